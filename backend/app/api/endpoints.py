@@ -1,29 +1,44 @@
-import io
-import json
 import logging
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 from fastapi import APIRouter, File, HTTPException, Query, Request, UploadFile, Form
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 from app.services.parser_service import extract_text_from_file
 from app.services.ai_service import (
-    extract_cv_data,
+    extract_cv_data_chunked,
+    extract_cv_data_stream,
     optimize_cv_data,
     critique_cv_data,
     optimize_for_role,
     generate_linkedin_post,
+    generate_linkedin_post_stream,
     generate_cover_letter,
+    generate_cover_letter_stream,
+    format_cover_letter,
     analyze_ats,
+    analyze_ats_sweep,
     generate_conversation_response,
     generate_conversation_response_stream,
     extract_cv_data_from_message,
     generate_next_question,
     analyze_job_description,
+    rank_candidates_for_job,
 )
-from app.services.cv_generator import generate_complete_cv
-from app.services.export_service import build_export_payload
+from app.services.cv_generator import (
+    generate_complete_cv,
+    generate_complete_cv_batch,
+    generate_complete_cv_stream,
+)
+from app.services.export_cache import build_cached_export, etag_matches, export_cache_key, export_etag
+from app.services.export_bundle import (
+    BUNDLE_MAX_ITEMS,
+    build_bundle_filename,
+    normalize_bundle_items,
+    stream_export_bundle,
+)
+from app.services.export_workers import stream_export_chunks
 from app.api.schemas import (
     CVDataInput,
     CVData,
@@ -34,9 +49,13 @@ from app.api.schemas import (
     ConversationPhase,
     JobAnalysisRequest,
     JobAnalysisResponse,
+    BatchJobRankingRequest,
+    BatchJobRankingResponse,
     ChatSession,
     CritiqueResponse,
+    CVMergeIndex,
 )
+from app.core.config import settings
 from app.core.exceptions import (
     APIError,
     CVProcessingError,
@@ -46,8 +65,12 @@ from app.core.exceptions import (
     NotFoundError,
     ValidationError,
 )
-from app.core.templates import registry, TemplateConfig
+from app.core.serialization import ORJSONResponse, sse_event
+from app.core.templates import registry
 from app.core.limiter import limiter
+from app.services.cv_merge import merge_cv_data
+from app.services.json_repair import get_repair_metrics
+from app.services.language_detection import update_session_language
 from app.services.session_store import store as session_store
 
 logger = logging.getLogger(__name__)
@@ -57,21 +80,54 @@ async def _get_session(session_id: str) -> Optional[ChatSession]:
     return await session_store.get_session(session_id)
 
 
-async def _save_session(session: ChatSession) -> None:
-    """Guarda una sesión de chat."""
+async def _save_session(session: ChatSession, flush: bool = False) -> None:
+    """
+    Guarda una sesión de chat. Con el cache de sesiones la escritura al backend
+    es diferida; `flush` (fin de turno) la hace en el momento.
+    """
     await session_store.save_session(session)
+    if flush:
+        await session_store.flush(session.session_id)
 
 
-async def _update_session_cv_data(session_id: str, new_data: Dict[str, Any]) -> None:
-    """Actualiza los datos del CV en una sesión."""
-    session = await _get_session(session_id)
-    if session:
-        # Deep merge de los datos
-        current_cv = session.cv_data
-        merged = _deep_merge(current_cv, new_data)
-        session.cv_data = merged
-        session.updated_at = datetime.utcnow()
-        await _save_session(session)
+def _sse_response(events: AsyncIterator[str], context: str) -> StreamingResponse:
+    """StreamingResponse SSE; un error inesperado llega al cliente como evento `error`."""
+
+    async def event_generator():
+        try:
+            async for event in events:
+                yield event
+        except Exception as e:
+            logger.error(f"Error in {context} stream generator: {e}")
+            yield sse_event({"type": "error", "error": str(e), "code": "STREAM_ERROR"})
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def _update_session_cv_data(session: ChatSession, new_data: Dict[str, Any]) -> None:
+    """
+    Fusiona datos nuevos en el CV de la sesión (in place).
+
+    Usa el índice de fingerprints de la sesión, así que solo se procesan los
+    ítems nuevos. Guardar la sesión queda a cargo del llamador.
+    """
+    merge_cv_data(session.cv_data, new_data, index=session.cv_index, in_place=True)
+    session.updated_at = datetime.utcnow()
+
+
+def _sync_session_cv_data(session: ChatSession, cv_data: Dict[str, Any]) -> None:
+    """Reemplaza el CV de la sesión por el del frontend, invalidando el índice si cambió."""
+    if cv_data != session.cv_data:
+        session.cv_data = cv_data
+        session.cv_index = CVMergeIndex()
 
 
 class CoverLetterRequest(BaseModel):
@@ -89,6 +145,10 @@ class CoverLetterResponse(BaseModel):
     signature: str
 
 
+# Todas las plantillas (sin aliases) caben en un batch.
+GENERATE_BATCH_MAX_TEMPLATES = 16
+
+
 class GenerateCompleteCVRequest(BaseModel):
     """Request model for complete CV generation."""
     cv_data: Dict[str, Any]
@@ -103,6 +163,17 @@ class GenerateCompleteCVResponse(BaseModel):
     generated_at: str
 
 
+class GenerateCompleteCVBatchRequest(BaseModel):
+    """Request model para generar el mismo CV en varias plantillas."""
+    cv_data: Dict[str, Any]
+    template_types: List[str] = Field(..., min_length=1, max_length=GENERATE_BATCH_MAX_TEMPLATES)
+
+
+class GenerateCompleteCVBatchResponse(BaseModel):
+    """Resultados por plantilla, en el orden pedido."""
+    results: Dict[str, GenerateCompleteCVResponse]
+
+
 class ExportCVRequest(BaseModel):
     """Request model for exportación de CV."""
     cv_data: Dict[str, Any]
@@ -110,12 +181,83 @@ class ExportCVRequest(BaseModel):
     format: str = Field(..., description="Formato de exportación: pdf, docx, txt, json")
 
 
+class ExportBundleItem(BaseModel):
+    template_id: str = Field(..., description="ID de la plantilla")
+    format: str = Field(..., description="Formato de exportación: pdf, docx, txt, json")
+
+
+class ExportBundleRequest(BaseModel):
+    """Request model para exportar varias combinaciones plantilla/formato en un ZIP."""
+    cv_data: Dict[str, Any]
+    items: List[ExportBundleItem] = Field(..., min_length=1, max_length=BUNDLE_MAX_ITEMS)
+
+
+# Las plantillas cambian solo con un deploy (o recarga): cache largo, revalidado por ETag.
+TEMPLATES_CACHE_CONTROL = "public, max-age=86400"
+
 router = APIRouter()
 
+
+def _model_response(result: Any) -> Any:
+    """
+    Serializa un modelo ya validado directamente a JSON.
+
+    FastAPI re-valida todo lo que devuelve un endpoint contra `response_model`;
+    devolver un `Response` evita esa segunda validación. Los dicts siguen el
+    camino normal.
+    """
+    if isinstance(result, BaseModel):
+        return Response(
+            content=result.model_dump_json(by_alias=True),
+            media_type="application/json",
+        )
+    return result
+
 MAX_FILE_SIZE_MB = 12
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
 
+def _unique_candidate_id(filename: str, used: Set[str]) -> str:
+    """ID de candidato sin repetir para archivos con el mismo nombre (`cv.pdf`, `cv.pdf#2`, ...)."""
+    candidate = filename
+    counter = 2
+    while candidate in used:
+        candidate = f"{filename}#{counter}"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+async def _extract_cv_uploads(files: List[UploadFile]) -> List[Tuple[str, str]]:
+    """
+    Extrae el texto de cada CV subido.
+
+    Returns:
+        Pares (nombre de archivo, texto). No se recorta nada: los textos largos
+        se procesan por chunks en la extracción.
+    """
+    documents: List[Tuple[str, str]] = []
+    for file in files:
+        content = await file.read()
+        filename = file.filename or "unknown"
+
+        if len(content) > MAX_FILE_SIZE_BYTES:
+            raise FileProcessingError(f"El archivo {filename} supera el límite de {MAX_FILE_SIZE_MB} MB")
+
+        if not filename.lower().endswith((".pdf", ".docx", ".txt")):
+            raise FileProcessingError(f"Unsupported file type: {filename}")
+
+        text = await extract_text_from_file(content, filename)
+        if not text.strip():
+            raise FileProcessingError(f"Could not extract text from {filename}")
+
+        documents.append((filename, text))
+
+    if not documents:
+        raise FileProcessingError("Could not extract text from files")
+    return documents
+
+
 @router.post("/generate-cv", response_model=CVData, response_model_by_alias=True, tags=["cv-gen"])
 @limiter.limit("10/minute")
 async def generate_cv(request: Request, files: List[UploadFile] = File(...)):
@@ -133,40 +275,17 @@ async def generate_cv(request: Request, files: List[UploadFile] = File(...)):
         422: CV processing failed
         503: AI service error
     """
-    combined_text = ""
-
     if not files:
         raise ValidationError("No files uploaded")
 
     try:
-        for file in files:
-            content = await file.read()
-            filename = file.filename or "unknown"
-
-            if len(content) > MAX_FILE_SIZE_BYTES:
-                raise FileProcessingError(f"El archivo {filename} supera el límite de {MAX_FILE_SIZE_MB} MB")
-
-            if not filename.lower().endswith((".pdf", ".docx", ".txt")):
-                raise FileProcessingError(f"Unsupported file type: {filename}")
-
-            text = await extract_text_from_file(content, filename)
-            if not text.strip():
-                raise FileProcessingError(f"Could not extract text from {filename}")
-
-            combined_text += f"\n--- FILE: {filename} ---\n{text}\n"
-
-        if not combined_text.strip():
-            raise FileProcessingError("Could not extract text from files")
-
-        # Limit text size for Groq API
-        combined_text = combined_text[:20000]
-
-        cv_data = await extract_cv_data(combined_text)
+        documents = await _extract_cv_uploads(files)
+        cv_data = await extract_cv_data_chunked(documents, as_model=True)
 
         if not cv_data:
             raise CVProcessingError("AI processing failed to generate CV data")
 
-        return cv_data
+        return _model_response(cv_data)
 
     except (CVProcessingError, FileProcessingError, ValidationError) as e:
         # Re-raise validation and file processing errors as-is
@@ -178,6 +297,30 @@ async def generate_cv(request: Request, files: List[UploadFile] = File(...)):
         raise InternalServerError("Error interno al procesar el CV. Intentá de nuevo.")
 
 
+@router.post("/generate-cv/stream", tags=["cv-gen"])
+@limiter.limit("10/minute")
+async def generate_cv_stream(request: Request, files: List[UploadFile] = File(...)):
+    """
+    Igual que /generate-cv, pero en streaming (SSE).
+
+    Emite `item` por cada ítem de las secciones lista (`experience[0]`, ...),
+    `section` por cada sección completa y un evento final `complete` con el
+    `cvData` validado. Los errores durante el stream llegan como evento `error`.
+    """
+    if not files:
+        raise ValidationError("No files uploaded")
+
+    try:
+        documents = await _extract_cv_uploads(files)
+    except (FileProcessingError, ValidationError):
+        raise
+    except Exception:
+        logger.exception("Unexpected error in generate_cv_stream")
+        raise InternalServerError("Error interno al procesar el CV. Intentá de nuevo.")
+
+    return _sse_response(extract_cv_data_stream(documents), "generate_cv_stream")
+
+
 @router.post("/optimize-cv", response_model=CVData, response_model_by_alias=True, tags=["cv-gen"])
 @limiter.limit("10/minute")
 async def optimize_cv(
@@ -199,12 +342,14 @@ async def optimize_cv(
         503: AI service error
     """
     try:
-        optimized_data = await optimize_cv_data(cv_data.model_dump(), target, section)
+        optimized_data = await optimize_cv_data(
+            cv_data.model_dump(), target, section, as_model=True
+        )
 
         if not optimized_data:
             raise CVProcessingError("AI optimization failed")
 
-        return optimized_data
+        return _model_response(optimized_data)
 
     except (CVProcessingError, ValidationError) as e:
         raise e
@@ -259,7 +404,7 @@ async def interview_cv(
         raise InternalServerError("Error al optimizar el CV para el puesto. Intentá de nuevo.")
 
 
-@router.post("/generate-linkedin-post")
+@router.post("/generate-linkedin-post", response_class=ORJSONResponse)
 @limiter.limit("10/minute")
 async def generate_linkedin_post_endpoint(request: Request, cv_data: CVDataInput):
     """Generate a LinkedIn post content based on CV data."""
@@ -279,6 +424,16 @@ async def generate_linkedin_post_endpoint(request: Request, cv_data: CVDataInput
         raise InternalServerError("Error al generar el post de LinkedIn. Intentá de nuevo.")
 
 
+@router.post("/generate-linkedin-post/stream")
+@limiter.limit("10/minute")
+async def generate_linkedin_post_stream_endpoint(request: Request, cv_data: CVDataInput):
+    """
+    Igual que /generate-linkedin-post, pero en streaming (SSE): `delta`,
+    `section` (`post_content`) y `complete` con la misma respuesta.
+    """
+    return _sse_response(generate_linkedin_post_stream(cv_data.model_dump()), "LinkedIn post")
+
+
 @router.post("/generate-cover-letter", response_model=CoverLetterResponse)
 @limiter.limit("10/minute")
 async def generate_cover_letter_endpoint(request: Request, cover_letter_request: CoverLetterRequest):
@@ -295,12 +450,7 @@ async def generate_cover_letter_endpoint(request: Request, cover_letter_request:
         if not result:
             raise CVProcessingError("No se pudo generar la carta de presentación.")
 
-        return CoverLetterResponse(
-            opening=result.get("opening", ""),
-            body=result.get("body", ""),
-            closing=result.get("closing", ""),
-            signature=result.get("signature", ""),
-        )
+        return CoverLetterResponse(**format_cover_letter(result))
     except APIError:
         raise
     except AIServiceError as e:
@@ -310,13 +460,42 @@ async def generate_cover_letter_endpoint(request: Request, cover_letter_request:
         raise InternalServerError("Error al generar la carta de presentación. Intentá de nuevo.")
 
 
-@router.get("/templates", response_model=List[TemplateConfig], tags=["cv-gen"])
+@router.post("/generate-cover-letter/stream")
+@limiter.limit("10/minute")
+async def generate_cover_letter_stream_endpoint(request: Request, cover_letter_request: CoverLetterRequest):
+    """
+    Igual que /generate-cover-letter, pero en streaming (SSE).
+
+    Emite `delta` con cada fragmento de texto, `section` cuando se completa
+    cada campo (`opening`, `body`, ...) y un evento final `complete` cuyo
+    `data` es la misma respuesta que el endpoint sin streaming.
+    """
+    return _sse_response(
+        generate_cover_letter_stream(
+            cv_data=cover_letter_request.cv_data,
+            company_name=cover_letter_request.company_name,
+            recipient_name=cover_letter_request.recipient_name,
+            job_description=cover_letter_request.job_description or "",
+            tone=cover_letter_request.tone,
+        ),
+        "cover letter",
+    )
+
+
+@router.get("/templates", response_class=Response, tags=["cv-gen"])
 @limiter.limit("30/minute")
 async def get_templates(request: Request):
     """
     Get all available CV templates with their metadata.
+
+    El JSON se arma una sola vez en el registry (sin los prompts internos) y se
+    sirve tal cual, con ETag; si cambian las plantillas cambia el ETag.
     """
-    return registry.get_all_templates()
+    payload, etag = registry.get_public_payload()
+    headers = {"ETag": etag, "Cache-Control": TEMPLATES_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
 
 
 @router.post("/generate-complete-cv", response_model=GenerateCompleteCVResponse, response_model_by_alias=True, tags=["cv-gen"])
@@ -339,14 +518,7 @@ async def generate_complete_cv_endpoint(
         503: AI service error
     """
     try:
-        # Validate template type
-        valid_templates = registry.get_template_ids()
-
-        if cv_request.template_type not in valid_templates:
-            raise ValidationError(
-                f"Invalid template type: {cv_request.template_type}. "
-                f"Must be one of: {', '.join(valid_templates)}"
-            )
+        _validate_template_types([cv_request.template_type])
 
         # Generate complete CV
         result = await generate_complete_cv(
@@ -354,12 +526,7 @@ async def generate_complete_cv_endpoint(
             template_type=cv_request.template_type,
         )
 
-        return GenerateCompleteCVResponse(
-            data=result["data"],
-            metadata=result["metadata"],
-            template_type=result["template_type"],
-            generated_at=result["generatedAt"],
-        )
+        return GenerateCompleteCVResponse(**result)
 
     except (CVProcessingError, ValidationError) as e:
         raise e
@@ -370,18 +537,105 @@ async def generate_complete_cv_endpoint(
         raise InternalServerError("Error interno al generar el CV. Intentá de nuevo.")
 
 
+@router.post("/generate-complete-cv/stream", tags=["cv-gen"])
+@limiter.limit("10/minute")
+async def generate_complete_cv_stream_endpoint(
+    request: Request, cv_request: GenerateCompleteCVRequest
+):
+    """
+    Igual que /generate-complete-cv, pero en streaming (SSE).
+
+    Emite `delta` y `section` por cada sección que se reescribe (con
+    `section` e `index`), y un evento final `complete` cuyo `data` es la
+    misma respuesta que el endpoint sin streaming.
+
+    Raises:
+        400: Plantilla inválida (antes de abrir el stream)
+    """
+    _validate_template_types([cv_request.template_type])
+    return _sse_response(
+        generate_complete_cv_stream(cv_request.cv_data, cv_request.template_type),
+        "complete CV",
+    )
+
+
+@router.post("/generate-complete-cv/batch", response_model=GenerateCompleteCVBatchResponse, tags=["cv-gen"])
+@limiter.limit("10/minute")
+async def generate_complete_cv_batch_endpoint(
+    request: Request, batch_request: GenerateCompleteCVBatchRequest
+):
+    """
+    Genera el mismo CV para varias plantillas en un solo request.
+
+    La mejora con IA se hace una vez y se comparte; cada plantilla solo suma
+    su paso de formato.
+
+    Raises:
+        400: Plantilla inválida
+        422: CV processing failed
+        503: AI service error
+    """
+    try:
+        _validate_template_types(batch_request.template_types)
+        results = await generate_complete_cv_batch(
+            cv_data=batch_request.cv_data,
+            template_types=batch_request.template_types,
+        )
+        return GenerateCompleteCVBatchResponse(
+            results={
+                template_type: GenerateCompleteCVResponse(**result)
+                for template_type, result in results.items()
+            }
+        )
+
+    except (CVProcessingError, ValidationError) as e:
+        raise e
+    except AIServiceError as e:
+        raise e
+    except Exception:
+        logger.exception("Unexpected error in generate_complete_cv_batch_endpoint")
+        raise InternalServerError("Error interno al generar el CV. Intentá de nuevo.")
+
+
+def _validate_template_types(template_types: List[str]) -> None:
+    valid_templates = registry.get_template_ids()
+    for template_type in template_types:
+        if template_type not in valid_templates:
+            raise ValidationError(
+                f"Invalid template type: {template_type}. "
+                f"Must be one of: {', '.join(valid_templates)}"
+            )
+
+
 @router.post("/export-cv", tags=["exports"])
 @limiter.limit("10/minute")
 async def export_cv_endpoint(request: Request, export_request: ExportCVRequest):
-    """Exporta un CV en el formato solicitado."""
+    """
+    Exporta un CV en el formato solicitado.
+
+    El archivo se cachea por contenido: la respuesta lleva un `ETag` fuerte y
+    un `If-None-Match` que coincide devuelve 304 sin volver a renderizar.
+    """
     try:
-        content, filename, media_type = build_export_payload(
+        export_format = export_request.format.lower()
+        cache_key = export_cache_key(export_request.cv_data, export_request.template_id, export_format)
+        etag = export_etag(cache_key)
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=cache_headers)
+
+        content, filename, media_type = await build_cached_export(
+            cache_key,
             cv_data=export_request.cv_data,
             template_id=export_request.template_id,
-            export_format=export_request.format.lower(),
+            export_format=export_format,
         )
-        headers = {"Content-Disposition": f"attachment; filename={filename}"}
-        return StreamingResponse(io.BytesIO(content), media_type=media_type, headers=headers)
+        headers = {
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(len(content)),
+            **cache_headers,
+        }
+        return StreamingResponse(stream_export_chunks(content), media_type=media_type, headers=headers)
     except (CVProcessingError, ValidationError) as e:
         raise e
     except Exception:
@@ -389,6 +643,53 @@ async def export_cv_endpoint(request: Request, export_request: ExportCVRequest):
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@router.post("/export-cv/bundle", tags=["exports"])
+@limiter.limit("10/minute")
+async def export_cv_bundle_endpoint(request: Request, bundle_request: ExportBundleRequest):
+    """
+    Exporta varias combinaciones de plantilla y formato en un solo ZIP.
+
+    Cada plantilla se compila una vez y sus formatos se renderizan en paralelo;
+    el ZIP se envía a medida que se completa cada archivo.
+    """
+    try:
+        items = normalize_bundle_items(
+            [(item.template_id, item.format) for item in bundle_request.items]
+        )
+        filename = build_bundle_filename(bundle_request.cv_data)
+        return StreamingResponse(
+            stream_export_bundle(bundle_request.cv_data, items),
+            media_type="application/zip",
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+    except ValidationError as e:
+        raise e
+    except Exception:
+        logger.exception("Unexpected error in export_cv_bundle_endpoint")
+        raise InternalServerError("Error interno al exportar el CV. Intentá de nuevo.")
+
+
+async def _extract_ats_files_text(files: List[UploadFile]) -> str:
+    """Extrae y concatena el texto de los archivos subidos para el ATS checker."""
+    combined_text = ""
+    for file in files:
+        content = await file.read()
+        filename = file.filename or "unknown"
+
+        if not filename.lower().endswith((".pdf", ".docx", ".txt")):
+            raise FileProcessingError(f"Unsupported file type: {filename}")
+
+        text = await extract_text_from_file(content, filename)
+        if not text.strip():
+            raise FileProcessingError(f"Could not extract text from {filename}")
+
+        combined_text += f"\n--- FILE: {filename} ---\n{text}\n"
+
+    if not combined_text.strip():
+        raise FileProcessingError("Could not extract text from files")
+    return combined_text
+
+
 class ATSCheckResponse(BaseModel):
     ats_score: int
     grade: str
@@ -418,31 +719,19 @@ async def ats_check(
         None,
         description="Contexto opcional para asegurar consistencia en mejoras previas",
     ),
+    mode: str = Query(
+        "full",
+        pattern="^(full|fast)$",
+        description="full: local scores + AI narrative; fast: local scoring only, no AI call",
+    ),
 ):
     """Analyze a CV PDF/DOCX for ATS compatibility."""
-    combined_text = ""
-
     if not files:
         raise ValidationError("No files uploaded")
 
     try:
-        for file in files:
-            content = await file.read()
-            filename = file.filename or "unknown"
-
-            if not filename.lower().endswith((".pdf", ".docx", ".txt")):
-                raise FileProcessingError(f"Unsupported file type: {filename}")
-
-            text = await extract_text_from_file(content, filename)
-            if not text.strip():
-                raise FileProcessingError(f"Could not extract text from {filename}")
-
-            combined_text += f"\n--- FILE: {filename} ---\n{text}\n"
-
-        if not combined_text.strip():
-            raise FileProcessingError("Could not extract text from files")
-
-        result = await analyze_ats(combined_text, target_industry, improvement_context)
+        combined_text = await _extract_ats_files_text(files)
+        result = await analyze_ats(combined_text, target_industry, improvement_context, mode=mode)
 
         if not result:
             raise CVProcessingError("ATS analysis failed")
@@ -473,6 +762,54 @@ async def ats_check(
         raise InternalServerError("Error interno al analizar el CV. Intentá de nuevo.")
 
 
+class ATSIndustryFit(BaseModel):
+    industry: str
+    name: str
+    fit_score: int
+    ats_score: int
+    grade: str
+    keyword_score: int
+    found_keywords: List[str]
+    match_ratio: float
+    mismatch_detected: bool
+
+
+class ATSSweepResponse(BaseModel):
+    industries: List[ATSIndustryFit]
+    top_match: ATSCheckResponse
+
+
+@router.post("/ats-check/sweep", response_model=ATSSweepResponse, tags=["cv-gen"])
+@limiter.limit("10/minute")
+async def ats_check_sweep(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    improvement_context: Optional[str] = Form(
+        None,
+        description="Contexto opcional para asegurar consistencia en mejoras previas",
+    ),
+    mode: str = Query(
+        "fast",
+        pattern="^(full|fast)$",
+        description="fast: local ranking only; full: adds the AI narrative for the top match",
+    ),
+):
+    """Parse the CV once and rank its fit against every supported industry."""
+    if not files:
+        raise ValidationError("No files uploaded")
+
+    try:
+        combined_text = await _extract_ats_files_text(files)
+        result = await analyze_ats_sweep(combined_text, improvement_context, mode=mode)
+        return ATSSweepResponse(**result)
+
+    except (FileProcessingError, ValidationError, AIServiceError) as e:
+        raise e
+    except Exception:
+        logger.exception("Unexpected error in ats_check_sweep")
+        raise InternalServerError("Error interno al analizar el CV. Intentá de nuevo.")
+
+
 # =============================================================================
 # CHAT ENDPOINTS
 # =============================================================================
@@ -485,36 +822,43 @@ async def chat_stream(request: Request, chat_request: ChatRequest):
 
     Permite una conversación natural para construir el CV,
     con respuestas en tiempo real y extracción de datos.
+
+    El turno completo corre con el lock de la sesión tomado (se libera al
+    terminar o cortarse el stream), así dos turnos de la misma sesión no se pisan.
     """
-    try:
-        # Obtener o crear sesión
-        session = await _get_session(chat_request.session_id)
-        if not session:
-            session = ChatSession(
-                session_id=chat_request.session_id,
-                cv_data=chat_request.cv_data,
-                current_phase=chat_request.phase,
-            )
-        else:
-            # ACTUALIZACIÓN CRÍTICA: Sincronizar datos del CV desde el frontend
-            # para evitar que la sesión en memoria tenga datos obsoletos
-            session.cv_data = chat_request.cv_data
-            session.current_phase = chat_request.phase
-
-        # Agregar mensaje del usuario al historial
-        user_message = ChatMessage(
-            id=f"msg_{datetime.utcnow().timestamp()}_user",
-            role="user",
-            content=chat_request.message,
-            timestamp=datetime.utcnow(),
-        )
-        session.messages.append(user_message)
 
-        # Guardar sesión
-        await _save_session(session)
+    async def event_generator():
+        """Generador de eventos SSE."""
+        async with session_store.lock(chat_request.session_id):
+            try:
+                # Obtener o crear sesión
+                session = await _get_session(chat_request.session_id)
+                if not session:
+                    session = ChatSession(
+                        session_id=chat_request.session_id,
+                        cv_data=chat_request.cv_data,
+                        current_phase=chat_request.phase,
+                    )
+                else:
+                    # ACTUALIZACIÓN CRÍTICA: Sincronizar datos del CV desde el frontend
+                    # para evitar que la sesión en memoria tenga datos obsoletos
+                    _sync_session_cv_data(session, chat_request.cv_data)
+                    session.current_phase = chat_request.phase
+
+                # Agregar mensaje del usuario al historial
+                user_message = ChatMessage(
+                    id=f"msg_{datetime.utcnow().timestamp()}_user",
+                    role="user",
+                    content=chat_request.message,
+                    timestamp=datetime.utcnow(),
+                )
+                session.messages.append(user_message)
+                language_code = update_session_language(session)
+            except Exception as e:
+                logger.exception("Error in chat_stream endpoint")
+                yield sse_event({"type": "error", "error": str(e), "code": "STREAM_ERROR"})
+                return
 
-        async def event_generator():
-            """Generador de eventos SSE."""
             try:
                 async for event in generate_conversation_response_stream(
                     message=chat_request.message,
@@ -522,30 +866,23 @@ async def chat_stream(request: Request, chat_request: ChatRequest):
                     cv_data=session.cv_data,
                     current_phase=session.current_phase,
                     job_description=chat_request.job_description,
+                    language_code=language_code,
+                    cv_index=session.cv_index,
                 ):
                     yield event
 
-                # Actualizar sesión al completar
-                session.updated_at = datetime.utcnow()
-                await _save_session(session)
-
             except Exception as e:
                 logger.error(f"Error in stream generator: {e}")
-                yield f"data: {json.dumps({'type': 'error', 'error': str(e), 'code': 'STREAM_ERROR'})}\n\n"
+                yield sse_event({"type": "error", "error": str(e), "code": "STREAM_ERROR"})
 
-        return StreamingResponse(
-            event_generator(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",
-            },
-        )
+            finally:
+                # Fin del turno (completo o no): una sola escritura al backend.
+                try:
+                    await _save_session(session, flush=True)
+                except Exception:
+                    logger.exception("Error saving chat session after stream")
 
-    except Exception:
-        logger.exception("Error in chat_stream endpoint")
-        raise InternalServerError("Error en el servicio de chat. Intentá de nuevo.")
+    return _sse_response(event_generator(), "chat_stream")
 
 
 @router.post("/chat", response_model=ChatResponse, response_model_by_alias=True)
@@ -557,68 +894,70 @@ async def chat(request: Request, chat_request: ChatRequest):
     Útil para clientes que no soportan SSE o para testing.
     """
     try:
-        # Obtener o crear sesión
-        session = await _get_session(chat_request.session_id)
-        if not session:
-            session = ChatSession(
-                session_id=chat_request.session_id,
-                cv_data=chat_request.cv_data,
-                current_phase=chat_request.phase,
+        async with session_store.lock(chat_request.session_id):
+            # Obtener o crear sesión
+            session = await _get_session(chat_request.session_id)
+            if not session:
+                session = ChatSession(
+                    session_id=chat_request.session_id,
+                    cv_data=chat_request.cv_data,
+                    current_phase=chat_request.phase,
+                )
+
+            # Agregar mensaje del usuario
+            user_message = ChatMessage(
+                id=f"msg_{datetime.utcnow().timestamp()}_user",
+                role="user",
+                content=chat_request.message,
+                timestamp=datetime.utcnow(),
+            )
+            session.messages.append(user_message)
+
+            # Generar respuesta
+            result = await generate_conversation_response(
+                message=chat_request.message,
+                history=session.messages,
+                cv_data=session.cv_data,
+                current_phase=session.current_phase,
+                job_description=chat_request.job_description,
+                language_code=update_session_language(session),
             )
 
-        # Agregar mensaje del usuario
-        user_message = ChatMessage(
-            id=f"msg_{datetime.utcnow().timestamp()}_user",
-            role="user",
-            content=chat_request.message,
-            timestamp=datetime.utcnow(),
-        )
-        session.messages.append(user_message)
-
-        # Generar respuesta
-        result = await generate_conversation_response(
-            message=chat_request.message,
-            history=session.messages,
-            cv_data=session.cv_data,
-            current_phase=session.current_phase,
-            job_description=chat_request.job_description,
-        )
-
-        # Extraer datos
-        extraction = await extract_cv_data_from_message(
-            message=chat_request.message,
-            history=session.messages,
-            cv_data=session.cv_data,
-            current_phase=session.current_phase,
-        )
+            # Extraer datos
+            extraction = await extract_cv_data_from_message(
+                message=chat_request.message,
+                history=session.messages,
+                cv_data=session.cv_data,
+                current_phase=session.current_phase,
+            )
 
-        # Actualizar datos del CV si hay extracción con alta confianza
-        if extraction and extraction.extracted:
-            await _update_session_cv_data(chat_request.session_id, extraction.extracted)
-
-        # Actualizar fase si cambió
-        new_phase = result.get("new_phase")
-        if new_phase and new_phase != session.current_phase:
-            session.current_phase = new_phase
-
-        # Crear mensaje de respuesta
-        assistant_message = ChatMessage(
-            id=f"msg_{datetime.utcnow().timestamp()}_assistant",
-            role="assistant",
-            content=result["response"],
-            timestamp=datetime.utcnow(),
-            extraction=extraction.model_dump(by_alias=True) if extraction else None,
-        )
-        session.messages.append(assistant_message)
-        session.updated_at = datetime.utcnow()
-        await _save_session(session)
-
-        return ChatResponse(
-            message=assistant_message,
-            extraction=extraction,
-            new_phase=new_phase,
-            suggestions=result.get("suggestions"),
-        )
+            # Actualizar datos del CV si hay extracción con alta confianza
+            if extraction and extraction.extracted:
+                _update_session_cv_data(session, extraction.extracted)
+
+            # Actualizar fase si cambió
+            new_phase = result.get("new_phase")
+            if new_phase and new_phase != session.current_phase:
+                session.current_phase = new_phase
+
+            # Crear mensaje de respuesta
+            assistant_message = ChatMessage(
+                id=f"msg_{datetime.utcnow().timestamp()}_assistant",
+                role="assistant",
+                content=result["response"],
+                timestamp=datetime.utcnow(),
+                extraction=extraction.model_dump(by_alias=True) if extraction else None,
+            )
+            session.messages.append(assistant_message)
+            session.updated_at = datetime.utcnow()
+            await _save_session(session, flush=True)
+
+            return ChatResponse(
+                message=assistant_message,
+                extraction=extraction,
+                new_phase=new_phase,
+                suggestions=result.get("suggestions"),
+            )
 
     except Exception:
         logger.exception("Error in chat endpoint")
@@ -658,7 +997,15 @@ async def chat_extract(request: Request, chat_request: ChatRequest):
 
 @router.post("/chat/job-analysis", response_model=JobAnalysisResponse, response_model_by_alias=True)
 @limiter.limit("10/minute")
-async def chat_job_analysis(request: Request, job_request: JobAnalysisRequest):
+async def chat_job_analysis(
+    request: Request,
+    job_request: JobAnalysisRequest,
+    mode: str = Query(
+        "full",
+        pattern="^(full|fast)$",
+        description="full: match local + sugerencias de IA; fast: solo match local, sin IA",
+    ),
+):
     """
     Analiza una descripción de puesto y compara con el CV.
 
@@ -668,6 +1015,7 @@ async def chat_job_analysis(request: Request, job_request: JobAnalysisRequest):
         result = await analyze_job_description(
             job_description=job_request.job_description,
             cv_data=job_request.cv_data,
+            mode=mode,
         )
 
         if not result:
@@ -682,7 +1030,88 @@ async def chat_job_analysis(request: Request, job_request: JobAnalysisRequest):
         raise InternalServerError("Error al analizar el puesto. Intentá de nuevo.")
 
 
-@router.get("/chat/session/{session_id}")
+@router.post(
+    "/chat/job-analysis/batch",
+    response_model=BatchJobRankingResponse,
+    response_model_by_alias=True,
+)
+@limiter.limit("10/minute")
+async def chat_job_analysis_batch(request: Request, batch_request: BatchJobRankingRequest):
+    """
+    Rankea muchos CVs contra una descripción de puesto.
+
+    El ranking es local; solo los `topK` mejores reciben análisis con IA.
+    """
+    try:
+        result = await rank_candidates_for_job(
+            batch_request.job_description,
+            [(candidate.id, candidate.cv_data) for candidate in batch_request.candidates],
+            top_k=batch_request.top_k,
+        )
+        return BatchJobRankingResponse(**result)
+
+    except APIError:
+        raise
+    except Exception:
+        logger.exception("Error in chat_job_analysis_batch endpoint")
+        raise InternalServerError("Error al rankear los CVs. Intentá de nuevo.")
+
+
+@router.post(
+    "/chat/job-analysis/batch/files",
+    response_model=BatchJobRankingResponse,
+    response_model_by_alias=True,
+)
+@limiter.limit("10/minute")
+async def chat_job_analysis_batch_files(
+    request: Request,
+    job_description: str = Form(..., min_length=50, max_length=10000),
+    files: List[UploadFile] = File(...),
+    top_k: int = Query(0, ge=0, le=20, description="Cantidad de CVs que reciben análisis con IA"),
+):
+    """
+    Variante de `/chat/job-analysis/batch` que recibe los CVs como archivos.
+
+    Cada archivo es un candidato; el ID es el nombre del archivo.
+    """
+    if not files:
+        raise ValidationError("No files uploaded")
+    if len(files) > settings.BATCH_RANKING_MAX_CANDIDATES:
+        raise ValidationError(
+            f"Se pueden rankear hasta {settings.BATCH_RANKING_MAX_CANDIDATES} CVs por request."
+        )
+    # Tipo y tamaño de todos los archivos antes de parsear ninguno.
+    for file in files:
+        filename = file.filename or "unknown"
+        if not filename.lower().endswith((".pdf", ".docx", ".txt")):
+            raise FileProcessingError(f"Unsupported file type: {filename}")
+        if file.size is not None and file.size > MAX_FILE_SIZE_BYTES:
+            raise FileProcessingError(f"El archivo {filename} supera el límite de {MAX_FILE_SIZE_MB} MB")
+
+    try:
+        candidates = []
+        seen_ids = set()
+        for file in files:
+            filename = file.filename or "unknown"
+            content = await file.read()
+            if len(content) > MAX_FILE_SIZE_BYTES:
+                raise FileProcessingError(f"El archivo {filename} supera el límite de {MAX_FILE_SIZE_MB} MB")
+            text = await extract_text_from_file(content, filename)
+            if not text.strip():
+                raise FileProcessingError(f"Could not extract text from {filename}")
+            candidates.append((_unique_candidate_id(filename, seen_ids), text))
+
+        result = await rank_candidates_for_job(job_description, candidates, top_k=top_k)
+        return BatchJobRankingResponse(**result)
+
+    except APIError:
+        raise
+    except Exception:
+        logger.exception("Error in chat_job_analysis_batch_files endpoint")
+        raise InternalServerError("Error al rankear los CVs. Intentá de nuevo.")
+
+
+@router.get("/chat/session/{session_id}", response_class=ORJSONResponse)
 @limiter.limit("30/minute")
 async def get_chat_session(request: Request, session_id: str):
     """
@@ -690,28 +1119,30 @@ async def get_chat_session(request: Request, session_id: str):
 
     Incluye historial de mensajes y datos del CV acumulados.
     """
-    session = await _get_session(session_id)
+    async with session_store.lock(session_id):
+        session = await _get_session(session_id)
 
-    if not session:
-        # Crear nueva sesión si no existe
-        session = ChatSession(
-            session_id=session_id,
-            cv_data={},
-            current_phase=ConversationPhase.WELCOME,
-        )
-        await _save_session(session)
+        if not session:
+            # Crear nueva sesión si no existe (con el cache, la escritura se junta
+            # con la del primer turno si llega antes de SESSION_CACHE_FLUSH_MS)
+            session = ChatSession(
+                session_id=session_id,
+                cv_data={},
+                current_phase=ConversationPhase.WELCOME,
+            )
+            await _save_session(session)
 
-    return {
-        "sessionId": session.session_id,
-        "messages": [msg.model_dump(by_alias=True) for msg in session.messages],
-        "cvData": session.cv_data,
-        "currentPhase": session.current_phase.value,
-        "createdAt": session.created_at.isoformat(),
-        "updatedAt": session.updated_at.isoformat(),
-    }
+        return {
+            "sessionId": session.session_id,
+            "messages": [msg.model_dump(by_alias=True) for msg in session.messages],
+            "cvData": session.cv_data,
+            "currentPhase": session.current_phase.value,
+            "createdAt": session.created_at.isoformat(),
+            "updatedAt": session.updated_at.isoformat(),
+        }
 
 
-@router.post("/chat/session/{session_id}/next-question")
+@router.post("/chat/session/{session_id}/next-question", response_class=ORJSONResponse)
 @limiter.limit("10/minute")
 async def get_next_question(request: Request, session_id: str):
     """
@@ -738,30 +1169,34 @@ async def get_next_question(request: Request, session_id: str):
         raise InternalServerError("Error al generar la siguiente pregunta. Intentá de nuevo.")
 
 
+# =============================================================================
+# METRICS
+# =============================================================================
+
+@router.get("/metrics/json-repair", tags=["metrics"], response_class=ORJSONResponse)
+@limiter.limit("30/minute")
+async def json_repair_metrics(request: Request):
+    """
+    Contadores de la reparación local de JSON de la IA.
+
+    `retriesAvoided` cuenta las respuestas reparadas en el primer intento, que
+    de otro modo habrían disparado un nuevo pedido al proveedor.
+    """
+    metrics = get_repair_metrics()
+    return {
+        "attempts": metrics["attempts"],
+        "parseRepaired": metrics["parse_repaired"],
+        "validationRepaired": metrics["validation_repaired"],
+        "failed": metrics["failed"],
+        "retriesAvoided": metrics["retries_avoided"],
+        "byContext": metrics["by_context"],
+    }
+
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
 
 def _deep_merge(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
-    """Realiza un merge profundo de dos diccionarios."""
-    result = base.copy()
-
-    for key, value in update.items():
-        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-            result[key] = _deep_merge(result[key], value)
-        elif key in result and isinstance(result[key], list) and isinstance(value, list):
-            # Para listas, agregamos elementos nuevos (evitando duplicados simples)
-            existing = {json.dumps(item, sort_keys=True) for item in result[key] if isinstance(item, dict)}
-            for item in value:
-                if isinstance(item, dict):
-                    item_key = json.dumps(item, sort_keys=True)
-                    if item_key not in existing:
-                        result[key].append(item)
-                        existing.add(item_key)
-                else:
-                    if item not in result[key]:
-                        result[key].append(item)
-        else:
-            result[key] = value
-
-    return result
+    """Realiza un merge profundo de dos diccionarios sin modificar `base`."""
+    return merge_cv_data(base, update)
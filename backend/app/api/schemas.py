@@ -7,7 +7,7 @@ from pydantic import (
     AliasGenerator,
 )
 from pydantic.alias_generators import to_camel
-from typing import List, Optional, Any, Dict, Literal
+from typing import List, Optional, Any, Dict, Literal, Set
 from datetime import datetime
 from enum import Enum
 
@@ -213,6 +213,58 @@ class JobAnalysisResponse(BaseSchema):
     optimized_cv: Optional[Dict[str, Any]] = Field(None, description="CV optimizado")
 
 
+class BatchCandidate(BaseSchema):
+    """CV a rankear dentro de un batch."""
+
+    id: str = Field(..., min_length=1, max_length=200, description="ID del candidato")
+    cv_data: Dict[str, Any] = Field(..., description="Datos del CV")
+
+
+class BatchJobRankingRequest(BaseSchema):
+    """Request para rankear muchos CVs contra un mismo puesto."""
+
+    job_description: str = Field(
+        ..., min_length=50, max_length=10000, description="Descripción del puesto"
+    )
+    candidates: List[BatchCandidate] = Field(
+        ..., min_length=1, description="CVs a rankear"
+    )
+    top_k: int = Field(
+        0, ge=0, le=20, description="Cantidad de mejores CVs que reciben análisis con IA"
+    )
+
+    @field_validator("candidates")
+    @classmethod
+    def unique_candidate_ids(cls, v):
+        ids = [candidate.id for candidate in v]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Candidate IDs must be unique")
+        return v
+
+
+class RankedCandidate(BaseSchema):
+    """Resultado de un CV dentro del ranking."""
+
+    id: str = Field(..., description="ID del candidato")
+    rank: int = Field(..., ge=1, description="Posición en el ranking")
+    match_score: int = Field(..., ge=0, le=100, description="Score de coincidencia 0-100")
+    matched_skills: List[str] = Field(default_factory=list, description="Habilidades que coinciden")
+    missing_skills: List[str] = Field(default_factory=list, description="Habilidades faltantes")
+    analysis: Optional[JobAnalysisResponse] = Field(
+        None, description="Análisis con IA (solo top-K)"
+    )
+
+
+class BatchJobRankingResponse(BaseSchema):
+    """Response del ranking de CVs."""
+
+    key_requirements: List[str] = Field(
+        default_factory=list, description="Requisitos clave del puesto"
+    )
+    total: int = Field(..., ge=0, description="Cantidad de CVs rankeados")
+    ranked: List[RankedCandidate] = Field(default_factory=list, description="CVs ordenados por match")
+
+
 class ChatResponse(BaseSchema):
     """Response completo del chat (no-streaming)."""
 
@@ -231,6 +283,29 @@ class ChatResponse(BaseSchema):
 # =============================================================================
 
 
+class LanguageState(BaseSchema):
+    """Idioma detectado en una sesión, actualizado incrementalmente por mensaje."""
+
+    code: Literal["es", "en"] = Field("es", description="Idioma detectado")
+    es_score: float = Field(0.0, description="Señales de español (con decaimiento)")
+    en_score: float = Field(0.0, description="Señales de inglés (con decaimiento)")
+    explicit: Optional[Literal["es", "en"]] = Field(
+        None, description="Idioma pedido explícitamente por el usuario"
+    )
+    scanned_messages: int = Field(0, ge=0, description="Mensajes ya procesados")
+
+
+class CVMergeIndex(BaseSchema):
+    """Fingerprints por sección de `cv_data`, para merges incrementales."""
+
+    fingerprints: Dict[str, Set[str]] = Field(
+        default_factory=dict, description="Fingerprints de los ítems de cada sección lista"
+    )
+    sizes: Dict[str, int] = Field(
+        default_factory=dict, description="Cantidad de ítems indexados por sección"
+    )
+
+
 class ChatSession(BaseSchema):
     """Estado de una sesión de chat."""
 
@@ -253,6 +328,12 @@ class ChatSession(BaseSchema):
     job_description: Optional[str] = Field(
         None, description="Descripción del puesto si existe"
     )
+    language: LanguageState = Field(
+        default_factory=LanguageState, description="Idioma detectado de la conversación"
+    )
+    cv_index: CVMergeIndex = Field(
+        default_factory=CVMergeIndex, description="Índice de deduplicación de `cv_data`"
+    )
 
 
 class PersonalInfo(BaseSchema):
@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List, Literal
 
 from dotenv import load_dotenv
 from pydantic import Field, model_validator
@@ -26,6 +26,40 @@ class Settings(BaseSettings):
     CORS_ORIGINS: str = ""
     SESSION_STORE_TYPE: str = "sqlite"
     CHAT_SESSION_TTL_SECONDS: int = 60 * 60 * 24
+    # Cache de sesiones en memoria con escritura diferida: sesiones cacheadas (0 = sin cache),
+    # demora máxima de una escritura pendiente, y Redis para invalidar entre workers
+    # ("" = REDIS_URL si SESSION_STORE_TYPE=redis; si no, sin invalidación: un solo worker).
+    SESSION_CACHE_SIZE: int = 1024
+    SESSION_CACHE_FLUSH_MS: int = 5000
+    SESSION_CACHE_REDIS_URL: str = ""
+    # Workers del servidor (la misma variable que leen uvicorn y gunicorn). Con más de uno
+    # y sin Redis para invalidar, el cache de sesiones se desactiva.
+    WEB_CONCURRENCY: int = 1
+    BATCH_RANKING_MAX_CANDIDATES: int = 5000
+    BATCH_ANALYSIS_CONCURRENCY: int = 4
+    # Extracción map-reduce: tamaño de chunk, fan-out y tope de chunks por request.
+    EXTRACTION_CHUNK_CHARS: int = 12000
+    EXTRACTION_MAX_CONCURRENCY: int = 4
+    EXTRACTION_MAX_CHUNKS: int = 16
+    # Envía JSON Schemas a los proveedores que soportan salida estructurada.
+    AI_STRUCTURED_OUTPUTS: bool = True
+    # Generación por secciones: llamadas simultáneas al proveedor por request.
+    AI_SECTION_CONCURRENCY: int = 4
+    # Mejora de CV compartida entre plantillas: entradas cacheadas y vigencia.
+    ENHANCEMENT_CACHE_SIZE: int = 256
+    ENHANCEMENT_CACHE_TTL_SECONDS: int = 60 * 60
+    # Cache de exports: tope en memoria (bytes) y tier opcional en disco ("" = deshabilitado).
+    EXPORT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    EXPORT_CACHE_DIR: str = ""
+    EXPORT_CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024
+    # Render de exports fuera del event loop: pool ("thread" o "process") y tope por formato.
+    EXPORT_WORKER_MODE: Literal["thread", "process"] = "thread"
+    EXPORT_WORKERS: int = 2
+    EXPORT_FORMAT_CONCURRENCY: Dict[str, int] = {"pdf": 2, "docx": 2, "txt": 8, "json": 8}
+    # Plantillas: directorio de archivos JSON ("" = las incluidas en app/core/template_data)
+    # y cada cuántos segundos se revisan cambios (0 = solo recarga con SIGHUP).
+    TEMPLATES_DIR: str = ""
+    TEMPLATES_RELOAD_INTERVAL: float = 0
 
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",") if origin.strip()]
@@ -0,0 +1,69 @@
+"""
+Serialization.
+
+JSON con orjson para lo que se serializa en caliente: eventos SSE (uno por
+fragmento de texto en streaming), sesiones de chat (en cada turno) y las
+respuestas de la API que no tienen `response_model`. Respecto de `json.dumps`
+la salida es compacta y no escapa caracteres no ASCII; el contenido es el mismo.
+"""
+
+from typing import Any, Dict, Type, TypeVar, Union
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.core.exceptions import APIError
+
+# Claves no string (p. ej. enteros) como las acepta `json.dumps`.
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def dumps(data: Any) -> str:
+    return orjson.dumps(data, option=_OPTIONS).decode("utf-8")
+
+
+def dumps_bytes(data: Any) -> bytes:
+    return orjson.dumps(data, option=_OPTIONS)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    return orjson.loads(data)
+
+
+def dump_model(model: BaseModel) -> str:
+    """Modelo a JSON con el serializer de Pydantic (sin armar el dict intermedio)."""
+    return model.model_dump_json()
+
+
+def load_model(model_cls: Type[ModelT], data: Union[str, bytes]) -> ModelT:
+    return model_cls.model_validate(orjson.loads(data))
+
+
+def sse_event(data: Dict[str, Any]) -> str:
+    """Una línea `data: {...}` de Server-Sent Events."""
+    return "data: " + dumps(data) + "\n\n"
+
+
+def sse_error_event(error: APIError) -> str:
+    """Evento `error` con el mensaje y el código de un `APIError`."""
+    return sse_event({
+        "type": "error",
+        "error": error.detail["message"],
+        "code": error.detail["code"],
+    })
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse serializada con orjson.
+
+    La `ORJSONResponse` de FastAPI está deprecada: los endpoints con
+    `response_model` ya serializan directo desde Pydantic, así que esta clase
+    se usa solo donde se devuelven dicts.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
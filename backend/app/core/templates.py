@@ -1,6 +1,36 @@
-from typing import Any, Dict, List, Optional
+"""
+Template Registry.
+
+Las plantillas se definen en archivos JSON (uno por plantilla) dentro de
+`TEMPLATES_DIR` (por defecto `app/core/template_data`). Se validan una vez al
+cargar y quedan en un snapshot inmutable; recargar arma un snapshot nuevo y lo
+reemplaza de una sola vez, así que un request nunca ve una mezcla de versiones.
+Los archivos se leen en orden de nombre (el prefijo numérico fija el orden de
+la galería).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import signal
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "template_data")
+
+# Campos internos que no se publican en /api/templates (solo los usa el backend).
+PRIVATE_TEMPLATE_FIELDS = {"prompt", "aliases", "formatting"}
+
+
 class TemplateConfig(BaseModel):
     id: str
     name: str
@@ -13,290 +43,156 @@ class TemplateConfig(BaseModel):
     prompt: str
     section_order: List[str] = Field(alias="sectionOrder")
     styles: Dict[str, Any]
+    aliases: List[str] = Field(default_factory=list)
+    # Reglas locales para adaptar un CV ya mejorado a la plantilla (ver cv_generator).
+    formatting: Dict[str, Any] = Field(default_factory=dict)
 
     class Config:
         populate_by_name = True
 
+
+@dataclass(frozen=True)
+class TemplateSnapshot:
+    """Plantillas cargadas de un directorio, con todo lo derivado ya calculado."""
+
+    version: int
+    signature: Tuple[Tuple[str, int, int], ...]
+    templates: Dict[str, TemplateConfig]  # incluye aliases
+    unique: Tuple[TemplateConfig, ...]
+    public_payload: bytes
+    etag: str
+
+
+def _directory_signature(directory: str) -> Tuple[Tuple[str, int, int], ...]:
+    """(nombre, mtime, tamaño) de cada archivo: cambia si se edita, agrega o borra una plantilla."""
+    entries = []
+    with os.scandir(directory) as scan:
+        for entry in scan:
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+
+def load_templates(directory: str, version: int = 1) -> TemplateSnapshot:
+    """
+    Lee y valida las plantillas de `directory`.
+
+    Raises:
+        ValueError: Si algún archivo no es JSON válido, no pasa la validación,
+            o hay IDs/aliases repetidos. No se carga nada parcialmente.
+    """
+    signature = _directory_signature(directory)
+    templates: Dict[str, TemplateConfig] = {}
+    unique: List[TemplateConfig] = []
+    for name, _, _ in signature:
+        path = os.path.join(directory, name)
+        try:
+            with open(path, encoding="utf-8") as handle:
+                template = TemplateConfig(**json.load(handle))
+        except Exception as exc:
+            raise ValueError(f"Plantilla inválida en {path}: {exc}") from exc
+        for template_id in (template.id, *template.aliases):
+            if template_id in templates:
+                raise ValueError(f"ID de plantilla repetido: {template_id} ({path})")
+            templates[template_id] = template
+        unique.append(template)
+
+    if not unique:
+        raise ValueError(f"No hay plantillas en {directory}")
+
+    payload = json.dumps(
+        [t.model_dump(mode="json", by_alias=True, exclude=PRIVATE_TEMPLATE_FIELDS) for t in unique],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return TemplateSnapshot(
+        version=version,
+        signature=signature,
+        templates=templates,
+        unique=tuple(unique),
+        public_payload=payload,
+        etag=f'"{hashlib.sha256(payload).hexdigest()}"',
+    )
+
+
 class TemplateRegistry:
-    def __init__(self):
-        self._templates: Dict[str, TemplateConfig] = {}
-        self._setup_templates()
-
-    def _setup_templates(self):
-        templates_data = [
-            {
-                "id": "professional",
-                "name": "Executive",
-                "description": "Diseño clásico y elegante para corporativos",
-                "category": "Corporativo",
-                "tags": ["ATS-friendly", "Clásico"],
-                "previewColor": "bg-zinc-800",
-                "skeleton": "classic",
-                "icon": "FileText",
-                "prompt": """
-Format this CV for a classic professional template:
-- Use formal, traditional structure
-- Clear section headers
-- Emphasis on experience and education
-- Conservative layout with good use of white space
-- Standard chronological format for experience
-""",
-                "sectionOrder": [
-                    "summary", "experience", "education", "skills", "projects",
-                    "certifications", "languages", "interests", "tools"
-                ],
-                "styles": {
-                    "heading_font": "Helvetica-Bold",
-                    "body_font": "Helvetica",
-                    "accent": "#111827",
-                }
-            },
-            {
-                "id": "harvard",
-                "name": "Ivy",
-                "description": "Estilo Ivy League, ATS-Optimized",
-                "category": "Académico",
-                "tags": ["ATS-friendly", "Research-ready"],
-                "previewColor": "bg-slate-800",
-                "skeleton": "classic",
-                "icon": "GraduationCap",
-                "prompt": """
-Format this CV for an academic/Harvard-style template:
-- Academic focus with detailed education section
-- Publications and research highlighted
-- Professional summary with career objectives
-- Detailed description of academic achievements
-- Clear chronological structure
-""",
-                "sectionOrder": [
-                    "summary", "education", "experience", "projects", "skills",
-                    "certifications", "languages", "interests", "tools"
-                ],
-                "styles": {
-                    "heading_font": "Times-Bold",
-                    "body_font": "Times-Roman",
-                    "accent": "#0f172a",
-                }
-            },
-            {
-                "id": "creative",
-                "name": "Studio",
-                "description": "Estilo editorial y audaz para creativos",
-                "category": "Diseño",
-                "tags": ["Modern", "Editorial"],
-                "previewColor": "bg-stone-800",
-                "skeleton": "modern",
-                "icon": "Sparkles",
-                "prompt": """
-Format this CV for a creative template:
-- Emphasize unique skills and achievements
-- Highlight projects and creative work
-- Dynamic layout suggestions
-- Showcase innovation and creativity
-- Modern, engaging presentation
-""",
-                "sectionOrder": [
-                    "summary", "skills", "experience", "projects", "education",
-                    "certifications", "languages", "interests", "tools"
-                ],
-                "styles": {
-                    "heading_font": "Helvetica-Bold",
-                    "body_font": "Helvetica-Oblique",
-                    "accent": "#7c3aed",
-                }
-            },
-            {
-                "id": "pure",
-                "name": "Swiss",
-                "description": "Minimalismo suizo con precisión extrema",
-                "category": "Moderno",
-                "tags": ["Minimal", "Structured"],
-                "previewColor": "bg-stone-100",
-                "skeleton": "split",
-                "icon": "Grid3X3",
-                "prompt": """
-Format this CV for a minimal template:
-- Stripped-down, clean design
-- Focus on content over decoration
-- Simple formatting with essential information only
-- Good use of spacing for readability
-- Subtle use of bold for headers
-""",
-                "sectionOrder": [
-                    "summary", "experience", "projects", "education", "skills",
-                    "certifications", "languages", "interests", "tools"
-                ],
-                "styles": {
-                    "heading_font": "Helvetica-Bold",
-                    "body_font": "Helvetica",
-                    "accent": "#0f172a",
-                }
-            },
-            {
-                "id": "terminal",
-                "name": "Code",
-                "description": "Elegancia técnica estilo editor de código",
-                "category": "Tecnología",
-                "tags": ["Monospace", "Developer"],
-                "previewColor": "bg-slate-950",
-                "skeleton": "modern",
-                "icon": "Code",
-                "prompt": """
-Format this CV for a tech/developer template:
-- Emphasize technical skills and projects
-- GitHub and technical contributions highlighted
-- List technologies and frameworks used
-- Focus on technical achievements
-- Modern, clean layout
-""",
-                "sectionOrder": [
-                    "summary", "skills", "experience", "projects", "education",
-                    "languages", "certifications", "interests", "tools"
-                ],
-                "styles": {
-                    "heading_font": "Courier-Bold",
-                    "body_font": "Courier",
-                    "accent": "#0f172a",
-                }
-            },
-            {
-                "id": "care",
-                "name": "Care",
-                "description": "Diseño cálido centrado en las personas",
-                "category": "Salud",
-                "tags": ["Warm", "People-first"],
-                "previewColor": "bg-orange-100",
-                "skeleton": "split",
-                "icon": "Users",
-                "prompt": """
-Format this CV for a healthcare template:
-- Focus on healthcare skills and certifications
-- Emphasize patient care and medical achievements
-- Professional healthcare presentation
-- Highlight clinical experience
-- Medical professional appearance
-""",
-                "sectionOrder": [
-                    "summary", "experience", "education", "skills", "certifications",
-                    "projects", "languages", "interests", "tools"
-                ],
-                "styles": {
-                    "heading_font": "Times-Bold",
-                    "body_font": "Times-Roman",
-                    "accent": "#0f766e",
-                }
-            },
-            {
-                "id": "capital",
-                "name": "Capital",
-                "description": "Precisión financiera y elegancia institucional",
-                "category": "Corporativo",
-                "tags": ["ATS-friendly", "Finance"],
-                "previewColor": "bg-blue-950",
-                "skeleton": "classic",
-                "icon": "Landmark",
-                "prompt": """
-Format this CV for a finance template:
-- Focus on financial skills and certifications
-- Emphasize analytical and quantitative skills
-- Highlight financial achievements with metrics
-- Professional financial presentation
-- Attention to detail
-""",
-                "sectionOrder": [
-                    "summary", "experience", "projects", "education", "skills",
-                    "certifications", "languages", "interests", "tools"
-                ],
-                "styles": {
-                    "heading_font": "Helvetica-Bold",
-                    "body_font": "Helvetica",
-                    "accent": "#1d4ed8",
-                }
-            },
-            {
-                "id": "scholar",
-                "name": "Scholar",
-                "description": "Plantilla académica con rigor investigativo",
-                "category": "Académico",
-                "tags": ["Research", "Publication-ready"],
-                "previewColor": "bg-red-900",
-                "skeleton": "classic",
-                "icon": "GraduationCap",
-                "prompt": """
-Format this CV for an education/academic template:
-- Emphasize teaching experience and achievements
-- Highlight educational contributions
-- Focus on academic qualifications
-- Student outcomes and achievements
-- Academic professional appearance
-""",
-                "sectionOrder": [
-                    "summary", "education", "experience", "projects", "skills",
-                    "certifications", "languages", "interests", "tools"
-                ],
-                "styles": {
-                    "heading_font": "Times-Bold",
-                    "body_font": "Times-Roman",
-                    "accent": "#1e293b",
-                }
-            },
-            {
-                "id": "bian",
-                "name": "Bian",
-                "description": "Diseño ejecutivo para consultoría y negocios",
-                "category": "Corporativo",
-                "tags": ["Consulting", "Business"],
-                "previewColor": "bg-emerald-900",
-                "skeleton": "classic",
-                "icon": "Briefcase",
-                "prompt": """
-Format this CV for a business/consulting template:
-- Professional business presentation
-- Emphasize business skills and achievements
-- Quantifiable results and metrics
-- Leadership and strategic thinking
-- Corporate, polished look
-""",
-                "sectionOrder": [
-                    "summary", "experience", "education", "skills", "projects",
-                    "certifications", "languages", "interests", "tools"
-                ],
-                "styles": {
-                    "heading_font": "Helvetica-Bold",
-                    "body_font": "Helvetica",
-                    "accent": "#064e3b",
-                }
-            }
-        ]
-        for data in templates_data:
-            template = TemplateConfig(**data)
-            self._templates[template.id] = template
-
-        # Add aliases
-        self._add_alias("minimal", "pure")
-        self._add_alias("tech", "terminal")
-        self._add_alias("health", "care")
-        self._add_alias("finance", "capital")
-        self._add_alias("education", "scholar")
-
-    def _add_alias(self, alias_id: str, target_id: str):
-        if target_id in self._templates:
-            self._templates[alias_id] = self._templates[target_id]
+    def __init__(self, directory: str = DEFAULT_TEMPLATES_DIR):
+        self.directory = directory
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[TemplateSnapshot], None]] = []
+        self._snapshot = load_templates(directory)
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def add_listener(self, callback: Callable[[TemplateSnapshot], None]) -> None:
+        """Registra un callback que recibe cada snapshot nuevo después del swap."""
+        self._listeners.append(callback)
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Vuelve a leer el directorio si cambió (o siempre, con `force`).
+
+        Si alguna plantilla es inválida se loguea el error y se sigue sirviendo
+        el snapshot anterior. Devuelve True si hubo swap.
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            try:
+                if not force and _directory_signature(self.directory) == current.signature:
+                    return False
+                snapshot = load_templates(self.directory, version=current.version + 1)
+            except (OSError, ValueError) as exc:
+                logger.error(f"[TEMPLATES] Recarga descartada, se mantiene la versión {current.version}: {exc}")
+                return False
+            self._snapshot = snapshot
+
+        logger.info(f"[TEMPLATES] Versión {snapshot.version}: {len(snapshot.unique)} plantillas")
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception:
+                logger.exception("[TEMPLATES] Falló un listener de recarga")
+        return True
 
     def get_template(self, template_id: str) -> Optional[TemplateConfig]:
-        return self._templates.get(template_id)
+        return self._snapshot.templates.get(template_id)
 
     def get_all_templates(self) -> List[TemplateConfig]:
         # Return only unique templates (avoiding aliases in the list)
-        seen = set()
-        unique_templates = []
-        for t in self._templates.values():
-            if t.id not in seen:
-                unique_templates.append(t)
-                seen.add(t.id)
-        return unique_templates
+        return list(self._snapshot.unique)
 
     def get_template_ids(self) -> List[str]:
-        return list(self._templates.keys())
+        return list(self._snapshot.templates.keys())
+
+    def get_public_payload(self) -> Tuple[bytes, str]:
+        """JSON de /api/templates (sin campos internos) y su ETag."""
+        snapshot = self._snapshot
+        return snapshot.public_payload, snapshot.etag
+
+
+registry = TemplateRegistry(settings.TEMPLATES_DIR or DEFAULT_TEMPLATES_DIR)
+
+
+async def watch_templates(interval: float) -> None:
+    """Revisa el directorio de plantillas cada `interval` segundos (corre hasta que se cancela)."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(registry.reload)
+
 
-registry = TemplateRegistry()
+def install_reload_signal() -> bool:
+    """`kill -HUP <pid>` fuerza una recarga. No disponible en Windows."""
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(
+            signal.SIGHUP,
+            lambda: loop.run_in_executor(None, lambda: registry.reload(force=True)),
+        )
+    except (NotImplementedError, RuntimeError):
+        return False
+    return True
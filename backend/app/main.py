@@ -1,10 +1,10 @@
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from slowapi.errors import RateLimitExceeded
 
 from app.api.endpoints import router as api_router
@@ -12,6 +12,7 @@ from app.core.logging import setup_logging
 from app.core.limiter import limiter
 from app.core.exceptions import build_error_detail, normalize_error_detail
 from app.core.config import settings
+from app.core.serialization import ORJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +34,20 @@ async def lifespan(app: FastAPI):
         logger.warning("[BOOT] CORS_ORIGINS missing in production")
     from app.services.session_store import store
     await store.initialize()
+    from app.core.templates import install_reload_signal, watch_templates
+    from app.services.template_assets import warm_template_assets
+    warm_template_assets()
+    install_reload_signal()
+    template_watcher = None
+    if settings.TEMPLATES_RELOAD_INTERVAL > 0:
+        template_watcher = asyncio.create_task(watch_templates(settings.TEMPLATES_RELOAD_INTERVAL))
     yield
+    if template_watcher is not None:
+        template_watcher.cancel()
+    from app.services.export_workers import shutdown_export_workers
+    shutdown_export_workers()
+    # Escribe las sesiones con cambios pendientes (cache write-behind).
+    await store.close()
 
 
 app = FastAPI(title="CV Builder IA API", lifespan=lifespan)
@@ -69,7 +83,7 @@ app.add_middleware(
 # Rate limit error handler
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=429,
         content=build_error_detail(
             "rate_limit_exceeded",
@@ -81,25 +95,25 @@ async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     detail = normalize_error_detail(exc.detail, exc.status_code)
-    return JSONResponse(status_code=exc.status_code, content=detail)
+    return ORJSONResponse(status_code=exc.status_code, content=detail)
 
 
 # Include Routers
 app.include_router(api_router, prefix="/api")
 
 
-@app.get("/")
+@app.get("/", response_class=ORJSONResponse)
 async def root():
     return {"message": "CV Builder IA Backend is running"}
 
 
-@app.get("/ping")
+@app.get("/ping", response_class=ORJSONResponse)
 @limiter.limit("5/minute")
 async def ping(request: Request):
     return {"status": "ok", "message": "pong"}
 
 
-@app.get("/health")
+@app.get("/health", response_class=ORJSONResponse)
 async def health():
     return {"status": "healthy", "version": "1.0.0"}
 
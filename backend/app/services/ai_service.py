@@ -1,26 +1,60 @@
 import json
 import logging
-import copy
 import asyncio
 import os
 import re
 import uuid
-from typing import List, Dict, Any, Optional, AsyncGenerator
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, AsyncGenerator, Awaitable, Callable, Iterator, Sequence, Tuple
 from datetime import datetime
 from google import genai
 from google.genai import types
-from groq import Groq
+from google.genai import errors as genai_errors
+from groq import BadRequestError as GroqBadRequestError, Groq
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from pydantic import ValidationError as PydanticValidationError
+from pydantic import TypeAdapter, ValidationError as PydanticValidationError
 from app.core.config import settings
-from app.core.exceptions import AIServiceError, CVProcessingError
+from app.core.exceptions import AIServiceError, APIError, CVProcessingError, FileProcessingError
+from app.core.serialization import sse_error_event, sse_event
+from app.services.ats_scoring import (  # noqa: F401 - re-exported for callers
+    INDUSTRY_KEYWORDS,
+    build_ats_rule_issues as _build_ats_rule_issues,
+    build_cv_profile,
+    build_term_index,
+    check_resume_content_indicators,
+    filter_anti_keywords_for_industry,
+    score_ats_locally,
+    sweep_industries,
+)
 from app.services.chat_prompts import (
     CONVERSATION_ORCHESTRATOR_PROMPT,
     DATA_EXTRACTION_PROMPT,
+    DATA_EXTRACTION_SCHEMA_HINT,
     NEXT_QUESTION_GENERATOR_PROMPT,
-    JOB_ANALYSIS_PROMPT,
+    JOB_TAILORING_PROMPT,
+    JOB_TAILORING_SCHEMA_HINT,
     get_phase_prompt,
 )
+from app.services.cv_chunking import build_extraction_chunks
+from app.services.cv_merge import item_signature, merge_cv_data
+from app.services.job_matcher import match_job_description, rank_candidates
+from app.services.json_repair import (
+    coerce_to_model,
+    parse_json_with_repair,
+    record_retry_avoided,
+    track_repairs,
+)
+from app.services.language_detection import detect_language, detect_language_preference
+from app.services.partial_json import IncrementalJSONParser
+from app.services.section_planner import assemble_sections, plan_sections, run_section_plan
+from app.services.structured_output import (
+    StructuredOutput,
+    build_structured_output,
+    is_schema_unsupported_error,
+    mark_structured_output_unsupported,
+    model_json_schema,
+    supports_structured_output,
+)
 from app.api.schemas import (
     ChatMessage,
     DataExtraction,
@@ -28,11 +62,13 @@ from app.api.schemas import (
     JobAnalysisResponse,
     TailoringSuggestion,
     CVData,
+    CVMergeIndex,
     CritiqueResponse,
 )
 
 # Valid Groq Models
 MODEL_ID = "llama-3.3-70b-versatile"
+GEMINI_MODEL_ID = "gemini-2.0-flash-exp"
 
 logger = logging.getLogger(__name__)
 
@@ -86,20 +122,24 @@ Rules:
   - Use ONLY ONE of these exact values: "Beginner", "Intermediate", "Advanced", "Expert" (or Spanish: "Principiante", "Intermedio", "Avanzado", "Experto").
   - Do NOT use the example text "Beginner/Intermediate/Advanced/Expert" - pick ONE value.
 - PHONE NUMBERS: Keep as-is, including parentheses and spaces.
-- Strictly follow this schema:
-{{
-  "personalInfo": {{ "fullName": "", "email": "", "phone": "", "location": "", "summary": "", "website": "", "linkedin": "", "github": "" }},
-  "experience": [ {{ "company": "", "position": "", "location": "", "startDate": "", "endDate": "", "current": false, "description": "" }} ],
-  "education": [ {{ "institution": "", "degree": "", "fieldOfStudy": "", "location": "", "startDate": "", "endDate": "" }} ],
-  "skills": [ {{ "name": "", "level": "" }} ],
-  "languages": [ {{ "language": "", "fluency": "" }} ],
-  "projects": [ {{ "name": "", "description": "", "technologies": [] }} ],
-  "certifications": [ {{ "name": "", "issuer": "", "date": "" }} ]
-}}
 
 Input: {text}
 """
 
+# Schema en prosa: solo se agrega al prompt si el proveedor no acepta JSON Schema.
+EXTRACT_CV_SCHEMA_HINT = """
+Strictly follow this schema:
+{
+  "personalInfo": { "fullName": "", "email": "", "phone": "", "location": "", "summary": "", "website": "", "linkedin": "", "github": "" },
+  "experience": [ { "company": "", "position": "", "location": "", "startDate": "", "endDate": "", "current": false, "description": "" } ],
+  "education": [ { "institution": "", "degree": "", "fieldOfStudy": "", "location": "", "startDate": "", "endDate": "" } ],
+  "skills": [ { "name": "", "level": "" } ],
+  "languages": [ { "language": "", "fluency": "" } ],
+  "projects": [ { "name": "", "description": "", "technologies": [] } ],
+  "certifications": [ { "name": "", "issuer": "", "date": "" } ]
+}
+"""
+
 # --- SPECIALIZED PROMPTS ---
 
 SUMMARIZE_PROMPT = """
@@ -248,17 +288,21 @@ CAMPOS DEL CRITIQUE (ESTRICTAMENTE ELIGE UNO DE ESTOS VALORES TÉCNICOS):
 - target_field: Ruta exacta al campo (ej: 'experience.0.description', 'personalInfo.summary'). Usa puntos para los índices de arreglos.
 - impact_reason: Explicación de qué KPI o percepción profesional mejora con este cambio.
 
+- overall_verdict: Un análisis ejecutivo de 2 oraciones sobre el estado actual del CV y su potencial.
+
 INPUT CV:
 {cv_json}
+"""
 
+SENTINEL_CRITIQUE_SCHEMA_HINT = """
 REGLAS DE SALIDA (JSON):
-{{
+{
   "score": 0-100 (Sé honesto, 100 es perfección absoluta),
   "one_page_viable": boolean,
   "word_count_estimate": number,
   "overall_verdict": "Un análisis ejecutivo de 2 oraciones sobre el estado actual del CV y su potencial.",
   "critique": [
-    {{
+    {
       "id": "short-uuid",
       "target_field": "string",
       "category": "string",
@@ -268,11 +312,34 @@ REGLAS DE SALIDA (JSON):
       "impact_reason": "Valor aportado",
       "original_text": "Cita exacta del CV",
       "suggested_text": "Propuesta optimizada"
-    }}
+    }
   ]
-}}
+}
 """
 
+# --- STRUCTURED OUTPUTS ---
+# Schemas generados desde app/api/schemas.py; el schema en prosa queda como fallback.
+
+CV_DATA_OUTPUT = build_structured_output(CVData, "cv_data", EXTRACT_CV_SCHEMA_HINT)
+CRITIQUE_OUTPUT = build_structured_output(
+    CritiqueResponse, "cv_critique", SENTINEL_CRITIQUE_SCHEMA_HINT
+)
+DATA_EXTRACTION_OUTPUT = build_structured_output(
+    DataExtraction,
+    "cv_data_extraction",
+    DATA_EXTRACTION_SCHEMA_HINT,
+    fields=("extracted", "confidence", "needs_clarification", "follow_up_questions"),
+    overrides={"extracted": model_json_schema(CVData, partial=True)},
+)
+# El match se calcula localmente: la IA solo completa sugerencias y CV optimizado.
+JOB_TAILORING_OUTPUT = build_structured_output(
+    JobAnalysisResponse,
+    "job_tailoring",
+    JOB_TAILORING_SCHEMA_HINT,
+    fields=("suggestions", "optimized_cv"),
+    overrides={"optimized_cv": model_json_schema(CVData, partial=True)},
+)
+
 # --- SERVICE FUNCTIONS ---
 
 
@@ -282,64 +349,95 @@ REGLAS DE SALIDA (JSON):
     retry=retry_if_exception_type((Exception,)),
     reraise=True
 )
-def _call_groq_api(prompt: str, system_msg: str, use_json: bool = True) -> Any:
+def _call_groq_api(
+    prompt: str,
+    system_msg: str,
+    use_json: bool = True,
+    output: Optional[StructuredOutput] = None,
+) -> Any:
     """Internal function to call Groq API with retry logic."""
     settings.raise_if_missing_ai_keys(["GROQ_API_KEY"])
     client = Groq(api_key=settings.GROQ_API_KEY)
-    completion = client.chat.completions.create(
-        model=MODEL_ID,
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.1,
-        response_format={"type": "json_object"} if use_json else None,
-    )
+
+    def _create(user_prompt: str, response_format: Optional[Dict[str, Any]]):
+        return client.chat.completions.create(
+            model=MODEL_ID,
+            messages=[
+                {"role": "system", "content": system_msg},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=0.1,
+            response_format=response_format,
+        )
+
+    json_object = {"type": "json_object"} if use_json else None
+    if use_json and output and supports_structured_output("groq", MODEL_ID):
+        try:
+            completion = _create(prompt, output.groq_response_format())
+        except GroqBadRequestError as e:
+            if not is_schema_unsupported_error(e):
+                raise
+            mark_structured_output_unsupported("groq", MODEL_ID)
+            completion = _create(output.prompt_with_hint(prompt), json_object)
+    else:
+        completion = _create(output.prompt_with_hint(prompt) if output else prompt, json_object)
     message_content = completion.choices[0].message.content
     if message_content is None:
         raise ValueError("Empty response from AI")
 
     if use_json:
-        try:
-            return json.loads(message_content)
-        except json.JSONDecodeError:
+        parsed = parse_json_with_repair(message_content, "groq")
+        if parsed is None:
             logger.error(f"Failed to parse JSON from AI: {message_content}")
-            return None
+        return parsed
     return message_content
 
 
-def _call_gemini_api(prompt: str, system_msg: str, use_json: bool = True) -> Any:
+def _call_gemini_api(
+    prompt: str,
+    system_msg: str,
+    use_json: bool = True,
+    output: Optional[StructuredOutput] = None,
+) -> Any:
     """Internal function to call Google Gemini API as fallback."""
     try:
         settings.raise_if_missing_ai_keys(["GOOGLE_API_KEY"])
 
         client = genai.Client(api_key=settings.GOOGLE_API_KEY)
-        
-        # Combine system prompt with user prompt for Gemini (it handles system instructions differently but this is safe)
-        full_prompt = f"{system_msg}\n\nUSER REQUEST:\n{prompt}"
-        
-        config = types.GenerateContentConfig(
-            temperature=0.1,
-            response_mime_type="application/json" if use_json else "text/plain"
-        )
 
-        response = client.models.generate_content(
-            model='gemini-2.0-flash-exp', 
-            contents=full_prompt,
-            config=config
-        )
+        def _generate(user_prompt: str, json_schema: Optional[Dict[str, Any]]):
+            config = types.GenerateContentConfig(
+                temperature=0.1,
+                response_mime_type="application/json" if use_json else "text/plain",
+                response_json_schema=json_schema,
+            )
+            # Combine system prompt with user prompt for Gemini (it handles system instructions differently but this is safe)
+            return client.models.generate_content(
+                model=GEMINI_MODEL_ID,
+                contents=f"{system_msg}\n\nUSER REQUEST:\n{user_prompt}",
+                config=config,
+            )
+
+        if use_json and output and supports_structured_output("gemini", GEMINI_MODEL_ID):
+            try:
+                response = _generate(prompt, output.json_schema)
+            except genai_errors.ClientError as e:
+                if not is_schema_unsupported_error(e):
+                    raise
+                mark_structured_output_unsupported("gemini", GEMINI_MODEL_ID)
+                response = _generate(output.prompt_with_hint(prompt), None)
+        else:
+            response = _generate(output.prompt_with_hint(prompt) if output else prompt, None)
         
         if not response.text:
              return None
 
         if use_json:
-            try:
-                # Gemini often wraps json in ```json ... ```
-                clean_text = response.text.replace('```json', '').replace('```', '').strip()
-                return json.loads(clean_text)
-            except json.JSONDecodeError:
+            # Gemini suele envolver el JSON en ```json ... ```; la reparación lo recorta.
+            parsed = parse_json_with_repair(response.text, "gemini")
+            if parsed is None:
                 logger.error(f"Failed to parse JSON from Gemini: {response.text}")
-                return None
+            return parsed
         
         return response.text
 
@@ -415,14 +513,25 @@ def _get_mock_fallback(prompt: str, system_msg: str, use_json: bool = True) -> A
     return {}
 
 
-async def get_ai_completion(prompt: str, system_msg: str = SYSTEM_RULES, use_json: bool = True):
+async def get_ai_completion(
+    prompt: str,
+    system_msg: str = SYSTEM_RULES,
+    use_json: bool = True,
+    output: Optional[StructuredOutput] = None,
+):
+    """
+    Pide una completion a Groq, con Gemini y mock como fallback.
+
+    `output` pide salida estructurada con el schema indicado; si el proveedor
+    no la soporta, el schema en prosa se agrega al prompt.
+    """
     _raise_if_no_ai_provider()
     # 1. Try Groq (Primary)
     if _has_groq_key():
         try:
             loop = asyncio.get_event_loop()
             result = await loop.run_in_executor(
-                None, _call_groq_api, prompt, system_msg, use_json
+                None, _call_groq_api, prompt, system_msg, use_json, output
             )
             if result:
                 return result
@@ -434,7 +543,7 @@ async def get_ai_completion(prompt: str, system_msg: str = SYSTEM_RULES, use_jso
         logger.info("Failing over to Gemini API...")
         loop = asyncio.get_event_loop()
         result = await loop.run_in_executor(
-            None, _call_gemini_api, prompt, system_msg, use_json
+            None, _call_gemini_api, prompt, system_msg, use_json, output
         )
         if result:
             return result
@@ -448,96 +557,485 @@ def _parse_ai_payload(response: Any) -> Optional[Dict[str, Any]]:
     if isinstance(response, dict):
         return response
     if isinstance(response, str):
-        try:
-            return json.loads(response)
-        except json.JSONDecodeError:
-            return None
+        parsed = parse_json_with_repair(response, "parse_ai_payload")
+        return parsed if isinstance(parsed, dict) else None
     return None
 
 
+@lru_cache(maxsize=None)
+def _get_type_adapter(model_cls: Any) -> TypeAdapter:
+    """TypeAdapter cacheado por tipo: el schema de validación se arma una sola vez."""
+    return TypeAdapter(model_cls)
+
+
 def _validate_ai_payload(model_cls: Any, payload: Optional[Dict[str, Any]], context: str) -> Optional[Any]:
-    """Valida un payload con el modelo Pydantic indicado."""
+    """
+    Valida un payload con el modelo Pydantic indicado.
+
+    Si no valida, se intenta adaptarlo al schema localmente antes de que el
+    llamador pague un reintento contra el proveedor.
+    """
     if not payload or not isinstance(payload, dict):
         logger.warning(f"[AI-VALIDATION] Payload inválido en {context}.")
         return None
+    adapter = _get_type_adapter(model_cls)
     try:
-        return model_cls.model_validate(payload)
+        return adapter.validate_python(payload)
     except PydanticValidationError as exc:
         logger.warning(f"[AI-VALIDATION] Error en {context}: {exc}")
-        return None
+        return coerce_to_model(adapter, payload, context)
+
+
+def _validate_before_retry(model_cls: Any, payload: Optional[Dict[str, Any]], context: str) -> Optional[Any]:
+    """
+    `_validate_ai_payload` para el primer intento de un llamador que, si no
+    valida, vuelve a preguntarle a la IA: si lo salva una reparación local,
+    cuenta el reintento evitado.
+    """
+    with track_repairs() as repairs:
+        validated = _validate_ai_payload(model_cls, payload, context)
+    if validated is not None and repairs.repaired:
+        record_retry_avoided(context)
+    return validated
+
 
+async def extract_cv_data(text: str, as_model: bool = False):
+    """
+    Extrae el CV estructurado desde texto plano.
 
-async def extract_cv_data(text: str):
+    Con `as_model=True` devuelve el `CVData` ya validado (para que el router lo
+    serialice sin volver a validarlo); si no, el dict con alias camelCase.
+    """
     prompt = EXTRACT_CV_PROMPT.format(text=text)
-    raw_response = await get_ai_completion(prompt)
-    parsed_response = _parse_ai_payload(raw_response)
+    raw_response = await get_ai_completion(prompt, output=CV_DATA_OUTPUT)
+    # Parseo y validación pueden reparar la misma respuesta: el reintento evitado se cuenta una vez.
+    with track_repairs() as repairs:
+        parsed_response = _parse_ai_payload(raw_response)
+        validated = _validate_extracted_cv(parsed_response, "extract_cv_data")
+    if validated and repairs.repaired:
+        record_retry_avoided("extract_cv_data")
 
     if parsed_response is None:
         retry_prompt = f"{prompt}\n\nIMPORTANTE: Devuelve solo JSON válido con el esquema exacto."
-        parsed_response = _parse_ai_payload(await get_ai_completion(retry_prompt))
+        parsed_response = _parse_ai_payload(
+            await get_ai_completion(retry_prompt, output=CV_DATA_OUTPUT)
+        )
+        if parsed_response is None:
+            raise CVProcessingError(
+                "No pudimos procesar tu CV en este momento. Por favor, intenta nuevamente."
+            )
+        validated = _validate_extracted_cv(parsed_response, "extract_cv_data")
+
+    if not validated:
+        retry_prompt = f"{prompt}\n\nIMPORTANTE: Devuelve solo JSON válido con el esquema exacto."
+        retry_response = _parse_ai_payload(
+            await get_ai_completion(retry_prompt, output=CV_DATA_OUTPUT)
+        )
+        if retry_response:
+            validated = _validate_extracted_cv(retry_response, "extract_cv_data_retry")
 
-    if parsed_response is None:
+    if not validated:
         raise CVProcessingError(
-            "No pudimos procesar tu CV en este momento. Por favor, intenta nuevamente."
+            "La IA devolvió un formato incompatible. Intenta nuevamente en unos segundos."
         )
 
-    normalized = _normalize_extracted_payload(parsed_response)
-    candidate = _ensure_cv_schema(normalized)
-    validated = _validate_ai_payload(CVData, candidate, "extract_cv_data")
+    return validated if as_model else validated.model_dump(by_alias=True)
+
+
+def _validate_extracted_cv(parsed: Optional[Dict[str, Any]], context: str) -> Optional[CVData]:
+    """Normaliza la respuesta de extracción y la valida como CVData."""
+    if not parsed:
+        return None
+    candidate = _ensure_cv_schema(_normalize_extracted_payload(parsed))
+    return _validate_ai_payload(CVData, candidate, context)
+
+
+def _stream_groq_text(prompt: str, system_msg: str) -> Iterator[str]:
+    """Stream de texto de Groq (bloqueante: se consume con `_iterate_blocking`)."""
+    settings.raise_if_missing_ai_keys(["GROQ_API_KEY"])
+    client = Groq(api_key=settings.GROQ_API_KEY)
+    stream = client.chat.completions.create(
+        model=MODEL_ID,
+        messages=[
+            {"role": "system", "content": system_msg},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.1,
+        stream=True,
+    )
+    for chunk in stream:
+        content = chunk.choices[0].delta.content
+        if content:
+            yield content
+
+
+def _stream_gemini_text(
+    prompt: str, system_msg: str, output: Optional[StructuredOutput] = None
+) -> Iterator[str]:
+    """Stream de texto de Gemini, con JSON Schema si hay `output` y el modelo lo soporta."""
+    settings.raise_if_missing_ai_keys(["GOOGLE_API_KEY"])
+    client = genai.Client(api_key=settings.GOOGLE_API_KEY)
+    use_schema = output is not None and supports_structured_output("gemini", GEMINI_MODEL_ID)
+    config = types.GenerateContentConfig(
+        temperature=0.1,
+        response_mime_type="application/json",
+        response_json_schema=output.json_schema if use_schema else None,
+    )
+    user_prompt = prompt if use_schema or output is None else output.prompt_with_hint(prompt)
+    for chunk in client.models.generate_content_stream(
+        model=GEMINI_MODEL_ID,
+        contents=f"{system_msg}\n\nUSER REQUEST:\n{user_prompt}",
+        config=config,
+    ):
+        if chunk.text:
+            yield chunk.text
+
+
+def _json_stream_providers(
+    prompt: str, system_msg: str, output: Optional[StructuredOutput] = None
+) -> List[Tuple[str, Callable[[], Iterator[str]]]]:
+    """Proveedores configurados con streaming de JSON, en orden de preferencia."""
+    providers = []
+    if _has_groq_key():
+        # El modo JSON de Groq no admite streaming: el schema va en prosa.
+        groq_prompt = output.prompt_with_hint(prompt) if output else prompt
+        providers.append(("groq", lambda: _stream_groq_text(groq_prompt, system_msg)))
+    if _has_google_key():
+        providers.append(("gemini", lambda: _stream_gemini_text(prompt, system_msg, output)))
+    return providers
+
+
+async def _iterate_blocking(iterator: Iterator[str]) -> AsyncGenerator[str, None]:
+    """Consume un iterador bloqueante en el executor sin frenar el event loop."""
+    loop = asyncio.get_running_loop()
+    exhausted = object()
+    while True:
+        chunk = await loop.run_in_executor(None, next, iterator, exhausted)
+        if chunk is exhausted:
+            return
+        yield chunk
+
+
+def _normalize_stream_event(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Aplica a un evento parcial la misma normalización que a la extracción completa."""
+    section = event["section"]
+    data = [event["data"]] if event["type"] == "item" else event["data"]
+    normalized = _normalize_extracted_payload({section: data}).get(section)
+    if not normalized:
+        return None
+    if event["type"] == "item":
+        return {**event, "data": normalized[0]}
+    return {**event, "data": normalized}
+
+
+async def extract_cv_data_stream(documents: Sequence[Tuple[str, str]]) -> AsyncGenerator[str, None]:
+    """
+    Variante en streaming de `extract_cv_data` (eventos SSE).
+
+    Emite `item` por cada ítem de lista y `section` por cada sección completa
+    (normalizados, todavía sin validar), y termina con `complete` y el CVData
+    validado. Si el stream no produce un CV válido se recurre a la extracción
+    sin streaming, con sus reintentos. Si los archivos requieren más de un
+    chunk, se usa la extracción map-reduce y se emite `progress` por chunk.
+
+    Args:
+        documents: Pares (nombre de archivo, texto extraído).
+    """
+    if not _has_groq_key() and not _has_google_key():
+        yield _format_sse_event({
+            "type": "error",
+            "error": "AI service not configured. Check GROQ_API_KEY, GOOGLE_API_KEY.",
+            "code": "AI_NOT_CONFIGURED",
+        })
+        return
+
+    try:
+        chunks = _build_cv_chunks(documents)
+    except APIError as e:
+        yield sse_error_event(e)
+        return
+
+    if len(chunks) > 1:
+        async for event in _extract_chunked_stream(chunks):
+            yield event
+        return
+
+    text = chunks[0]
+    prompt = EXTRACT_CV_PROMPT.format(text=text)
+
+    validated: Optional[CVData] = None
+    provider_used = None
+    for provider, open_stream in _json_stream_providers(prompt, SYSTEM_RULES, CV_DATA_OUTPUT):
+        parser = IncrementalJSONParser()
+        try:
+            async for chunk in _iterate_blocking(open_stream()):
+                for event in parser.feed(chunk):
+                    partial = _normalize_stream_event(event)
+                    if partial:
+                        yield _format_sse_event(partial)
+        except Exception as e:
+            logger.error(f"[CV-STREAM] {provider} stream failed: {e}")
+            if not parser.text:
+                continue
+
+        validated = _validate_extracted_cv(_parse_ai_payload(parser.text), "extract_cv_data_stream")
+        provider_used = provider
+        break
 
     if not validated:
-        retry_prompt = f"{prompt}\n\nIMPORTANTE: Devuelve solo JSON válido con el esquema exacto."
-        retry_response = _parse_ai_payload(await get_ai_completion(retry_prompt))
-        if retry_response:
-            normalized = _normalize_extracted_payload(retry_response)
-            candidate = _ensure_cv_schema(normalized)
-            validated = _validate_ai_payload(CVData, candidate, "extract_cv_data_retry")
+        try:
+            validated = await extract_cv_data(text, as_model=True)
+            provider_used = "fallback"
+        except APIError as e:
+            yield sse_error_event(e)
+            return
+
+    yield _format_sse_event({
+        "type": "complete",
+        "cvData": validated.model_dump(by_alias=True),
+        "provider": provider_used,
+    })
+
 
+# --- STREAMING DE GENERACIÓN ---
+
+async def stream_ai_completion(
+    prompt: str,
+    system_msg: str = SYSTEM_RULES,
+    output: Optional[StructuredOutput] = None,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Completion JSON en streaming, como eventos (todavía sin formato SSE).
+
+    Emite `delta` con cada fragmento de texto y `section` por cada clave del
+    objeto raíz ya completa. El último evento es siempre `result`, con el JSON
+    parseado y el proveedor, o `data: None` si ningún stream produjo un objeto:
+    el fallback sin streaming lo decide el llamador.
+    """
+    for provider, open_stream in _json_stream_providers(prompt, system_msg, output):
+        parser = IncrementalJSONParser()
+        try:
+            async for chunk in _iterate_blocking(open_stream()):
+                yield {"type": "delta", "text": chunk}
+                for event in parser.feed(chunk):
+                    if event["type"] == "section":
+                        yield event
+        except Exception as e:
+            logger.error(f"[AI-STREAM] {provider} stream failed: {e}")
+            if not parser.text:
+                continue
+        yield {"type": "result", "data": _parse_ai_payload(parser.text), "provider": provider}
+        return
+    yield {"type": "result", "data": None, "provider": None}
+
+
+async def _stream_generation(
+    prompt: str,
+    system_msg: str,
+    fallback: Callable[[], Awaitable[Any]],
+    finalize: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]],
+) -> AsyncGenerator[str, None]:
+    """
+    Eventos SSE de una generación: `delta` y `section` mientras llega el
+    texto, y `complete` con `finalize(resultado)`, el mismo payload que
+    devuelve el endpoint sin streaming. Si el stream no produce un objeto se
+    usa `fallback` (la versión sin streaming, con sus reintentos).
+    """
+    result: Optional[Dict[str, Any]] = None
+    provider_used = None
+    async for event in stream_ai_completion(prompt, system_msg):
+        if event["type"] == "result":
+            result, provider_used = event["data"], event["provider"]
+        else:
+            yield _format_sse_event(event)
+
+    try:
+        if not result:
+            result = _parse_ai_payload(await fallback())
+            provider_used = "fallback"
+        payload = finalize(result)
+    except APIError as e:
+        yield sse_error_event(e)
+        return
+
+    yield _format_sse_event({"type": "complete", "data": payload, "provider": provider_used})
+
+
+# --- MAP-REDUCE EXTRACTION ---
+
+def _build_cv_chunks(documents: Sequence[Tuple[str, str]]) -> List[str]:
+    """Chunks de extracción; si son demasiados se rechaza en vez de truncar."""
+    chunks = build_extraction_chunks(documents, settings.EXTRACTION_CHUNK_CHARS)
+    if not chunks:
+        raise CVProcessingError("No encontramos texto para procesar en los archivos.")
+    if len(chunks) > settings.EXTRACTION_MAX_CHUNKS:
+        raise FileProcessingError(
+            "El contenido subido es demasiado extenso para procesarlo de una vez. "
+            "Subí menos archivos o un CV más corto."
+        )
+    return chunks
+
+
+async def _iter_chunk_extractions(
+    chunks: Sequence[str],
+) -> AsyncGenerator[Tuple[int, Dict[str, Any]], None]:
+    """Extrae los chunks en paralelo (fan-out acotado) y los devuelve a medida que terminan."""
+    semaphore = asyncio.Semaphore(max(1, settings.EXTRACTION_MAX_CONCURRENCY))
+
+    async def _extract(index: int, chunk: str) -> Tuple[int, Dict[str, Any]]:
+        async with semaphore:
+            return index, await extract_cv_data(chunk)
+
+    tasks = [asyncio.create_task(_extract(index, chunk)) for index, chunk in enumerate(chunks)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Si un chunk falla no tiene sentido seguir pagando los demás.
+        for task in tasks:
+            task.cancel()
+
+
+def _dedupe_cv_items(section: str, items: List[Any]) -> List[Any]:
+    seen = set()
+    unique: List[Any] = []
+    for item in items:
+        if section == "skills" and isinstance(item, dict):
+            key = (item.get("name") or "").strip().lower()
+        else:
+            key = item_signature(item).lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(item)
+    return unique
+
+
+def _merge_partial_cvs(partials: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduce las extracciones parciales (una por chunk, en orden de documento).
+
+    personalInfo toma el primer valor no vacío de cada campo; las listas se
+    concatenan y pasan por la misma normalización que una extracción completa
+    (`_dedupe_experience` une las experiencias repetidas entre chunks).
+    """
+    personal: Dict[str, Any] = {}
+    sections: Dict[str, List[Any]] = {section: [] for section in _CV_LIST_SECTIONS}
+    for partial in partials:
+        for field, value in (partial.get("personalInfo") or {}).items():
+            if _is_empty(personal.get(field)) and not _is_empty(value):
+                personal[field] = value
+        for section, items in sections.items():
+            items.extend(_normalize_list(partial.get(section)))
+
+    merged = _normalize_extracted_payload({"personalInfo": personal, **sections})
+    for section in ("education", "skills", "projects", "languages", "certifications"):
+        if merged.get(section):
+            merged[section] = _dedupe_cv_items(section, merged[section])
+    return merged
+
+
+def _reduce_partial_cvs(partials: Sequence[Dict[str, Any]], as_model: bool):
+    candidate = _ensure_cv_schema(_merge_partial_cvs(partials))
+    validated = _validate_ai_payload(CVData, candidate, "extract_cv_data_chunked")
     if not validated:
         raise CVProcessingError(
             "La IA devolvió un formato incompatible. Intenta nuevamente en unos segundos."
         )
+    return validated if as_model else validated.model_dump(by_alias=True)
+
+
+async def extract_cv_data_chunked(documents: Sequence[Tuple[str, str]], as_model: bool = False):
+    """
+    Extracción map-reduce para CVs largos o subidas de varios archivos.
+
+    Cada archivo (o cada chunk alineado a secciones de un archivo largo) se
+    extrae por separado con `extract_cv_data`, con a lo sumo
+    EXTRACTION_MAX_CONCURRENCY en paralelo, y los CVs parciales se fusionan
+    localmente. Un único chunk equivale a `extract_cv_data`.
+
+    Args:
+        documents: Pares (nombre de archivo, texto extraído).
+        as_model: Devuelve el `CVData` validado en lugar del dict.
+    """
+    chunks = _build_cv_chunks(documents)
+    if len(chunks) == 1:
+        return await extract_cv_data(chunks[0], as_model=as_model)
+
+    partials: List[Dict[str, Any]] = [{} for _ in chunks]
+    async for index, partial in _iter_chunk_extractions(chunks):
+        partials[index] = partial
+    return _reduce_partial_cvs(partials, as_model)
+
+
+async def _extract_chunked_stream(chunks: Sequence[str]) -> AsyncGenerator[str, None]:
+    partials: List[Dict[str, Any]] = [{} for _ in chunks]
+    completed = 0
+    try:
+        async for index, partial in _iter_chunk_extractions(chunks):
+            partials[index] = partial
+            completed += 1
+            yield _format_sse_event({"type": "progress", "completed": completed, "total": len(chunks)})
+        validated = _reduce_partial_cvs(partials, as_model=True)
+    except APIError as e:
+        yield sse_error_event(e)
+        return
+
+    yield _format_sse_event({
+        "type": "complete",
+        "cvData": validated.model_dump(by_alias=True),
+        "provider": "chunked",
+    })
+
+
+_CV_PERSONAL_INFO_DEFAULTS = {
+    "fullName": "",
+    "email": None,
+    "phone": None,
+    "location": None,
+    "summary": None,
+    "website": None,
+    "linkedin": None,
+    "github": None,
+}
+_CV_LIST_SECTIONS = (
+    "experience",
+    "education",
+    "skills",
+    "projects",
+    "languages",
+    "certifications",
+    "interests",
+)
+_EMAIL_FORMAT_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+_PHONE_FORMAT_RE = re.compile(r"^[\+\(\)0-9\s-]{7,20}$")
+_WORD_COUNT_RE = re.compile(r"\b\w+\b")
+_DIGIT_RE = re.compile(r"\d")
+_SENTENCE_SPLIT_RE = re.compile(r"[.\n]+")
 
-    return validated.model_dump(by_alias=True)
 
 def _merge_experience_descriptions(
     original: List[Dict[str, Any]],
     updates: List[Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
-    merged = copy.deepcopy(original)
-    for idx, update in enumerate(updates):
-        if idx >= len(merged):
-            break
+    # Solo se copian los ítems que cambian; el resto se comparte con el original.
+    merged = list(original)
+    for idx, update in enumerate(updates[:len(merged)]):
         if isinstance(update, dict) and update.get("description"):
-            merged[idx]["description"] = update["description"]
+            merged[idx] = {**merged[idx], "description": update["description"]}
     return merged
 
 
 def _ensure_cv_schema(cv_data: Dict[str, Any]) -> Dict[str, Any]:
-    base = {
-        "personalInfo": {
-            "fullName": "",
-            "email": None,
-            "phone": None,
-            "location": None,
-            "summary": None,
-            "website": None,
-            "linkedin": None,
-            "github": None,
-        },
-        "experience": [],
-        "education": [],
-        "skills": [],
-        "projects": [],
-        "languages": [],
-        "certifications": [],
-        "interests": [],
+    # Se arma un dict nuevo en cada llamada; los valores del input se reutilizan
+    # sin copiarlos (nunca se mutan).
+    merged: Dict[str, Any] = {
+        "personalInfo": dict(_CV_PERSONAL_INFO_DEFAULTS),
+        **{key: [] for key in _CV_LIST_SECTIONS},
     }
 
     if not isinstance(cv_data, dict):
-        return base
-
-    merged = copy.deepcopy(base)
+        return merged
 
     personal = cv_data.get("personalInfo")
     if isinstance(personal, dict):
@@ -551,15 +1049,7 @@ def _ensure_cv_schema(cv_data: Dict[str, Any]) -> Dict[str, Any]:
             cleaned_personal[key] = value
         merged["personalInfo"].update(cleaned_personal)
 
-    for key in [
-        "experience",
-        "education",
-        "skills",
-        "projects",
-        "languages",
-        "certifications",
-        "interests",
-    ]:
+    for key in _CV_LIST_SECTIONS:
         value = cv_data.get(key)
         if isinstance(value, list):
             merged[key] = value
@@ -572,11 +1062,11 @@ def _ensure_cv_schema(cv_data: Dict[str, Any]) -> Dict[str, Any]:
         merged["personalInfo"]["fullName"] = ""
 
     email_value = merged["personalInfo"].get("email")
-    if email_value and not re.match(r"^[^@\s]+@[^@\s]+\.[^@\s]+$", str(email_value)):
+    if email_value and not _EMAIL_FORMAT_RE.match(str(email_value)):
         merged["personalInfo"]["email"] = None
 
     phone_value = merged["personalInfo"].get("phone")
-    if phone_value and not re.match(r"^[\+\(\)0-9\s-]{7,20}$", str(phone_value)):
+    if phone_value and not _PHONE_FORMAT_RE.match(str(phone_value)):
         merged["personalInfo"]["phone"] = None
 
     for url_field in ["website", "linkedin", "github"]:
@@ -598,7 +1088,9 @@ def _apply_optimization_response(
     section: str,
     target: str,
 ) -> Dict[str, Any]:
-    result_cv = copy.deepcopy(original_copy)
+    # Copia superficial: cada rama que se modifica se reemplaza por un objeto
+    # nuevo, así el CV original nunca se muta.
+    result_cv = dict(original_copy)
 
     def _normalize_skills_list(raw_skills: Any) -> Optional[List[Dict[str, Any]]]:
         skills = _normalize_list(raw_skills)
@@ -624,7 +1116,7 @@ def _apply_optimization_response(
                 original_summary = original_copy.get("personalInfo", {}).get("summary", "")
                 if original_summary and len(new_summary) > len(original_summary):
                     new_summary = original_summary
-            result_cv["personalInfo"]["summary"] = new_summary
+            result_cv["personalInfo"] = {**(original_copy.get("personalInfo") or {}), "summary": new_summary}
 
     elif section == "skills" or target == "suggest_skills":
         if "skills" in ai_response:
@@ -649,8 +1141,33 @@ def _apply_optimization_response(
     return result_cv
 
 
-async def optimize_cv_data(cv_data: dict, target: str, section: str):
-    original_copy = copy.deepcopy(cv_data)
+async def _optimize_all_sections(cv_data: dict, target: str, language: str, as_model: bool):
+    """`section="all"`: una llamada por sección en paralelo (ver `section_planner`)."""
+    tasks = plan_sections(cv_data, target, language)
+    results = await run_section_plan(
+        tasks,
+        lambda prompt: get_ai_completion(prompt, SYSTEM_RULES),
+        settings.AI_SECTION_CONCURRENCY,
+    )
+    validated = _validate_ai_payload(
+        CVData, assemble_sections(cv_data, tasks, results), "optimize_cv_data_sections"
+    )
+    if not validated:
+        raise CVProcessingError(
+            "No pudimos validar la optimización del CV. Intenta nuevamente."
+        )
+    return validated if as_model else validated.model_dump(by_alias=True)
+
+
+async def optimize_cv_data(cv_data: dict, target: str, section: str, as_model: bool = False):
+    """
+    Optimiza una sección del CV.
+
+    Con `section="all"` y `target` shrink/improve cada sección se optimiza en
+    su propia llamada, en paralelo. `cv_data` no se muta; con `as_model=True`
+    devuelve el `CVData` validado.
+    """
+    original_copy = cv_data
     target = (target or "").lower()
     section = (section or "").lower()
     cv_json = json.dumps(cv_data, indent=2)
@@ -659,6 +1176,9 @@ async def optimize_cv_data(cv_data: dict, target: str, section: str):
     # We'll assume the prompt instruction "Match CV language" handles it enough.
     language_instruction = "Spanish if the input is Spanish, English if English."
 
+    if section == "all" and target in {"shrink", "improve"}:
+        return await _optimize_all_sections(cv_data, target, language_instruction, as_model)
+
     prompt = ""
     system_msg = SYSTEM_RULES
 
@@ -715,7 +1235,7 @@ async def optimize_cv_data(cv_data: dict, target: str, section: str):
         return original_copy
 
     result_cv = _apply_optimization_response(ai_response, original_copy, section, target)
-    validated = _validate_ai_payload(CVData, result_cv, "optimize_cv_data")
+    validated = _validate_before_retry(CVData, result_cv, "optimize_cv_data")
 
     if not validated:
         retry_prompt = f"{prompt}\n\nIMPORTANTE: Devuelve solo JSON válido con el esquema exacto."
@@ -731,7 +1251,7 @@ async def optimize_cv_data(cv_data: dict, target: str, section: str):
             "No pudimos validar la optimización del CV. Intenta nuevamente."
         )
 
-    return validated.model_dump(by_alias=True)
+    return validated if as_model else validated.model_dump(by_alias=True)
 
 
 def _collect_cv_text(cv_data: dict) -> str:
@@ -761,7 +1281,7 @@ def _collect_cv_text(cv_data: dict) -> str:
 
 def _estimate_word_count(cv_data: dict) -> int:
     text = _collect_cv_text(cv_data)
-    return len(re.findall(r"\b\w+\b", text))
+    return len(_WORD_COUNT_RE.findall(text))
 
 
 def _shorten_text(text: str, max_words: int) -> str:
@@ -831,7 +1351,7 @@ def _build_rule_based_critique(cv_data: dict, language_code: str) -> List[Dict[s
 
     if description_text:
         has_metrics = any(
-            re.search(r"\d", (item.get("description") or "")) 
+            _DIGIT_RE.search(item.get("description") or "") 
             for item in experience 
             if isinstance(item, dict)
         )
@@ -854,7 +1374,7 @@ def _build_rule_based_critique(cv_data: dict, language_code: str) -> List[Dict[s
 def _normalize_critique_response(cv_data: dict, ai_response: Any) -> Dict[str, Any]:
     response = ai_response if isinstance(ai_response, dict) else {}
 
-    language_code = _detect_language(_collect_cv_text(cv_data))
+    language_code = detect_language(_collect_cv_text(cv_data))
     fallback_title = "Mejora sugerida" if language_code == "es" else "Suggested improvement"
     allowed_categories = {
         "impact": "Impact",
@@ -966,13 +1486,13 @@ def _normalize_critique_response(cv_data: dict, ai_response: Any) -> Dict[str, A
 async def critique_cv_data(cv_data: dict):
     cv_json = json.dumps(cv_data, indent=2)
     prompt = SENTINEL_CRITIQUE_PROMPT.format(cv_json=cv_json)
-    ai_response = await get_ai_completion(prompt)
+    ai_response = await get_ai_completion(prompt, output=CRITIQUE_OUTPUT)
     normalized = _normalize_critique_response(cv_data, ai_response)
-    validated = _validate_ai_payload(CritiqueResponse, normalized, "critique_cv_data")
+    validated = _validate_before_retry(CritiqueResponse, normalized, "critique_cv_data")
 
     if not validated:
         retry_prompt = f"{prompt}\n\nIMPORTANTE: Devuelve solo JSON válido con el esquema exacto."
-        retry_response = await get_ai_completion(retry_prompt)
+        retry_response = await get_ai_completion(retry_prompt, output=CRITIQUE_OUTPUT)
         normalized = _normalize_critique_response(cv_data, retry_response)
         validated = _validate_ai_payload(CritiqueResponse, normalized, "critique_cv_data_retry")
 
@@ -986,7 +1506,8 @@ async def critique_cv_data(cv_data: dict):
 
 async def optimize_for_role(cv_data: dict, target_role: str):
     """Optimize CV for a specific target job role."""
-    original_copy = copy.deepcopy(cv_data)
+    # Solo se lee del original; la respuesta de la IA es la que se modifica.
+    original_copy = cv_data
     cv_json = json.dumps(cv_data, indent=2)
     language_instruction = "Spanish if the input is Spanish, English if English."
 
@@ -1041,6 +1562,24 @@ async def generate_linkedin_post(cv_data: dict):
     return await get_ai_completion(LINKEDIN_PROMPT.format(cv_json=cv_json))
 
 
+def _require_linkedin_post(result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not result:
+        raise CVProcessingError("No se pudo generar el post de LinkedIn.")
+    return result
+
+
+async def generate_linkedin_post_stream(cv_data: dict) -> AsyncGenerator[str, None]:
+    """Variante en streaming (SSE) de `generate_linkedin_post`; ver `_stream_generation`."""
+    prompt = LINKEDIN_PROMPT.format(cv_json=json.dumps(cv_data, indent=2))
+    async for event in _stream_generation(
+        prompt,
+        SYSTEM_RULES,
+        fallback=lambda: get_ai_completion(prompt),
+        finalize=_require_linkedin_post,
+    ):
+        yield event
+
+
 # --- COVER LETTER GENERATION ---
 
 COVER_LETTER_PROMPT = """
@@ -1078,839 +1617,224 @@ Return JSON con la estructura exacta:
 """
 
 
-async def generate_cover_letter(
+COVER_LETTER_SYSTEM_MSG = "Eres un experto en redacción de cartas de presentación profesionales."
+COVER_LETTER_FIELDS = ("opening", "body", "closing", "signature")
+
+
+def _cover_letter_prompt(
     cv_data: dict,
     company_name: str,
     recipient_name: str,
-    job_description: str = "",
-    tone: str = "formal",
-):
-    cv_json = json.dumps(cv_data, indent=2)
-    prompt = COVER_LETTER_PROMPT.format(
-        cv_json=cv_json,
+    job_description: str,
+    tone: str,
+) -> str:
+    return COVER_LETTER_PROMPT.format(
+        cv_json=json.dumps(cv_data, indent=2),
         company_name=company_name,
         recipient_name=recipient_name,
         job_description=job_description or "No especificada",
         tone=tone,
     )
-    return await get_ai_completion(
-        prompt,
-        system_msg="Eres un experto en redacción de cartas de presentación profesionales.",
-    )
-
-
-# --- ATS CHECKER ---
 
-# =============================================================================
-# FIELD-CONTEXTUAL VALIDATION SYSTEM
-# =============================================================================
-# This module implements strict industry-specific validation for ATS checking.
-# Key principles:
-# 1. Every recommendation must be relevant to the selected industry
-# 2. Irrelevant technical suggestions are suppressed for non-technical roles
-# 3. Resume content is verified against selected industry indicators
-# 4. Mismatches between resume content and selected industry are flagged
-# =============================================================================
 
-INDUSTRY_KEYWORDS = {
-    "tech": {
-        "name": "Tecnología / IT / Desarrollo de Software",
-        "keywords": [
-            "Python",
-            "JavaScript",
-            "TypeScript",
-            "React",
-            "Angular",
-            "Vue.js",
-            "Node.js",
-            "Django",
-            "Flask",
-            "FastAPI",
-            "Spring Boot",
-            "SQL",
-            "NoSQL",
-            "MongoDB",
-            "PostgreSQL",
-            "MySQL",
-            "Redis",
-            "Git",
-            "GitHub",
-            "GitLab",
-            "AWS",
-            "Azure",
-            "GCP",
-            "Docker",
-            "Kubernetes",
-            "Terraform",
-            "CI/CD",
-            "Jenkins",
-            "GitHub Actions",
-            "API",
-            "REST",
-            "GraphQL",
-            "gRPC",
-            "Agile",
-            "Scrum",
-            "Kanban",
-            "Machine Learning",
-            "TensorFlow",
-            "PyTorch",
-            "NLP",
-            "Full Stack",
-            "Backend",
-            "Frontend",
-            "DevOps",
-            "Cloud",
-            "Microservices",
-            "Architecture",
-            "Testing",
-            "Unit Testing",
-            "TDD",
-            "Security",
-            "OAuth",
-            "JWT",
-        ],
-        "focus": "habilidades técnicas, tecnologías específicas, proyectos de código, metodologías ágiles, arquitectura de sistemas",
-        # Terms that SHOULD NOT be suggested for tech industry
-        "anti_keywords": [
-            "Photoshop",
-            "Illustrator",
-            "Figma",
-            "Branding",
-            "Copywriting",
-            "Paciente",
-            "Clínica",
-            "Auditoría",
-            "Contabilidad",
-            "Docencia",
-            "Curriculum",
-            "Pedagogía",
-        ],
-        # Words that indicate genuine tech experience
-        "content_indicators": [
-            "desarroll",
-            "program",
-            "code",
-            "coding",
-            "software",
-            "engineer",
-            "developer",
-            "frontend",
-            "backend",
-            "fullstack",
-            "api",
-            "database",
-            "server",
-            "deploy",
-            "cloud",
-            "aws",
-            "azure",
-            "docker",
-            "kubernetes",
-            "git",
-            "framework",
-            "javascript",
-            "python",
-            "java",
-            "react",
-            "node",
-            "sql",
-            "nosql",
-        ],
-    },
-    "finance": {
-        "name": "Finanzas / Banca / Contabilidad",
-        "keywords": [
-            "Excel",
-            "Análisis financiero",
-            "Contabilidad",
-            "Presupuestos",
-            "Auditoría",
-            "Reporting",
-            "SAP",
-            "ERP",
-            "Compliance",
-            "Riesgo",
-            "Inversiones",
-            "Balance",
-            "P&L",
-            "Forecasting",
-            "Power BI",
-            "Tableau",
-            "KPIs",
-            "Due Diligence",
-            "Regulación",
-            "IFRS",
-            "GAAP",
-            "Tesorería",
-            "Cash Flow",
-            "Modelado financiero",
-            "Valoración",
-            "M&A",
-            "Fusiones",
-            "Adquisiciones",
-            "Crédito",
-            "Financiamiento",
-            "Capital",
-            "Rentabilidad",
-            "Margen",
-            "ROI",
-        ],
-        "focus": "análisis numérico, herramientas de reporting, regulaciones financieras, experiencia en auditoría y compliance, modelado financiero",
-        # Terms that SHOULD NOT be suggested for finance industry
-        "anti_keywords": [
-            "Photoshop",
-            "Illustrator",
-            "Figma",
-            "React",
-            "Node.js",
-            "JavaScript",
-            "Python",
-            "Docker",
-            "Kubernetes",
-            "Paciente",
-            "Clínica",
-            "Docencia",
-            "Curriculum",
-            "Pedagogía",
-            "Portfolio",
-            "Branding",
-        ],
-        # Words that indicate genuine finance experience
-        "content_indicators": [
-            "financiero",
-            "contabil",
-            "auditor",
-            "presupuesto",
-            "balance",
-            "p&l",
-            "forecast",
-            "reporting",
-            "excel",
-            "sap",
-            "erp",
-            "compliance",
-            "riesgo",
-            "inversion",
-            "valoracion",
-            "tesoreria",
-            "cash flow",
-            "credito",
-            "banca",
-            "acciones",
-            "bolsa",
-        ],
-    },
-    "healthcare": {
-        "name": "Salud / Medicina / Enfermería",
-        "keywords": [
-            "Paciente",
-            "Clínica",
-            "Hospital",
-            "Diagnóstico",
-            "Tratamiento",
-            "Historial clínico",
-            "HIPAA",
-            "Emergencias",
-            "Farmacología",
-            "Enfermería",
-            "Cirugía",
-            "Laboratorio",
-            "Radiología",
-            "Atención primaria",
-            "Cuidados intensivos",
-            "Protocolos",
-            "Esterilización",
-            "Signos vitales",
-            "Triage",
-            "Medicina",
-            "Farmacia",
-            "Terapia",
-            "Rehabilitación",
-            "Epic",
-            "Cerner",
-            "Medication",
-            "Patient care",
-            "Clinical",
-            "Healthcare",
-        ],
-        "focus": "certificaciones médicas, experiencia clínica, atención al paciente, protocolos de seguridad, cumplimiento regulatorio",
-        # Terms that SHOULD NOT be suggested for healthcare industry
-        "anti_keywords": [
-            "Photoshop",
-            "Illustrator",
-            "Figma",
-            "React",
-            "Node.js",
-            "JavaScript",
-            "Python",
-            "Docker",
-            "Kubernetes",
-            "API",
-            "DevOps",
-            "AWS",
-            "Auditoría",
-            "Contabilidad",
-            "Docencia",
-            "Curriculum",
-        ],
-        # Words that indicate genuine healthcare experience
-        "content_indicators": [
-            "paciente",
-            "clinica",
-            "hospital",
-            "medico",
-            "enfermer",
-            "diagnostic",
-            "tratamiento",
-            "terapia",
-            "farmaco",
-            "cirugia",
-            "laboratorio",
-            "radiologia",
-            "cuidado",
-            "hipaa",
-            "epic",
-            "cerner",
-            "historial",
-            "signos vitales",
-            "triage",
-        ],
-    },
-    "creative": {
-        "name": "Diseño / Marketing / Comunicación",
-        "keywords": [
-            "Photoshop",
-            "Illustrator",
-            "InDesign",
-            "Figma",
-            "Sketch",
-            "UI/UX",
-            "Branding",
-            "Identidad visual",
-            "Copywriting",
-            "SEO",
-            "SEM",
-            "Social Media",
-            "Campañas",
-            "Estrategia digital",
-            "Google Ads",
-            "Facebook Ads",
-            "Content Marketing",
-            "Email Marketing",
-            "Creatividad",
-            "Portfolio",
-            "Adobe Creative Suite",
-            "Canva",
-            "Motion Graphics",
-            "Video",
-            "Fotografía",
-            "Dirección de arte",
-            "Packaging",
-            "Tipografía",
-            "Colorimetría",
-            "Storytelling",
-            "Engagement",
-            "Conversion",
-        ],
-        "focus": "portfolio de trabajos, herramientas de diseño, métricas de campañas, creatividad y storytelling visual, identidad de marca",
-        # Terms that SHOULD NOT be suggested for creative industry
-        "anti_keywords": [
-            "React",
-            "Node.js",
-            "JavaScript",
-            "Python",
-            "Docker",
-            "Kubernetes",
-            "AWS",
-            "API",
-            "DevOps",
-            "CI/CD",
-            "Auditoría",
-            "Contabilidad",
-            "Paciente",
-            "Clínica",
-            "Docencia",
-        ],
-        # Words that indicate genuine creative experience
-        "content_indicators": [
-            "diseño",
-            "diseno",
-            "grafico",
-            "visual",
-            "brand",
-            "identidad",
-            "ux",
-            "ui",
-            "fotografia",
-            "video",
-            "motion",
-            "animacion",
-            "ilustracion",
-            "arte",
-            "tipografia",
-            "marketing",
-            "campana",
-            "seo",
-            "copywriting",
-            "contenido",
-            "social media",
-        ],
-    },
-    "education": {
-        "name": "Educación / Docencia / Capacitación",
-        "keywords": [
-            "Docencia",
-            "Curriculum",
-            "Planificación",
-            "Evaluación",
-            "Pedagogía",
-            "E-learning",
-            "Moodle",
-            "Canvas",
-            "Blackboard",
-            "Estudiantes",
-            "Aula",
-            "Didáctica",
-            "Capacitación",
-            "Tutoría",
-            "Metodología",
-            "Inclusión",
-            "NEE",
-            "Desarrollo curricular",
-            "Materiales didácticos",
-            "Formación profesional",
-            "Certificaciones",
-            "SQA",
-            "Competencias",
-            "Aprendizaje",
-            "Enseñanza",
-            "Evaluación",
-            "Calificaciones",
-            "Tesis",
-            "Investigación educativa",
-        ],
-        "focus": "experiencia docente, metodologías educativas, gestión de aula, desarrollo de programas, formación de competencias",
-        # Terms that SHOULD NOT be suggested for education industry
-        "anti_keywords": [
-            "React",
-            "Node.js",
-            "JavaScript",
-            "Python",
-            "Docker",
-            "Kubernetes",
-            "AWS",
-            "API",
-            "DevOps",
-            "Photoshop",
-            "Illustrator",
-            "Branding",
-            "Paciente",
-            "Clínica",
-            "Auditoría",
-        ],
-        # Words that indicate genuine education experience
-        "content_indicators": [
-            "docencia",
-            "docente",
-            "enseñanza",
-            "educacion",
-            "curriculum",
-            "pedagog",
-            "aula",
-            "estudiante",
-            "alumno",
-            "evaluacion",
-            "didactica",
-            "tutoria",
-            "capacitacion",
-            "formacion",
-            "moodle",
-            "e-learning",
-            "curso",
-        ],
-    },
-    "general": {
-        "name": "General / Multiindustria",
-        "keywords": [
-            "Liderazgo",
-            "Gestión",
-            "Comunicación",
-            "Trabajo en equipo",
-            "Organización",
-            "Resolución de problemas",
-            "Excel",
-            "Inglés",
-            "Atención al cliente",
-            "Ventas",
-            "Negociación",
-            "Planificación",
-            "Adaptabilidad",
-            "Proactividad",
-            "Gestión de proyectos",
-            "Análisis",
-            "Microsoft Office",
-            "PowerPoint",
-            "Word",
-            "Outlook",
-            "CRM",
-            "ERP",
-            "Reporting",
-            "KPIs",
-            "Metas",
-            "Objetivos",
-            "Resultados",
-        ],
-        "focus": "habilidades transferibles, logros cuantificables, experiencia general relevante, competencias blandas",
-        # No specific anti-keywords for general - it's flexible
-        "anti_keywords": [],
-        # Generic indicators for any professional experience
-        "content_indicators": [
-            "gestion",
-            "liderazgo",
-            "proyecto",
-            "equipo",
-            "cliente",
-            "ventas",
-            "atencion",
-            "comunicacion",
-            "organizacion",
-            "analisis",
-            "planificacion",
-        ],
-    },
-}
-
-
-# =============================================================================
-# CONTENT VERIFICATION HELPER FUNCTIONS
-# =============================================================================
-
-def check_resume_content_indicators(
-    cv_text: str,
-    industry: str,
-    threshold: float = 0.2
-) -> Dict[str, Any]:
-    """
-    Verifies if resume content contains indicators for the selected industry.
-
-    Args:
-        cv_text: Lowercase text of the resume
-        industry: Selected industry key (e.g., 'tech', 'creative')
-        threshold: Minimum ratio of indicators to keywords (default 20%)
-
-    Returns:
-        Dict with mismatch_detected, match_ratio, found_indicators, and recommendations
-    """
-    industry_data = INDUSTRY_KEYWORDS.get(industry, INDUSTRY_KEYWORDS["general"])
-    indicators = industry_data.get("content_indicators", [])
-    anti_keywords = industry_data.get("anti_keywords", [])
-
-    # Count how many content indicators are present
-    found_indicators = []
-    for indicator in indicators:
-        if indicator.lower() in cv_text:
-            found_indicators.append(indicator)
-
-    # Count anti-keywords that ARE present (these indicate OTHER industries)
-    found_anti_keywords = []
-    for anti_kw in anti_keywords:
-        if anti_kw.lower() in cv_text:
-            found_anti_keywords.append(anti_kw)
-
-    # Calculate match ratio
-    match_ratio = len(found_indicators) / max(len(indicators), 1)
-
-    # Detect mismatch: few indicators but many anti-keywords
-    mismatch_detected = (
-        match_ratio < threshold and len(found_anti_keywords) > 0
-    ) or (match_ratio < threshold and industry != "general")
-
-    return {
-        "mismatch_detected": mismatch_detected,
-        "match_ratio": round(match_ratio, 3),
-        "found_indicators": found_indicators,
-        "found_anti_keywords": found_anti_keywords,
-        "indicator_count": len(found_indicators),
-        "anti_keyword_count": len(found_anti_keywords),
-    }
+async def generate_cover_letter(
+    cv_data: dict,
+    company_name: str,
+    recipient_name: str,
+    job_description: str = "",
+    tone: str = "formal",
+):
+    prompt = _cover_letter_prompt(cv_data, company_name, recipient_name, job_description, tone)
+    return await get_ai_completion(prompt, system_msg=COVER_LETTER_SYSTEM_MSG)
 
 
-def filter_anti_keywords_for_industry(
-    keywords: List[str],
-    industry: str,
-) -> List[str]:
-    """
-    Filters out keywords that are anti-keywords for the selected industry.
+def format_cover_letter(result: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Campos de `CoverLetterResponse` a partir de la respuesta de la IA."""
+    if not result:
+        raise CVProcessingError("No se pudo generar la carta de presentación.")
+    return {field: result.get(field, "") for field in COVER_LETTER_FIELDS}
 
-    Args:
-        keywords: List of suggested keywords
-        industry: Selected industry key
 
-    Returns:
-        Filtered list without anti-keywords
-    """
-    industry_data = INDUSTRY_KEYWORDS.get(industry, INDUSTRY_KEYWORDS["general"])
-    anti_keywords = industry_data.get("anti_keywords", [])
-
-    # Create lowercase sets for case-insensitive matching
-    anti_keywords_lower = {kw.lower() for kw in anti_keywords}
-
-    filtered = [
-        kw for kw in keywords if kw.lower() not in anti_keywords_lower
-    ]
+async def generate_cover_letter_stream(
+    cv_data: dict,
+    company_name: str,
+    recipient_name: str,
+    job_description: str = "",
+    tone: str = "formal",
+) -> AsyncGenerator[str, None]:
+    """Variante en streaming (SSE) de `generate_cover_letter`; ver `_stream_generation`."""
+    prompt = _cover_letter_prompt(cv_data, company_name, recipient_name, job_description, tone)
+    async for event in _stream_generation(
+        prompt,
+        COVER_LETTER_SYSTEM_MSG,
+        fallback=lambda: get_ai_completion(prompt, system_msg=COVER_LETTER_SYSTEM_MSG),
+        finalize=format_cover_letter,
+    ):
+        yield event
 
-    return filtered
 
+# --- ATS CHECKER ---
 
-# =============================================================================
-# ENHANCED ATS CHECKER PROMPT WITH STRICT VALIDATION
-# =============================================================================
+ATS_MODES = ("full", "fast")
 
-ATS_CHECKER_PROMPT = """
+ATS_NARRATIVE_PROMPT = """
 Actúa como un sistema ATS (Applicant Tracking System) profesional especializado en la industria de {industry_name}.
 
-═══════════════════════════════════════════════════════════════════════════════
-CRITICAL VALIDATION RULES - READ FIRST
-═══════════════════════════════════════════════════════════════════════════════
-
-1. CONTEXTUAL RELEVANCE: You MUST ONLY suggest keywords and recommendations
-   that are RELEVANT to {industry_name}. Do NOT suggest keywords from other industries.
-
-2. ANTI-KEYWORD SUPPRESSION: You MUST NOT recommend any of these terms for
-   this industry because they are IRRELEVANT or COUNTER-PRODUCTIVE:
-   {anti_keywords_list}
-
-3. CONTENT VERIFICATION: Before making suggestions, verify that the resume
-   actually contains INDICATORS for {industry_name}.
-   - If the resume shows NO indicators for this industry, flag a MISMATCH
-   - Content indicators found: {content_indicators_found}
-   - Anti-keywords found: {anti_keywords_found}
-
-4. MISMATCH DETECTION:
-   - If mismatch_detected is true: Warn the user about the industry selection
-   - Suggest the ACTUAL industry the resume appears to target
-   - Do NOT force recommendations for a mismatched industry
-
-═══════════════════════════════════════════════════════════════════════════════
-INDUSTRY-SPECIFIC REQUIREMENTS
-═══════════════════════════════════════════════════════════════════════════════
+Los puntajes ya fueron calculados por el motor determinístico. NO los recalcules ni los contradigas:
+- Score ATS: {ats_score}/100 (grade {grade})
+- Formato: {format_score}/100 | Keywords: {keyword_score}/100 | Completitud: {completeness_score}/100
+- Keywords encontradas: {found_keywords}
+- Keywords faltantes: {missing_keywords}
+- Problemas detectados: {issues}
+- Mismatch de industria: {mismatch_detected}
+- Contexto de mejora previo (si existe): {improvement_context}
 
 ENFOQUE PRINCIPAL: {industry_focus}
 
-KEYWORDS ESPERADAS PARA ESTA INDUSTRIA (SOLO RELEVANTES):
-{industry_keywords}
-
-═══════════════════════════════════════════════════════════════════════════════
-QUALITY STANDARD: MULTI-AGENT CRITIQUE DEBATE
-═══════════════════════════════════════════════════════════════════════════════
-
-Antes de generar el resultado final, debés realizar internamente un debate de calidad entre dos agentes con posiciones opuestas sobre este CV en el contexto de {industry_name}:
-
-1. AGENTE OPTIMISTA: Su misión es encontrar el potencial oculto. Debe argumentar por qué el candidato es valioso, qué fortalezas resaltan y por qué el ATS debería ser indulgente en ciertos puntos.
-2. AGENTE PESIMISTA: Su misión es el control de daños. Debe ser implacable, identificar por qué este CV sería rechazado en 6 segundos y criticar cualquier punto "débil" o genérico que el optimista intente defender.
-
-MECÁNICA DEL DEBATE:
-- El Optimista propone una fortaleza.
-- El Pesimista la contrarresta o señala un vacío crítico que la anula.
-- Ambos llegan a un consenso sobre qué es REALMENTE importante corregir para ganar en {industry_name}.
-
-ESTO ES CRÍTICO: El resultado final (JSON) debe ser la síntesis de este debate, asegurando que las recomendaciones no sean genéricas sino producto de un análisis de "oposición de posiciones".
-
-═══════════════════════════════════════════════════════════════════════════════
-ANÁLISIS REQUERIDO (SÍNTESIS DEL DEBATE)
-═══════════════════════════════════════════════════════════════════════════════
-
-1. SCORE ATS (0-100): Basado en:
-   - Formato: ¿Es el texto parseable (no imágenes, no tablas complejas)?
-   - Keywords de {industry_name}: ¿Tiene palabras clave relevantes para ESTA industria?
-   - Longitud: ¿Es apropiado (1-2 páginas)?
-   - Contacto: ¿Tiene email y teléfono visibles?
-   - Extras relevantes para {industry_name}: LinkedIn, portfolio, certificaciones específicas
-   - CONTEXTUAL FIT: ¿Las recomendaciones coinciden con la industria seleccionada?
-
-2. KEYWORDS ENCONTRADAS (RELEVANTES): Lista SOLO las skills y términos
-   relevantes para {industry_name} que detectaste. NO incluyas anti-keywords.
-
-3. KEYWORDS FALTANTES: Sugiere palabras clave que DEBERÍAN estar para
-   destacar en {industry_name}. CRITICAL: Only suggest from the approved list.
-   - Do NOT suggest: {anti_keywords_list}
-
-4. PROBLEMAS DETECTADOS: Lista issues que podrían filtrar el CV en
-   procesos de selección de {industry_name}
-
-5. MEJORAS SUGERIDAS: Acciones concretas para mejorar el score en la
-   industria de {industry_name}. Ensure all suggestions are contextual.
-
-6. MISMATCH ANALYSIS (CRITICAL): If content_indicators_found is empty or
-   anti_keywords_found is significant, explain the potential mismatch:
-   - "Your resume appears to target [ACTUAL INDUSTRY] but you selected {industry_name}"
-   - Suggest the correct industry based on resume content
-
-7. GUARDRAILS DE CONSISTENCIA (MEJORAS PREVIAS):
-   - Contexto de mejora previo (si existe): {improvement_context}
-   - Si el CV actual incorpora mejoras claras sobre el contexto (keywords faltantes ahora presentes,
-     issues resueltos o estructura más alineada a {industry_name}), el score debe reflejar una mejora
-     tangible y no puede quedar igual o peor que el baseline.
-   - Si NO hay mejoras claras, mantené el score sin inflarlo artificialmente.
-
-═══════════════════════════════════════════════════════════════════════════════
-IDIOMA Y FORMATO
-═══════════════════════════════════════════════════════════════════════════════
+REGLAS:
+1. Solo hacé recomendaciones RELEVANTES para {industry_name}.
+2. NO recomiendes estos términos: {anti_keywords_list}
+3. Si hay mismatch, advertilo y sugerí la industria que realmente parece apuntar el CV.
+4. Antes de responder, debatí internamente entre un Agente Optimista (potencial oculto)
+   y un Agente Pesimista (por qué se rechazaría en 6 segundos); el debrief es la síntesis.
 
 IDIOMA: Responde en el mismo idioma del CV.
 
 Return JSON exactamente así:
 {{
-  "ats_score": 0-100,
-  "grade": "A/B/C/D/F",
   "summary": "Resumen de 1-2 oraciones evaluando el CV para {industry_name}",
-  "format_score": 0-100,
-  "keyword_score": 0-100,
-  "completeness_score": 0-100,
-  "found_keywords": ["keyword1", "keyword2", ...],
-  "missing_keywords": ["keyword1", "keyword2", ...],
-  "industry_recommendation": "{target_industry}",
-  "mismatch_detected": boolean,
-  "mismatch_warning": "Warning message if mismatch detected",
-  "suggested_industry": "Actual industry if mismatch detected",
-  "issues": [
-    {{"severity": "high/medium/low", "message": "descripción del problema", "fix": "cómo solucionarlo"}}
-  ],
-  "quick_wins": ["acción 1", "acción 2"],
   "detailed_tips": "consejos específicos para mejorar el CV para {industry_name}",
-  "relevance_justification": "Explicación de por qué cada sugerencia es relevante para {industry_name}",
-  "quality_debrief": "Un resumen muy breve (2 frases) de la conclusión del debate entre el Agente Optimista y el Pesimista sobre este CV."
+  "quality_debrief": "Un resumen muy breve (2 frases) de la conclusión del debate entre el Agente Optimista y el Pesimista."
 }}
 
-═══════════════════════════════════════════════════════════════════════════════
 CV A ANALIZAR:
-═══════════════════════════════════════════════════════════════════════════════
 {cv_text}
 """
 
-def _build_ats_rule_issues(cv_text: str, language_code: str) -> List[dict]:
-    labels = {
-        "es": {
-            "missing_email": ("Falta email visible", "Agregá un email profesional en el encabezado."),
-            "missing_phone": ("Falta teléfono visible", "Incluí un número de contacto claro en el encabezado."),
-            "too_long": ("CV demasiado extenso", "Reducí contenido para mantener 1-2 páginas."),
-        },
-        "en": {
-            "missing_email": ("Missing visible email", "Add a professional email in the header."),
-            "missing_phone": ("Missing visible phone", "Include a clear contact number in the header."),
-            "too_long": ("CV too long", "Reduce content to keep it within 1-2 pages."),
-        },
-    }
-    lang_labels = labels["es"] if language_code == "es" else labels["en"]
-    issues: List[dict] = []
-
-    if not re.search(r"[\w\.-]+@[\w\.-]+\.\w+", cv_text):
-        title, fix = lang_labels["missing_email"]
-        issues.append({"severity": "high", "message": title, "fix": fix})
-
-    if not re.search(r"\+?\d[\d\s().-]{7,}", cv_text):
-        title, fix = lang_labels["missing_phone"]
-        issues.append({"severity": "high", "message": title, "fix": fix})
-
-    word_count = len(re.findall(r"\b\w+\b", cv_text))
-    if word_count > 900:
-        title, fix = lang_labels["too_long"]
-        issues.append({"severity": "medium", "message": title, "fix": fix})
-
-    return issues
+ATS_NARRATIVE_FIELDS = ("summary", "detailed_tips", "quality_debrief")
 
 
 async def analyze_ats(
     cv_text: str,
     target_industry: str = "general",
     improvement_context: Optional[str] = None,
+    mode: str = "full",
 ):
     """
     Analyze CV for ATS compatibility in a specific industry with strict
     field-contextual validation.
 
+    Scores, keywords and issues come from the local engine in ats_scoring.
+    In "full" mode the AI only writes the narrative fields; "fast" mode
+    skips the AI call entirely.
+
     Args:
         cv_text: The resume text to analyze
         target_industry: The industry to check against (tech, finance, etc.)
+        improvement_context: Optional summary of a previous analysis
+        mode: "full" (local scores + AI narrative) or "fast" (local only)
 
     Returns:
         Dict with ATS analysis including mismatch detection and contextual recommendations
     """
-    _raise_if_no_ai_provider()
+    if mode not in ATS_MODES:
+        raise CVProcessingError(f"Unsupported ATS mode: {mode}")
 
-    industry_data = INDUSTRY_KEYWORDS.get(target_industry, INDUSTRY_KEYWORDS["general"])
+    language_code = detect_language(cv_text)
+    result = score_ats_locally(cv_text, target_industry, language_code)
+    if mode == "fast":
+        return result
 
-    # Perform content verification BEFORE generating the prompt
-    cv_text_lower = cv_text.lower()
-    verification_result = check_resume_content_indicators(
-        cv_text_lower, target_industry
-    )
+    return await _apply_ats_narrative(result, cv_text, target_industry, improvement_context)
 
-    # Get anti-keywords for the selected industry
-    anti_keywords = industry_data.get("anti_keywords", [])
-    anti_keywords_list = ", ".join(anti_keywords) if anti_keywords else "None for this industry"
 
-    # Format content indicators for the prompt
-    content_indicators_found = ", ".join(verification_result["found_indicators"]) or "None detected"
-    anti_keywords_found = ", ".join(verification_result["found_anti_keywords"]) or "None detected"
+async def _apply_ats_narrative(
+    result: Dict[str, Any],
+    cv_text: str,
+    target_industry: str,
+    improvement_context: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Completa los campos narrativos de un análisis local con la IA."""
+    _raise_if_no_ai_provider()
 
-    # Build the prompt with all contextual information
-    prompt = ATS_CHECKER_PROMPT.format(
+    industry_data = INDUSTRY_KEYWORDS.get(target_industry, INDUSTRY_KEYWORDS["general"])
+    anti_keywords = industry_data.get("anti_keywords", [])
+
+    prompt = ATS_NARRATIVE_PROMPT.format(
         cv_text=cv_text,
         industry_name=industry_data["name"],
-        industry_keywords=", ".join(industry_data["keywords"]),
         industry_focus=industry_data["focus"],
-        target_industry=target_industry,
-        anti_keywords_list=anti_keywords_list,
-        content_indicators_found=content_indicators_found,
-        anti_keywords_found=anti_keywords_found,
+        ats_score=result["ats_score"],
+        grade=result["grade"],
+        format_score=result["format_score"],
+        keyword_score=result["keyword_score"],
+        completeness_score=result["completeness_score"],
+        found_keywords=", ".join(result["found_keywords"]) or "Ninguna",
+        missing_keywords=", ".join(result["missing_keywords"]) or "Ninguna",
+        issues="; ".join(issue["message"] for issue in result["issues"]) or "Ninguno",
+        mismatch_detected=result["mismatch_detected"],
+        anti_keywords_list=", ".join(anti_keywords) if anti_keywords else "None for this industry",
         improvement_context=improvement_context or "Sin contexto previo",
     )
 
-    # Generate the analysis
-    result = await get_ai_completion(
-        prompt,
-        system_msg=f"""Eres un sistema ATS experto especializado en la industria de {industry_data['name']}. 
-        IMPORTANTE: 
+    try:
+        narrative = await get_ai_completion(
+            prompt,
+            system_msg=f"""Eres un sistema ATS experto especializado en la industria de {industry_data['name']}.
+        IMPORTANTE:
+        - Solo redactás los campos narrativos; los puntajes ya están calculados
         - Solo haz recomendaciones RELEVANTES para esta industria
-        - NO sugieras términos técnicos (React, Node, Python, etc.) para roles no-técnicos
-        - NO sugieras términos creativos (Photoshop, Branding, etc.) para roles no-creativos
-        - NO sugieras términos financieros (Auditoría, Contabilidad, etc.) para roles no-financieros
-        - NO sugieras términos médicos (Paciente, Clínica, etc.) para roles no-médicos
-        - NO sugieras términos educativos (Docencia, Curriculum, etc.) para roles no-educativos
-        - Sé riguroso y específico en tu análisis, enfocándote en lo que realmente importa para esta industria.
         - Si detectas un desbalance entre la industria seleccionada y el contenido del CV, adviértelo claramente.""",
-    )
+        )
+    except Exception as e:
+        # Los puntajes locales siguen siendo válidos aunque falle la narrativa.
+        logger.warning(f"ATS narrative generation failed, using local summary: {e}")
+        return result
 
-    if not result or not isinstance(result, dict):
-        raise AIServiceError("ATS analysis failed to return valid results.")
+    if isinstance(narrative, dict):
+        for field in ATS_NARRATIVE_FIELDS:
+            value = narrative.get(field)
+            if isinstance(value, str) and value.strip():
+                result[field] = value.strip()
 
-    if not result.get("issues"):
-        language_code = _detect_language(cv_text)
-        fallback_issues = _build_ats_rule_issues(cv_text, language_code)
-        if fallback_issues:
-            result["issues"] = fallback_issues
+    return result
 
-    # Post-process to ensure anti-keywords are filtered from suggestions
-    if result and "missing_keywords" in result:
-        result["missing_keywords"] = filter_anti_keywords_for_industry(
-            result["missing_keywords"],
-            target_industry,
-        )
 
-    # Add verification metadata to the result
-    if result:
-        result["content_verification"] = {
-            "mismatch_detected": verification_result["mismatch_detected"],
-            "match_ratio": verification_result["match_ratio"],
-            "found_indicators": verification_result["found_indicators"],
-            "found_anti_keywords": verification_result["found_anti_keywords"],
-        }
+async def analyze_ats_sweep(
+    cv_text: str,
+    improvement_context: Optional[str] = None,
+    mode: str = "fast",
+) -> Dict[str, Any]:
+    """
+    Rank the CV against every industry in INDUSTRY_KEYWORDS in a single pass.
 
-    return result
+    The CV text is indexed once and reused for every industry. Only the
+    best-fitting industry gets a full analysis, and in "full" mode only that
+    one receives the AI narrative.
 
+    Returns:
+        Dict with the ranked `industries` list and the `top_match` analysis.
+    """
+    if mode not in ATS_MODES:
+        raise CVProcessingError(f"Unsupported ATS mode: {mode}")
+
+    term_index = build_term_index(cv_text)
+    profile = build_cv_profile(cv_text)
+    ranking = sweep_industries(cv_text, term_index=term_index, profile=profile)
+    top_industry = ranking[0]["industry"] if ranking else "general"
+
+    top_match = score_ats_locally(
+        cv_text,
+        top_industry,
+        detect_language(cv_text),
+        term_index=term_index,
+        profile=profile,
+        industry_recommendation=top_industry,
+    )
+    if mode == "full":
+        top_match = await _apply_ats_narrative(top_match, cv_text, top_industry, improvement_context)
 
+    return {"industries": ranking, "top_match": top_match}
 
 
 # --- CONVERSATIONAL ENGINE (MULTI-PROVIDER FALLBACK) ---
@@ -2115,9 +2039,13 @@ async def generate_conversation_response(
     cv_data: Dict[str, Any],
     current_phase: ConversationPhase,
     job_description: Optional[str] = None,
+    language_code: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Genera una respuesta conversacional para el chat del CV builder.
+
+    `language_code` viene de la sesión (ver `update_session_language`); si no
+    se pasa, se detecta a partir del historial.
     """
     if (
         (not _has_groq_key())
@@ -2130,7 +2058,7 @@ async def generate_conversation_response(
         }
 
     try:
-        language_code = _detect_language_preference(message, history)
+        language_code = language_code or detect_language_preference(message, history)
         prompt = _build_conversation_prompt(
             message=message,
             history=history,
@@ -2167,6 +2095,8 @@ async def generate_conversation_response_stream(
     cv_data: Dict[str, Any],
     current_phase: ConversationPhase,
     job_description: Optional[str] = None,
+    language_code: Optional[str] = None,
+    cv_index: Optional[CVMergeIndex] = None,
 ) -> AsyncGenerator[str, None]:
     """
     Genera una respuesta conversacional en streaming (SSE).
@@ -2190,8 +2120,8 @@ async def generate_conversation_response_stream(
     # Log entry for debugging
     logger.info(f"[CHAT-STREAM] New request | Phase: {current_phase} | Gemini exhausted: {_gemini_quota_exhausted}")
     
-    # Detect language preference once per request
-    language_code = _detect_language_preference(message, history)
+    # Language comes from the session when available; detect once per request otherwise
+    language_code = language_code or detect_language_preference(message, history)
 
     # =========================================================================
     # STRATEGY 1: Try Gemini (if not exhausted or cooldown elapsed)
@@ -2342,6 +2272,7 @@ async def generate_conversation_response_stream(
             prompt_cv_data = _merge_cv_data_for_context(
                 cv_data,
                 seeded_extraction.extracted if seeded_extraction else None,
+                cv_index=cv_index,
             )
             conversation_prompt = _build_conversation_prompt(
                 message=message,
@@ -2500,7 +2431,7 @@ async def extract_cv_data_from_message(
         )
 
         system_msg = "Eres un extractor de datos preciso y cuidadoso."
-        response = await get_ai_completion(prompt, system_msg)
+        response = await get_ai_completion(prompt, system_msg, output=DATA_EXTRACTION_OUTPUT)
 
         if not response:
             return None
@@ -2527,11 +2458,13 @@ async def extract_cv_data_from_message(
             "needs_clarification": extraction_data.get("needs_clarification", []),
             "follow_up_questions": extraction_data.get("follow_up_questions", []),
         }
-        validated = _validate_ai_payload(DataExtraction, payload, "extract_cv_data_from_message")
+        validated = _validate_before_retry(DataExtraction, payload, "extract_cv_data_from_message")
 
         if not validated:
             retry_prompt = f"{prompt}\n\nIMPORTANTE: Devuelve solo JSON válido con el esquema exacto."
-            retry_response = await get_ai_completion(retry_prompt, system_msg)
+            retry_response = await get_ai_completion(
+                retry_prompt, system_msg, output=DATA_EXTRACTION_OUTPUT
+            )
             retry_data = _parse_ai_payload(retry_response)
             if retry_data:
                 clean_data = clean_extracted(retry_data.get("extracted", {}))
@@ -2637,36 +2570,86 @@ async def generate_next_question(
         }
 
 
+JOB_ANALYSIS_MODES = ("full", "fast")
+
+
+def _build_tailoring_suggestions(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    suggestions = [
+        TailoringSuggestion(
+            section=s.get("section", ""),
+            current=s.get("current", ""),
+            suggested=s.get("suggested", ""),
+            reason=s.get("reason", ""),
+            priority=s.get("priority", "medium"),
+        )
+        for s in data.get("suggestions", [])
+        if isinstance(s, dict)
+    ]
+    return [s.model_dump() for s in suggestions]
+
+
+def _build_local_tailoring_suggestions(local_match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    missing = local_match["missing_skills"]
+    if not missing:
+        return []
+    return [
+        TailoringSuggestion(
+            section="skills",
+            current=", ".join(local_match["matched_skills"]),
+            suggested=", ".join(local_match["matched_skills"] + missing[:5]),
+            reason="Requisitos del puesto que no aparecen en el CV. Agregalos solo si los tenés.",
+            priority="high",
+        ).model_dump()
+    ]
+
+
 async def analyze_job_description(
     job_description: str,
     cv_data: Dict[str, Any],
+    mode: str = "full",
 ) -> Optional[JobAnalysisResponse]:
     """
     Analiza una descripción de puesto y compara con el CV.
 
+    El score y las skills coincidentes/faltantes se calculan localmente
+    (job_matcher). En modo "full" la IA solo genera las sugerencias y el CV
+    optimizado; en modo "fast" no se llama a la IA.
+
     Args:
         job_description: Descripción del puesto
         cv_data: Datos del CV
+        mode: "full" o "fast"
 
     Returns:
         JobAnalysisResponse con análisis y sugerencias
     """
+    if mode not in JOB_ANALYSIS_MODES:
+        raise CVProcessingError(f"Modo de análisis no soportado: {mode}")
+
+    local_match = match_job_description(job_description, cv_data)
+    if mode == "fast":
+        return JobAnalysisResponse(
+            **local_match,
+            suggestions=_build_local_tailoring_suggestions(local_match),
+        )
+
     if not settings.GROQ_API_KEY or settings.GROQ_API_KEY == "placeholder_key":
         return None
 
     try:
         cv_data_json = json.dumps(cv_data, indent=2, default=str)
 
-        prompt = JOB_ANALYSIS_PROMPT.format(
+        prompt = JOB_TAILORING_PROMPT.format(
             job_description=job_description,
             cv_data=cv_data_json,
+            match_score=local_match["match_score"],
+            key_requirements=", ".join(local_match["key_requirements"]) or "Ninguno",
+            matched_skills=", ".join(local_match["matched_skills"]) or "Ninguna",
+            missing_skills=", ".join(local_match["missing_skills"]) or "Ninguna",
         )
 
         system_msg = "Eres un experto en reclutamiento y optimización de CVs."
-        response = await get_ai_completion(
-            prompt,
-            system_msg,
-        )
+        response = await get_ai_completion(prompt, system_msg, output=JOB_TAILORING_OUTPUT)
 
         if not response:
             return None
@@ -2676,52 +2659,23 @@ async def analyze_job_description(
             logger.error(f"Failed to parse job analysis response: {response}")
             return None
 
-        # Parsear sugerencias
-        suggestions_data = data.get("suggestions", [])
-        suggestions = [
-            TailoringSuggestion(
-                section=s.get("section", ""),
-                current=s.get("current", ""),
-                suggested=s.get("suggested", ""),
-                reason=s.get("reason", ""),
-                priority=s.get("priority", "medium"),
-            )
-            for s in suggestions_data
-            if isinstance(s, dict)
-        ]
-
         payload = {
-            "match_score": data.get("match_score", 50),
-            "key_requirements": data.get("key_requirements", []),
-            "matched_skills": data.get("matched_skills", []),
-            "missing_skills": data.get("missing_skills", []),
-            "suggestions": [s.model_dump() for s in suggestions],
+            **local_match,
+            "suggestions": _build_tailoring_suggestions(data),
             "optimized_cv": data.get("optimized_cv"),
         }
 
-        validated = _validate_ai_payload(JobAnalysisResponse, payload, "analyze_job_description")
+        validated = _validate_before_retry(JobAnalysisResponse, payload, "analyze_job_description")
         if not validated:
             retry_prompt = f"{prompt}\n\nIMPORTANTE: Devuelve solo JSON válido con el esquema exacto."
-            retry_response = await get_ai_completion(retry_prompt, system_msg)
+            retry_response = await get_ai_completion(
+                retry_prompt, system_msg, output=JOB_TAILORING_OUTPUT
+            )
             retry_data = _parse_ai_payload(retry_response)
             if retry_data:
-                retry_suggestions = [
-                    TailoringSuggestion(
-                        section=s.get("section", ""),
-                        current=s.get("current", ""),
-                        suggested=s.get("suggested", ""),
-                        reason=s.get("reason", ""),
-                        priority=s.get("priority", "medium"),
-                    )
-                    for s in retry_data.get("suggestions", [])
-                    if isinstance(s, dict)
-                ]
                 retry_payload = {
-                    "match_score": retry_data.get("match_score", 50),
-                    "key_requirements": retry_data.get("key_requirements", []),
-                    "matched_skills": retry_data.get("matched_skills", []),
-                    "missing_skills": retry_data.get("missing_skills", []),
-                    "suggestions": [s.model_dump() for s in retry_suggestions],
+                    **local_match,
+                    "suggestions": _build_tailoring_suggestions(retry_data),
                     "optimized_cv": retry_data.get("optimized_cv"),
                 }
                 validated = _validate_ai_payload(
@@ -2743,6 +2697,54 @@ async def analyze_job_description(
         return None
 
 
+async def rank_candidates_for_job(
+    job_description: str,
+    candidates: List[Tuple[str, Any]],
+    top_k: int = 0,
+) -> Dict[str, Any]:
+    """
+    Rankea muchos CVs contra un puesto y analiza con IA solo los mejores.
+
+    El ranking es local (job_matcher) y corre en un thread para no bloquear el
+    event loop con batches grandes. Los top-K se analizan en paralelo, limitados
+    por BATCH_ANALYSIS_CONCURRENCY.
+
+    Args:
+        job_description: Descripción del puesto
+        candidates: Pares (id, cv_data o texto plano del CV)
+        top_k: Cantidad de CVs que reciben análisis con IA
+
+    Returns:
+        Dict con key_requirements, total y ranked
+    """
+    if len(candidates) > settings.BATCH_RANKING_MAX_CANDIDATES:
+        raise CVProcessingError(
+            f"Se pueden rankear hasta {settings.BATCH_RANKING_MAX_CANDIDATES} CVs por request."
+        )
+
+    loop = asyncio.get_running_loop()
+    key_requirements, ranked = await loop.run_in_executor(
+        None, rank_candidates, job_description, candidates
+    )
+
+    if top_k > 0 and ranked:
+        cv_by_id = dict(candidates)
+        semaphore = asyncio.Semaphore(max(1, settings.BATCH_ANALYSIS_CONCURRENCY))
+
+        async def _analyze(item: Dict[str, Any]) -> None:
+            cv = cv_by_id[item["id"]]
+            cv_data = cv if isinstance(cv, dict) else {"rawText": cv}
+            async with semaphore:
+                try:
+                    item["analysis"] = await analyze_job_description(job_description, cv_data)
+                except Exception as e:
+                    logger.warning(f"Batch analysis failed for candidate {item['id']}: {e}")
+
+        await asyncio.gather(*(_analyze(item) for item in ranked[:top_k]))
+
+    return {"key_requirements": key_requirements, "total": len(ranked), "ranked": ranked}
+
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
@@ -2758,87 +2760,7 @@ def _format_chat_history(messages: List[ChatMessage]) -> str:
 
 def _format_sse_event(data: Dict[str, Any]) -> str:
     """Formatea un evento SSE."""
-    return f"data: {json.dumps(data)}\n\n"
-
-
-def _detect_language(text: str) -> str:
-    """Detecta el idioma (es/en) de un texto."""
-    if not text:
-        return "es"
-
-    spanish_indicators = [
-        "años", "experiencia", "educación", "habilidades", "proyectos",
-        "certificaciones", "realicé", "lideré", "desarrollé", "gestioné",
-        "creé", "presente", "licenciatura", "ingeniería", "en", "con",
-        "trabajo", "responsabilidades"
-    ]
-    text_lower = text.lower()
-    spanish_count = sum(1 for word in spanish_indicators if word in text_lower)
-    return "es" if spanish_count > 0 else "en"
-
-
-def _detect_language_preference(message: str, history: List[ChatMessage]) -> str:
-    """Detecta preferencia de idioma con prioridad a solicitudes explícitas."""
-    user_context = [message] + [msg.content for msg in history[-5:] if msg.role == "user"]
-    assistant_context = [msg.content for msg in history[-5:] if msg.role == "assistant"]
-    explicit_text = " ".join(user_context).lower()
-    full_context = " ".join(user_context + assistant_context).lower()
-
-    if any(phrase in explicit_text for phrase in ["español", "espanol", "spanish", "en español", "solo español", "solo espanol", "castellano"]):
-        return "es"
-    if any(phrase in explicit_text for phrase in ["english", "inglés", "ingles", "en inglés", "en ingles"]):
-        return "en"
-
-    spanish_indicators = [
-        "hola",
-        "me llamo",
-        "años",
-        "experiencia",
-        "educación",
-        "habilidades",
-        "proyectos",
-        "certificaciones",
-        "trabaj",
-        "desarroll",
-        "realic",
-        "lider",
-        "presente",
-        "mi nombre",
-        "mi name",
-        "ponelo",
-        "ponlo",
-        "hacelo",
-        "hazlo",
-        "ahora",
-        "dale",
-        "quiero",
-        "solo",
-        "sin experiencia",
-        "sin estudios",
-        "equipo",
-        "cv",
-        "curriculum",
-        "currículum",
-    ]
-    english_indicators = [
-        "hello",
-        "experience",
-        "education",
-        "skills",
-        "projects",
-        "resume",
-        "current job",
-        "teamwork",
-        "employee",
-    ]
-
-    spanish_count = sum(1 for word in spanish_indicators if word in full_context)
-    english_count = sum(1 for word in english_indicators if word in explicit_text)
-
-    if any(token in explicit_text for token in ["mi ", "hola", "che ", "buenas", "nombre"]):
-        spanish_count += 2
-
-    return "es" if spanish_count >= english_count else "en"
+    return sse_event(data)
 
 
 def _apply_language_instruction(system_instruction: str, language_code: str) -> str:
@@ -2855,69 +2777,29 @@ def _serialize_cv_for_prompt(cv_data: Dict[str, Any]) -> str:
     return json.dumps(safe_cv, indent=2, ensure_ascii=False, default=str)
 
 
-def _fingerprint_context_item(item: Any) -> str:
-    """Crea una firma estable para deduplicar elementos del CV al construir contexto."""
-    if isinstance(item, dict):
-        relevant_keys = (
-            "id",
-            "name",
-            "company",
-            "position",
-            "institution",
-            "degree",
-            "language",
-            "issuer",
-            "startDate",
-            "endDate",
-            "description",
-        )
-        compact = {key: item.get(key) for key in relevant_keys if item.get(key) not in (None, "", [], {})}
-        if compact:
-            return json.dumps(compact, sort_keys=True, ensure_ascii=False, default=str)
-    return json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
-
+def _merge_cv_data_for_context(
+    base_cv_data: Dict[str, Any],
+    extracted: Optional[Dict[str, Any]],
+    cv_index: Optional[CVMergeIndex] = None,
+) -> Dict[str, Any]:
+    """
+    Fusiona el estado actual del CV con extracción reciente para darle memoria al prompt.
 
-def _merge_cv_data_for_context(base_cv_data: Dict[str, Any], extracted: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-    """Fusiona el estado actual del CV con extracción reciente para darle memoria al prompt."""
-    merged = copy.deepcopy(base_cv_data or {})
+    El CV de la sesión no se modifica; con `cv_index` solo se calculan las
+    firmas de los ítems extraídos.
+    """
+    base = base_cv_data or {}
     if not extracted:
-        return merged
+        return base
 
+    update: Dict[str, Any] = {}
     if extracted.get("personalInfo"):
-        merged["personalInfo"] = {
-            **(merged.get("personalInfo") or {}),
-            **extracted["personalInfo"],
-        }
-
-    list_sections = (
-        "experience",
-        "education",
-        "skills",
-        "projects",
-        "languages",
-        "certifications",
-    )
-
-    for section in list_sections:
+        update["personalInfo"] = extracted["personalInfo"]
+    for section in _CV_LIST_SECTIONS:
         incoming = extracted.get(section)
-        if not incoming:
-            continue
-
-        existing_items = merged.get(section) or []
-        if not isinstance(existing_items, list):
-            existing_items = []
-
-        fingerprints = {_fingerprint_context_item(item) for item in existing_items}
-        for item in incoming:
-            fingerprint = _fingerprint_context_item(item)
-            if fingerprint in fingerprints:
-                continue
-            existing_items.append(item)
-            fingerprints.add(fingerprint)
-
-        merged[section] = existing_items
-
-    return merged
+        if incoming:
+            update[section] = incoming
+    return merge_cv_data(base, update, index=cv_index)
 
 
 def _build_conversation_prompt(
@@ -3044,13 +2926,11 @@ def _merge_descriptions(primary: Optional[str], secondary: Optional[str]) -> Opt
         return primary
 
     def split_sentences(text: str) -> List[str]:
-        parts = re.split(r"[.\n]+", text)
+        parts = _SENTENCE_SPLIT_RE.split(text)
         return [p.strip() for p in parts if p and p.strip()]
 
-    seen = []
-    for sentence in split_sentences(primary) + split_sentences(secondary):
-        if sentence not in seen:
-            seen.append(sentence)
+    # dict.fromkeys deduplica en O(n) conservando el orden de aparición.
+    seen = dict.fromkeys(split_sentences(primary) + split_sentences(secondary))
     return ". ".join(seen) if seen else None
 
 
@@ -3093,6 +2973,37 @@ def _dedupe_experience(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return deduped_list
 
 
+_DEGREE_FIELD_RE = re.compile(
+    r"^(?P<degree>.+?)\s+(?:in|en|de|of)\s+(?P<field>.+)$",
+    re.IGNORECASE,
+)
+_DEGREE_SEPARATOR_RE = re.compile(r"^(?P<degree>.+?)\s*[:\-–—]\s*(?P<field>.+)$")
+_DEGREE_ABBREVIATIONS = frozenset({
+    "mba", "msc", "m.sc", "ms", "ma",
+    "bsc", "b.sc", "bs", "ba",
+    "phd", "ph.d", "jd", "md", "dds", "dvm",
+    "ing", "lic", "tec", "tecnologo",
+})
+
+
+def _split_degree_and_field(raw_degree: Optional[str]) -> tuple[str, Optional[str]]:
+    if not raw_degree:
+        return "", None
+
+    normalized_degree = raw_degree.strip()
+
+    for pattern in (_DEGREE_FIELD_RE, _DEGREE_SEPARATOR_RE):
+        split_match = pattern.match(normalized_degree)
+        if split_match:
+            return split_match.group("degree").strip(), split_match.group("field").strip()
+
+    tokens = normalized_degree.split()
+    if len(tokens) >= 2 and tokens[0].rstrip(".").lower() in _DEGREE_ABBREVIATIONS:
+        return tokens[0], " ".join(tokens[1:]).strip() or None
+
+    return normalized_degree, None
+
+
 def _normalize_extracted_payload(extracted: Dict[str, Any]) -> Dict[str, Any]:
     """Limpia y normaliza la extracción para alinear con el schema del frontend."""
     if not isinstance(extracted, dict):
@@ -3116,41 +3027,6 @@ def _normalize_extracted_payload(extracted: Dict[str, Any]) -> Dict[str, Any]:
     if exp_clean:
         normalized["experience"] = _dedupe_experience(exp_clean)
 
-    def _split_degree_and_field(raw_degree: Optional[str]) -> tuple[str, Optional[str]]:
-        if not raw_degree:
-            return "", None
-
-        normalized_degree = raw_degree.strip()
-
-        split_match = re.match(
-            r"^(?P<degree>.+?)\s+(?:in|en|de|of)\s+(?P<field>.+)$",
-            normalized_degree,
-            flags=re.IGNORECASE,
-        )
-        if split_match:
-            return split_match.group("degree").strip(), split_match.group("field").strip()
-
-        split_match = re.match(
-            r"^(?P<degree>.+?)\s*[:\-–—]\s*(?P<field>.+)$",
-            normalized_degree,
-        )
-        if split_match:
-            return split_match.group("degree").strip(), split_match.group("field").strip()
-
-        tokens = normalized_degree.split()
-        if len(tokens) >= 2:
-            head = tokens[0].rstrip(".").lower()
-            known_abbrev = {
-                "mba", "msc", "m.sc", "ms", "ma",
-                "bsc", "b.sc", "bs", "ba",
-                "phd", "ph.d", "jd", "md", "dds", "dvm",
-                "ing", "lic", "tec", "tecnologo",
-            }
-            if head in known_abbrev:
-                return tokens[0], " ".join(tokens[1:]).strip() or None
-
-        return normalized_degree, None
-
     education = _normalize_list(extracted.get("education"))
     edu_clean: List[Dict[str, Any]] = []
     for item in education:
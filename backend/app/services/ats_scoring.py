@@ -0,0 +1,1003 @@
+"""
+ATS Scoring Engine.
+
+Scoring local y determinístico para el ATS checker: keywords por industria,
+detección de secciones, reglas de formato y puntajes numéricos. La IA solo
+se usa para los campos narrativos (ver `analyze_ats` en ai_service).
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+_EMAIL_RE = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}")
+_WORD_RE = re.compile(r"\b\w+\b")
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_LINK_RE = re.compile(r"linkedin\.com|github\.com|behance\.net|https?://|www\.", re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+# Glifos que suelen aparecer cuando el PDF usa fuentes de símbolos o íconos.
+_BROKEN_GLYPH_RE = re.compile("[\ufffd\uf0b7\uf0a7\uf076\u25a1]")
+_TABLE_ROW_RE = re.compile(r"^.*(?:\t.*\t|\|.*\|).*$", re.MULTILINE)
+
+# =============================================================================
+# FIELD-CONTEXTUAL VALIDATION SYSTEM
+# =============================================================================
+# This module implements strict industry-specific validation for ATS checking.
+# Key principles:
+# 1. Every recommendation must be relevant to the selected industry
+# 2. Irrelevant technical suggestions are suppressed for non-technical roles
+# 3. Resume content is verified against selected industry indicators
+# 4. Mismatches between resume content and selected industry are flagged
+# =============================================================================
+
+INDUSTRY_KEYWORDS = {
+    "tech": {
+        "name": "Tecnología / IT / Desarrollo de Software",
+        "keywords": [
+            "Python",
+            "JavaScript",
+            "TypeScript",
+            "React",
+            "Angular",
+            "Vue.js",
+            "Node.js",
+            "Django",
+            "Flask",
+            "FastAPI",
+            "Spring Boot",
+            "SQL",
+            "NoSQL",
+            "MongoDB",
+            "PostgreSQL",
+            "MySQL",
+            "Redis",
+            "Git",
+            "GitHub",
+            "GitLab",
+            "AWS",
+            "Azure",
+            "GCP",
+            "Docker",
+            "Kubernetes",
+            "Terraform",
+            "CI/CD",
+            "Jenkins",
+            "GitHub Actions",
+            "API",
+            "REST",
+            "GraphQL",
+            "gRPC",
+            "Agile",
+            "Scrum",
+            "Kanban",
+            "Machine Learning",
+            "TensorFlow",
+            "PyTorch",
+            "NLP",
+            "Full Stack",
+            "Backend",
+            "Frontend",
+            "DevOps",
+            "Cloud",
+            "Microservices",
+            "Architecture",
+            "Testing",
+            "Unit Testing",
+            "TDD",
+            "Security",
+            "OAuth",
+            "JWT",
+        ],
+        "focus": "habilidades técnicas, tecnologías específicas, proyectos de código, metodologías ágiles, arquitectura de sistemas",
+        # Terms that SHOULD NOT be suggested for tech industry
+        "anti_keywords": [
+            "Photoshop",
+            "Illustrator",
+            "Figma",
+            "Branding",
+            "Copywriting",
+            "Paciente",
+            "Clínica",
+            "Auditoría",
+            "Contabilidad",
+            "Docencia",
+            "Curriculum",
+            "Pedagogía",
+        ],
+        # Words that indicate genuine tech experience
+        "content_indicators": [
+            "desarroll",
+            "program",
+            "code",
+            "coding",
+            "software",
+            "engineer",
+            "developer",
+            "frontend",
+            "backend",
+            "fullstack",
+            "api",
+            "database",
+            "server",
+            "deploy",
+            "cloud",
+            "aws",
+            "azure",
+            "docker",
+            "kubernetes",
+            "git",
+            "framework",
+            "javascript",
+            "python",
+            "java",
+            "react",
+            "node",
+            "sql",
+            "nosql",
+        ],
+    },
+    "finance": {
+        "name": "Finanzas / Banca / Contabilidad",
+        "keywords": [
+            "Excel",
+            "Análisis financiero",
+            "Contabilidad",
+            "Presupuestos",
+            "Auditoría",
+            "Reporting",
+            "SAP",
+            "ERP",
+            "Compliance",
+            "Riesgo",
+            "Inversiones",
+            "Balance",
+            "P&L",
+            "Forecasting",
+            "Power BI",
+            "Tableau",
+            "KPIs",
+            "Due Diligence",
+            "Regulación",
+            "IFRS",
+            "GAAP",
+            "Tesorería",
+            "Cash Flow",
+            "Modelado financiero",
+            "Valoración",
+            "M&A",
+            "Fusiones",
+            "Adquisiciones",
+            "Crédito",
+            "Financiamiento",
+            "Capital",
+            "Rentabilidad",
+            "Margen",
+            "ROI",
+        ],
+        "focus": "análisis numérico, herramientas de reporting, regulaciones financieras, experiencia en auditoría y compliance, modelado financiero",
+        # Terms that SHOULD NOT be suggested for finance industry
+        "anti_keywords": [
+            "Photoshop",
+            "Illustrator",
+            "Figma",
+            "React",
+            "Node.js",
+            "JavaScript",
+            "Python",
+            "Docker",
+            "Kubernetes",
+            "Paciente",
+            "Clínica",
+            "Docencia",
+            "Curriculum",
+            "Pedagogía",
+            "Portfolio",
+            "Branding",
+        ],
+        # Words that indicate genuine finance experience
+        "content_indicators": [
+            "financiero",
+            "contabil",
+            "auditor",
+            "presupuesto",
+            "balance",
+            "p&l",
+            "forecast",
+            "reporting",
+            "excel",
+            "sap",
+            "erp",
+            "compliance",
+            "riesgo",
+            "inversion",
+            "valoracion",
+            "tesoreria",
+            "cash flow",
+            "credito",
+            "banca",
+            "acciones",
+            "bolsa",
+        ],
+    },
+    "healthcare": {
+        "name": "Salud / Medicina / Enfermería",
+        "keywords": [
+            "Paciente",
+            "Clínica",
+            "Hospital",
+            "Diagnóstico",
+            "Tratamiento",
+            "Historial clínico",
+            "HIPAA",
+            "Emergencias",
+            "Farmacología",
+            "Enfermería",
+            "Cirugía",
+            "Laboratorio",
+            "Radiología",
+            "Atención primaria",
+            "Cuidados intensivos",
+            "Protocolos",
+            "Esterilización",
+            "Signos vitales",
+            "Triage",
+            "Medicina",
+            "Farmacia",
+            "Terapia",
+            "Rehabilitación",
+            "Epic",
+            "Cerner",
+            "Medication",
+            "Patient care",
+            "Clinical",
+            "Healthcare",
+        ],
+        "focus": "certificaciones médicas, experiencia clínica, atención al paciente, protocolos de seguridad, cumplimiento regulatorio",
+        # Terms that SHOULD NOT be suggested for healthcare industry
+        "anti_keywords": [
+            "Photoshop",
+            "Illustrator",
+            "Figma",
+            "React",
+            "Node.js",
+            "JavaScript",
+            "Python",
+            "Docker",
+            "Kubernetes",
+            "API",
+            "DevOps",
+            "AWS",
+            "Auditoría",
+            "Contabilidad",
+            "Docencia",
+            "Curriculum",
+        ],
+        # Words that indicate genuine healthcare experience
+        "content_indicators": [
+            "paciente",
+            "clinica",
+            "hospital",
+            "medico",
+            "enfermer",
+            "diagnostic",
+            "tratamiento",
+            "terapia",
+            "farmaco",
+            "cirugia",
+            "laboratorio",
+            "radiologia",
+            "cuidado",
+            "hipaa",
+            "epic",
+            "cerner",
+            "historial",
+            "signos vitales",
+            "triage",
+        ],
+    },
+    "creative": {
+        "name": "Diseño / Marketing / Comunicación",
+        "keywords": [
+            "Photoshop",
+            "Illustrator",
+            "InDesign",
+            "Figma",
+            "Sketch",
+            "UI/UX",
+            "Branding",
+            "Identidad visual",
+            "Copywriting",
+            "SEO",
+            "SEM",
+            "Social Media",
+            "Campañas",
+            "Estrategia digital",
+            "Google Ads",
+            "Facebook Ads",
+            "Content Marketing",
+            "Email Marketing",
+            "Creatividad",
+            "Portfolio",
+            "Adobe Creative Suite",
+            "Canva",
+            "Motion Graphics",
+            "Video",
+            "Fotografía",
+            "Dirección de arte",
+            "Packaging",
+            "Tipografía",
+            "Colorimetría",
+            "Storytelling",
+            "Engagement",
+            "Conversion",
+        ],
+        "focus": "portfolio de trabajos, herramientas de diseño, métricas de campañas, creatividad y storytelling visual, identidad de marca",
+        # Terms that SHOULD NOT be suggested for creative industry
+        "anti_keywords": [
+            "React",
+            "Node.js",
+            "JavaScript",
+            "Python",
+            "Docker",
+            "Kubernetes",
+            "AWS",
+            "API",
+            "DevOps",
+            "CI/CD",
+            "Auditoría",
+            "Contabilidad",
+            "Paciente",
+            "Clínica",
+            "Docencia",
+        ],
+        # Words that indicate genuine creative experience
+        "content_indicators": [
+            "diseño",
+            "diseno",
+            "grafico",
+            "visual",
+            "brand",
+            "identidad",
+            "ux",
+            "ui",
+            "fotografia",
+            "video",
+            "motion",
+            "animacion",
+            "ilustracion",
+            "arte",
+            "tipografia",
+            "marketing",
+            "campana",
+            "seo",
+            "copywriting",
+            "contenido",
+            "social media",
+        ],
+    },
+    "education": {
+        "name": "Educación / Docencia / Capacitación",
+        "keywords": [
+            "Docencia",
+            "Curriculum",
+            "Planificación",
+            "Evaluación",
+            "Pedagogía",
+            "E-learning",
+            "Moodle",
+            "Canvas",
+            "Blackboard",
+            "Estudiantes",
+            "Aula",
+            "Didáctica",
+            "Capacitación",
+            "Tutoría",
+            "Metodología",
+            "Inclusión",
+            "NEE",
+            "Desarrollo curricular",
+            "Materiales didácticos",
+            "Formación profesional",
+            "Certificaciones",
+            "SQA",
+            "Competencias",
+            "Aprendizaje",
+            "Enseñanza",
+            "Evaluación",
+            "Calificaciones",
+            "Tesis",
+            "Investigación educativa",
+        ],
+        "focus": "experiencia docente, metodologías educativas, gestión de aula, desarrollo de programas, formación de competencias",
+        # Terms that SHOULD NOT be suggested for education industry
+        "anti_keywords": [
+            "React",
+            "Node.js",
+            "JavaScript",
+            "Python",
+            "Docker",
+            "Kubernetes",
+            "AWS",
+            "API",
+            "DevOps",
+            "Photoshop",
+            "Illustrator",
+            "Branding",
+            "Paciente",
+            "Clínica",
+            "Auditoría",
+        ],
+        # Words that indicate genuine education experience
+        "content_indicators": [
+            "docencia",
+            "docente",
+            "enseñanza",
+            "educacion",
+            "curriculum",
+            "pedagog",
+            "aula",
+            "estudiante",
+            "alumno",
+            "evaluacion",
+            "didactica",
+            "tutoria",
+            "capacitacion",
+            "formacion",
+            "moodle",
+            "e-learning",
+            "curso",
+        ],
+    },
+    "general": {
+        "name": "General / Multiindustria",
+        "keywords": [
+            "Liderazgo",
+            "Gestión",
+            "Comunicación",
+            "Trabajo en equipo",
+            "Organización",
+            "Resolución de problemas",
+            "Excel",
+            "Inglés",
+            "Atención al cliente",
+            "Ventas",
+            "Negociación",
+            "Planificación",
+            "Adaptabilidad",
+            "Proactividad",
+            "Gestión de proyectos",
+            "Análisis",
+            "Microsoft Office",
+            "PowerPoint",
+            "Word",
+            "Outlook",
+            "CRM",
+            "ERP",
+            "Reporting",
+            "KPIs",
+            "Metas",
+            "Objetivos",
+            "Resultados",
+        ],
+        "focus": "habilidades transferibles, logros cuantificables, experiencia general relevante, competencias blandas",
+        # No specific anti-keywords for general - it's flexible
+        "anti_keywords": [],
+        # Generic indicators for any professional experience
+        "content_indicators": [
+            "gestion",
+            "liderazgo",
+            "proyecto",
+            "equipo",
+            "cliente",
+            "ventas",
+            "atencion",
+            "comunicacion",
+            "organizacion",
+            "analisis",
+            "planificacion",
+        ],
+    },
+}
+
+
+# =============================================================================
+# CONTENT VERIFICATION HELPER FUNCTIONS
+# =============================================================================
+
+def check_resume_content_indicators(
+    cv_text: str,
+    industry: str,
+    threshold: float = 0.2
+) -> Dict[str, Any]:
+    """
+    Verifies if resume content contains indicators for the selected industry.
+
+    Args:
+        cv_text: Lowercase text of the resume
+        industry: Selected industry key (e.g., 'tech', 'creative')
+        threshold: Minimum ratio of indicators to keywords (default 20%)
+
+    Returns:
+        Dict with mismatch_detected, match_ratio, found_indicators, and recommendations
+    """
+    industry_data = INDUSTRY_KEYWORDS.get(industry, INDUSTRY_KEYWORDS["general"])
+    indicators = industry_data.get("content_indicators", [])
+    anti_keywords = industry_data.get("anti_keywords", [])
+
+    # Count how many content indicators are present
+    found_indicators = []
+    for indicator in indicators:
+        if indicator.lower() in cv_text:
+            found_indicators.append(indicator)
+
+    # Count anti-keywords that ARE present (these indicate OTHER industries)
+    found_anti_keywords = []
+    for anti_kw in anti_keywords:
+        if anti_kw.lower() in cv_text:
+            found_anti_keywords.append(anti_kw)
+
+    # Calculate match ratio
+    match_ratio = len(found_indicators) / max(len(indicators), 1)
+
+    # Detect mismatch: few indicators but many anti-keywords
+    mismatch_detected = (
+        match_ratio < threshold and len(found_anti_keywords) > 0
+    ) or (match_ratio < threshold and industry != "general")
+
+    return {
+        "mismatch_detected": mismatch_detected,
+        "match_ratio": round(match_ratio, 3),
+        "found_indicators": found_indicators,
+        "found_anti_keywords": found_anti_keywords,
+        "indicator_count": len(found_indicators),
+        "anti_keyword_count": len(found_anti_keywords),
+    }
+
+
+def filter_anti_keywords_for_industry(
+    keywords: List[str],
+    industry: str,
+) -> List[str]:
+    """
+    Filters out keywords that are anti-keywords for the selected industry.
+
+    Args:
+        keywords: List of suggested keywords
+        industry: Selected industry key
+
+    Returns:
+        Filtered list without anti-keywords
+    """
+    industry_data = INDUSTRY_KEYWORDS.get(industry, INDUSTRY_KEYWORDS["general"])
+    anti_keywords = industry_data.get("anti_keywords", [])
+
+    # Create lowercase sets for case-insensitive matching
+    anti_keywords_lower = {kw.lower() for kw in anti_keywords}
+
+    filtered = [
+        kw for kw in keywords if kw.lower() not in anti_keywords_lower
+    ]
+
+    return filtered
+
+
+def build_ats_rule_issues(cv_text: str, language_code: str) -> List[dict]:
+    labels = {
+        "es": {
+            "missing_email": ("Falta email visible", "Agregá un email profesional en el encabezado."),
+            "missing_phone": ("Falta teléfono visible", "Incluí un número de contacto claro en el encabezado."),
+            "too_long": ("CV demasiado extenso", "Reducí contenido para mantener 1-2 páginas."),
+        },
+        "en": {
+            "missing_email": ("Missing visible email", "Add a professional email in the header."),
+            "missing_phone": ("Missing visible phone", "Include a clear contact number in the header."),
+            "too_long": ("CV too long", "Reduce content to keep it within 1-2 pages."),
+        },
+    }
+    lang_labels = labels["es"] if language_code == "es" else labels["en"]
+    issues: List[dict] = []
+
+    if not _EMAIL_RE.search(cv_text):
+        title, fix = lang_labels["missing_email"]
+        issues.append({"severity": "high", "message": title, "fix": fix})
+
+    if not _PHONE_RE.search(cv_text):
+        title, fix = lang_labels["missing_phone"]
+        issues.append({"severity": "high", "message": title, "fix": fix})
+
+    word_count = len(_WORD_RE.findall(cv_text))
+    if word_count > MAX_WORD_COUNT:
+        title, fix = lang_labels["too_long"]
+        issues.append({"severity": "medium", "message": title, "fix": fix})
+
+    return issues
+
+
+# =============================================================================
+# LOCAL SCORING ENGINE
+# =============================================================================
+
+ATS_SCORE_WEIGHTS = {"format": 0.35, "keyword": 0.40, "completeness": 0.25}
+ATS_GRADE_THRESHOLDS: Tuple[Tuple[int, str], ...] = ((90, "A"), (80, "B"), (70, "C"), (60, "D"))
+
+# Cantidad de keywords relevantes a partir de la cual el score de keywords es 100.
+KEYWORD_TARGET = 12
+MAX_MISSING_KEYWORDS = 10
+MIN_WORD_COUNT = 150
+MAX_WORD_COUNT = 900
+
+ATS_SECTION_PATTERNS: Dict[str, "re.Pattern[str]"] = {
+    "summary": re.compile(
+        r"^\W*(?:perfil|resumen|sobre m[ií]|acerca de m[ií]|objetivo|summary|profile|about me|objective)\b",
+        re.IGNORECASE | re.MULTILINE,
+    ),
+    "experience": re.compile(
+        r"^\W*(?:experiencia|historial laboral|trayectoria|experience|work history|employment)\b",
+        re.IGNORECASE | re.MULTILINE,
+    ),
+    "education": re.compile(
+        r"^\W*(?:educaci[oó]n|formaci[oó]n|estudios|education|academic)\b",
+        re.IGNORECASE | re.MULTILINE,
+    ),
+    "skills": re.compile(
+        r"^\W*(?:habilidades|competencias|aptitudes|conocimientos|skills|technical skills|competencies)\b",
+        re.IGNORECASE | re.MULTILINE,
+    ),
+    "languages": re.compile(r"^\W*(?:idiomas|languages)\b", re.IGNORECASE | re.MULTILINE),
+    "certifications": re.compile(
+        r"^\W*(?:certificaciones|certificados|cursos|certifications|licenses|courses)\b",
+        re.IGNORECASE | re.MULTILINE,
+    ),
+}
+
+# Peso de cada señal de completitud (suma 100).
+COMPLETENESS_WEIGHTS = {
+    "email": 15,
+    "phone": 10,
+    "links": 5,
+    "dates": 5,
+    "summary": 10,
+    "experience": 25,
+    "education": 15,
+    "skills": 15,
+}
+
+_REQUIRED_SECTIONS = ("summary", "experience", "education", "skills")
+
+_ATS_LABELS = {
+    "es": {
+        "missing_section": "Falta la sección de {section}",
+        "missing_section_fix": "Agregá un encabezado claro de {section} para que el ATS la detecte.",
+        "mismatch": "El contenido no coincide con {industry}",
+        "mismatch_fix": "Revisá la industria seleccionada o agregá experiencia relevante para {industry}.",
+        "add_keywords": "Incorporá keywords relevantes: {keywords}",
+        "add_section": "Sumá una sección de {section}",
+        "summary": (
+            "Score ATS de {ats_score}/100 para {industry}: {found} keywords relevantes "
+            "detectadas y {missing} por incorporar."
+        ),
+        "tips_fallback": "Mantené un formato simple, con encabezados estándar y keywords de la industria.",
+        "sections": {
+            "summary": "perfil profesional",
+            "experience": "experiencia",
+            "education": "educación",
+            "skills": "habilidades",
+        },
+    },
+    "en": {
+        "missing_section": "Missing {section} section",
+        "missing_section_fix": "Add a clear {section} heading so the ATS can detect it.",
+        "mismatch": "Content does not match {industry}",
+        "mismatch_fix": "Review the selected industry or add experience relevant to {industry}.",
+        "add_keywords": "Add relevant keywords: {keywords}",
+        "add_section": "Add a {section} section",
+        "summary": (
+            "ATS score of {ats_score}/100 for {industry}: {found} relevant keywords "
+            "found and {missing} still missing."
+        ),
+        "tips_fallback": "Keep a simple layout with standard headings and industry keywords.",
+        "sections": {
+            "summary": "professional summary",
+            "experience": "experience",
+            "education": "education",
+            "skills": "skills",
+        },
+    },
+}
+
+
+def normalize_for_matching(text: str) -> str:
+    """Pasa a minúsculas y elimina tildes para comparar 'Análisis' con 'analisis'."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(normalize_for_matching(text))
+
+
+def _keyword_key(keyword: str) -> str:
+    return " ".join(tokenize(keyword))
+
+
+def _compile_industry_keywords() -> Dict[str, Tuple[Tuple[str, str], ...]]:
+    compiled: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+    for industry, data in INDUSTRY_KEYWORDS.items():
+        seen = set()
+        pairs = []
+        for keyword in data.get("keywords", []):
+            key = _keyword_key(keyword)
+            if key and key not in seen:
+                seen.add(key)
+                pairs.append((keyword, key))
+        compiled[industry] = tuple(pairs)
+    return compiled
+
+
+_INDUSTRY_KEYWORD_KEYS = _compile_industry_keywords()
+_MAX_KEYWORD_NGRAM = max(
+    len(key.split()) for pairs in _INDUSTRY_KEYWORD_KEYS.values() for _, key in pairs
+)
+
+
+def build_term_index(text: str, max_ngram: int = _MAX_KEYWORD_NGRAM) -> FrozenSet[str]:
+    """
+    Indexa el texto una sola vez como n-gramas normalizados.
+
+    Cada keyword se resuelve luego con un lookup O(1), sin volver a escanear
+    el texto por cada término.
+    """
+    tokens = tokenize(text)
+    terms = set(tokens)
+    for size in range(2, max_ngram + 1):
+        for start in range(len(tokens) - size + 1):
+            terms.add(" ".join(tokens[start:start + size]))
+    return frozenset(terms)
+
+
+def match_industry_keywords(
+    term_index: FrozenSet[str],
+    industry: str,
+) -> Tuple[List[str], List[str]]:
+    """Devuelve (encontradas, faltantes) para las keywords de la industria."""
+    pairs = _INDUSTRY_KEYWORD_KEYS.get(industry, _INDUSTRY_KEYWORD_KEYS["general"])
+    found = [keyword for keyword, key in pairs if key in term_index]
+    missing = [keyword for keyword, key in pairs if key not in term_index]
+    return found, missing
+
+
+def detect_cv_sections(cv_text: str) -> Dict[str, bool]:
+    """Detecta los encabezados de sección estándar presentes en el CV."""
+    return {
+        section: bool(pattern.search(cv_text))
+        for section, pattern in ATS_SECTION_PATTERNS.items()
+    }
+
+
+def _clamp_score(value: float) -> int:
+    return max(0, min(100, int(round(value))))
+
+
+def _grade_for_score(score: int) -> str:
+    for threshold, grade in ATS_GRADE_THRESHOLDS:
+        if score >= threshold:
+            return grade
+    return "F"
+
+
+def _compute_format_score(cv_text: str, word_count: int) -> int:
+    score = 100
+    if word_count > MAX_WORD_COUNT:
+        score -= 15
+    if word_count < MIN_WORD_COUNT:
+        score -= 15
+    if _BROKEN_GLYPH_RE.search(cv_text):
+        score -= 15
+    if len(_TABLE_ROW_RE.findall(cv_text)) >= 3:
+        score -= 15
+    return _clamp_score(score)
+
+
+def _compute_completeness_score(cv_text: str, sections: Dict[str, bool]) -> int:
+    signals = {
+        "email": bool(_EMAIL_RE.search(cv_text)),
+        "phone": bool(_PHONE_RE.search(cv_text)),
+        "links": bool(_LINK_RE.search(cv_text)),
+        "dates": bool(_YEAR_RE.search(cv_text)),
+    }
+    signals.update({section: sections.get(section, False) for section in _REQUIRED_SECTIONS})
+    return _clamp_score(
+        sum(weight for signal, weight in COMPLETENESS_WEIGHTS.items() if signals.get(signal))
+    )
+
+
+def _compute_keyword_score(found: List[str], industry: str) -> int:
+    total = len(_INDUSTRY_KEYWORD_KEYS.get(industry, ()))
+    target = min(KEYWORD_TARGET, total) or 1
+    return _clamp_score(100 * len(found) / target)
+
+
+def build_cv_profile(cv_text: str) -> Dict[str, Any]:
+    """Señales del CV que no dependen de la industria (se calculan una sola vez)."""
+    word_count = len(_WORD_RE.findall(cv_text))
+    sections = detect_cv_sections(cv_text)
+    return {
+        "word_count": word_count,
+        "sections": sections,
+        "format_score": _compute_format_score(cv_text, word_count),
+        "completeness_score": _compute_completeness_score(cv_text, sections),
+    }
+
+
+def _weighted_ats_score(format_score: int, keyword_score: int, completeness_score: int) -> int:
+    return _clamp_score(
+        format_score * ATS_SCORE_WEIGHTS["format"]
+        + keyword_score * ATS_SCORE_WEIGHTS["keyword"]
+        + completeness_score * ATS_SCORE_WEIGHTS["completeness"]
+    )
+
+
+def score_ats_locally(
+    cv_text: str,
+    target_industry: str = "general",
+    language_code: str = "es",
+    term_index: Optional[FrozenSet[str]] = None,
+    profile: Optional[Dict[str, Any]] = None,
+    industry_recommendation: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Calcula el análisis ATS completo sin IA.
+
+    Args:
+        cv_text: Texto plano del CV.
+        target_industry: Industria seleccionada (tech, finance, etc.).
+        language_code: Idioma de los textos generados ("es" o "en").
+        term_index: Índice de términos ya construido con `build_term_index`,
+            para reutilizarlo entre varias industrias.
+        profile: Señales independientes de la industria ya calculadas.
+        industry_recommendation: Industria con mejor fit si ya se corrió
+            `sweep_industries`; si no, se calcula acá.
+
+    Returns:
+        Dict con el mismo shape que la respuesta de `/api/ats-check`, más
+        `mismatch_detected` y `content_verification`.
+    """
+    industry_key = target_industry if target_industry in INDUSTRY_KEYWORDS else "general"
+    industry_name = INDUSTRY_KEYWORDS[industry_key]["name"]
+    labels = _ATS_LABELS["es"] if language_code == "es" else _ATS_LABELS["en"]
+
+    terms = term_index if term_index is not None else build_term_index(cv_text)
+    cv_profile = profile if profile is not None else build_cv_profile(cv_text)
+    found, missing = match_industry_keywords(terms, industry_key)
+    missing = filter_anti_keywords_for_industry(missing, industry_key)[:MAX_MISSING_KEYWORDS]
+
+    sections = cv_profile["sections"]
+    verification = check_resume_content_indicators(cv_text.lower(), target_industry)
+
+    format_score = cv_profile["format_score"]
+    keyword_score = _compute_keyword_score(found, industry_key)
+    completeness_score = cv_profile["completeness_score"]
+    ats_score = _weighted_ats_score(format_score, keyword_score, completeness_score)
+    if industry_recommendation is None:
+        ranking = sweep_industries(cv_text, term_index=terms, profile=cv_profile)
+        industry_recommendation = ranking[0]["industry"] if ranking else industry_key
+    issues = build_ats_rule_issues(cv_text, language_code)
+    quick_wins: List[str] = []
+    for section in _REQUIRED_SECTIONS:
+        if sections.get(section):
+            continue
+        section_label = labels["sections"][section]
+        issues.append({
+            "severity": "medium",
+            "message": labels["missing_section"].format(section=section_label),
+            "fix": labels["missing_section_fix"].format(section=section_label),
+        })
+        quick_wins.append(labels["add_section"].format(section=section_label))
+
+    if verification["mismatch_detected"]:
+        issues.append({
+            "severity": "high",
+            "message": labels["mismatch"].format(industry=industry_name),
+            "fix": labels["mismatch_fix"].format(industry=industry_name),
+        })
+
+    if missing:
+        quick_wins.insert(0, labels["add_keywords"].format(keywords=", ".join(missing[:3])))
+
+    detailed_tips = " ".join(issue["fix"] for issue in issues) or labels["tips_fallback"]
+
+    return {
+        "ats_score": ats_score,
+        "grade": _grade_for_score(ats_score),
+        "summary": labels["summary"].format(
+            ats_score=ats_score,
+            industry=industry_name,
+            found=len(found),
+            missing=len(missing),
+        ),
+        "format_score": format_score,
+        "keyword_score": keyword_score,
+        "completeness_score": completeness_score,
+        "found_keywords": found,
+        "missing_keywords": missing,
+        "industry_recommendation": industry_recommendation,
+        "mismatch_detected": verification["mismatch_detected"],
+        "issues": issues,
+        "quick_wins": quick_wins,
+        "detailed_tips": detailed_tips,
+        "quality_debrief": "",
+        "content_verification": {
+            "mismatch_detected": verification["mismatch_detected"],
+            "match_ratio": verification["match_ratio"],
+            "found_indicators": verification["found_indicators"],
+            "found_anti_keywords": verification["found_anti_keywords"],
+        },
+    }
+
+
+# =============================================================================
+# MULTI-INDUSTRY SWEEP
+# =============================================================================
+
+# Peso del match de keywords vs. indicadores de contenido en el fit por industria.
+SWEEP_FIT_WEIGHTS = {"keyword": 0.6, "indicators": 0.4}
+
+
+def _compile_term_industries() -> Dict[str, Tuple[str, ...]]:
+    """Índice invertido keyword normalizada -> industrias que la usan."""
+    inverted: Dict[str, List[str]] = {}
+    for industry, pairs in _INDUSTRY_KEYWORD_KEYS.items():
+        for _, key in pairs:
+            inverted.setdefault(key, []).append(industry)
+    return {key: tuple(industries) for key, industries in inverted.items()}
+
+
+_TERM_INDUSTRIES = _compile_term_industries()
+
+
+def sweep_industries(
+    cv_text: str,
+    term_index: Optional[FrozenSet[str]] = None,
+    profile: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Evalúa el CV contra todas las industrias de INDUSTRY_KEYWORDS en una pasada.
+
+    El texto se indexa una vez y cada keyword conocida se resuelve una sola vez
+    contra el índice, aunque aparezca en varias industrias.
+
+    Returns:
+        Lista ordenada por `fit_score` (mayor primero) con el resumen por industria.
+    """
+    terms = term_index if term_index is not None else build_term_index(cv_text)
+    cv_profile = profile if profile is not None else build_cv_profile(cv_text)
+    matched_keys = {key for key in _TERM_INDUSTRIES if key in terms}
+    cv_text_lower = cv_text.lower()
+
+    ranking: List[Dict[str, Any]] = []
+    for industry, pairs in _INDUSTRY_KEYWORD_KEYS.items():
+        found = [keyword for keyword, key in pairs if key in matched_keys]
+        keyword_score = _compute_keyword_score(found, industry)
+        verification = check_resume_content_indicators(cv_text_lower, industry)
+        ats_score = _weighted_ats_score(
+            cv_profile["format_score"], keyword_score, cv_profile["completeness_score"]
+        )
+        fit_score = _clamp_score(
+            keyword_score * SWEEP_FIT_WEIGHTS["keyword"]
+            + min(1.0, verification["match_ratio"]) * 100 * SWEEP_FIT_WEIGHTS["indicators"]
+        )
+        ranking.append({
+            "industry": industry,
+            "name": INDUSTRY_KEYWORDS[industry]["name"],
+            "fit_score": fit_score,
+            "ats_score": ats_score,
+            "grade": _grade_for_score(ats_score),
+            "keyword_score": keyword_score,
+            "found_keywords": found,
+            "match_ratio": verification["match_ratio"],
+            "mismatch_detected": verification["mismatch_detected"],
+        })
+
+    ranking.sort(key=lambda item: (item["fit_score"], item["ats_score"]), reverse=True)
+    return ranking
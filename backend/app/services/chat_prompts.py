@@ -71,17 +71,21 @@ USER MESSAGE: {user_message}
 CURRENT PHASE: {current_phase}
 CURRENT CV DATA: {current_cv_data}
 CONVERSATION CONTEXT: {chat_history}
+"""
 
+# Schema en prosa: solo se agrega al prompt si el proveedor no acepta JSON Schema.
+DATA_EXTRACTION_SCHEMA_HINT = """
 RESPONSE FORMAT:
-{{
-  "extracted": {{
-    "personalInfo": {{ "fullName": "...", "email": "...", ... }},
-    "experience": [ {{ ... }} ],
+{
+  "extracted": {
+    "personalInfo": { "fullName": "...", "email": "...", ... },
+    "experience": [ { ... } ],
     ...
-  }},
-  "confidence": {{ "personalInfo.fullName": 0.95, ... }},
-  "detected_phase": "..."
-}}
+  },
+  "confidence": { "personalInfo.fullName": 0.95, ... },
+  "needs_clarification": [],
+  "follow_up_questions": []
+}
 """
 
 # =============================================================================
@@ -180,6 +184,43 @@ Responde con el siguiente JSON:
 }}
 """
 
+JOB_TAILORING_PROMPT = """
+Eres un experto en reclutamiento y optimización de CVs. El match entre el puesto y el CV
+ya fue calculado localmente; NO lo recalcules ni devuelvas scores.
+
+MATCH PRECALCULADO:
+- Score de coincidencia: {match_score}/100
+- Requisitos clave: {key_requirements}
+- Habilidades que coinciden: {matched_skills}
+- Habilidades faltantes: {missing_skills}
+
+TU TAREA:
+1. Generar sugerencias específicas para cerrar las brechas (priorizá las habilidades faltantes)
+2. Indicar exactamente qué cambiar y por qué, sin inventar experiencia que el candidato no tiene
+
+DESCRIPCIÓN DEL PUESTO:
+{job_description}
+
+CV DEL CANDIDATO:
+{cv_data}
+"""
+
+JOB_TAILORING_SCHEMA_HINT = """
+Responde con el siguiente JSON:
+{
+  "suggestions": [
+    {
+      "section": "experience|skills|summary|education",
+      "current": "Texto actual",
+      "suggested": "Texto sugerido",
+      "reason": "Por qué este cambio mejora el match",
+      "priority": "high|medium|low"
+    }
+  ],
+  "optimized_cv": { /* CV completo optimizado */ }
+}
+"""
+
 # =============================================================================
 # PHASE-SPECIFIC PROMPTS
 # =============================================================================
@@ -0,0 +1,85 @@
+"""
+CV Chunking.
+
+Corte de CVs largos en chunks alineados a secciones para la extracción
+map-reduce. Los encabezados se detectan con los mismos patrones que usa el
+ATS (`ATS_SECTION_PATTERNS`); una sección que no entra en un chunk se corta
+por párrafos y, en último caso, por líneas. Nunca se descarta texto.
+"""
+
+import re
+from typing import List, Sequence, Tuple
+
+from app.services.ats_scoring import ATS_SECTION_PATTERNS
+
+_HEADING_RE = re.compile(
+    "|".join(f"(?:{pattern.pattern})" for pattern in ATS_SECTION_PATTERNS.values()),
+    re.IGNORECASE | re.MULTILINE,
+)
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_LINE_RE = re.compile(r"\n")
+
+
+def split_sections(text: str) -> List[str]:
+    """Separa el texto en bloques que empiezan en cada encabezado de sección."""
+    # `^\W*` puede arrancar en líneas vacías previas: se corta al inicio de la línea del título.
+    starts = sorted({text.rfind("\n", 0, match.end()) + 1 for match in _HEADING_RE.finditer(text)} | {0})
+    bounds = starts[1:] + [len(text)]
+    return [text[start:end] for start, end in zip(starts, bounds) if text[start:end].strip()]
+
+
+def _split_oversized(block: str, max_chars: int) -> List[str]:
+    """Corta un bloque demasiado largo por párrafos, luego por líneas y luego duro."""
+    for separator_re, joiner in ((_PARAGRAPH_RE, "\n\n"), (_LINE_RE, "\n")):
+        parts = [part for part in separator_re.split(block) if part.strip()]
+        if len(parts) > 1:
+            return _pack(parts, max_chars, joiner)
+    return [block[start:start + max_chars] for start in range(0, len(block), max_chars)]
+
+
+def _pack(parts: Sequence[str], max_chars: int, joiner: str) -> List[str]:
+    """Agrupa partes consecutivas sin pasarse de `max_chars` por chunk."""
+    chunks: List[str] = []
+    current = ""
+    for part in parts:
+        if len(part) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_oversized(part, max_chars))
+            continue
+        candidate = f"{current}{joiner}{part}" if current else part
+        if len(candidate) > max_chars:
+            chunks.append(current)
+            current = part
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_cv_text(text: str, max_chars: int) -> List[str]:
+    """Divide un CV en chunks de hasta `max_chars`, respetando las secciones."""
+    if len(text) <= max_chars:
+        return [text] if text.strip() else []
+    return _pack(split_sections(text), max_chars, "")
+
+
+def build_extraction_chunks(
+    documents: Sequence[Tuple[str, str]],
+    max_chars: int,
+) -> List[str]:
+    """
+    Arma los chunks de extracción para todos los archivos subidos.
+
+    Cada archivo se trata por separado (un chunk nunca mezcla dos archivos) y
+    cada chunk lleva el encabezado `--- FILE: ... ---` que espera el prompt.
+    """
+    chunks: List[str] = []
+    for filename, text in documents:
+        parts = split_cv_text(text, max_chars)
+        for index, part in enumerate(parts, start=1):
+            label = filename if len(parts) == 1 else f"{filename} (parte {index}/{len(parts)})"
+            chunks.append(f"\n--- FILE: {label} ---\n{part}\n")
+    return chunks
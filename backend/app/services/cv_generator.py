@@ -5,14 +5,31 @@ Provides complete CV generation functionality with AI enhancement,
 template-specific formatting, and structured output for frontend templates.
 """
 
+import asyncio
+import copy
 import json
 import logging
-from typing import Dict, Any, Optional, List, Literal
+from typing import AsyncGenerator, Dict, Any, Optional, List, Literal
 from datetime import datetime
 from app.core.config import settings
-from app.core.exceptions import CVProcessingError, AIServiceError
-from app.services.ai_service import get_ai_completion, SYSTEM_RULES
-from app.core.templates import registry
+from app.core.exceptions import APIError, CVProcessingError, AIServiceError
+from app.core.serialization import sse_error_event, sse_event
+from app.services.ai_service import (
+    SYSTEM_RULES,
+    get_ai_completion,
+    stream_ai_completion,
+)
+from app.services.enhancement_cache import enhancement_cache
+from app.services.language_detection import detect_cv_language
+from app.services.section_planner import (
+    Completion,
+    assemble_sections,
+    current_section_task,
+    plan_sections,
+    run_section_plan,
+)
+from app.core.templates import TemplateConfig, registry
+from app.services.template_assets import get_template_assets
 
 logger = logging.getLogger(__name__)
 
@@ -20,94 +37,22 @@ logger = logging.getLogger(__name__)
 # CV GENERATION PROMPTS
 # =============================================================================
 
-CV_GENERATION_PROMPT = """
-Task: Generate a complete, professional CV based on the provided CV data.
-Goal: Create a polished, well-structured CV optimized for job applications.
-
-Instructions:
-1. Review and enhance the CV data while maintaining factual accuracy
-2. Ensure all sections are properly formatted
-3. Add any missing but inferrable information where appropriate
-4. Optimize for clarity and impact
-5. Maintain consistent formatting throughout
-6. Language: {language} (match the input language)
-
-Input CV Data:
-{cv_json}
-
-Return a complete CV structure with the following enhanced sections:
-{{
-    "personalInfo": {{
-        "fullName": "...",
-        "email": "...",
-        "phone": "...",
-        "location": "...",
-        "summary": "...",
-        "website": "...",
-        "linkedin": "...",
-        "github": "...",
-        "role": "..."
-    }},
-    "experience": [
-        {{
-            "id": "...",
-            "company": "...",
-            "position": "...",
-            "startDate": "...",
-            "endDate": "...",
-            "current": true/false,
-            "location": "...",
-            "description": "...",
-            "highlights": ["...", "..."]
-        }}
-    ],
-    "education": [
-        {{
-            "id": "...",
-            "institution": "...",
-            "degree": "...",
-            "fieldOfStudy": "...",
-            "startDate": "...",
-            "endDate": "...",
-            "location": "...",
-            "description": "..."
-        }}
-    ],
-    "skills": [
-        {{
-            "id": "...",
-            "name": "...",
-            "level": "Beginner|Intermediate|Advanced|Expert",
-            "proficiency": 0-100,
-            "category": "..."
-        }}
-    ],
-    "projects": [
-        {{
-            "id": "...",
-            "name": "...",
-            "description": "...",
-            "url": "...",
-            "technologies": [...]
-        }}
-    ],
-    "languages": [
-        {{
-            "id": "...",
-            "language": "...",
-            "fluency": "Native|Fluent|Conversational|Basic"
-        }}
-    ],
-    "certifications": [
-        {{
-            "id": "...",
-            "name": "...",
-            "issuer": "...",
-            "date": "...",
-            "url": "..."
-        }}
-    ]
-}}
+TEMPLATE_DELTA_PROMPT = """
+Task: Adjust the wording of this CV for a specific template. The content was
+already reviewed: only change tone and emphasis, keep facts and length.
+
+Template guidelines:
+{formatting_prompt}
+
+Rules:
+1. Do NOT invent facts, metrics, companies or titles.
+2. Keep the same number of experience entries, in the same order.
+3. LANGUAGE: {language} (match the input language).
+
+Input:
+{delta_json}
+
+FORMAT: JSON {{ "summary": "...", "experience": [ {{ "description": "..." }} ] }}
 """
 
 # =============================================================================
@@ -115,12 +60,128 @@ Return a complete CV structure with the following enhanced sections:
 # =============================================================================
 
 
+async def _complete_section(prompt: str) -> Any:
+    return await get_ai_completion(prompt=prompt, system_msg=SYSTEM_RULES, use_json=True)
+
+
+async def enhance_cv(cv_data: Dict[str, Any], complete: Optional[Completion] = None) -> Dict[str, Any]:
+    """
+    Mejora con IA independiente de la plantilla.
+
+    Cada sección (resumen, cada experiencia, skills, proyectos) se reescribe
+    en su propia llamada, en paralelo (ver `section_planner`); una sección
+    cuya llamada falla conserva el contenido original. `complete` reemplaza
+    la llamada por sección (la usa la variante en streaming).
+    """
+    language = detect_cv_language(cv_data)
+    tasks = plan_sections(cv_data, "generate", language)
+    results = await run_section_plan(
+        tasks,
+        complete or _complete_section,
+        settings.AI_SECTION_CONCURRENCY,
+    )
+    if tasks and not any(results):
+        raise CVProcessingError("AI generation failed to produce valid CV data")
+    return _process_generated_cv(assemble_sections(cv_data, tasks, results), cv_data)
+
+
+def _apply_local_formatting(cv: Dict[str, Any], rules: Dict[str, Any]) -> None:
+    """Reglas de la plantilla que no necesitan IA (topes de highlights, skills y resumen)."""
+    max_highlights = rules.get("maxHighlights")
+    if isinstance(max_highlights, int):
+        for exp in cv["experience"]:
+            exp["highlights"] = exp["highlights"][:max_highlights]
+
+    max_skills = rules.get("maxSkills")
+    if isinstance(max_skills, int):
+        cv["skills"] = cv["skills"][:max_skills]
+
+    max_words = rules.get("summaryMaxWords")
+    summary = cv["personalInfo"].get("summary")
+    if isinstance(max_words, int) and summary:
+        words = summary.split()
+        if len(words) > max_words:
+            cv["personalInfo"]["summary"] = " ".join(words[:max_words]).rstrip(",;:") + "…"
+
+
+async def _apply_template_delta(cv: Dict[str, Any], formatting_prompt: str) -> None:
+    """Prompt chico con solo los textos que cambian según la plantilla (resumen y descripciones)."""
+    delta = {
+        "summary": cv["personalInfo"].get("summary", ""),
+        "experience": [{"description": exp["description"]} for exp in cv["experience"]],
+    }
+    prompt = TEMPLATE_DELTA_PROMPT.format(
+        formatting_prompt=formatting_prompt,
+        language=detect_cv_language(cv),
+        delta_json=json.dumps(delta, indent=2, ensure_ascii=False),
+    )
+    try:
+        response = await get_ai_completion(prompt=prompt, system_msg=SYSTEM_RULES, use_json=True)
+    except AIServiceError as e:
+        # El CV mejorado ya es válido para la plantilla: el ajuste es opcional.
+        logger.warning(f"Template delta failed, keeping enhanced CV: {e}")
+        return
+    if not isinstance(response, dict):
+        return
+
+    summary = response.get("summary")
+    if isinstance(summary, str) and summary.strip():
+        cv["personalInfo"]["summary"] = summary.strip()
+    descriptions = response.get("experience")
+    if isinstance(descriptions, list) and len(descriptions) == len(cv["experience"]):
+        for exp, updated in zip(cv["experience"], descriptions):
+            if isinstance(updated, dict) and isinstance(updated.get("description"), str) and updated["description"].strip():
+                exp["description"] = updated["description"].strip()
+
+
+async def format_for_template(enhanced_cv: Dict[str, Any], template_config: TemplateConfig) -> Dict[str, Any]:
+    """
+    Adapta un CV ya mejorado a la plantilla: reglas locales y, solo si la
+    plantilla lo pide (`formatting.aiDelta`), un prompt chico de ajuste.
+    `enhanced_cv` se modifica en el lugar y se devuelve.
+    """
+    rules = template_config.formatting
+    if rules.get("aiDelta"):
+        await _apply_template_delta(enhanced_cv, get_template_assets(template_config).formatting_prompt)
+    _apply_local_formatting(enhanced_cv, rules)
+    return enhanced_cv
+
+
+def _get_template_config(template_type: str) -> TemplateConfig:
+    template_config = registry.get_template(template_type)
+    if not template_config:
+        raise CVProcessingError(f"Invalid template type: {template_type}")
+    return template_config
+
+
+async def _generate_for_template(
+    enhanced_cv: Dict[str, Any],
+    template_type: str,
+    cached: bool,
+) -> Dict[str, Any]:
+    template_config = _get_template_config(template_type)
+    data = await format_for_template(enhanced_cv, template_config)
+    metadata = _generate_cv_metadata(data, template_type)
+    metadata["enhancement_cached"] = cached
+    return {
+        "data": data,
+        "metadata": metadata,
+        "template_type": template_type,
+        "generated_at": datetime.utcnow().isoformat(),
+    }
+
+
 async def generate_complete_cv(
     cv_data: Dict[str, Any], template_type: str
 ) -> Dict[str, Any]:
     """
     Generate a complete CV with AI enhancement and template-specific formatting.
 
+    The enhancement does not depend on the template and is cached per CV
+    content (`enhancement_cache`), so previewing the same CV with several
+    templates only pays for it once; the template step is local rules plus,
+    for some templates, a small delta prompt.
+
     Args:
         cv_data: Dictionary containing CV data with sections:
             - personalInfo: Personal information
@@ -143,47 +204,10 @@ async def generate_complete_cv(
         # Validate input data
         if not cv_data or not isinstance(cv_data, dict):
             raise CVProcessingError("Invalid CV data provided")
+        _get_template_config(template_type)
 
-        template_config = registry.get_template(template_type)
-        if not template_config:
-            raise CVProcessingError(f"Invalid template type: {template_type}")
-
-        # Detect language from CV data
-        language = _detect_language(cv_data)
-
-        # Prepare the CV JSON
-        cv_json = json.dumps(cv_data, indent=2, ensure_ascii=False)
-
-        # Generate enhanced CV with AI
-        generation_prompt = CV_GENERATION_PROMPT.format(
-            language=language, cv_json=cv_json
-        )
-        formatting_prompt = template_config.prompt
-
-        combined_prompt = f"{generation_prompt}\n\n{formatting_prompt}"
-
-        ai_response = await get_ai_completion(
-            prompt=combined_prompt,
-            system_msg=SYSTEM_RULES,
-            use_json=True,
-        )
-
-        if not ai_response or not isinstance(ai_response, dict):
-            raise CVProcessingError("AI generation failed to produce valid CV data")
-
-        # Process and validate the response
-        enhanced_cv = _process_generated_cv(ai_response, cv_data)
-
-        # Generate metadata for the frontend
-        metadata = _generate_cv_metadata(enhanced_cv, template_type)
-
-        # Build the complete response
-        result = {
-            "data": enhanced_cv,
-            "metadata": metadata,
-            "template_type": template_type,
-            "generated_at": datetime.utcnow().isoformat(),
-        }
+        enhanced_cv, cached = await enhancement_cache.get_or_enhance(cv_data, enhance_cv)
+        result = await _generate_for_template(enhanced_cv, template_type, cached)
 
         logger.info(f"Successfully generated CV for template: {template_type}")
         return result
@@ -197,58 +221,118 @@ async def generate_complete_cv(
         raise CVProcessingError(f"CV generation failed: {str(e)}")
 
 
-def _detect_language(cv_data: Dict[str, Any]) -> str:
+async def generate_complete_cv_stream(
+    cv_data: Dict[str, Any], template_type: str
+) -> AsyncGenerator[str, None]:
+    """
+    Streaming (SSE) variant of `generate_complete_cv`.
+
+    While the sections are rewritten it emits `delta` (text fragments) and
+    `section` (the AI response once a section call finishes), both tagged with
+    `section` and `index` (the experience entry, or null). It ends with
+    `complete`, whose `data` is the same payload the non-streaming endpoint
+    returns. When the enhancement comes from the cache, or another request is
+    already running it, there are no intermediate events.
     """
-    Detect the language of the CV data.
+    try:
+        if not cv_data or not isinstance(cv_data, dict):
+            raise CVProcessingError("Invalid CV data provided")
+        _get_template_config(template_type)
+    except APIError as e:
+        yield sse_error_event(e)
+        return
+
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def complete(prompt: str) -> Any:
+        task = current_section_task.get()
+        tag = {"section": task.section, "index": task.index}
+        result, provider = None, None
+        async for event in stream_ai_completion(prompt, SYSTEM_RULES):
+            if event["type"] == "delta":
+                events.put_nowait({"type": "delta", **tag, "text": event["text"]})
+            elif event["type"] == "result":
+                result, provider = event["data"], event["provider"]
+        if provider is None:
+            # Ningún proveedor abrió el stream: la llamada normal tiene su propio fallback.
+            result = await _complete_section(prompt)
+        elif not result:
+            # El stream respondió pero no con JSON válido: la sección conserva el
+            # contenido original en vez de pagar la misma llamada otra vez.
+            error = CVProcessingError(f"La IA devolvió una respuesta inválida para {task.section}.")
+            events.put_nowait({"type": "section", **tag, "data": None, "error": error.detail["message"]})
+            raise error
+        events.put_nowait({"type": "section", **tag, "data": result})
+        return result
 
-    Args:
-        cv_data: CV data dictionary
+    enhancement = asyncio.ensure_future(
+        enhancement_cache.get_or_enhance(cv_data, lambda data: enhance_cv(data, complete))
+    )
+    try:
+        while not enhancement.done():
+            next_event = asyncio.ensure_future(events.get())
+            await asyncio.wait({next_event, enhancement}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event.done():
+                yield sse_event(next_event.result())
+            else:
+                next_event.cancel()
+        while not events.empty():
+            yield sse_event(events.get_nowait())
+
+        enhanced_cv, cached = enhancement.result()
+        result = await _generate_for_template(enhanced_cv, template_type, cached)
+    except APIError as e:
+        yield sse_error_event(e)
+        return
+    except Exception as e:
+        logger.exception(f"Unexpected error in generate_complete_cv_stream: {e}")
+        yield sse_error_event(CVProcessingError(f"CV generation failed: {str(e)}"))
+        return
+    finally:
+        if not enhancement.done():
+            enhancement.cancel()
+
+    logger.info(f"Successfully streamed CV for template: {template_type}")
+    yield sse_event({"type": "complete", "data": result})
+
+
+async def generate_complete_cv_batch(
+    cv_data: Dict[str, Any], template_types: List[str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Same as `generate_complete_cv` for several templates in one call: one
+    enhancement, then every template formatted concurrently.
 
     Returns:
-        Detected language code ('es' or 'en')
+        Results keyed by template type, in request order (duplicates removed)
     """
-    # Check summary and descriptions for language indicators
-    text_samples = []
+    try:
+        if not cv_data or not isinstance(cv_data, dict):
+            raise CVProcessingError("Invalid CV data provided")
+        template_types = list(dict.fromkeys(template_types))
+        for template_type in template_types:
+            _get_template_config(template_type)
+
+        enhanced_cv, cached = await enhancement_cache.get_or_enhance(cv_data, enhance_cv)
+        results = await asyncio.gather(*(
+            _generate_for_template(
+                enhanced_cv if index == 0 else copy.deepcopy(enhanced_cv),
+                template_type,
+                cached,
+            )
+            for index, template_type in enumerate(template_types)
+        ))
+
+        logger.info(f"Successfully generated CV for templates: {', '.join(template_types)}")
+        return dict(zip(template_types, results))
 
-    personal_info = cv_data.get("personalInfo", {})
-    if personal_info.get("summary"):
-        text_samples.append(personal_info["summary"])
-
-    # Check experience descriptions
-    for exp in cv_data.get("experience", []):
-        if exp.get("description"):
-            text_samples.append(exp["description"])
-
-    # Check education descriptions
-    for edu in cv_data.get("education", []):
-        if edu.get("description"):
-            text_samples.append(edu["description"])
-
-    # Simple language detection
-    spanish_indicators = [
-        "usted",
-        "ustedes",
-        "años",
-        "experiencia",
-        "educación",
-        "habilidades",
-        "proyectos",
-        "certificaciones",
-        "realicé",
-        "lideré",
-        "desarrollé",
-        "gestioné",
-        "creé",
-        "presente",
-        "licenciatura",
-        "ingeniería",
-    ]
-
-    text_content = " ".join(text_samples).lower()
-
-    spanish_count = sum(1 for word in spanish_indicators if word in text_content)
-
-    return "es" if spanish_count > 0 else "en"
+    except CVProcessingError:
+        raise
+    except AIServiceError:
+        raise
+    except Exception as e:
+        logger.exception(f"Unexpected error in generate_complete_cv_batch: {e}")
+        raise CVProcessingError(f"CV generation failed: {str(e)}")
 
 
 def _process_generated_cv(
@@ -0,0 +1,123 @@
+"""
+CV Merge.
+
+Motor de merge para `cv_data`. Las secciones lista se deduplican con un set de
+fingerprints por sección que se guarda junto a la sesión (`CVMergeIndex`): un
+merge solo calcula la firma de los ítems nuevos, en vez de re-serializar el CV
+completo en cada turno.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from app.api.schemas import CVMergeIndex
+
+# Campos que identifican a un ítem; el resto (nivel, ubicación, highlights)
+# puede variar entre extracciones sin que sea un ítem distinto.
+IDENTITY_KEYS = (
+    "id",
+    "name",
+    "company",
+    "position",
+    "institution",
+    "degree",
+    "language",
+    "issuer",
+    "startDate",
+    "endDate",
+    "description",
+)
+_EMPTY = (None, "", [], {})
+
+
+def item_signature(item: Any) -> str:
+    """Firma estable y legible de un ítem del CV (sus campos de identidad en JSON)."""
+    if isinstance(item, dict):
+        compact = {key: item.get(key) for key in IDENTITY_KEYS if item.get(key) not in _EMPTY}
+        if compact:
+            return json.dumps(compact, sort_keys=True, ensure_ascii=False, default=str)
+    return json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def fingerprint_item(item: Any) -> str:
+    """Hash corto de `item_signature`, para guardar en el índice de la sesión."""
+    return hashlib.blake2b(item_signature(item).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _known_fingerprints(index: Optional[CVMergeIndex], section: str, items: List[Any]) -> Set[str]:
+    """Fingerprints de una sección; se recalculan solo si el índice no está al día."""
+    if index is None:
+        return {fingerprint_item(item) for item in items}
+    known = index.fingerprints.get(section)
+    # Si la lista cambió de tamaño por fuera del motor (ej. edición del frontend)
+    # el índice de esa sección ya no es confiable.
+    if known is None or index.sizes.get(section) != len(items):
+        known = {fingerprint_item(item) for item in items}
+        index.fingerprints[section] = known
+        index.sizes[section] = len(items)
+    return known
+
+
+def _merge_section(
+    section: str,
+    items: List[Any],
+    incoming: List[Any],
+    index: Optional[CVMergeIndex],
+    in_place: bool,
+) -> List[Any]:
+    known = _known_fingerprints(index, section, items)
+    fresh: Set[str] = set()
+    added: List[Any] = []
+    for item in incoming:
+        fingerprint = fingerprint_item(item)
+        if fingerprint in known or fingerprint in fresh:
+            continue
+        fresh.add(fingerprint)
+        added.append(item)
+
+    if not added:
+        return items
+    if not in_place:
+        # Sin `in_place` la base no cambia, así que el índice tampoco.
+        return items + added
+    items.extend(added)
+    if index is not None:
+        known.update(fresh)
+        index.sizes[section] = len(items)
+    return items
+
+
+def merge_cv_data(
+    base: Dict[str, Any],
+    update: Dict[str, Any],
+    index: Optional[CVMergeIndex] = None,
+    in_place: bool = False,
+) -> Dict[str, Any]:
+    """
+    Fusiona `update` sobre `base`.
+
+    Los diccionarios se fusionan recursivamente, las listas agregan los ítems
+    cuyo fingerprint no está en la sección y el resto de los valores se
+    reemplaza.
+
+    Args:
+        base: CV actual.
+        update: Datos nuevos (ej. una extracción del chat).
+        index: Índice de fingerprints de `base`; evita recalcular las firmas
+            de los ítems existentes.
+        in_place: Si es True modifica `base` y mantiene el índice al día. Si es
+            False `base` y el índice quedan intactos.
+    """
+    result = base if in_place else dict(base)
+    for key, value in update.items():
+        current = result.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            result[key] = merge_cv_data(current, value, in_place=in_place)
+        elif isinstance(current, list) and isinstance(value, list):
+            result[key] = _merge_section(key, current, value, index, in_place)
+        else:
+            result[key] = value
+            if in_place and index is not None:
+                index.fingerprints.pop(key, None)
+    return result
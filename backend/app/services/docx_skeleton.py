@@ -0,0 +1,166 @@
+"""
+DOCX Skeleton.
+
+Documento base por plantilla con los estilos del CV ya definidos ("Normal" con
+la fuente de cuerpo, rol, título de ítem, nombre) y un párrafo modelo por tipo
+de línea. Se arma una vez por versión de la plantilla (ver `template_assets`) y
+se parsea una vez por proceso; cada export clona el documento ya parseado y,
+por cada línea, el párrafo modelo con su estilo, en vez de crear el documento
+desde cero y resolver estilos o fijar fuentes párrafo por párrafo.
+"""
+
+import copy
+import io
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
+from docx.shared import Pt
+from docx.text.run import Run
+
+BODY_STYLE = "Normal"
+ROLE_STYLE = "CV Role"
+ENTRY_TITLE_STYLE = "CV Entry Title"
+NAME_STYLE = "Title"
+HEADING_STYLE = "Heading 1"
+
+# Párrafos modelo, en el orden en que quedan en el cuerpo del esqueleto.
+PARAGRAPH_KINDS = ("name", "role", "heading", "body", "entry")
+
+# Caracteres que python-docx convierte en elementos propios (<w:br/>, <w:tab/>).
+_SPECIAL_CHARS = frozenset("\n\r\t")
+
+# Partes de la plantilla default de python-docx que un CV no necesita y que
+# igual viajan en cada archivo: la copia de estilos para Word 2010, la
+# miniatura y el customXml de ejemplo (~15 KB comprimidos entre las tres).
+_UNUSED_PART_TYPES = frozenset({"stylesWithEffects", "thumbnail", "customXml"})
+_STYLE_REFERENCES = tuple(qn(tag) for tag in ("w:basedOn", "w:link", "w:next"))
+
+
+def build_docx_skeleton(styles: Dict[str, Any]) -> "DocxSkeleton":
+    """Esqueleto con los estilos nombrados de la plantilla y sus párrafos modelo."""
+    document = Document()
+    document_styles = document.styles
+
+    document_styles[BODY_STYLE].font.name = styles["body_font"]
+
+    name = document_styles[NAME_STYLE]
+    name.font.name = styles["heading_font"]
+    name.font.size = Pt(20)
+
+    role = document_styles.add_style(ROLE_STYLE, WD_STYLE_TYPE.PARAGRAPH)
+    role.base_style = document_styles[BODY_STYLE]
+    role.font.size = Pt(11)
+
+    entry_title = document_styles.add_style(ENTRY_TITLE_STYLE, WD_STYLE_TYPE.CHARACTER)
+    entry_title.font.name = styles["heading_font"]
+    entry_title.font.bold = True
+
+    document.add_paragraph(" ", style=NAME_STYLE)
+    document.add_paragraph(" ", style=ROLE_STYLE)
+    document.add_paragraph(" ", style=HEADING_STYLE)
+    document.add_paragraph(" ")
+    document.add_paragraph().add_run(" ", style=ENTRY_TITLE_STYLE)
+
+    _drop_unused_parts(document)
+    _prune_styles(document, (BODY_STYLE, NAME_STYLE, HEADING_STYLE, ROLE_STYLE, ENTRY_TITLE_STYLE))
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return DocxSkeleton(buffer.getvalue())
+
+
+def _drop_unused_parts(document: Any) -> None:
+    """Al guardar solo se escriben las partes alcanzables por alguna relación."""
+    for rels in (document.part.package.rels, document.part.rels):
+        for r_id, rel in list(rels.items()):
+            if rel.reltype.rsplit("/", 1)[-1] in _UNUSED_PART_TYPES:
+                rels.pop(r_id)
+
+
+def _prune_styles(document: Any, used: Tuple[str, ...]) -> None:
+    """Deja los estilos usados, sus dependencias y los default de cada tipo."""
+    styles = document.styles
+    by_id = {style.style_id: style.element for style in styles}
+    keep = {styles[name].style_id for name in used}
+    keep.update(style_id for style_id, element in by_id.items() if element.get(qn("w:default")) == "1")
+    pending = list(keep)
+    while pending:
+        element = by_id[pending.pop()]
+        for tag in _STYLE_REFERENCES:
+            reference = element.find(tag)
+            style_id = reference.get(qn("w:val")) if reference is not None else None
+            if style_id in by_id and style_id not in keep:
+                keep.add(style_id)
+                pending.append(style_id)
+    for style_id, element in by_id.items():
+        if style_id not in keep:
+            styles.element.remove(element)
+
+
+class DocxSkeleton:
+    """
+    Esqueleto serializado de una plantilla.
+
+    Viaja como bytes (así se puede mandar al pool de procesos de exports) y se
+    parsea la primera vez que se usa en cada proceso.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self._parsed: Optional[Tuple[Any, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"data": self.data}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["data"])
+
+    def _parse(self) -> Tuple[Any, Dict[str, Any]]:
+        with self._lock:
+            if self._parsed is None:
+                document = Document(io.BytesIO(self.data))
+                body = document.element.body
+                paragraphs = body.findall(qn("w:p"))
+                for paragraph in paragraphs:
+                    body.remove(paragraph)
+                self._parsed = (document, dict(zip(PARAGRAPH_KINDS, paragraphs)))
+            return self._parsed
+
+    def new_document(self) -> "SkeletonDocument":
+        """Copia del esqueleto parseado, vacía y lista para agregar líneas."""
+        document, prototypes = self._parsed or self._parse()
+        return SkeletonDocument(copy.deepcopy(document), prototypes)
+
+
+class SkeletonDocument:
+    """Documento de un export: cada línea es una copia del párrafo modelo de su tipo."""
+
+    def __init__(self, document: Any, prototypes: Dict[str, Any]) -> None:
+        self.document = document
+        self._prototypes = prototypes
+        self._paragraphs: List[Any] = []
+
+    def add_paragraph(self, kind: str, text: str) -> None:
+        paragraph = copy.deepcopy(self._prototypes[kind])
+        run = paragraph.find(qn("w:r"))
+        if _SPECIAL_CHARS.isdisjoint(text):
+            run.find(qn("w:t")).text = text
+        else:
+            Run(run, self.document).text = text
+        self._paragraphs.append(paragraph)
+
+    def save(self) -> bytes:
+        body = self.document.element.body
+        section = body.find(qn("w:sectPr"))
+        for paragraph in self._paragraphs:
+            if section is None:
+                body.append(paragraph)
+            else:
+                section.addprevious(paragraph)
+        buffer = io.BytesIO()
+        self.document.save(buffer)
+        return buffer.getvalue()
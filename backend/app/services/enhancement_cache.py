@@ -0,0 +1,99 @@
+"""
+Enhancement Cache.
+
+Resultado de la mejora con IA de un CV (independiente de la plantilla),
+cacheado por contenido. Las previews de varias plantillas del mismo CV
+comparten una sola mejora: si llegan en paralelo, esperan a la misma tarea en
+vez de disparar una por plantilla.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Subirla al cambiar los prompts de mejora invalida los resultados cacheados.
+ENHANCEMENT_VERSION = "1"
+
+Enhancer = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def enhancement_key(cv_data: Dict[str, Any]) -> str:
+    material = json.dumps(cv_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{ENHANCEMENT_VERSION}:{material}".encode("utf-8")).hexdigest()
+
+
+class EnhancementCache:
+    """LRU por cantidad de entradas, con TTL y deduplicación de mejoras en curso."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, enhanced = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return enhanced
+
+    def put(self, key: str, enhanced: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), enhanced)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    async def get_or_enhance(
+        self,
+        cv_data: Dict[str, Any],
+        enhance: Enhancer,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        CV mejorado y si salió del cache. Devuelve una copia: quien formatea
+        para una plantilla puede modificarla sin tocar la entrada compartida.
+        """
+        key = enhancement_key(cv_data)
+        enhanced = self.get(key)
+        if enhanced is not None:
+            return copy.deepcopy(enhanced), True
+
+        task = self._pending.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(enhance(cv_data))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # `shield`: si un request se cancela, los demás que esperan la misma mejora siguen.
+        enhanced = await asyncio.shield(task)
+        return copy.deepcopy(enhanced), shared
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        # Se cachea al terminar la tarea aunque el request que la lanzó ya no esté.
+        self._pending.pop(key, None)
+        if not task.cancelled() and task.exception() is None:
+            self.put(key, task.result())
+
+
+enhancement_cache = EnhancementCache(
+    max_entries=settings.ENHANCEMENT_CACHE_SIZE,
+    ttl_seconds=settings.ENHANCEMENT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,153 @@
+"""
+Export Bundle.
+
+Varios exports de un mismo CV (combinaciones de plantilla y formato) en un
+solo ZIP. Hay un render tree por plantilla, compartido por todos sus
+formatos, y los renders corren en paralelo en el pool de `export_workers`.
+El ZIP se va enviando a medida que se completa cada archivo.
+"""
+
+import asyncio
+import io
+import logging
+import zipfile
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from app.core.templates import registry
+from app.services.export_cache import derive_export_key, export_cache
+from app.services.export_service import (
+    build_export_filename,
+    get_render_tree,
+    render_tree_key,
+    validate_export_target,
+)
+from app.services.export_workers import render_export
+
+logger = logging.getLogger(__name__)
+
+# 3 formatos x 4 plantillas cubre el uso real sin permitir bundles abusivos.
+BUNDLE_MAX_ITEMS = 12
+
+# PDF y DOCX ya vienen comprimidos: volver a comprimirlos solo gasta CPU.
+_STORED_FORMATS = {"pdf", "docx"}
+
+
+class _ZipSink(io.RawIOBase):
+    """Destino no seekable para `zipfile`: acumula bytes hasta el próximo `drain()`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def normalize_bundle_items(items: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Valida los pares (plantilla, formato) y descarta repetidos, conservando el
+    orden. Los aliases se resuelven al ID de la plantilla: `minimal` y `pure`
+    son el mismo archivo.
+    """
+    unique: List[Tuple[str, str]] = []
+    for template_id, export_format in items:
+        export_format = export_format.lower()
+        pair = (validate_export_target(template_id, export_format).id, export_format)
+        if pair not in unique:
+            unique.append(pair)
+    return unique
+
+
+def _unique_entry_name(filename: str, used: Set[str]) -> str:
+    """Nombre del archivo dentro del ZIP sin repetir (`cv_x.pdf`, `cv_x_2.pdf`, ...)."""
+    candidate = filename
+    stem, dot, extension = filename.rpartition(".")
+    counter = 2
+    while candidate in used:
+        candidate = f"{stem}_{counter}{dot}{extension}"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+
+def build_bundle_filename(cv_data: Dict[str, Any]) -> str:
+    full_name = (cv_data.get("personalInfo") or {}).get("fullName") or "cv"
+    safe_name = "_".join(full_name.strip().split())
+    return f"cv_{safe_name}_{datetime.utcnow().strftime('%Y%m%d')}.zip"
+
+
+async def _render_item(
+    cv_data: Dict[str, Any],
+    template_id: str,
+    export_format: str,
+    tree_key: str,
+) -> Tuple[str, bytes]:
+    cache_key = derive_export_key(tree_key, export_format)
+    filename = build_export_filename(cv_data, template_id, export_format)
+    content = export_cache.get(cache_key)
+    if content is None:
+        tree = None if export_format == "json" else get_render_tree(cv_data, template_id, key=tree_key)
+        content, filename, _ = await render_export(cv_data, template_id, export_format, tree)
+        export_cache.put(cache_key, content)
+    return filename, content
+
+
+async def stream_export_bundle(
+    cv_data: Dict[str, Any],
+    items: Sequence[Tuple[str, str]],
+) -> AsyncIterator[bytes]:
+    """
+    Genera el ZIP por partes: cada archivo se escribe apenas termina su render.
+
+    `items` tiene que venir validado (`normalize_bundle_items`). Si un render
+    falla, el resto del bundle se envía igual y el error queda en `ERRORES.txt`.
+    """
+    tree_keys: Dict[str, str] = {}
+    for template_id, _ in items:
+        if template_id not in tree_keys:
+            tree_keys[template_id] = render_tree_key(cv_data, registry.get_template(template_id))
+
+    tasks: Dict[asyncio.Task, Tuple[str, str]] = {
+        asyncio.create_task(
+            _render_item(cv_data, template_id, export_format, tree_keys[template_id])
+        ): (template_id, export_format)
+        for template_id, export_format in items
+    }
+    sink = _ZipSink()
+    errors: List[str] = []
+    entry_names: Set[str] = set()
+    try:
+        with zipfile.ZipFile(sink, mode="w") as archive:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    template_id, export_format = tasks[task]
+                    error: Optional[BaseException] = task.exception()
+                    if error is not None:
+                        logger.error(f"[EXPORT-BUNDLE] Falló {template_id}/{export_format}: {error}")
+                        errors.append(f"{template_id}.{export_format}: no se pudo generar el archivo")
+                        continue
+                    filename, content = task.result()
+                    compression = zipfile.ZIP_STORED if export_format in _STORED_FORMATS else zipfile.ZIP_DEFLATED
+                    archive.writestr(_unique_entry_name(filename, entry_names), content, compress_type=compression)
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            if errors:
+                archive.writestr("ERRORES.txt", "\n".join(errors), compress_type=zipfile.ZIP_DEFLATED)
+        yield sink.drain()
+    finally:
+        # Si el cliente corta la descarga no tiene sentido seguir renderizando.
+        for task in tasks:
+            task.cancel()
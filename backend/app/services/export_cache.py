@@ -0,0 +1,202 @@
+"""
+Export Cache.
+
+Cache de archivos exportados (PDF, DOCX, TXT, JSON). La clave es un hash
+estable de (`cv_data`, plantilla, formato, `EXPORTER_VERSION`) y también se usa
+como ETag, así que un `If-None-Match` repetido se responde con 304 sin
+renderizar nada. El tier en memoria es un LRU acotado por bytes; opcionalmente
+los archivos se guardan también en disco (`EXPORT_CACHE_DIR`).
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.export_service import (
+    EXPORT_MIME_TYPES,
+    EXPORTER_VERSION,
+    build_export_filename,
+    render_tree_key,
+    validate_export_target,
+)
+from app.services.export_workers import render_export
+
+logger = logging.getLogger(__name__)
+
+
+def export_cache_key(cv_data: Dict[str, Any], template_id: str, export_format: str) -> str:
+    """
+    Clave estable del export. Valida plantilla y formato.
+
+    Parte de `render_tree_key`, que incluye la configuración de la plantilla:
+    un cambio de estilos o de orden de secciones no sirve archivos viejos.
+    """
+    template_config = validate_export_target(template_id, export_format)
+    return derive_export_key(render_tree_key(cv_data, template_config), export_format)
+
+
+def derive_export_key(tree_key: str, export_format: str) -> str:
+    """Clave de un formato a partir del `render_tree_key` (varios formatos, un solo hash del CV)."""
+    return hashlib.sha256(f"{EXPORTER_VERSION}:{export_format}:{tree_key}".encode("utf-8")).hexdigest()
+
+
+def export_etag(cache_key: str) -> str:
+    return f'"{cache_key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evalúa `If-None-Match` (lista de ETags o `*`), ignorando el prefijo débil `W/`."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+class ExportCache:
+    """LRU acotado por bytes, con un tier opcional en disco."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return content
+
+        content = self._read_disk(key)
+        with self._lock:
+            if content is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+        self._store_memory(key, content)
+        return content
+
+    def put(self, key: str, content: bytes) -> None:
+        self._store_memory(key, content)
+        self._write_disk(key, content)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            for counter in self._stats:
+                self._stats[counter] = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._size}
+
+    # ------------------------------------------------------------------
+
+    def _store_memory(self, key: str, content: bytes) -> None:
+        # Un archivo más grande que todo el presupuesto no desplaza al resto.
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = content
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as handle:
+                content = handle.read()
+            os.utime(path)  # el mtime hace de "último uso" para el pruning
+            return content
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning(f"[EXPORT-CACHE] No se pudo leer {path}: {exc}")
+            return None
+
+    def _write_disk(self, key: str, content: bytes) -> None:
+        if not self.disk_dir or len(content) > self.disk_max_bytes:
+            return
+        try:
+            # Escritura atómica: otro worker nunca ve un archivo a medias.
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(content)
+            os.replace(tmp_path, self._disk_path(key))
+            self._prune_disk()
+        except OSError as exc:
+            logger.warning(f"[EXPORT-CACHE] No se pudo escribir en {self.disk_dir}: {exc}")
+
+    def _prune_disk(self) -> None:
+        files = []
+        total = 0
+        with os.scandir(self.disk_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.startswith(".tmp-"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                continue
+
+
+export_cache = ExportCache(
+    max_bytes=settings.EXPORT_CACHE_MAX_BYTES,
+    disk_dir=settings.EXPORT_CACHE_DIR,
+    disk_max_bytes=settings.EXPORT_CACHE_DISK_MAX_BYTES,
+)
+
+
+async def build_cached_export(
+    cache_key: str,
+    cv_data: Dict[str, Any],
+    template_id: str,
+    export_format: str,
+) -> Tuple[bytes, str, str]:
+    """
+    Igual que `build_export_payload`, pero reutiliza el archivo si ya se
+    renderizó; si no, lo renderiza en el pool de `export_workers`.
+    """
+    content = export_cache.get(cache_key)
+    if content is not None:
+        filename = build_export_filename(cv_data, template_id, export_format)
+        return content, filename, EXPORT_MIME_TYPES[export_format]
+
+    content, filename, media_type = await render_export(cv_data, template_id, export_format)
+    export_cache.put(cache_key, content)
+    return content, filename, media_type
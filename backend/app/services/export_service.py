@@ -1,20 +1,48 @@
+import hashlib
 import io
 import json
-import textwrap
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from docx import Document
-from docx.shared import Pt
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
 from app.core.exceptions import ValidationError
-from app.core.templates import registry
+from app.core.templates import TemplateConfig, registry
+from app.services.docx_skeleton import SkeletonDocument
+from app.services.pdf_layout import wrap_lines
+from app.services.template_assets import TemplateAssets, get_template_assets
 
 SUPPORTED_EXPORT_FORMATS = {"pdf", "docx", "txt", "json"}
 
+# Forma parte de la clave del cache de exports: subirla al cambiar cómo se
+# renderiza cualquier formato invalida los archivos cacheados.
+EXPORTER_VERSION = "5"
+
+PDF_MARGIN = 72
+PDF_TEXT_WIDTH = letter[0] - 2 * PDF_MARGIN
+
+# Fuentes base-14 por categoría: las familias web del editor no vienen
+# embebidas, así que el PDF usa la equivalente más cercana.
+PDF_FONT_FAMILIES = {
+    "sans": {"heading": "Helvetica-Bold", "body": "Helvetica"},
+    "serif": {"heading": "Times-Bold", "body": "Times-Roman"},
+    "mono": {"heading": "Courier-Bold", "body": "Courier"},
+}
+_MONO_FAMILIES = {"courier", "courier new", "consolas", "menlo", "monospace"}
+_SERIF_FAMILIES = {
+    "playfair display", "merriweather", "lora", "georgia", "times", "times new roman",
+    "garamond", "eb garamond", "libre baskerville", "crimson text", "pt serif",
+}
+_SANS_FAMILIES = {
+    "inter", "roboto", "open sans", "lato", "montserrat", "raleway", "helvetica",
+    "arial", "poppins", "nunito", "work sans",
+}
+
 EXPORT_MIME_TYPES = {
     "pdf": "application/pdf",
     "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
@@ -34,36 +62,95 @@ SECTION_LABELS = {
     "tools": "Herramientas",
 }
 
+RENDER_TREE_CACHE_SIZE = 64
+_render_tree_cache: "OrderedDict[str, RenderTree]" = OrderedDict()
+_render_tree_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class RenderEntry:
+    """Ítem de una sección (una experiencia, un proyecto, una certificación)."""
+
+    title: str
+    # Títulos de experiencia/educación/proyectos van con la fuente de títulos.
+    emphasis: bool = True
+    dates: str = ""
+    location: str = ""
+    details: Tuple[str, ...] = ()
+
+    @property
+    def meta(self) -> str:
+        return " | ".join(item for item in (self.location, self.dates) if item)
+
+
+@dataclass(frozen=True)
+class RenderSection:
+    key: str
+    label: str
+    # Secciones de un solo párrafo (perfil, habilidades, idiomas, ...).
+    text: str = ""
+    entries: Tuple[RenderEntry, ...] = ()
+
+
+@dataclass(frozen=True)
+class RenderTree:
+    """
+    CV ya resuelto para una plantilla: orden y visibilidad de secciones,
+    etiquetas, fechas y textos. Los exportadores TXT, DOCX y PDF solo lo
+    recorren, así que se arma una vez y se reutiliza entre formatos.
+    """
+
+    template_id: str
+    full_name: str
+    role: str
+    contact: str
+    links: str
+    sections: Tuple[RenderSection, ...]
+    styles: Dict[str, Any] = field(default_factory=dict, hash=False, compare=False)
+    pdf_fonts: Dict[str, str] = field(default_factory=dict, hash=False, compare=False)
+    assets: Optional[TemplateAssets] = field(default=None, hash=False, compare=False, repr=False)
+
 
 def build_export_payload(
     cv_data: Dict[str, Any],
     template_id: str,
     export_format: str,
+    tree: Optional[RenderTree] = None,
 ) -> Tuple[bytes, str, str]:
-    """Genera un archivo descargable con formato y plantilla específicos."""
-    template_config = registry.get_template(template_id)
-    if not template_config:
-        raise ValidationError(f"Plantilla no soportada: {template_id}")
+    """
+    Genera un archivo descargable con formato y plantilla específicos.
 
-    if export_format not in SUPPORTED_EXPORT_FORMATS:
-        raise ValidationError(f"Formato no soportado: {export_format}")
+    Args:
+        tree: Render tree ya compilado para (cv_data, plantilla), para no
+            recompilarlo al exportar varios formatos del mismo CV.
+    """
+    validate_export_target(template_id, export_format)
 
-    file_name = _build_filename(cv_data, template_id, export_format)
+    file_name = build_export_filename(cv_data, template_id, export_format)
     if export_format == "json":
         content = _build_json_export(cv_data, template_id)
-    elif export_format == "txt":
-        content = _build_txt_export(cv_data, template_id)
-    elif export_format == "docx":
-        content = _build_docx_export(cv_data, template_id)
-    elif export_format == "pdf":
-        content = _build_pdf_export(cv_data, template_id)
     else:
-        raise ValidationError(f"Formato no soportado: {export_format}")
+        tree = tree or get_render_tree(cv_data, template_id)
+        renderer = _TREE_RENDERERS.get(export_format)
+        if renderer is None:
+            raise ValidationError(f"Formato no soportado: {export_format}")
+        content = renderer(tree)
 
     return content, file_name, EXPORT_MIME_TYPES[export_format]
 
 
-def _build_filename(cv_data: Dict[str, Any], template_id: str, export_format: str) -> str:
+def validate_export_target(template_id: str, export_format: str) -> TemplateConfig:
+    """Valida plantilla y formato de un export y devuelve la configuración de la plantilla."""
+    template_config = registry.get_template(template_id)
+    if not template_config:
+        raise ValidationError(f"Plantilla no soportada: {template_id}")
+
+    if export_format not in SUPPORTED_EXPORT_FORMATS:
+        raise ValidationError(f"Formato no soportado: {export_format}")
+    return template_config
+
+
+def build_export_filename(cv_data: Dict[str, Any], template_id: str, export_format: str) -> str:
     personal_info = cv_data.get("personalInfo", {})
     full_name = personal_info.get("fullName") or "cv"
     safe_name = "_".join(full_name.strip().split())
@@ -75,42 +162,60 @@ def _build_filename(cv_data: Dict[str, Any], template_id: str, export_format: st
     return f"cv_{safe_name}_{template_label}_{timestamp}.{export_format}"
 
 
-def _is_section_visible(cv_data: Dict[str, Any], section: str) -> bool:
-    config = cv_data.get("config") or {}
-    sections_config = config.get("sections") or {}
-    section_config = sections_config.get(section) or {}
-    return section_config.get("visible", True)
+def render_tree_key(cv_data: Dict[str, Any], template_config: TemplateConfig) -> str:
+    """Hash estable de (cv_data, plantilla): identifica un render tree."""
+    material = json.dumps(
+        [template_config.model_dump(mode="json"), cv_data],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
 
 
-def _build_json_export(cv_data: Dict[str, Any], template_id: str) -> bytes:
-    payload = {
-        "template": template_id,
-        "generatedAt": datetime.utcnow().isoformat(),
-        "data": cv_data,
-    }
-    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+def get_render_tree(
+    cv_data: Dict[str, Any],
+    template_id: str,
+    key: Optional[str] = None,
+) -> RenderTree:
+    """
+    Render tree de (cv_data, plantilla), compilado una vez y cacheado (LRU).
+
+    Args:
+        key: `render_tree_key` ya calculado por el llamador, si lo tiene.
+    """
+    template_config = registry.get_template(template_id)
+    if not template_config:
+        raise ValidationError(f"Plantilla no soportada: {template_id}")
 
+    key = key or render_tree_key(cv_data, template_config)
+    with _render_tree_lock:
+        tree = _render_tree_cache.get(key)
+        if tree is not None:
+            _render_tree_cache.move_to_end(key)
+            return tree
 
-def _build_txt_export(cv_data: Dict[str, Any], template_id: str) -> bytes:
-    lines: List[str] = []
-    personal_info = cv_data.get("personalInfo", {})
-    full_name = personal_info.get("fullName") or "Sin nombre"
-    role = personal_info.get("role")
+    tree = compile_render_tree(cv_data, template_config)
+    with _render_tree_lock:
+        _render_tree_cache[key] = tree
+        if len(_render_tree_cache) > RENDER_TREE_CACHE_SIZE:
+            _render_tree_cache.popitem(last=False)
+    return tree
 
-    lines.append(full_name)
-    if role:
-        lines.append(role)
-    lines.append("=" * 60)
 
+def clear_render_tree_cache() -> None:
+    with _render_tree_lock:
+        _render_tree_cache.clear()
+
+
+def compile_render_tree(cv_data: Dict[str, Any], template_config: TemplateConfig) -> RenderTree:
+    personal_info = cv_data.get("personalInfo") or {}
     contact_parts = [
         personal_info.get("email"),
         personal_info.get("phone"),
         personal_info.get("location"),
     ]
-    contact = " | ".join([item for item in contact_parts if item])
-    if contact:
-        lines.append(contact)
-
     link_parts = []
     if personal_info.get("linkedin"):
         link_parts.append(f"LinkedIn: {personal_info.get('linkedin')}")
@@ -118,368 +223,206 @@ def _build_txt_export(cv_data: Dict[str, Any], template_id: str) -> bytes:
         link_parts.append(f"GitHub: {personal_info.get('github')}")
     if personal_info.get("website"):
         link_parts.append(f"Web: {personal_info.get('website')}")
-    if link_parts:
-        lines.append(" | ".join(link_parts))
 
-    lines.append("")
-
-    template_config = registry.get_template(template_id)
-    section_order = template_config.section_order if template_config else []
-
-    for section in section_order:
+    sections = []
+    for section in template_config.section_order:
         if not _is_section_visible(cv_data, section):
             continue
-        section_lines = _render_section_txt(cv_data, section)
-        if section_lines:
-            lines.extend(section_lines)
-            lines.append("")
+        compiled = _compile_section(cv_data, section)
+        if compiled is not None:
+            sections.append(compiled)
+
+    return RenderTree(
+        template_id=template_config.id,
+        full_name=personal_info.get("fullName") or "Sin nombre",
+        role=personal_info.get("role") or "",
+        contact=" | ".join([item for item in contact_parts if item]),
+        links=" | ".join(link_parts),
+        sections=tuple(sections),
+        styles=dict(template_config.styles),
+        pdf_fonts=_resolve_pdf_fonts(cv_data, template_config.id),
+        assets=get_template_assets(template_config),
+    )
 
-    return "\n".join(lines).strip().encode("utf-8")
 
+def _is_section_visible(cv_data: Dict[str, Any], section: str) -> bool:
+    config = cv_data.get("config") or {}
+    sections_config = config.get("sections") or {}
+    section_config = sections_config.get(section) or {}
+    return section_config.get("visible", True)
+
+
+def _get_section_label(cv_data: Dict[str, Any], section: str) -> str:
+    """Título de la sección: el que eligió el usuario en el editor o el por defecto."""
+    section_config = ((cv_data.get("config") or {}).get("sections") or {}).get(section) or {}
+    title = section_config.get("title")
+    if isinstance(title, str) and title.strip():
+        return title.strip()
+    return SECTION_LABELS.get(section, section.title())
+
+
+def _items(cv_data: Dict[str, Any], section: str) -> List[Dict[str, Any]]:
+    return [item for item in cv_data.get(section) or [] if isinstance(item, dict)]
 
-def _render_section_txt(cv_data: Dict[str, Any], section: str) -> List[str]:
-    lines: List[str] = []
-    label = SECTION_LABELS.get(section, section.title())
+
+def _compile_section(cv_data: Dict[str, Any], section: str) -> Optional[RenderSection]:
+    label = _get_section_label(cv_data, section)
+    text = ""
+    entries: List[RenderEntry] = []
 
     if section == "summary":
-        summary = cv_data.get("personalInfo", {}).get("summary")
-        if summary:
-            lines.append(label.upper())
-            lines.append("-" * len(label))
-            lines.append(summary)
+        text = (cv_data.get("personalInfo") or {}).get("summary") or ""
     elif section == "experience":
-        experiences = cv_data.get("experience", [])
-        if experiences:
-            lines.append(label.upper())
-            lines.append("-" * len(label))
-            for exp in experiences:
-                title = exp.get("position") or "Sin título"
-                company = exp.get("company")
-                location = exp.get("location")
-                dates = _format_date_range(exp.get("startDate"), exp.get("endDate"), exp.get("current"))
-                lines.append(f"{title}{f' · {company}' if company else ''}")
-                if location or dates:
-                    meta = " | ".join([item for item in [location, dates] if item])
-                    lines.append(f"  {meta}")
-                if exp.get("description"):
-                    lines.append(f"  {exp.get('description')}")
-                lines.append("")
+        for exp in _items(cv_data, "experience"):
+            company = exp.get("company")
+            entries.append(RenderEntry(
+                title=f"{exp.get('position') or 'Sin título'}{f' · {company}' if company else ''}",
+                dates=_format_date_range(exp.get("startDate"), exp.get("endDate"), exp.get("current")),
+                location=exp.get("location") or "",
+                details=_present(exp.get("description")),
+            ))
     elif section == "education":
-        education = cv_data.get("education", [])
-        if education:
-            lines.append(label.upper())
-            lines.append("-" * len(label))
-            for edu in education:
-                degree = edu.get("degree") or "Sin título"
-                institution = edu.get("institution")
-                location = edu.get("location")
-                dates = _format_date_range(edu.get("startDate"), edu.get("endDate"), False)
-                lines.append(f"{degree}{f' · {institution}' if institution else ''}")
-                if location or dates:
-                    meta = " | ".join([item for item in [location, dates] if item])
-                    lines.append(f"  {meta}")
-                if edu.get("description"):
-                    lines.append(f"  {edu.get('description')}")
-                lines.append("")
-    elif section == "skills":
-        skills = [skill.get("name") for skill in cv_data.get("skills", []) if skill.get("name")]
-        if skills:
-            lines.append(label.upper())
-            lines.append("-" * len(label))
-            lines.append(" • ".join(skills))
+        for edu in _items(cv_data, "education"):
+            institution = edu.get("institution")
+            entries.append(RenderEntry(
+                title=f"{edu.get('degree') or 'Sin título'}{f' · {institution}' if institution else ''}",
+                dates=_format_date_range(edu.get("startDate"), edu.get("endDate"), False),
+                location=edu.get("location") or "",
+                details=_present(edu.get("description")),
+            ))
     elif section == "projects":
-        projects = cv_data.get("projects", [])
-        if projects:
-            lines.append(label.upper())
-            lines.append("-" * len(label))
-            for proj in projects:
-                name = proj.get("name") or "Proyecto"
-                description = proj.get("description")
-                lines.append(name)
-                if description:
-                    lines.append(f"  {description}")
-                if proj.get("url"):
-                    lines.append(f"  {proj.get('url')}")
-                if proj.get("technologies"):
-                    lines.append(f"  Tecnologías: {', '.join(proj.get('technologies'))}")
-                lines.append("")
+        for proj in _items(cv_data, "projects"):
+            technologies = proj.get("technologies")
+            entries.append(RenderEntry(
+                title=proj.get("name") or "Proyecto",
+                details=_present(
+                    proj.get("description"),
+                    proj.get("url"),
+                    f"Tecnologías: {', '.join(technologies)}" if technologies else None,
+                ),
+            ))
     elif section == "certifications":
-        certifications = cv_data.get("certifications", [])
-        if certifications:
-            lines.append(label.upper())
-            lines.append("-" * len(label))
-            for cert in certifications:
-                title = cert.get("name") or "Certificación"
-                issuer = cert.get("issuer")
-                date = cert.get("date")
-                lines.append(f"{title}{f' · {issuer}' if issuer else ''}{f' ({date})' if date else ''}")
-                if cert.get("url"):
-                    lines.append(f"  {cert.get('url')}")
-            lines.append("")
+        for cert in _items(cv_data, "certifications"):
+            issuer = cert.get("issuer")
+            date = cert.get("date")
+            entries.append(RenderEntry(
+                title=f"{cert.get('name') or 'Certificación'}{f' · {issuer}' if issuer else ''}{f' ({date})' if date else ''}",
+                emphasis=False,
+                details=_present(cert.get("url")),
+            ))
+    elif section == "skills":
+        text = " • ".join(skill["name"] for skill in _items(cv_data, "skills") if skill.get("name"))
     elif section == "languages":
-        languages = cv_data.get("languages", [])
-        if languages:
-            lines.append(label.upper())
-            lines.append("-" * len(label))
-            lines.append(
-                " • ".join(
-                    [
-                        _format_language_entry(lang)
-                        for lang in languages
-                        if lang.get("language")
-                    ]
-                )
-            )
+        text = " • ".join(
+            _format_language_entry(lang) for lang in _items(cv_data, "languages") if lang.get("language")
+        )
     elif section == "interests":
-        interests = cv_data.get("interests", [])
-        if interests:
-            lines.append(label.upper())
-            lines.append("-" * len(label))
-            lines.append(" • ".join([interest.get("name") for interest in interests if interest.get("name")]))
+        text = " • ".join(interest["name"] for interest in _items(cv_data, "interests") if interest.get("name"))
     elif section == "tools":
-        tools = cv_data.get("tools", [])
-        if tools:
-            lines.append(label.upper())
-            lines.append("-" * len(label))
-            lines.append(" • ".join([tool for tool in tools if tool]))
+        text = " • ".join(tool for tool in cv_data.get("tools") or [] if isinstance(tool, str) and tool)
 
-    return [line for line in lines if line is not None]
+    if not text and not entries:
+        return None
+    return RenderSection(key=section, label=label, text=text, entries=tuple(entries))
 
 
-def _build_docx_export(cv_data: Dict[str, Any], template_id: str) -> bytes:
-    document = Document()
-    personal_info = cv_data.get("personalInfo", {})
-    template_config = registry.get_template(template_id)
-    style = template_config.styles if template_config else {}
-    section_order = template_config.section_order if template_config else []
+def _present(*values: Optional[str]) -> Tuple[str, ...]:
+    return tuple(value for value in values if value)
+
+
+def _build_json_export(cv_data: Dict[str, Any], template_id: str) -> bytes:
+    payload = {
+        "template": template_id,
+        "generatedAt": datetime.utcnow().isoformat(),
+        "data": cv_data,
+    }
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
 
-    name_heading = document.add_heading(personal_info.get("fullName") or "Sin nombre", level=0)
-    name_run = name_heading.runs[0]
-    name_run.font.name = style["heading_font"]
-    name_run.font.size = Pt(20)
 
-    if personal_info.get("role"):
-        role_paragraph = document.add_paragraph(personal_info.get("role"))
-        role_run = role_paragraph.runs[0]
-        role_run.font.name = style["body_font"]
-        role_run.font.size = Pt(11)
+def _build_txt_export(tree: RenderTree) -> bytes:
+    lines: List[str] = [tree.full_name]
+    if tree.role:
+        lines.append(tree.role)
+    lines.append("=" * 60)
+    if tree.contact:
+        lines.append(tree.contact)
+    if tree.links:
+        lines.append(tree.links)
+    lines.append("")
 
-    contact_parts = [
-        personal_info.get("email"),
-        personal_info.get("phone"),
-        personal_info.get("location"),
-    ]
-    contact = " | ".join([item for item in contact_parts if item])
-    if contact:
-        contact_paragraph = document.add_paragraph(contact)
-        contact_paragraph.runs[0].font.name = style["body_font"]
+    for section in tree.sections:
+        lines.extend(_render_section_txt(section))
+        lines.append("")
 
-    link_parts = []
-    if personal_info.get("linkedin"):
-        link_parts.append(f"LinkedIn: {personal_info.get('linkedin')}")
-    if personal_info.get("github"):
-        link_parts.append(f"GitHub: {personal_info.get('github')}")
-    if personal_info.get("website"):
-        link_parts.append(f"Web: {personal_info.get('website')}")
-    if link_parts:
-        link_paragraph = document.add_paragraph(" | ".join(link_parts))
-        link_paragraph.runs[0].font.name = style.get("body_font")
+    return "\n".join(lines).strip().encode("utf-8")
 
-    for section in section_order:
-        if not _is_section_visible(cv_data, section):
-            continue
-        _render_section_docx(document, cv_data, section, style)
 
-    buffer = io.BytesIO()
-    document.save(buffer)
-    buffer.seek(0)
-    return buffer.read()
+def _render_section_txt(section: RenderSection) -> List[str]:
+    lines = [section.label.upper(), "-" * len(section.label)]
+    if section.text:
+        lines.append(section.text)
+    for entry in section.entries:
+        lines.append(entry.title)
+        if entry.meta:
+            lines.append(f"  {entry.meta}")
+        lines.extend(f"  {detail}" for detail in entry.details)
+        lines.append("")
+    return lines
 
 
-def _render_section_docx(
-    document: Document,
-    cv_data: Dict[str, Any],
-    section: str,
-    style: Dict[str, Any],
-) -> None:
-    label = SECTION_LABELS.get(section, section.title())
+def _build_docx_export(tree: RenderTree) -> bytes:
+    document = tree.assets.docx_skeleton.new_document()
 
-    if section == "summary":
-        summary = cv_data.get("personalInfo", {}).get("summary")
-        if summary:
-            document.add_heading(label, level=1)
-            paragraph = document.add_paragraph(summary)
-            paragraph.runs[0].font.name = style["body_font"]
-    elif section == "experience":
-        experiences = cv_data.get("experience", [])
-        if experiences:
-            document.add_heading(label, level=1)
-            for exp in experiences:
-                title = exp.get("position") or "Sin título"
-                company = exp.get("company")
-                dates = _format_date_range(exp.get("startDate"), exp.get("endDate"), exp.get("current"))
-                header = f"{title}{f' · {company}' if company else ''}"
-                paragraph = document.add_paragraph()
-                run = paragraph.add_run(header)
-                run.bold = True
-                run.font.name = style["heading_font"]
-                if dates:
-                    meta = document.add_paragraph(dates)
-                    meta.runs[0].font.name = style["body_font"]
-                if exp.get("location"):
-                    location = document.add_paragraph(exp.get("location"))
-                    location.runs[0].font.name = style["body_font"]
-                if exp.get("description"):
-                    description = document.add_paragraph(exp.get("description"))
-                    description.runs[0].font.name = style["body_font"]
-    elif section == "education":
-        education = cv_data.get("education", [])
-        if education:
-            document.add_heading(label, level=1)
-            for edu in education:
-                degree = edu.get("degree") or "Sin título"
-                institution = edu.get("institution")
-                dates = _format_date_range(edu.get("startDate"), edu.get("endDate"), False)
-                header = f"{degree}{f' · {institution}' if institution else ''}"
-                paragraph = document.add_paragraph()
-                run = paragraph.add_run(header)
-                run.bold = True
-                run.font.name = style["heading_font"]
-                if dates:
-                    meta = document.add_paragraph(dates)
-                    meta.runs[0].font.name = style["body_font"]
-                if edu.get("location"):
-                    location = document.add_paragraph(edu.get("location"))
-                    location.runs[0].font.name = style["body_font"]
-                if edu.get("description"):
-                    description = document.add_paragraph(edu.get("description"))
-                    description.runs[0].font.name = style["body_font"]
-    elif section == "skills":
-        skills = [skill.get("name") for skill in cv_data.get("skills", []) if skill.get("name")]
-        if skills:
-            document.add_heading(label, level=1)
-            paragraph = document.add_paragraph(" • ".join(skills))
-            paragraph.runs[0].font.name = style["body_font"]
-    elif section == "projects":
-        projects = cv_data.get("projects", [])
-        if projects:
-            document.add_heading(label, level=1)
-            for proj in projects:
-                name = proj.get("name") or "Proyecto"
-                paragraph = document.add_paragraph()
-                run = paragraph.add_run(name)
-                run.bold = True
-                run.font.name = style["heading_font"]
-                if proj.get("description"):
-                    description = document.add_paragraph(proj.get("description"))
-                    description.runs[0].font.name = style["body_font"]
-                if proj.get("url"):
-                    url = document.add_paragraph(proj.get("url"))
-                    url.runs[0].font.name = style["body_font"]
-                if proj.get("technologies"):
-                    tech = document.add_paragraph(f"Tecnologías: {', '.join(proj.get('technologies'))}")
-                    tech.runs[0].font.name = style["body_font"]
-    elif section == "certifications":
-        certifications = cv_data.get("certifications", [])
-        if certifications:
-            document.add_heading(label, level=1)
-            for cert in certifications:
-                title = cert.get("name") or "Certificación"
-                issuer = cert.get("issuer")
-                date = cert.get("date")
-                header = f"{title}{f' · {issuer}' if issuer else ''}{f' ({date})' if date else ''}"
-                paragraph = document.add_paragraph(header)
-                paragraph.runs[0].font.name = style["body_font"]
-                if cert.get("url"):
-                    url = document.add_paragraph(cert.get("url"))
-                    url.runs[0].font.name = style["body_font"]
-    elif section == "languages":
-        languages = cv_data.get("languages", [])
-        if languages:
-            document.add_heading(label, level=1)
-            content = " • ".join(
-                [
-                    _format_language_entry(lang)
-                    for lang in languages
-                    if lang.get("language")
-                ]
-            )
-            paragraph = document.add_paragraph(content)
-            paragraph.runs[0].font.name = style["body_font"]
-    elif section == "interests":
-        interests = cv_data.get("interests", [])
-        if interests:
-            document.add_heading(label, level=1)
-            content = " • ".join([interest.get("name") for interest in interests if interest.get("name")])
-            paragraph = document.add_paragraph(content)
-            paragraph.runs[0].font.name = style["body_font"]
-    elif section == "tools":
-        tools = cv_data.get("tools", [])
-        if tools:
-            document.add_heading(label, level=1)
-            content = " • ".join([tool for tool in tools if tool])
-            paragraph = document.add_paragraph(content)
-            paragraph.runs[0].font.name = style["body_font"]
+    document.add_paragraph("name", tree.full_name)
+    if tree.role:
+        document.add_paragraph("role", tree.role)
+    for line in (tree.contact, tree.links):
+        if line:
+            document.add_paragraph("body", line)
 
+    for section in tree.sections:
+        _render_section_docx(document, section)
 
-def _build_pdf_export(cv_data: Dict[str, Any], template_id: str) -> bytes:
-    buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-    template_config = registry.get_template(template_id)
+    return document.save()
 
-    # Adapt styles for ReportLab
-    raw_style = template_config.styles if template_config else {}
-    style = raw_style.copy()
-    if "accent" in style and isinstance(style["accent"], str):
-        style["accent"] = colors.HexColor(style["accent"])
 
-    section_order = template_config.section_order if template_config else []
+def _render_section_docx(document: SkeletonDocument, section: RenderSection) -> None:
+    document.add_paragraph("heading", section.label)
+    if section.text:
+        document.add_paragraph("body", section.text)
+    for entry in section.entries:
+        document.add_paragraph("entry" if entry.emphasis else "body", entry.title)
+        for line in (entry.dates, entry.location, *entry.details):
+            if line:
+                document.add_paragraph("body", line)
 
-    pdf.setTitle("CV Export")
-    cursor_y = height - 72
 
-    personal_info = cv_data.get("personalInfo", {})
-    full_name = personal_info.get("fullName") or "Sin nombre"
-    role = personal_info.get("role")
-
-    cursor_y = _draw_wrapped_text(
-        pdf,
-        full_name,
-        cursor_y,
-        style["heading_font"],
-        18,
-        style["accent"],
-    )
+def _build_pdf_export(tree: RenderTree) -> bytes:
+    buffer = io.BytesIO()
+    # `invariant` fija fecha e ID del documento: mismo CV, mismos bytes (y mismo ETag).
+    pdf = canvas.Canvas(buffer, pagesize=letter, invariant=1)
+    width, height = letter
 
-    if role:
-        cursor_y = _draw_wrapped_text(pdf, role, cursor_y, style["body_font"], 12, colors.black)
+    # Adapt styles for ReportLab
+    style = dict(tree.styles)
+    style["accent"] = tree.assets.accent
+    style["heading_font"] = tree.pdf_fonts["heading"]
+    style["body_font"] = tree.pdf_fonts["body"]
 
-    contact_parts = [
-        personal_info.get("email"),
-        personal_info.get("phone"),
-        personal_info.get("location"),
-    ]
-    contact = " | ".join([item for item in contact_parts if item])
-    if contact:
-        cursor_y = _draw_wrapped_text(pdf, contact, cursor_y, style["body_font"], 10, colors.black)
+    pdf.setTitle("CV Export")
+    cursor_y = height - PDF_MARGIN
 
-    link_parts = []
-    if personal_info.get("linkedin"):
-        link_parts.append(f"LinkedIn: {personal_info.get('linkedin')}")
-    if personal_info.get("github"):
-        link_parts.append(f"GitHub: {personal_info.get('github')}")
-    if personal_info.get("website"):
-        link_parts.append(f"Web: {personal_info.get('website')}")
-    if link_parts:
-        cursor_y = _draw_wrapped_text(pdf, " | ".join(link_parts), cursor_y, style["body_font"], 10, colors.black)
+    cursor_y = _draw_wrapped_text(pdf, tree.full_name, cursor_y, style["heading_font"], 18, style["accent"])
+    if tree.role:
+        cursor_y = _draw_wrapped_text(pdf, tree.role, cursor_y, style["body_font"], 12, colors.black)
+    for line in (tree.contact, tree.links):
+        if line:
+            cursor_y = _draw_wrapped_text(pdf, line, cursor_y, style["body_font"], 10, colors.black)
 
     cursor_y -= 12
 
-    for section in section_order:
-        if not _is_section_visible(cv_data, section):
-            continue
-        cursor_y = _render_section_pdf(pdf, cv_data, section, style, cursor_y)
+    for section in tree.sections:
+        cursor_y = _render_section_pdf(pdf, section, style, cursor_y)
 
     pdf.showPage()
     pdf.save()
@@ -489,93 +432,36 @@ def _build_pdf_export(cv_data: Dict[str, Any], template_id: str) -> bytes:
 
 def _render_section_pdf(
     pdf: canvas.Canvas,
-    cv_data: Dict[str, Any],
-    section: str,
+    section: RenderSection,
     style: Dict[str, Any],
     cursor_y: float,
 ) -> float:
-    label = SECTION_LABELS.get(section, section.title())
-    cursor_y = _draw_wrapped_text(pdf, label, cursor_y, style["heading_font"], 12, style["accent"])
-
-    if section == "summary":
-        summary = cv_data.get("personalInfo", {}).get("summary")
-        if summary:
-            cursor_y = _draw_wrapped_text(pdf, summary, cursor_y, style["body_font"], 10, colors.black)
-    elif section == "experience":
-        experiences = cv_data.get("experience", [])
-        for exp in experiences:
-            title = exp.get("position") or "Sin título"
-            company = exp.get("company")
-            header = f"{title}{f' · {company}' if company else ''}"
-            cursor_y = _draw_wrapped_text(pdf, header, cursor_y, style["heading_font"], 10, colors.black)
-            dates = _format_date_range(exp.get("startDate"), exp.get("endDate"), exp.get("current"))
-            meta = " | ".join([item for item in [exp.get("location"), dates] if item])
-            if meta:
-                cursor_y = _draw_wrapped_text(pdf, meta, cursor_y, style["body_font"], 9, colors.black)
-            if exp.get("description"):
-                cursor_y = _draw_wrapped_text(pdf, exp.get("description"), cursor_y, style["body_font"], 9, colors.black)
-            cursor_y -= 6
-    elif section == "education":
-        education = cv_data.get("education", [])
-        for edu in education:
-            degree = edu.get("degree") or "Sin título"
-            institution = edu.get("institution")
-            header = f"{degree}{f' · {institution}' if institution else ''}"
-            cursor_y = _draw_wrapped_text(pdf, header, cursor_y, style["heading_font"], 10, colors.black)
-            dates = _format_date_range(edu.get("startDate"), edu.get("endDate"), False)
-            meta = " | ".join([item for item in [edu.get("location"), dates] if item])
-            if meta:
-                cursor_y = _draw_wrapped_text(pdf, meta, cursor_y, style["body_font"], 9, colors.black)
-            if edu.get("description"):
-                cursor_y = _draw_wrapped_text(pdf, edu.get("description"), cursor_y, style["body_font"], 9, colors.black)
-            cursor_y -= 6
-    elif section == "skills":
-        skills = [skill.get("name") for skill in cv_data.get("skills", []) if skill.get("name")]
-        if skills:
-            cursor_y = _draw_wrapped_text(pdf, " • ".join(skills), cursor_y, style["body_font"], 9, colors.black)
-    elif section == "projects":
-        projects = cv_data.get("projects", [])
-        for proj in projects:
-            name = proj.get("name") or "Proyecto"
-            cursor_y = _draw_wrapped_text(pdf, name, cursor_y, style["heading_font"], 10, colors.black)
-            if proj.get("description"):
-                cursor_y = _draw_wrapped_text(pdf, proj.get("description"), cursor_y, style["body_font"], 9, colors.black)
-            if proj.get("url"):
-                cursor_y = _draw_wrapped_text(pdf, proj.get("url"), cursor_y, style["body_font"], 9, colors.black)
-            if proj.get("technologies"):
-                tech = f"Tecnologías: {', '.join(proj.get('technologies'))}"
-                cursor_y = _draw_wrapped_text(pdf, tech, cursor_y, style["body_font"], 9, colors.black)
-            cursor_y -= 6
-    elif section == "certifications":
-        certifications = cv_data.get("certifications", [])
-        for cert in certifications:
-            title = cert.get("name") or "Certificación"
-            issuer = cert.get("issuer")
-            date = cert.get("date")
-            header = f"{title}{f' · {issuer}' if issuer else ''}{f' ({date})' if date else ''}"
-            cursor_y = _draw_wrapped_text(pdf, header, cursor_y, style["body_font"], 9, colors.black)
-            if cert.get("url"):
-                cursor_y = _draw_wrapped_text(pdf, cert.get("url"), cursor_y, style["body_font"], 9, colors.black)
-            cursor_y -= 4
-    elif section == "languages":
-        languages = cv_data.get("languages", [])
-        if languages:
-            content = " • ".join([_format_language_entry(lang) for lang in languages if lang.get("language")])
-            cursor_y = _draw_wrapped_text(pdf, content, cursor_y, style["body_font"], 9, colors.black)
-    elif section == "interests":
-        interests = cv_data.get("interests", [])
-        if interests:
-            content = " • ".join([interest.get("name") for interest in interests if interest.get("name")])
-            cursor_y = _draw_wrapped_text(pdf, content, cursor_y, style["body_font"], 9, colors.black)
-    elif section == "tools":
-        tools = cv_data.get("tools", [])
-        if tools:
-            content = " • ".join([tool for tool in tools if tool])
-            cursor_y = _draw_wrapped_text(pdf, content, cursor_y, style["body_font"], 9, colors.black)
+    cursor_y = _draw_wrapped_text(pdf, section.label, cursor_y, style["heading_font"], 12, style["accent"])
+    if section.text:
+        size = 10 if section.key == "summary" else 9
+        cursor_y = _draw_wrapped_text(pdf, section.text, cursor_y, style["body_font"], size, colors.black)
+
+    entry_gap = 4 if section.key == "certifications" else 6
+    for entry in section.entries:
+        if entry.emphasis:
+            cursor_y = _draw_wrapped_text(pdf, entry.title, cursor_y, style["heading_font"], 10, colors.black)
+        else:
+            cursor_y = _draw_wrapped_text(pdf, entry.title, cursor_y, style["body_font"], 9, colors.black)
+        for line in (entry.meta, *entry.details):
+            if line:
+                cursor_y = _draw_wrapped_text(pdf, line, cursor_y, style["body_font"], 9, colors.black)
+        cursor_y -= entry_gap
 
     return cursor_y - 12
 
 
+_TREE_RENDERERS: Dict[str, Callable[[RenderTree], bytes]] = {
+    "txt": _build_txt_export,
+    "docx": _build_docx_export,
+    "pdf": _build_pdf_export,
+}
+
+
 def _draw_wrapped_text(
     pdf: canvas.Canvas,
     text: str,
@@ -584,32 +470,74 @@ def _draw_wrapped_text(
     font_size: int,
     color: colors.Color,
 ) -> float:
-    if cursor_y < 72:
+    if cursor_y < PDF_MARGIN:
         pdf.showPage()
-        cursor_y = letter[1] - 72
-
-    pdf.setFont(font_name, font_size)
-    pdf.setFillColor(color)
-
-    max_width = letter[0] - 144
-    wrapped = _wrap_text(text, font_name, font_size, max_width)
-    for line in wrapped:
-        if cursor_y < 72:
+        cursor_y = letter[1] - PDF_MARGIN
+
+    lines = _wrap_text(text, font_name, font_size, PDF_TEXT_WIDTH)
+    leading = font_size + 2
+    # Un text object por bloque: fuente y color se fijan una vez por página,
+    # no por línea.
+    block = None
+    for line in lines:
+        if cursor_y < PDF_MARGIN:
+            if block is not None:
+                pdf.drawText(block)
+                block = None
             pdf.showPage()
-            cursor_y = letter[1] - 72
-            pdf.setFont(font_name, font_size)
-            pdf.setFillColor(color)
-        pdf.drawString(72, cursor_y, line)
-        cursor_y -= font_size + 2
+            cursor_y = letter[1] - PDF_MARGIN
+        if block is None:
+            block = pdf.beginText(PDF_MARGIN, cursor_y)
+            block.setFont(font_name, font_size, leading)
+            block.setFillColor(color)
+        block.textLine(line)
+        cursor_y -= leading
+    if block is not None:
+        pdf.drawText(block)
     return cursor_y
 
 
 def _wrap_text(text: str, font_name: str, font_size: int, max_width: float) -> List[str]:
     if not text:
         return []
-    approx_char_width = font_size * 0.5
-    max_chars = max(int(max_width / approx_char_width), 10)
-    return textwrap.wrap(text, width=max_chars)
+    return list(wrap_lines(text, font_name, font_size, max_width))
+
+
+def _font_category(family: str) -> Optional[str]:
+    """Clasifica una familia CSS (`'"Fira Code", monospace'`) en mono, serif o sans."""
+    name = family.split(",")[0].strip().strip("\"'").lower()
+    if not name:
+        return None
+    if name in _MONO_FAMILIES or "mono" in name or "code" in name:
+        return "mono"
+    if name in _SERIF_FAMILIES or ("serif" in name and "sans" not in name):
+        return "serif"
+    if name in _SANS_FAMILIES or "sans" in name:
+        return "sans"
+    return None
+
+
+def _resolve_pdf_fonts(cv_data: Dict[str, Any], template_id: str) -> Dict[str, str]:
+    """
+    Fuentes estándar del PDF para títulos y cuerpo.
+
+    Las familias elegidas en el editor (`config.fonts`) se aproximan a la
+    fuente base-14 de su misma categoría; si no se reconocen se usan las de
+    la plantilla.
+    """
+    template_config = registry.get_template(template_id)
+    style = template_config.styles if template_config else {}
+    fonts = {
+        "heading": style.get("heading_font", "Helvetica-Bold"),
+        "body": style.get("body_font", "Helvetica"),
+    }
+    configured = (cv_data.get("config") or {}).get("fonts") or {}
+    for role in ("heading", "body"):
+        family = configured.get(role)
+        category = _font_category(family) if isinstance(family, str) else None
+        if category:
+            fonts[role] = PDF_FONT_FAMILIES[category][role]
+    return fonts
 
 
 def _format_language_entry(language: Dict[str, Any]) -> str:
@@ -0,0 +1,96 @@
+"""
+Export Workers.
+
+Render de exports fuera del event loop. ReportLab y python-docx son CPU-bound
+y sincrónicos: corren en un pool acotado (hilos o procesos, según
+`EXPORT_WORKER_MODE`) y cada formato tiene su propio tope de renders
+simultáneos, para que un pico de PDFs no acapare el pool ni frene el SSE del
+chat en el mismo worker.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.export_service import RenderTree, build_export_payload
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+# Los semáforos de asyncio quedan atados a su loop: uno por loop y formato.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = max(1, settings.EXPORT_WORKERS)
+            if settings.EXPORT_WORKER_MODE == "process":
+                _executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+            logger.info(f"[EXPORT] Pool de {settings.EXPORT_WORKER_MODE} con {workers} workers")
+        return _executor
+
+
+def shutdown_export_workers() -> None:
+    """Libera el pool (se llama al apagar la app)."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _format_semaphore(export_format: str) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    per_loop = _semaphores.setdefault(loop, {})
+    semaphore = per_loop.get(export_format)
+    if semaphore is None:
+        limit = settings.EXPORT_FORMAT_CONCURRENCY.get(export_format, settings.EXPORT_WORKERS)
+        semaphore = per_loop[export_format] = asyncio.Semaphore(max(1, limit))
+    return semaphore
+
+
+async def render_export(
+    cv_data: Dict[str, Any],
+    template_id: str,
+    export_format: str,
+    tree: Optional[RenderTree] = None,
+) -> Tuple[bytes, str, str]:
+    """`build_export_payload` en el pool, respetando el tope del formato."""
+    async with _format_semaphore(export_format):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_executor(),
+            build_export_payload,
+            cv_data,
+            template_id,
+            export_format,
+            tree,
+        )
+
+
+async def stream_export_chunks(
+    content: bytes,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> AsyncIterator[memoryview]:
+    """
+    Corta el archivo en chunks para `StreamingResponse`.
+
+    Es un generador async (Starlette no lo pasa por el threadpool) y los chunks
+    son vistas del mismo buffer, sin copias.
+    """
+    view = memoryview(content)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
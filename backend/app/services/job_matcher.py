@@ -0,0 +1,246 @@
+"""
+Job Matcher.
+
+Matching léxico local entre una descripción de puesto y un CV. Los requisitos
+del aviso se ponderan con BM25 contra un corpus de avisos incluido en
+`app/data/job_corpus.json`; las skills coincidentes, faltantes y el score se
+calculan sin IA.
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Sequence, Tuple, Union
+
+from app.services.ats_scoring import (
+    INDUSTRY_KEYWORDS,
+    build_term_index,
+    normalize_for_matching,
+    tokenize,
+)
+
+CORPUS_PATH = Path(__file__).resolve().parent.parent / "data" / "job_corpus.json"
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Las skills conocidas pesan más que los términos libres del aviso.
+VOCABULARY_BOOST = 2.0
+MAX_REQUIREMENTS = 15
+# Un término libre entra como requisito si pesa al menos esta fracción del mayor.
+MIN_RELATIVE_WEIGHT = 0.3
+MIN_TERM_LENGTH = 3
+
+_RAW_TOKEN_RE = re.compile(r"[^\W_]+")
+
+_STOPWORDS = frozenset({
+    # Español
+    "a", "al", "algo", "ante", "anos", "area", "areas", "buscamos", "cada", "como", "con",
+    "conocimiento", "conocimientos", "contar", "de", "del", "desde", "donde", "el", "ella",
+    "en", "entre", "equipo", "equipos", "es", "esta", "este", "experiencia", "excluyente",
+    "forma", "gran", "ha", "hacia", "la", "las", "lo", "los", "manejo", "mas", "muy", "nivel",
+    "nos", "nuestra", "nuestro", "o", "para", "parte", "persona", "perfil", "por", "puesto",
+    "que", "requisito", "requisitos", "se", "ser", "si", "sin", "sobre", "su", "sus",
+    "tambien", "tener", "trabajo", "u", "un", "una", "uno", "valora", "valoran", "y", "ya",
+    "empresa", "excelente", "buena", "buen", "capacidad", "deseable", "indispensable",
+    # English
+    "about", "ability", "an", "and", "are", "as", "at", "be", "by", "can", "for", "from",
+    "have", "hiring", "in", "including", "is", "it", "join", "looking", "must", "of", "on",
+    "or", "our", "plus", "preferred", "required", "requirements", "responsible", "role",
+    "skills", "strong", "team", "teams", "that", "the", "their", "this", "to", "we",
+    "will", "with", "work", "working", "years", "you", "your", "experience", "knowledge",
+    "excellent", "good", "great", "needed", "position", "candidate", "company",
+})
+
+
+def _compile_skill_vocabulary() -> Dict[str, str]:
+    """Keyword normalizada -> forma canónica, a partir de INDUSTRY_KEYWORDS."""
+    vocabulary: Dict[str, str] = {}
+    for data in INDUSTRY_KEYWORDS.values():
+        for keyword in data.get("keywords", []):
+            key = " ".join(tokenize(keyword))
+            if key:
+                vocabulary.setdefault(key, keyword)
+    return vocabulary
+
+
+_SKILL_VOCABULARY = _compile_skill_vocabulary()
+_MAX_VOCABULARY_NGRAM = max(len(key.split()) for key in _SKILL_VOCABULARY)
+
+
+def _tokens_with_surface(text: str) -> Tuple[List[str], List[str]]:
+    """Tokens normalizados junto con su forma original (para mostrar)."""
+    surface = _RAW_TOKEN_RE.findall(text)
+    return [normalize_for_matching(token) for token in surface], surface
+
+
+def _is_free_term(token: str) -> bool:
+    return len(token) >= MIN_TERM_LENGTH and token not in _STOPWORDS and not token.isdigit()
+
+
+def _iter_candidate_terms(tokens: List[str]) -> Iterable[Tuple[str, int, int]]:
+    """Genera (término, inicio, largo) para skills conocidas y unigramas libres."""
+    for size in range(_MAX_VOCABULARY_NGRAM, 0, -1):
+        for start in range(len(tokens) - size + 1):
+            key = " ".join(tokens[start:start + size])
+            if key in _SKILL_VOCABULARY:
+                yield key, start, size
+    for start, token in enumerate(tokens):
+        if token not in _SKILL_VOCABULARY and _is_free_term(token):
+            yield token, start, 1
+
+
+@lru_cache(maxsize=1)
+def _load_corpus_stats() -> Tuple[int, float, Dict[str, int]]:
+    """Carga el corpus una sola vez: (cantidad de docs, largo promedio, document frequency)."""
+    documents = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+    document_frequency: Counter = Counter()
+    total_length = 0
+    for document in documents:
+        tokens, _ = _tokens_with_surface(document)
+        total_length += len(tokens)
+        document_frequency.update({term for term, _, _ in _iter_candidate_terms(tokens)})
+    doc_count = len(documents)
+    return doc_count, total_length / max(doc_count, 1), dict(document_frequency)
+
+
+def _bm25_weight(term: str, term_frequency: int, doc_length: int) -> float:
+    doc_count, avg_length, document_frequency = _load_corpus_stats()
+    df = document_frequency.get(term, 0)
+    idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_length / max(avg_length, 1.0))
+    return idf * term_frequency * (BM25_K1 + 1) / (term_frequency + norm)
+
+
+def extract_job_requirements(job_description: str) -> List[Dict[str, Any]]:
+    """
+    Extrae los requisitos clave del aviso, ordenados por peso BM25.
+
+    Returns:
+        Lista de dicts con `term` (normalizado), `label` (para mostrar),
+        `weight` y `is_skill`.
+    """
+    tokens, surface = _tokens_with_surface(job_description)
+    frequencies: Counter = Counter()
+    labels: Dict[str, str] = {}
+    covered: set = set()
+
+    # Las skills multi-palabra cubren sus tokens para no duplicar "spring" y "spring boot".
+    for term, start, size in _iter_candidate_terms(tokens):
+        positions = range(start, start + size)
+        if term in _SKILL_VOCABULARY:
+            if size > 1:
+                covered.update(positions)
+            elif start in covered:
+                continue
+            labels.setdefault(term, _SKILL_VOCABULARY[term])
+        else:
+            if start in covered:
+                continue
+            labels.setdefault(term, surface[start])
+        frequencies[term] += 1
+
+    scored = []
+    for term, frequency in frequencies.items():
+        is_skill = term in _SKILL_VOCABULARY
+        weight = _bm25_weight(term, frequency, len(tokens))
+        if is_skill:
+            weight *= VOCABULARY_BOOST
+        scored.append({"term": term, "label": labels[term], "weight": weight, "is_skill": is_skill})
+
+    if not scored:
+        return []
+
+    max_weight = max(item["weight"] for item in scored)
+    requirements = [
+        item for item in scored
+        if item["is_skill"] or item["weight"] >= max_weight * MIN_RELATIVE_WEIGHT
+    ]
+    requirements.sort(key=lambda item: (item["is_skill"], item["weight"]), reverse=True)
+    return requirements[:MAX_REQUIREMENTS]
+
+
+def _collect_strings(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _collect_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _collect_strings(item)
+
+
+def build_cv_term_index(cv_data: Union[Dict[str, Any], str]) -> FrozenSet[str]:
+    """Indexa todo el texto del CV (texto plano o cualquier campo string) como n-gramas."""
+    cv_text = "\n".join(_collect_strings(cv_data))
+    return build_term_index(cv_text, max_ngram=_MAX_VOCABULARY_NGRAM)
+
+
+def score_requirements(
+    requirements: List[Dict[str, Any]],
+    cv_terms: FrozenSet[str],
+) -> Dict[str, Any]:
+    """Cruza requisitos ya extraídos contra el índice de términos de un CV."""
+    matched = [item for item in requirements if item["term"] in cv_terms]
+    missing = [item for item in requirements if item["term"] not in cv_terms]
+    total_weight = sum(item["weight"] for item in requirements)
+    matched_weight = sum(item["weight"] for item in matched)
+    match_score = round(100 * matched_weight / total_weight) if total_weight else 0
+
+    return {
+        "match_score": max(0, min(100, match_score)),
+        "key_requirements": [item["label"] for item in requirements],
+        "matched_skills": [item["label"] for item in matched],
+        "missing_skills": [item["label"] for item in missing],
+    }
+
+
+def match_job_description(job_description: str, cv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calcula el match local entre un aviso y un CV.
+
+    Returns:
+        Dict con `match_score`, `key_requirements`, `matched_skills` y
+        `missing_skills` (mismos nombres que JobAnalysisResponse).
+    """
+    requirements = extract_job_requirements(job_description)
+    return score_requirements(requirements, build_cv_term_index(cv_data))
+
+
+def rank_candidates(
+    job_description: str,
+    candidates: Sequence[Tuple[str, Union[Dict[str, Any], str]]],
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Rankea muchos CVs contra un mismo aviso.
+
+    Los requisitos se extraen (y ponderan) una sola vez; por cada CV solo se
+    indexa su texto y se cruzan los requisitos contra ese índice.
+
+    Args:
+        job_description: Descripción del puesto.
+        candidates: Pares (id, cv_data o texto plano).
+
+    Returns:
+        Tupla (labels de los requisitos, ranking ordenado por match_score).
+    """
+    requirements = extract_job_requirements(job_description)
+
+    ranking: List[Dict[str, Any]] = []
+    for candidate_id, cv in candidates:
+        result = score_requirements(requirements, build_cv_term_index(cv))
+        ranking.append({
+            "id": candidate_id,
+            "match_score": result["match_score"],
+            "matched_skills": result["matched_skills"],
+            "missing_skills": result["missing_skills"],
+        })
+
+    # sort es estable: a igual score se respeta el orden de entrada.
+    ranking.sort(key=lambda item: item["match_score"], reverse=True)
+    for position, item in enumerate(ranking, start=1):
+        item["rank"] = position
+    return [item["label"] for item in requirements], ranking
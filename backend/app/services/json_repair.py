@@ -0,0 +1,425 @@
+"""
+JSON Repair.
+
+Reparación local de respuestas JSON de la IA antes de gastar otro round trip.
+Se aplican, en orden: extracción del bloque ```json```, recorte al objeto más
+externo, normalización de comillas y literales de Python, comas colgantes y
+cierre de objetos truncados. Si el JSON parsea pero no valida, se intenta
+adaptar el payload al modelo Pydantic (coerción de tipos, descarte de campos e
+ítems inválidos). Los contadores se exponen con `get_repair_metrics()`.
+"""
+
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter
+from pydantic import ValidationError as PydanticValidationError
+
+logger = logging.getLogger(__name__)
+
+# Pasadas máximas de coerción: cada una corrige todos los errores reportados.
+MAX_COERCION_PASSES = 3
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_NUMBER_RE = re.compile(r"-?\d+(?:[.,]\d+)?")
+_LIST_SPLIT_RE = re.compile(r"\s*(?:[,;\n•]|\s-\s)\s*")
+_CAMEL_BOUNDARY_RE = re.compile(r"(?<!^)(?=[A-Z])")
+
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+# Comilla de apertura -> comillas que la cierran.
+_QUOTE_PAIRS = {'"': ('"',), "'": ("'",), "“": ("”", '"'), "‘": ("’", "'")}
+_CLOSERS = {"{": "}", "[": "]"}
+
+REPAIRED_EVENTS = frozenset({"parse_repaired", "validation_repaired"})
+
+_metrics_lock = threading.Lock()
+_metrics: Counter = Counter()
+_metrics_by_context: Dict[str, Counter] = {}
+_current_tally: "ContextVar[Optional[RepairTally]]" = ContextVar("json_repair_tally", default=None)
+
+
+# ---------------------------------------------------------------------------
+# Métricas
+# ---------------------------------------------------------------------------
+
+def record_repair_event(event: str, context: str) -> None:
+    """Suma un evento (`parse_repaired`, `validation_repaired`, `failed`, ...)."""
+    with _metrics_lock:
+        _metrics[event] += 1
+        _metrics_by_context.setdefault(context, Counter())[event] += 1
+    tally = _current_tally.get()
+    if tally is not None and event in REPAIRED_EVENTS:
+        tally.repaired = True
+
+
+def record_retry_avoided(context: str) -> None:
+    """Un reintento contra el proveedor que no hizo falta gracias a una reparación."""
+    with _metrics_lock:
+        _metrics["retries_avoided"] += 1
+        _metrics_by_context.setdefault(context, Counter())["retries_avoided"] += 1
+
+
+class RepairTally:
+    """Si hubo alguna reparación exitosa dentro de un `track_repairs()`."""
+
+    def __init__(self) -> None:
+        self.repaired = False
+
+
+@contextmanager
+def track_repairs() -> Iterator[RepairTally]:
+    """
+    Marca si la respuesta procesada en el bloque necesitó reparación. El
+    llamador que así se salteó el re-prompt llama a `record_retry_avoided`
+    una vez, aunque la respuesta se haya reparado en más de un paso.
+    """
+    tally = RepairTally()
+    token = _current_tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _current_tally.reset(token)
+
+
+def get_repair_metrics() -> Dict[str, Any]:
+    """Snapshot de los contadores de reparación."""
+    with _metrics_lock:
+        return {
+            "attempts": _metrics["attempts"],
+            "parse_repaired": _metrics["parse_repaired"],
+            "validation_repaired": _metrics["validation_repaired"],
+            "failed": _metrics["failed"],
+            "retries_avoided": _metrics["retries_avoided"],
+            "by_context": {
+                context: dict(counter) for context, counter in sorted(_metrics_by_context.items())
+            },
+        }
+
+
+def reset_repair_metrics() -> None:
+    with _metrics_lock:
+        _metrics.clear()
+        _metrics_by_context.clear()
+
+
+# ---------------------------------------------------------------------------
+# Reparación de texto
+# ---------------------------------------------------------------------------
+
+def _strip_code_fences(text: str) -> str:
+    match = _FENCE_RE.search(text)
+    return match.group(1).strip() if match else text
+
+
+def _slice_outer_value(text: str) -> str:
+    """Descarta texto antes del primer `{`/`[` y después del último cierre."""
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        return text
+    start = min(starts)
+    end = max(text.rfind("}"), text.rfind("]"))
+    # Si no hay cierre posterior, el JSON está truncado: se conserva hasta el final.
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def _scan(text: str) -> Tuple[str, List[str], Optional[str], Optional[Tuple[str, List[str]]]]:
+    """
+    Normaliza el texto token a token.
+
+    Convierte comillas simples y tipográficas en dobles, escapa saltos de línea
+    dentro de strings, traduce True/False/None y elimina comas colgantes.
+
+    Returns:
+        Tupla (texto normalizado, pila de brackets abiertos, comilla abierta al
+        final o None, último punto de corte seguro con su pila).
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    quote: Optional[str] = None
+    # Índice en `out` (no en el texto) y pila en el último punto de corte seguro.
+    safe_cut: Optional[Tuple[int, List[str]]] = None
+    index = 0
+    length = len(text)
+
+    while index < length:
+        char = text[index]
+
+        if quote is not None:
+            if char == "\\" and index + 1 < length:
+                escaped = text[index + 1]
+                # \' no es un escape válido en JSON.
+                out.append("'" if escaped == "'" else char + escaped)
+                index += 2
+                continue
+            if char in _QUOTE_PAIRS[quote]:
+                out.append('"')
+                quote = None
+            elif char == '"':
+                out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+            elif char == "\r":
+                out.append("\\r")
+            elif char == "\t":
+                out.append("\\t")
+            else:
+                out.append(char)
+            index += 1
+            continue
+
+        if char in _QUOTE_PAIRS:
+            quote = char
+            out.append('"')
+        elif char in _CLOSERS:
+            stack.append(char)
+            out.append(char)
+            safe_cut = (len(out), list(stack))
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            if stack and _CLOSERS[stack[-1]] == char:
+                stack.pop()
+            out.append(char)
+            safe_cut = (len(out), list(stack))
+        elif char == ",":
+            safe_cut = (len(out), list(stack))
+            out.append(char)
+        elif char.isalpha():
+            end = index
+            while end < length and (text[end].isalnum() or text[end] == "_"):
+                end += 1
+            word = text[index:end]
+            out.append(_PYTHON_LITERALS.get(word, word))
+            index = end
+            continue
+        else:
+            out.append(char)
+        index += 1
+
+    cut = ("".join(out[:safe_cut[0]]), safe_cut[1]) if safe_cut is not None else None
+    return "".join(out), stack, quote, cut
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    position = len(out) - 1
+    while position >= 0 and out[position].isspace():
+        position -= 1
+    if position >= 0 and out[position] == ",":
+        del out[position]
+
+
+def _close(text: str, stack: Sequence[str]) -> str:
+    chars = list(text.rstrip())
+    _drop_trailing_comma(chars)
+    # Un ':' final significa que quedó una clave sin valor.
+    if chars and chars[-1] == ":":
+        chars.append("null")
+    return "".join(chars) + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def _loads(text: str) -> Optional[Any]:
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, ValueError):
+        return None
+
+
+def repair_json_text(text: str) -> Optional[Any]:
+    """
+    Intenta recuperar un valor JSON desde texto mal formado.
+
+    Returns:
+        El valor parseado, o None si ninguna reparación alcanzó.
+    """
+    if not isinstance(text, str) or not text.strip():
+        return None
+
+    candidate = _slice_outer_value(_strip_code_fences(text.strip()))
+    parsed = _loads(candidate)
+    if parsed is not None:
+        return parsed
+
+    normalized, stack, quote, safe_cut = _scan(candidate)
+    if not stack and quote is None:
+        return _loads(normalized)
+
+    # Respuesta truncada: primero se cierra tal cual, después en el último corte seguro.
+    completed = normalized + ('"' if quote is not None else "")
+    parsed = _loads(_close(completed, stack))
+    if parsed is not None:
+        return parsed
+    if safe_cut is not None:
+        cut_text, cut_stack = safe_cut
+        return _loads(_close(cut_text, cut_stack))
+    return None
+
+
+def parse_json_with_repair(text: str, context: str) -> Optional[Any]:
+    """json.loads con reparación local; registra métricas si hubo que reparar."""
+    parsed = _loads(text) if isinstance(text, str) else None
+    if parsed is not None:
+        return parsed
+
+    record_repair_event("attempts", context)
+    parsed = repair_json_text(text)
+    if parsed is None:
+        record_repair_event("failed", context)
+        return None
+    logger.info(f"[JSON-REPAIR] Respuesta reparada localmente en {context}.")
+    record_repair_event("parse_repaired", context)
+    return parsed
+
+
+# ---------------------------------------------------------------------------
+# Coerción contra el schema
+# ---------------------------------------------------------------------------
+
+def _key_variants(key: str) -> Tuple[str, ...]:
+    snake = _CAMEL_BOUNDARY_RE.sub("_", key).lower()
+    head, *rest = snake.split("_")
+    camel = head + "".join(part.title() for part in rest)
+    return key, snake, camel
+
+
+def _resolve_key(container: Dict[str, Any], key: str) -> Optional[str]:
+    """Las locs de Pydantic usan el alias; el payload puede venir en snake_case."""
+    for variant in _key_variants(key):
+        if variant in container:
+            return variant
+    return None
+
+
+def _walk(root: Any, loc: Sequence[Any], copied: set) -> Optional[Tuple[Any, Any]]:
+    """
+    Baja por `loc` copiando (una vez) cada contenedor del camino.
+
+    Returns:
+        (contenedor padre, clave/índice resuelto) o None si el camino no existe.
+    """
+    parent = root
+    for depth, step in enumerate(loc):
+        if isinstance(parent, dict) and isinstance(step, str):
+            key = _resolve_key(parent, step)
+        elif isinstance(parent, list) and isinstance(step, int) and 0 <= step < len(parent):
+            key = step
+        else:
+            return None
+        if key is None:
+            return None
+        if depth == len(loc) - 1:
+            return parent, key
+
+        child = parent[key]
+        if isinstance(child, (dict, list)) and id(child) not in copied:
+            child = dict(child) if isinstance(child, dict) else list(child)
+            copied.add(id(child))
+            parent[key] = child
+        parent = child
+    return None
+
+
+def _coerce_value(error_type: str, value: Any) -> Tuple[bool, Any]:
+    """Convierte valores con el tipo equivocado. Devuelve (pudo, valor)."""
+    if error_type == "string_type":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return True, str(value)
+        if isinstance(value, list) and all(isinstance(item, (str, int, float)) for item in value):
+            return True, ", ".join(str(item) for item in value)
+    elif error_type in ("int_parsing", "int_type", "float_parsing", "float_type"):
+        match = _NUMBER_RE.search(value) if isinstance(value, str) else None
+        if match:
+            number = float(match.group().replace(",", "."))
+            return True, int(round(number)) if error_type.startswith("int") else number
+    elif error_type == "list_type":
+        if isinstance(value, str):
+            return True, [item for item in _LIST_SPLIT_RE.split(value) if item]
+        if isinstance(value, dict):
+            return True, [value]
+    elif error_type == "bool_parsing" and isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("si", "sí", "yes", "true", "actual", "presente", "current"):
+            return True, True
+        if lowered in ("no", "false", ""):
+            return True, False
+    return False, None
+
+
+def _apply_fixes(root: Dict[str, Any], errors: List[Dict[str, Any]]) -> bool:
+    """Aplica una pasada de correcciones. Devuelve False si no se pudo tocar nada."""
+    copied: set = {id(root)}
+    removals: Dict[int, Tuple[Any, set]] = {}
+    changed = False
+
+    for error in errors:
+        loc = list(error.get("loc", ()))
+        if not loc:
+            continue
+        error_type = error.get("type", "")
+
+        if error_type == "missing":
+            # Un ítem de lista sin un campo obligatorio se descarta entero.
+            list_depth = max((i for i, step in enumerate(loc) if isinstance(step, int)), default=None)
+            if list_depth is None:
+                continue
+            target = _walk(root, loc[:list_depth + 1], copied)
+        else:
+            target = _walk(root, loc, copied)
+            if target is None:
+                continue
+            container, key = target
+            fixed, value = _coerce_value(error_type, container[key])
+            if fixed:
+                container[key] = value
+                changed = True
+                continue
+
+        if target is None:
+            continue
+        container, key = target
+        if isinstance(container, dict):
+            # Un campo inválido se quita; si era obligatorio, la próxima pasada lo
+            # reporta como "missing" y se descarta el ítem que lo contiene.
+            container.pop(key, None)
+            changed = True
+        else:
+            removals.setdefault(id(container), (container, set()))[1].add(key)
+
+    for container, indexes in removals.values():
+        for index in sorted(indexes, reverse=True):
+            del container[index]
+        changed = True
+    return changed
+
+
+def coerce_to_model(model_cls: Any, payload: Dict[str, Any], context: str) -> Optional[Any]:
+    """
+    Adapta un payload que no valida al modelo indicado, sin mutar el original.
+
+    Returns:
+        La instancia validada, o None si la coerción no alcanzó.
+    """
+    if not isinstance(payload, dict):
+        return None
+
+    adapter = model_cls if isinstance(model_cls, TypeAdapter) else TypeAdapter(model_cls)
+    record_repair_event("attempts", context)
+    candidate = dict(payload)
+
+    for attempt in range(MAX_COERCION_PASSES + 1):
+        try:
+            validated = adapter.validate_python(candidate)
+        except PydanticValidationError as exc:
+            if attempt == MAX_COERCION_PASSES or not _apply_fixes(candidate, exc.errors()):
+                break
+            continue
+        logger.info(f"[JSON-REPAIR] Payload adaptado al schema en {context}.")
+        record_repair_event("validation_repaired", context)
+        return validated
+
+    record_repair_event("failed", context)
+    return None
@@ -0,0 +1,171 @@
+"""
+Language Detection.
+
+Detección de idioma (es/en) compartida por todos los servicios. Un único regex
+compilado recorre el texto una sola vez y los resultados se memorizan por hash
+del texto. Para el chat, el estado se guarda en `ChatSession.language` y se
+actualiza solo con los mensajes nuevos.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.api.schemas import ChatMessage, ChatSession, LanguageState
+
+# Peso de los mensajes anteriores al sumar uno nuevo: los últimos mensajes
+# mandan, como la ventana de 5 mensajes que se usaba antes.
+HISTORY_DECAY = 0.6
+HISTORY_WINDOW = 5
+SIGNAL_CACHE_SIZE = 2048
+
+_SPANISH_WORDS = (
+    "hola", "buenas", "che", "dale", "me llamo", "mi nombre", "mi", "nombre", "usted", "ustedes",
+    "años", "experiencia", "educación", "habilidades", "proyectos", "certificaciones",
+    "responsabilidades", "presente", "licenciatura", "ingeniería", "trabajo", "equipo",
+    "quiero", "ahora", "solo", "sin", "con", "en", "para", "por", "que", "de", "del", "el",
+    "la", "los", "las", "un", "y",
+    "una", "como", "curriculum", "currículum", "cv", "ponelo", "ponlo", "hacelo", "hazlo",
+)
+_SPANISH_PREFIXES = ("trabaj", "desarroll", "realic", "lider", "gestion")
+_ENGLISH_WORDS = (
+    "hello", "hi", "my name", "my", "i am", "i'm", "experience", "education", "skills",
+    "projects", "resume", "current job", "teamwork", "employee", "years", "worked",
+    "developed", "managed", "responsible", "the", "and", "with", "of", "for", "to",
+)
+# Solo frases de pedido: "nivel de inglés avanzado" no debe cambiar el idioma.
+_SPANISH_REQUESTS = (
+    "en español", "en espanol", "solo español", "solo espanol", "in spanish", "spanish please",
+    "castellano",
+)
+_ENGLISH_REQUESTS = (
+    "en inglés", "en ingles", "solo inglés", "solo ingles", "in english", "english please",
+    "english only",
+)
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    # Las frases más largas primero para que "en español" gane sobre "en".
+    return "|".join(re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True))
+
+
+# Un solo scanner: los pedidos explícitos van antes que las palabras sueltas.
+_LANGUAGE_SIGNAL_RE = re.compile(
+    rf"\b(?:(?P<es_request>{_alternation(_SPANISH_REQUESTS)})"
+    rf"|(?P<en_request>{_alternation(_ENGLISH_REQUESTS)})"
+    rf"|(?P<es>{_alternation(_SPANISH_WORDS)}|(?:{'|'.join(_SPANISH_PREFIXES)})\w*)"
+    rf"|(?P<en>{_alternation(_ENGLISH_WORDS)}))\b"
+    r"|(?P<es_char>[ñ¿¡])",
+    re.IGNORECASE,
+)
+
+_signal_cache: "OrderedDict[bytes, Tuple[int, int, Optional[str]]]" = OrderedDict()
+
+
+def _text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def scan_language_signals(text: str) -> Tuple[int, int, Optional[str]]:
+    """
+    Cuenta señales de español/inglés en una sola pasada.
+
+    Returns:
+        Tupla (señales es, señales en, último pedido explícito de idioma o None).
+    """
+    if not text:
+        return 0, 0, None
+
+    key = _text_digest(text)
+    cached = _signal_cache.get(key)
+    if cached is not None:
+        _signal_cache.move_to_end(key)
+        return cached
+
+    spanish = english = 0
+    explicit: Optional[str] = None
+    for match in _LANGUAGE_SIGNAL_RE.finditer(text):
+        group = match.lastgroup
+        if group in ("es", "es_char"):
+            spanish += 1
+        elif group == "en":
+            english += 1
+        elif group == "es_request":
+            explicit = "es"
+        elif group == "en_request":
+            explicit = "en"
+
+    result = (spanish, english, explicit)
+    _signal_cache[key] = result
+    if len(_signal_cache) > SIGNAL_CACHE_SIZE:
+        _signal_cache.popitem(last=False)
+    return result
+
+
+def detect_language(text: str) -> str:
+    """Detecta el idioma (es/en) de un texto. Ante empate o texto vacío devuelve español."""
+    spanish, english, _ = scan_language_signals(text)
+    return "es" if spanish >= english else "en"
+
+
+def _collect_cv_language_samples(cv_data: Dict[str, Any]) -> List[str]:
+    samples: List[str] = []
+    personal_info = cv_data.get("personalInfo") or {}
+    if isinstance(personal_info, dict) and personal_info.get("summary"):
+        samples.append(str(personal_info["summary"]))
+    for section in ("experience", "education", "projects"):
+        for item in cv_data.get(section) or []:
+            if isinstance(item, dict) and item.get("description"):
+                samples.append(str(item["description"]))
+            if isinstance(item, dict) and item.get("position"):
+                samples.append(str(item["position"]))
+    return samples
+
+
+def detect_cv_language(cv_data: Dict[str, Any]) -> str:
+    """Detecta el idioma de un CV a partir de su resumen y descripciones."""
+    return detect_language("\n".join(_collect_cv_language_samples(cv_data or {})))
+
+
+def apply_message_to_language_state(state: LanguageState, text: str) -> LanguageState:
+    """Suma un mensaje del usuario al estado de idioma (en el lugar) y lo devuelve."""
+    spanish, english, explicit = scan_language_signals(text)
+    state.es_score = state.es_score * HISTORY_DECAY + spanish
+    state.en_score = state.en_score * HISTORY_DECAY + english
+    if explicit:
+        state.explicit = explicit
+    state.code = state.explicit or ("es" if state.es_score >= state.en_score else "en")
+    return state
+
+
+def update_session_language(session: ChatSession) -> str:
+    """
+    Actualiza `session.language` con los mensajes nuevos y devuelve el idioma.
+
+    Solo se escanean los mensajes agregados desde la última llamada.
+    """
+    state = session.language
+    if state.scanned_messages > len(session.messages):
+        # El historial se recortó o reemplazó: se recalcula desde cero.
+        state = session.language = LanguageState()
+
+    for message in session.messages[state.scanned_messages:]:
+        if message.role == "user":
+            apply_message_to_language_state(state, message.content)
+    state.scanned_messages = len(session.messages)
+    return state.code
+
+
+def detect_language_preference(message: str, history: List[ChatMessage]) -> str:
+    """
+    Detecta la preferencia de idioma sin sesión persistida.
+
+    Usa los últimos mensajes del usuario más el mensaje actual; los pedidos
+    explícitos ("en inglés", "in Spanish") tienen prioridad.
+    """
+    state = LanguageState()
+    user_messages = [msg.content for msg in history[-HISTORY_WINDOW:] if msg.role == "user"]
+    for text in user_messages + [message]:
+        apply_message_to_language_state(state, text)
+    return state.code
@@ -0,0 +1,172 @@
+"""
+Partial JSON.
+
+Parser incremental para respuestas JSON en streaming. Recorre los tokens a
+medida que llegan y avisa cuando se completa cada sección del objeto raíz
+(`personalInfo`, `skills`, ...) y cada ítem de las secciones que son listas
+(`experience[0]`, `experience[1]`, ...), sin re-parsear el buffer completo.
+El texto fuera del objeto raíz (```json, prosa) se ignora.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """
+    Recibe fragmentos con `feed()` y devuelve los eventos que completan.
+
+    Eventos:
+        {"type": "item", "section": str, "index": int, "data": Any}
+        {"type": "section", "section": str, "data": Any}
+
+    Los valores `null` no generan evento.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start: Optional[int] = None
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._await_value = False
+        self._value_start: Optional[int] = None
+        self._array_section = False
+        self._await_item = False
+        self._item_start: Optional[int] = None
+        self._item_index = 0
+        self.done = False
+
+    @property
+    def text(self) -> str:
+        """Todo lo recibido hasta ahora (para la validación final)."""
+        return self._buffer
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        if not chunk:
+            return events
+        self._buffer += chunk
+        buffer = self._buffer
+
+        while self._pos < len(buffer) and not self.done:
+            position = self._pos
+            char = buffer[position]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._on_string_end(position, events)
+                continue
+
+            if char in _WHITESPACE:
+                continue
+            if self._depth == 0:
+                # Prosa o fences antes del objeto raíz.
+                if char == "{":
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+
+            self._mark_value_start(char, position)
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._on_close(position, events)
+            elif char == ",":
+                self._on_comma(position, events)
+            elif char == ":" and self._depth == 1:
+                self._await_value = True
+
+        return events
+
+    # ------------------------------------------------------------------
+
+    def _mark_value_start(self, char: str, position: int) -> None:
+        if self._depth == 1 and self._await_value:
+            self._await_value = False
+            self._value_start = position
+            self._array_section = char == "["
+            self._await_item = self._array_section
+            self._item_index = 0
+        elif self._depth == 2 and self._array_section and self._await_item and char != "]":
+            self._await_item = False
+            self._item_start = position
+
+    def _on_string_end(self, position: int, events: List[Dict[str, Any]]) -> None:
+        if self._depth == 1 and self._expect_key:
+            self._expect_key = False
+            self._key = self._load(self._string_start, position + 1)
+        elif self._depth == 1 and self._value_start == self._string_start:
+            self._complete_section(position + 1, events)
+        elif self._depth == 2 and self._array_section and self._item_start == self._string_start:
+            self._complete_item(position + 1, events)
+
+    def _on_close(self, position: int, events: List[Dict[str, Any]]) -> None:
+        # Un escalar sin comilla (número, true, null) termina con el cierre del contenedor.
+        if self._depth == 1 and self._pending_scalar(self._value_start):
+            self._complete_section(position, events)
+        elif self._depth == 2 and self._array_section and self._pending_scalar(self._item_start):
+            self._complete_item(position, events)
+
+        self._depth -= 1
+        if self._depth == 0:
+            self.done = True
+        elif self._depth == 1 and self._value_start is not None:
+            self._complete_section(position + 1, events)
+        elif self._depth == 2 and self._array_section and self._item_start is not None:
+            self._complete_item(position + 1, events)
+
+    def _on_comma(self, position: int, events: List[Dict[str, Any]]) -> None:
+        if self._depth == 1:
+            if self._pending_scalar(self._value_start):
+                self._complete_section(position, events)
+            self._expect_key = True
+        elif self._depth == 2 and self._array_section:
+            if self._pending_scalar(self._item_start):
+                self._complete_item(position, events)
+            self._await_item = True
+
+    def _pending_scalar(self, start: Optional[int]) -> bool:
+        return start is not None and self._buffer[start] not in '"{['
+
+    def _complete_section(self, end: int, events: List[Dict[str, Any]]) -> None:
+        start, self._value_start = self._value_start, None
+        self._array_section = False
+        value = self._load(start, end)
+        if self._key is not None and value is not None:
+            events.append({"type": "section", "section": self._key, "data": value})
+
+    def _complete_item(self, end: int, events: List[Dict[str, Any]]) -> None:
+        start, self._item_start = self._item_start, None
+        value = self._load(start, end)
+        if self._key is not None and value is not None:
+            events.append({
+                "type": "item",
+                "section": self._key,
+                "index": self._item_index,
+                "data": value,
+            })
+        self._item_index += 1
+
+    def _load(self, start: Optional[int], end: int) -> Optional[Any]:
+        if start is None:
+            return None
+        try:
+            return json.loads(self._buffer[start:end])
+        except (json.JSONDecodeError, ValueError):
+            return None
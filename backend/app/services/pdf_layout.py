@@ -0,0 +1,106 @@
+"""
+PDF Layout.
+
+Corte de líneas para el exportador PDF con las métricas reales de las fuentes
+(`pdfmetrics.stringWidth`). El ancho de cada glifo se cachea por (fuente,
+tamaño) y el resultado del wrap se memoiza por texto, así los strings que se
+repiten (títulos, fechas, empresas) no se vuelven a medir.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+WRAP_CACHE_SIZE = 4096
+
+_glyph_widths: Dict[Tuple[str, float], Dict[str, float]] = {}
+
+
+def _widths_for(font_name: str, font_size: float) -> Dict[str, float]:
+    key = (font_name, font_size)
+    widths = _glyph_widths.get(key)
+    if widths is None:
+        widths = _glyph_widths[key] = {}
+    return widths
+
+
+def text_width(text: str, font_name: str, font_size: float) -> float:
+    """
+    Ancho de `text` en puntos.
+
+    Las fuentes estándar de ReportLab no aplican kerning, así que el ancho de
+    un string es la suma del ancho de sus glifos.
+    """
+    widths = _widths_for(font_name, font_size)
+    total = 0.0
+    for char in text:
+        width = widths.get(char)
+        if width is None:
+            width = widths[char] = stringWidth(char, font_name, font_size)
+        total += width
+    return total
+
+
+def _break_long_word(word: str, font_name: str, font_size: float, max_width: float) -> List[str]:
+    """Corta una palabra que no entra en una línea (URLs, hashes) por caracteres."""
+    widths = _widths_for(font_name, font_size)
+    pieces: List[str] = []
+    current = ""
+    current_width = 0.0
+    for char in word:
+        char_width = widths.get(char)
+        if char_width is None:
+            char_width = widths[char] = stringWidth(char, font_name, font_size)
+        if current and current_width + char_width > max_width:
+            pieces.append(current)
+            current, current_width = "", 0.0
+        current += char
+        current_width += char_width
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+@lru_cache(maxsize=WRAP_CACHE_SIZE)
+def wrap_lines(text: str, font_name: str, font_size: float, max_width: float) -> Tuple[str, ...]:
+    """
+    Corta `text` en líneas que entran en `max_width` (greedy, como `textwrap`).
+
+    Los espacios en blanco consecutivos y los saltos de línea se colapsan en un
+    espacio. Devuelve una tupla porque el resultado es compartido por la cache.
+    """
+    words = text.split()
+    if not words:
+        return ()
+
+    space_width = text_width(" ", font_name, font_size)
+    lines: List[str] = []
+    current: List[str] = []
+    current_width = 0.0
+    for word in words:
+        word_width = text_width(word, font_name, font_size)
+        if word_width > max_width:
+            if current:
+                lines.append(" ".join(current))
+            *full, tail = _break_long_word(word, font_name, font_size, max_width)
+            lines.extend(full)
+            current = [tail]
+            current_width = text_width(tail, font_name, font_size)
+            continue
+
+        needed = word_width + (space_width if current else 0.0)
+        if current and current_width + needed > max_width:
+            lines.append(" ".join(current))
+            current, current_width = [word], word_width
+        else:
+            current.append(word)
+            current_width += needed
+    if current:
+        lines.append(" ".join(current))
+    return tuple(lines)
+
+
+def clear_layout_caches() -> None:
+    _glyph_widths.clear()
+    wrap_lines.cache_clear()
@@ -0,0 +1,237 @@
+"""
+Section Planner.
+
+Parte la reescritura de un CV completo en llamadas independientes por sección
+(resumen, cada experiencia, skills, proyectos) que corren en paralelo con a lo
+sumo `AI_SECTION_CONCURRENCY` en vuelo. Cada respuesta es corta, así que el
+tiempo total pasa a ser el de la sección más lenta y no el de generar un JSON
+con el CV entero. Las secciones que no se reescriben (educación, idiomas,
+certificaciones) pasan tal cual.
+
+El módulo no conoce a los proveedores: recibe la función de completion, así lo
+pueden usar tanto `cv_generator` como `ai_service`.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+Completion = Callable[[str], Awaitable[Any]]
+
+SECTION_GOALS = {
+    "generate": "Polish it for a job application: clear, impactful and consistent",
+    "improve": "Improve clarity and impact without expanding its length",
+    "shrink": "Condense it by 30-50%, removing filler and repeated statements",
+}
+
+_SECTION_PROMPT = """
+Task: Rewrite the {label} of a CV. {goal}.
+
+Rules:
+1. Preserve facts; do NOT invent companies, dates, metrics or titles.
+2. Use active voice and strong verbs.
+3. LANGUAGE: {language}
+{rules}
+Candidate context (do not rewrite): {context}
+
+Input:
+{content}
+
+FORMAT: JSON {output}
+{instructions}
+"""
+
+_SECTION_SPECS = {
+    "summary": {
+        "label": "Professional Summary",
+        "rules": "4. 2-3 lines, 45-70 words. If it is empty, write one from the context.\n",
+        "output": '{ "summary": "..." }',
+    },
+    "experience": {
+        "label": "experience entry",
+        "rules": "4. Keep company, position, dates and location unchanged.\n"
+                 "5. Description: 2-4 bullet-like sentences. Highlights: short achievements.\n",
+        "output": '{ "description": "...", "highlights": ["..."] }',
+    },
+    "skills": {
+        "label": "skills list",
+        "rules": "4. Merge duplicates and fix names. Levels: Beginner, Intermediate, Advanced or Expert.\n",
+        "output": '{ "skills": [ { "name": "...", "level": "Advanced", "category": "..." } ] }',
+    },
+    "projects": {
+        "label": "projects list",
+        "rules": "4. Keep names and URLs unchanged. Same order and count as the input.\n",
+        "output": '{ "projects": [ { "description": "...", "technologies": ["..."] } ] }',
+    },
+}
+
+
+@dataclass(frozen=True)
+class SectionTask:
+    """Una llamada del plan: sección, índice del ítem (solo experiencia) y prompt."""
+
+    section: str
+    index: Optional[int]
+    prompt: str
+
+
+# Tarea que está ejecutando `complete`, para que pueda etiquetar lo que emite
+# (p. ej. los fragmentos de texto en streaming) sin cambiar su firma.
+current_section_task: contextvars.ContextVar[Optional[SectionTask]] = contextvars.ContextVar(
+    "current_section_task", default=None
+)
+
+
+def _candidate_context(cv_data: Dict[str, Any]) -> str:
+    personal = cv_data.get("personalInfo") or {}
+    roles = [
+        f"{item.get('position', '')} @ {item.get('company', '')}".strip(" @")
+        for item in (cv_data.get("experience") or [])[:5]
+        if isinstance(item, dict)
+    ]
+    parts = [personal.get("role") or "", "; ".join(role for role in roles if role)]
+    return " | ".join(part for part in parts if part) or "n/a"
+
+
+def _section_prompt(section: str, content: Any, goal: str, context: str, language: str, instructions: str) -> str:
+    spec = _SECTION_SPECS[section]
+    return _SECTION_PROMPT.format(
+        label=spec["label"],
+        goal=goal,
+        language=language,
+        rules=spec["rules"],
+        context=context,
+        content=json.dumps(content, indent=2, ensure_ascii=False) if not isinstance(content, str) else content,
+        output=spec["output"],
+        instructions=instructions,
+    ).strip()
+
+
+def plan_sections(
+    cv_data: Dict[str, Any],
+    mode: str,
+    language: str,
+    instructions: str = "",
+) -> List[SectionTask]:
+    """
+    Tareas independientes para reescribir el CV.
+
+    Args:
+        mode: "generate", "improve" o "shrink" (ver `SECTION_GOALS`).
+        instructions: Texto extra para cada llamada (p. ej. el prompt de formato de la plantilla).
+    """
+    goal = SECTION_GOALS.get(mode, SECTION_GOALS["improve"])
+    context = _candidate_context(cv_data)
+    experience = [item for item in (cv_data.get("experience") or []) if isinstance(item, dict)]
+
+    def prompt(section: str, content: Any) -> str:
+        return _section_prompt(section, content, goal, context, language, instructions)
+
+    tasks: List[SectionTask] = []
+    summary = (cv_data.get("personalInfo") or {}).get("summary") or ""
+    if summary or experience:
+        tasks.append(SectionTask("summary", None, prompt("summary", summary)))
+    for index, item in enumerate(cv_data.get("experience") or []):
+        if isinstance(item, dict):
+            tasks.append(SectionTask("experience", index, prompt("experience", item)))
+    for section in ("skills", "projects"):
+        items = cv_data.get(section) or []
+        if items:
+            tasks.append(SectionTask(section, None, prompt(section, items)))
+    return tasks
+
+
+async def run_section_plan(
+    tasks: Sequence[SectionTask],
+    complete: Completion,
+    concurrency: int,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Ejecuta el plan en paralelo (a lo sumo `concurrency` llamadas a la vez).
+
+    Una sección que falla queda en None y se conserva el contenido original;
+    si fallan todas se propaga el primer error (proveedor caído, sin API key).
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run(task: SectionTask) -> Any:
+        async with semaphore:
+            current_section_task.set(task)
+            return await complete(task.prompt)
+
+    outcomes = await asyncio.gather(*(_run(task) for task in tasks), return_exceptions=True)
+    errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    if tasks and len(errors) == len(tasks):
+        raise errors[0]
+
+    results: List[Optional[Dict[str, Any]]] = []
+    for task, outcome in zip(tasks, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning(f"[SECTIONS] Falló {task.section}[{task.index}]: {outcome}")
+            results.append(None)
+        else:
+            results.append(outcome if isinstance(outcome, dict) else None)
+    return results
+
+
+def _merge_by_index(
+    original: List[Any],
+    updated: Any,
+    fields: Sequence[str],
+) -> List[Any]:
+    """Toma `fields` de la respuesta ítem por ítem; el resto (nombres, URLs, IDs) queda fijo."""
+    if not isinstance(updated, list):
+        return original
+    merged = []
+    for index, item in enumerate(original):
+        candidate = updated[index] if index < len(updated) else None
+        if isinstance(item, dict) and isinstance(candidate, dict):
+            item = {**item, **{key: candidate[key] for key in fields if candidate.get(key)}}
+        merged.append(item)
+    return merged
+
+
+def assemble_sections(
+    cv_data: Dict[str, Any],
+    tasks: Sequence[SectionTask],
+    results: Sequence[Optional[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    """CV con las secciones reescritas aplicadas sobre el original (que no se muta)."""
+    assembled = dict(cv_data)
+    assembled["personalInfo"] = dict(cv_data.get("personalInfo") or {})
+    assembled["experience"] = list(cv_data.get("experience") or [])
+
+    for task, response in zip(tasks, results):
+        if not response:
+            continue
+        if task.section == "summary":
+            summary = response.get("summary") or (response.get("personalInfo") or {}).get("summary")
+            if isinstance(summary, str) and summary.strip():
+                assembled["personalInfo"]["summary"] = summary.strip()
+        elif task.section == "experience":
+            entry = response.get("experience", response)
+            if isinstance(entry, list) and entry:
+                entry = entry[0]
+            assembled["experience"][task.index] = _merge_by_index(
+                [assembled["experience"][task.index]], [entry], ("description", "highlights")
+            )[0]
+        elif task.section == "skills":
+            skills = response.get("skills")
+            if isinstance(skills, list):
+                normalized = [
+                    {"name": skill} if isinstance(skill, str) else skill
+                    for skill in skills
+                    if isinstance(skill, (str, dict))
+                ]
+                if normalized:
+                    assembled["skills"] = normalized
+        elif task.section == "projects":
+            assembled["projects"] = _merge_by_index(
+                list(cv_data.get("projects") or []), response.get("projects"), ("description", "technologies")
+            )
+    return assembled
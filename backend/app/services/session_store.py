@@ -1,19 +1,42 @@
-import json
+import asyncio
+import logging
 import os
+import uuid
+import weakref
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional, Set
 
 import aiosqlite
 import redis.asyncio as redis
 import asyncpg
 from app.api.schemas import ChatSession
+from app.core.config import settings
+from app.core.serialization import dump_model, load_model, loads
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_TTL_SECONDS = 60 * 60 * 24
+INVALIDATION_CHANNEL = "chat-sessions:invalidate"
 
 
 class BaseSessionStore(ABC):
+    def __init__(self) -> None:
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        """
+        Lock por sesión (dentro del proceso) para que dos requests de la misma
+        sesión no se pisen entre leer, modificar y guardar.
+        """
+        session_lock = self._locks.get(session_id)
+        if session_lock is None:
+            session_lock = asyncio.Lock()
+            self._locks[session_id] = session_lock
+        return session_lock
+
     @abstractmethod
     async def get_session(self, session_id: str) -> Optional[ChatSession]:
         pass
@@ -26,11 +49,18 @@ class BaseSessionStore(ABC):
     async def initialize(self) -> None:
         pass
 
+    async def flush(self, session_id: str) -> None:
+        """Escribe lo pendiente de la sesión. Los backends escriben en `save_session`."""
+
+    async def close(self) -> None:
+        pass
+
 
 class SQLiteSessionStore(BaseSessionStore):
     """Persistencia de sesiones de chat con SQLite (async)."""
 
     def __init__(self, db_path: Path, ttl_seconds: int) -> None:
+        super().__init__()
         self.db_path = db_path
         self.ttl_seconds = ttl_seconds
 
@@ -66,8 +96,7 @@ class SQLiteSessionStore(BaseSessionStore):
         if not row:
             return None
 
-        payload = json.loads(row[0])
-        return ChatSession.model_validate(payload)
+        return load_model(ChatSession, row[0])
 
     async def save_session(self, session: ChatSession) -> None:
         now = datetime.utcnow()
@@ -76,7 +105,7 @@ class SQLiteSessionStore(BaseSessionStore):
             session.created_at = now
 
         expires_at = (now + timedelta(seconds=self.ttl_seconds)).isoformat()
-        payload = json.dumps(session.model_dump(mode="json"))
+        payload = dump_model(session)
 
         async with aiosqlite.connect(self.db_path) as db:
             await self._cleanup_expired(db)
@@ -109,6 +138,7 @@ class RedisSessionStore(BaseSessionStore):
     """Persistencia de sesiones de chat con Redis."""
 
     def __init__(self, redis_url: str, ttl_seconds: int) -> None:
+        super().__init__()
         self.redis_url = redis_url
         self.ttl_seconds = ttl_seconds
         self.redis: Optional[redis.Redis] = None
@@ -123,8 +153,7 @@ class RedisSessionStore(BaseSessionStore):
         if not data:
             return None
 
-        payload = json.loads(data)
-        return ChatSession.model_validate(payload)
+        return load_model(ChatSession, data)
 
     async def save_session(self, session: ChatSession) -> None:
         await self.initialize()
@@ -133,7 +162,7 @@ class RedisSessionStore(BaseSessionStore):
         if not session.created_at:
             session.created_at = now
 
-        payload = json.dumps(session.model_dump(mode="json"))
+        payload = dump_model(session)
         await self.redis.set(
             f"session:{session.session_id}", payload, ex=self.ttl_seconds
         )
@@ -143,6 +172,7 @@ class PostgresSessionStore(BaseSessionStore):
     """Persistencia de sesiones de chat con PostgreSQL."""
 
     def __init__(self, dsn: str, ttl_seconds: int) -> None:
+        super().__init__()
         self.dsn = dsn
         self.ttl_seconds = ttl_seconds
         self.pool: Optional[asyncpg.Pool] = None
@@ -183,7 +213,7 @@ class PostgresSessionStore(BaseSessionStore):
         # asyncpg converts JSONB automatically to dict
         data = row["data"]
         if isinstance(data, str):
-            data = json.loads(data)
+            data = loads(data)
         return ChatSession.model_validate(data)
 
     async def save_session(self, session: ChatSession) -> None:
@@ -194,7 +224,7 @@ class PostgresSessionStore(BaseSessionStore):
             session.created_at = now
 
         expires_at = now + timedelta(seconds=self.ttl_seconds)
-        payload = session.model_dump(mode="json")
+        payload = dump_model(session)
 
         async with self.pool.acquire() as conn:
             await self._cleanup_expired(conn)
@@ -213,14 +243,203 @@ class PostgresSessionStore(BaseSessionStore):
                     expires_at = EXCLUDED.expires_at
                 """,
                 session.session_id,
-                json.dumps(payload),
+                payload,
                 session.created_at,
                 session.updated_at,
                 expires_at,
             )
 
 
-def _load_store() -> BaseSessionStore:
+class RedisSessionInvalidator:
+    """
+    Avisa por Redis pub/sub qué sesiones se escribieron, para que los otros
+    workers descarten su copia cacheada. Cada proceso ignora sus propios avisos.
+    """
+
+    def __init__(self, redis_url: str, channel: str = INVALIDATION_CHANNEL) -> None:
+        self.redis_url = redis_url
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self.redis: Optional[redis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, on_invalidate: Callable[[str], None]) -> None:
+        if not self.redis:
+            self.redis = redis.from_url(self.redis_url, decode_responses=True)
+        if not self._listener:
+            self._listener = asyncio.create_task(self._listen(on_invalidate))
+
+    async def _listen(self, on_invalidate: Callable[[str], None]) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Los avisos de mientras no había suscripción se perdieron: se descarta lo cacheado.
+                on_invalidate("")
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    origin, _, session_id = message["data"].partition(":")
+                    if origin != self.origin:
+                        on_invalidate(session_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[SESSIONS] Se cortó la suscripción de invalidación: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def publish(self, session_id: str) -> None:
+        await self.redis.publish(self.channel, f"{self.origin}:{session_id}")
+
+    async def close(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        if self.redis:
+            await self.redis.aclose()
+            self.redis = None
+
+
+class CachedSessionStore(BaseSessionStore):
+    """
+    Tier en memoria delante de otro store, con escritura diferida (write-behind).
+
+    Las sesiones cacheadas se leen sin tocar el backend. `save_session` solo
+    marca la sesión como sucia y programa la escritura para dentro de
+    `flush_delay` segundos; `flush()` (al terminar un turno) escribe en el
+    momento. Todos los guardados de un turno terminan en una sola escritura.
+    Con varios workers hace falta un `invalidator`: cada escritura se publica y
+    los demás procesos descartan su copia.
+    """
+
+    def __init__(
+        self,
+        backend: BaseSessionStore,
+        max_entries: int,
+        flush_delay: float,
+        ttl_seconds: int,
+        invalidator: Optional[RedisSessionInvalidator] = None,
+    ) -> None:
+        super().__init__()
+        self.backend = backend
+        self.max_entries = max_entries
+        self.flush_delay = flush_delay
+        self.ttl_seconds = ttl_seconds
+        self.invalidator = invalidator
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._flush_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._background: Set[asyncio.Task] = set()
+
+    async def initialize(self) -> None:
+        await self.backend.initialize()
+        if self.invalidator:
+            await self.invalidator.start(self.invalidate)
+
+    async def get_session(self, session_id: str) -> Optional[ChatSession]:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            if session_id in self._dirty or not self._expired(session):
+                self._sessions.move_to_end(session_id)
+                return session
+            del self._sessions[session_id]
+
+        session = await self.backend.get_session(session_id)
+        if session is not None:
+            self._remember(session)
+        return session
+
+    async def save_session(self, session: ChatSession) -> None:
+        now = datetime.utcnow()
+        session.updated_at = now
+        if not session.created_at:
+            session.created_at = now
+
+        session_id = session.session_id
+        self._dirty.add(session_id)
+        self._remember(session)
+        if session_id not in self._timers:
+            self._timers[session_id] = asyncio.get_running_loop().call_later(
+                self.flush_delay, self._flush_later, session_id
+            )
+
+    async def flush(self, session_id: str) -> None:
+        timer = self._timers.pop(session_id, None)
+        if timer:
+            timer.cancel()
+
+        flush_lock = self._flush_locks.get(session_id)
+        if flush_lock is None:
+            flush_lock = asyncio.Lock()
+            self._flush_locks[session_id] = flush_lock
+        async with flush_lock:
+            if session_id not in self._dirty:
+                return
+            self._dirty.discard(session_id)
+            try:
+                await self.backend.save_session(self._sessions[session_id])
+            except Exception:
+                self._dirty.add(session_id)
+                raise
+
+        if self.invalidator:
+            try:
+                await self.invalidator.publish(session_id)
+            except Exception as e:
+                logger.error(f"[SESSIONS] No se pudo publicar la invalidación de {session_id}: {e}")
+
+    async def flush_all(self) -> None:
+        for session_id in list(self._dirty):
+            try:
+                await self.flush(session_id)
+            except Exception:
+                logger.exception(f"[SESSIONS] Falló la escritura de la sesión {session_id}")
+
+    async def close(self) -> None:
+        await self.flush_all()
+        if self.invalidator:
+            await self.invalidator.close()
+        await self.backend.close()
+
+    def invalidate(self, session_id: str) -> None:
+        """Descarta la copia cacheada (otro worker escribió la sesión). `""` descarta todas."""
+        session_ids = list(self._sessions) if not session_id else [session_id]
+        for cached_id in session_ids:
+            if cached_id in self._dirty:
+                # La escritura pendiente de este worker gana, como sin cache.
+                logger.warning(f"[SESSIONS] Sesión {cached_id} modificada en otro worker con cambios sin escribir")
+                continue
+            self._sessions.pop(cached_id, None)
+
+    def _expired(self, session: ChatSession) -> bool:
+        return (datetime.utcnow() - session.updated_at).total_seconds() > self.ttl_seconds
+
+    def _remember(self, session: ChatSession) -> None:
+        self._sessions[session.session_id] = session
+        self._sessions.move_to_end(session.session_id)
+        # Las sucias no se desalojan: se van cuando se escriben.
+        for cached_id in list(self._sessions)[:-1]:
+            if len(self._sessions) <= self.max_entries:
+                break
+            if cached_id not in self._dirty:
+                del self._sessions[cached_id]
+
+    def _flush_later(self, session_id: str) -> None:
+        self._timers.pop(session_id, None)
+        task = asyncio.ensure_future(self.flush(session_id))
+        self._background.add(task)
+        task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"[SESSIONS] Falló la escritura diferida: {task.exception()}")
+
+
+def _load_backend() -> BaseSessionStore:
     store_type = os.getenv("SESSION_STORE_TYPE", "sqlite").lower()
     ttl_seconds = int(os.getenv("CHAT_SESSION_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
 
@@ -241,4 +460,36 @@ def _load_store() -> BaseSessionStore:
         return SQLiteSessionStore(db_path, ttl_seconds)
 
 
+def _load_store() -> BaseSessionStore:
+    backend = _load_backend()
+    if settings.SESSION_CACHE_SIZE <= 0:
+        return backend
+    # Con el store en Redis, la invalidación usa el mismo servidor salvo que se indique otro.
+    invalidation_url = settings.SESSION_CACHE_REDIS_URL
+    if not invalidation_url and isinstance(backend, RedisSessionStore):
+        invalidation_url = backend.redis_url
+    invalidator = RedisSessionInvalidator(invalidation_url) if invalidation_url else None
+    if invalidator is None and settings.WEB_CONCURRENCY > 1:
+        logger.warning(
+            f"[SESSIONS] WEB_CONCURRENCY={settings.WEB_CONCURRENCY} sin SESSION_CACHE_REDIS_URL: "
+            "cache de sesiones deshabilitado (cada worker serviría su propia copia)."
+        )
+        return backend
+    if invalidator is None:
+        # Incluye SQLite: `uvicorn --workers N` no setea WEB_CONCURRENCY y todos comparten la base.
+        logger.warning(
+            "[SESSIONS] Cache de sesiones sin invalidación: solo es correcto con un worker. "
+            "Si varios procesos comparten el store se sirven sesiones viejas y un worker puede "
+            "pisar los turnos de otro; configurá WEB_CONCURRENCY, SESSION_CACHE_REDIS_URL o "
+            "SESSION_CACHE_SIZE=0."
+        )
+    return CachedSessionStore(
+        backend,
+        max_entries=settings.SESSION_CACHE_SIZE,
+        flush_delay=settings.SESSION_CACHE_FLUSH_MS / 1000,
+        ttl_seconds=backend.ttl_seconds,
+        invalidator=invalidator,
+    )
+
+
 store = _load_store()
@@ -0,0 +1,166 @@
+"""
+Structured Output.
+
+JSON Schemas para salida estructurada de los proveedores, generados desde los
+modelos de `app/api/schemas.py`. Si el proveedor o el modelo no soportan
+schemas, el llamador vuelve a `json_object` y agrega al prompt el schema en
+prosa (`prose_hint`).
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Keywords que no aportan al modelo o que algunos proveedores rechazan; la
+# validación fina (patterns, formatos) se sigue haciendo localmente con Pydantic.
+_DROPPED_KEYWORDS = frozenset({"title", "examples", "default", "pattern", "format"})
+
+_unsupported_lock = threading.Lock()
+_unsupported: Set[Tuple[str, str]] = set()
+
+
+@dataclass(frozen=True)
+class StructuredOutput:
+    """Schema de respuesta para un prompt, con su equivalente en prosa."""
+
+    name: str
+    json_schema: Dict[str, Any] = field(hash=False, compare=False)
+    prose_hint: str = ""
+
+    def prompt_with_hint(self, prompt: str) -> str:
+        """Prompt para proveedores sin salida estructurada."""
+        return f"{prompt}\n\n{self.prose_hint}" if self.prose_hint else prompt
+
+    def groq_response_format(self) -> Dict[str, Any]:
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": self.name, "schema": self.json_schema},
+        }
+
+
+def _inline_refs(node: Any, definitions: Dict[str, Any]) -> Any:
+    """Resuelve `$ref` locales y limpia keywords que no se envían al proveedor."""
+    if isinstance(node, list):
+        return [_inline_refs(item, definitions) for item in node]
+    if not isinstance(node, dict):
+        return node
+
+    ref = node.get("$ref")
+    if isinstance(ref, str) and ref.startswith("#/$defs/"):
+        resolved = _inline_refs(definitions[ref.rsplit("/", 1)[-1]], definitions)
+        extra = {key: value for key, value in node.items() if key != "$ref"}
+        return {**resolved, **_inline_refs(extra, definitions)}
+
+    return {
+        key: _inline_refs(value, definitions)
+        for key, value in node.items()
+        if key not in _DROPPED_KEYWORDS and key != "$defs"
+    }
+
+
+def _drop_required(node: Any) -> Any:
+    if isinstance(node, list):
+        return [_drop_required(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+    return {key: _drop_required(value) for key, value in node.items() if key != "required"}
+
+
+def model_json_schema(model_cls: Any, partial: bool = False) -> Dict[str, Any]:
+    """
+    JSON Schema autocontenido (sin `$defs`) con los nombres de campo del modelo.
+
+    Args:
+        model_cls: Modelo Pydantic o tipo soportado por TypeAdapter.
+        partial: Si es True ningún campo es obligatorio (extracciones parciales).
+    """
+    raw = TypeAdapter(model_cls).json_schema(by_alias=False)
+    schema = _inline_refs(raw, raw.get("$defs", {}))
+    return _drop_required(schema) if partial else schema
+
+
+def build_structured_output(
+    model_cls: Any,
+    name: str,
+    prose_hint: str = "",
+    fields: Optional[Iterable[str]] = None,
+    overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> StructuredOutput:
+    """
+    Arma el schema de respuesta de un prompt a partir de un modelo.
+
+    Args:
+        model_cls: Modelo Pydantic de referencia.
+        name: Nombre del schema (lo exige el formato de Groq).
+        prose_hint: Schema en prosa para el fallback.
+        fields: Subconjunto de campos que completa la IA (el resto se calcula local).
+        overrides: Schemas que reemplazan a campos abiertos (ej. `Dict[str, Any]`).
+    """
+    schema = model_json_schema(model_cls)
+    properties = dict(schema.get("properties", {}))
+    required = list(schema.get("required", []))
+
+    if fields is not None:
+        keep = list(fields)
+        properties = {key: value for key, value in properties.items() if key in keep}
+        required = [key for key in required if key in keep]
+    for key, override in (overrides or {}).items():
+        properties[key] = {**override, "description": properties.get(key, {}).get("description", "")}
+
+    schema["properties"] = properties
+    if required:
+        schema["required"] = required
+    else:
+        schema.pop("required", None)
+    return StructuredOutput(name=name, json_schema=schema, prose_hint=prose_hint.strip())
+
+
+def supports_structured_output(provider: str, model: str) -> bool:
+    if not settings.AI_STRUCTURED_OUTPUTS:
+        return False
+    with _unsupported_lock:
+        return (provider, model) not in _unsupported
+
+
+def mark_structured_output_unsupported(provider: str, model: str) -> None:
+    """Recuerda (por proceso) que el modelo rechazó el schema para no volver a pagar el error."""
+    with _unsupported_lock:
+        if (provider, model) in _unsupported:
+            return
+        _unsupported.add((provider, model))
+    logger.warning(
+        f"[STRUCTURED-OUTPUT] {provider}/{model} no soporta schemas; se usa el schema en prosa."
+    )
+
+
+# Un 4xx solo apaga los schemas si el proveedor dice que no los soporta; cuota,
+# permisos, largo de contexto o un JSON inválido puntual siguen su camino normal.
+_SCHEMA_ERROR_TERMS = ("response_format", "json_schema", "response_json_schema", "responsejsonschema", "response_schema")
+_UNSUPPORTED_ERROR_TERMS = ("not supported", "unsupported", "does not support", "not available", "unknown name")
+_TRANSIENT_ERROR_CODES = ("json_validate_failed",)
+
+
+def is_schema_unsupported_error(error: Exception) -> bool:
+    """True si el error del proveedor indica que el modelo no acepta JSON Schema."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and status != 400:
+        return False
+    message = f"{error} {getattr(error, 'body', '') or ''}".lower()
+    if any(code in message for code in _TRANSIENT_ERROR_CODES):
+        return False
+    return (
+        any(term in message for term in _SCHEMA_ERROR_TERMS)
+        and any(term in message for term in _UNSUPPORTED_ERROR_TERMS)
+    )
+
+
+def reset_structured_output_support() -> None:
+    with _unsupported_lock:
+        _unsupported.clear()
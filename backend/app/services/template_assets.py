@@ -0,0 +1,79 @@
+"""
+Template Assets.
+
+Lo que cada plantilla necesita ya listo para usar en los exports y en la
+generación: el color de acento como color de ReportLab, el esqueleto DOCX con
+los estilos del CV y el prompt de formato. Se compilan una vez por versión de
+la plantilla; cuando el registry recarga se recompilan todas y se reemplaza
+el mapa entero.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from reportlab.lib import colors
+
+from app.core.templates import TemplateConfig, TemplateSnapshot, registry
+from app.services import docx_skeleton
+
+DEFAULT_ACCENT = "#000000"
+
+
+@dataclass(frozen=True)
+class TemplateAssets:
+    config: TemplateConfig
+    accent: colors.Color
+    docx_skeleton: docx_skeleton.DocxSkeleton
+    formatting_prompt: str
+
+
+_assets: Dict[str, TemplateAssets] = {}
+_assets_lock = threading.Lock()
+
+
+def compile_template_assets(config: TemplateConfig) -> TemplateAssets:
+    accent = config.styles.get("accent")
+    try:
+        accent_color = colors.HexColor(accent if isinstance(accent, str) else DEFAULT_ACCENT)
+    except ValueError:
+        accent_color = colors.HexColor(DEFAULT_ACCENT)
+    return TemplateAssets(
+        config=config,
+        accent=accent_color,
+        docx_skeleton=docx_skeleton.build_docx_skeleton(config.styles),
+        formatting_prompt=config.prompt.strip(),
+    )
+
+
+def get_template_assets(config: TemplateConfig) -> TemplateAssets:
+    """
+    Assets de `config`. Si `config` ya no es la versión vigente (quedó de
+    antes de una recarga) se compilan sin cachear.
+    """
+    assets = _assets.get(config.id)
+    if assets is not None and assets.config is config:
+        return assets
+
+    assets = compile_template_assets(config)
+    if registry.get_template(config.id) is config:
+        with _assets_lock:
+            _assets[config.id] = assets
+    return assets
+
+
+def warm_template_assets(snapshot: Optional[TemplateSnapshot] = None) -> None:
+    """Compila los assets de todas las plantillas y reemplaza el mapa de una vez."""
+    templates = snapshot.unique if snapshot is not None else registry.get_all_templates()
+    compiled = {config.id: compile_template_assets(config) for config in templates}
+    global _assets
+    with _assets_lock:
+        _assets = compiled
+
+
+def clear_template_assets() -> None:
+    with _assets_lock:
+        _assets.clear()
+
+
+registry.add_listener(warm_template_assets)
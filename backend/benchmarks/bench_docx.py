@@ -0,0 +1,91 @@
+"""
+Microbenchmark del exportador DOCX por plantilla.
+
+Compara el export anterior (`Document()` nuevo y fuente/tamaño fijados run por
+run) contra el actual, que clona el esqueleto ya parseado de la plantilla y sus
+párrafos modelo con estilos nombrados. Informa exports por segundo y tamaño
+del archivo.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_docx [--repeat 10] [--items 50]
+"""
+
+import argparse
+import io
+import time
+from typing import Callable
+
+from docx import Document
+from docx.shared import Pt
+
+from app.core.templates import registry
+from app.services.export_service import RenderTree, _build_docx_export, get_render_tree
+from benchmarks.cv_factory import build_cv
+
+
+def _legacy_docx(tree: RenderTree) -> bytes:
+    """Copia del `_build_docx_export` anterior, sobre el mismo render tree."""
+    document = Document()
+    style = tree.styles
+
+    def add(text: str, font_name: str) -> None:
+        document.add_paragraph(text).runs[0].font.name = font_name
+
+    name_run = document.add_heading(tree.full_name, level=0).runs[0]
+    name_run.font.name = style["heading_font"]
+    name_run.font.size = Pt(20)
+    if tree.role:
+        role_run = document.add_paragraph(tree.role).runs[0]
+        role_run.font.name = style["body_font"]
+        role_run.font.size = Pt(11)
+    for line in (tree.contact, tree.links):
+        if line:
+            add(line, style["body_font"])
+    for section in tree.sections:
+        document.add_heading(section.label, level=1)
+        if section.text:
+            add(section.text, style["body_font"])
+        for entry in section.entries:
+            if entry.emphasis:
+                run = document.add_paragraph().add_run(entry.title)
+                run.bold = True
+                run.font.name = style["heading_font"]
+            else:
+                add(entry.title, style["body_font"])
+            for line in (entry.dates, entry.location, *entry.details):
+                if line:
+                    add(line, style["body_font"])
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _per_second(build: Callable[[RenderTree], bytes], tree: RenderTree, repeat: int) -> float:
+    build(tree)  # warm-up (incluye armar el esqueleto)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build(tree)
+    return repeat / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--items", type=int, default=50)
+    args = parser.parse_args()
+
+    cv = build_cv(experience_items=args.items)
+    print(f"{'template':<12}{'legacy/s':>10}{'skeleton/s':>12}{'legacy KB':>11}{'skeleton KB':>13}")
+    for template in registry.get_all_templates():
+        tree = get_render_tree(cv, template.id)
+        legacy_rate = _per_second(_legacy_docx, tree, args.repeat)
+        current_rate = _per_second(_build_docx_export, tree, args.repeat)
+        print(
+            f"{template.id:<12}{legacy_rate:>10.1f}{current_rate:>12.1f}"
+            f"{len(_legacy_docx(tree)) / 1024:>11.1f}{len(_build_docx_export(tree)) / 1024:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark de throughput y latencia de los exportadores.
+
+Corre `build_export_payload` para cada plantilla del `registry` y cada formato
+soportado, sobre CVs de tamaño creciente (1 a 20 experiencias con
+descripciones largas). Por combinación informa latencia p50/p95/p99, tamaño
+del archivo y pico de memoria (medido con `tracemalloc` en una pasada aparte
+para no inflar la latencia).
+
+Cada muestra parte de un render tree frío (como un CV nuevo); el esqueleto
+DOCX y las caches de layout del PDF quedan calientes, como en producción.
+
+Con `--save-baseline` guarda los resultados en JSON; si el baseline existe, la
+corrida se compara contra él y termina con código 1 si alguna combinación se
+pasa de la tolerancia (latencia p50, tamaño o memoria).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_exports [--repeat 20] [--save-baseline]
+    python -m benchmarks.bench_exports --baseline otra/ruta.json --tolerance 0.3
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from app.core.templates import registry
+from app.services.export_service import (
+    EXPORTER_VERSION,
+    SUPPORTED_EXPORT_FORMATS,
+    build_export_payload,
+    clear_render_tree_cache,
+)
+from benchmarks.cv_factory import build_cv
+
+SIZES = (1, 5, 10, 20)
+EXTRA_SENTENCES = 12
+FORMATS = sorted(SUPPORTED_EXPORT_FORMATS)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "exports.json")
+
+# Latencias de pocos ms son ruidosas: por debajo de este piso no se marca regresión.
+LATENCY_FLOOR_MS = 2.0
+SIZE_TOLERANCE = 0.05
+
+Result = Dict[str, Any]
+
+
+def _percentile(samples: List[float], percent: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[percent - 1]
+
+
+def _measure(cv: Dict[str, Any], template_id: str, export_format: str, repeat: int) -> Result:
+    build_export_payload(cv, template_id, export_format)  # warm-up (esqueleto, fuentes)
+
+    samples = []
+    for _ in range(repeat):
+        clear_render_tree_cache()
+        start = time.perf_counter()
+        content, _, _ = build_export_payload(cv, template_id, export_format)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    clear_render_tree_cache()
+    tracemalloc.start()
+    build_export_payload(cv, template_id, export_format)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "bytes": len(content),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run(repeat: int) -> Dict[str, Result]:
+    results: Dict[str, Result] = {}
+    print(f"{'template':<12}{'format':<7}{'items':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'KB':>9}{'peak KB':>10}")
+    for size in SIZES:
+        cv = build_cv(experience_items=size, extra_sentences=EXTRA_SENTENCES)
+        for template in registry.get_all_templates():
+            for export_format in FORMATS:
+                result = _measure(cv, template.id, export_format, repeat)
+                results[f"{template.id}/{export_format}/{size}"] = result
+                print(
+                    f"{template.id:<12}{export_format:<7}{size:>6}{result['p50_ms']:>9.2f}"
+                    f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+                    f"{result['bytes'] / 1024:>9.1f}{result['peak_kb']:>10.1f}"
+                )
+    return results
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Result], tolerance: float) -> List[str]:
+    """Combinaciones que empeoraron respecto del baseline más allá de la tolerancia."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        checks = (
+            ("p50_ms", tolerance, LATENCY_FLOOR_MS),
+            ("bytes", SIZE_TOLERANCE, 0),
+            ("peak_kb", tolerance, 0),
+        )
+        for metric, allowed, floor in checks:
+            before, after = previous[metric], result[metric]
+            if after > floor and after > before * (1 + allowed):
+                regressions.append(f"{name} {metric}: {before} -> {after}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Guarda esta corrida como baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Empeoramiento relativo permitido")
+    args = parser.parse_args()
+
+    results = run(max(1, args.repeat))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "exporter_version": EXPORTER_VERSION,
+                    "python": platform.python_version(),
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                handle,
+                indent=2,
+                sort_keys=True,
+            )
+        print(f"\nBaseline guardado en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nSin baseline en {args.baseline} (crearlo con --save-baseline)")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if baseline.get("exporter_version") != EXPORTER_VERSION:
+        print(f"\nAviso: baseline de EXPORTER_VERSION {baseline.get('exporter_version')}, actual {EXPORTER_VERSION}")
+    if regressions:
+        print(f"\n{len(regressions)} regresiones (tolerancia {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nSin regresiones contra {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Microbenchmark del merge de `cv_data` en el chat.
+
+Simula una sesión que recibe extracciones de pocos ítems por turno sobre un
+CV grande, y compara el merge anterior (re-serializar todos los ítems en cada
+turno) contra el motor con índice de fingerprints persistente.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_merge [--turns 50]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from app.api.schemas import CVMergeIndex
+from app.services.cv_merge import merge_cv_data
+from benchmarks.cv_factory import build_cv
+
+SIZES = (100, 500, 1000)
+ITEMS_PER_TURN = 2
+
+
+def _legacy_merge(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia del `_deep_merge` anterior de endpoints.py."""
+    result = base.copy()
+    for key, value in update.items():
+        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+            result[key] = _legacy_merge(result[key], value)
+        elif key in result and isinstance(result[key], list) and isinstance(value, list):
+            existing = {json.dumps(item, sort_keys=True) for item in result[key] if isinstance(item, dict)}
+            for item in value:
+                if isinstance(item, dict):
+                    item_key = json.dumps(item, sort_keys=True)
+                    if item_key not in existing:
+                        result[key].append(item)
+                        existing.add(item_key)
+                elif item not in result[key]:
+                    result[key].append(item)
+        else:
+            result[key] = value
+    return result
+
+
+def _turns(size: int, turns: int) -> List[Dict[str, Any]]:
+    extra = build_cv(experience_items=size + turns * ITEMS_PER_TURN, seed=11)["experience"][size:]
+    return [
+        {"experience": extra[turn * ITEMS_PER_TURN:(turn + 1) * ITEMS_PER_TURN]}
+        for turn in range(turns)
+    ]
+
+
+def _run(merge: Callable[[Dict[str, Any], Dict[str, Any]], Any], size: int, turns: int) -> float:
+    cv_data = build_cv(experience_items=size)
+    updates = _turns(size, turns)
+    start = time.perf_counter()
+    for update in updates:
+        merge(cv_data, update)
+    return (time.perf_counter() - start) * 1000 / turns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'items':>7}{'legacy ms':>12}{'indexed ms':>12}{'speedup':>10}")
+    for size in SIZES:
+        index = CVMergeIndex()
+        legacy_ms = _run(_legacy_merge, size, args.turns)
+        indexed_ms = _run(
+            lambda base, update: merge_cv_data(base, update, index=index, in_place=True),
+            size,
+            args.turns,
+        )
+        print(f"{size:>7}{legacy_ms:>12.3f}{indexed_ms:>12.3f}{legacy_ms / indexed_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
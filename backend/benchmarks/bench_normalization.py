@@ -0,0 +1,92 @@
+"""
+Microbenchmark del pipeline de normalización/validación de payloads de la IA.
+
+Compara el camino actual (sin deep copies, TypeAdapter cacheado y JSON
+serializado una sola vez) contra el anterior (deepcopy + model_validate +
+model_dump + re-validación del router) para CVs de distintos tamaños.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_normalization [--repeat 20]
+"""
+
+import argparse
+import copy
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from app.api.schemas import CVData
+from app.services.ai_service import (
+    _apply_optimization_response,
+    _ensure_cv_schema,
+    _normalize_extracted_payload,
+    _validate_ai_payload,
+)
+from benchmarks.cv_factory import build_cv
+
+SIZES = (10, 100, 500)
+
+
+def _current_extract(payload: Dict) -> bytes:
+    candidate = _ensure_cv_schema(_normalize_extracted_payload(payload))
+    validated = _validate_ai_payload(CVData, candidate, "bench")
+    return validated.model_dump_json(by_alias=True).encode()
+
+
+def _legacy_extract(payload: Dict) -> bytes:
+    normalized = _normalize_extracted_payload(payload)
+    candidate = _ensure_cv_schema(copy.deepcopy(normalized))
+    dumped = CVData.model_validate(candidate).model_dump(by_alias=True)
+    # El router volvía a validar contra response_model antes de serializar.
+    return CVData.model_validate(dumped).model_dump_json(by_alias=True).encode()
+
+
+def _current_optimize(payload: Dict) -> bytes:
+    result = _apply_optimization_response(
+        {"experience": [{"description": "Nueva descripción"}]}, payload, "experience", "improve"
+    )
+    return _validate_ai_payload(CVData, result, "bench").model_dump_json(by_alias=True).encode()
+
+
+def _legacy_optimize(payload: Dict) -> bytes:
+    original = copy.deepcopy(payload)
+    result = copy.deepcopy(original)
+    result["experience"] = copy.deepcopy(original["experience"])
+    result["experience"][0]["description"] = "Nueva descripción"
+    dumped = CVData.model_validate(result).model_dump(by_alias=True)
+    return CVData.model_validate(dumped).model_dump_json(by_alias=True).encode()
+
+
+def _measure(fn: Callable[[Dict], bytes], payload: Dict, repeat: int) -> List[float]:
+    fn(payload)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = (
+        ("extract", _legacy_extract, _current_extract),
+        ("optimize", _legacy_optimize, _current_optimize),
+    )
+    print(f"{'case':<10}{'items':>7}{'legacy ms':>12}{'current ms':>12}{'speedup':>10}")
+    for size in SIZES:
+        payload = build_cv(experience_items=size)
+        for name, legacy, current in cases:
+            legacy_ms = statistics.median(_measure(legacy, payload, args.repeat))
+            current_ms = statistics.median(_measure(current, payload, args.repeat))
+            print(
+                f"{name:<10}{size:>7}{legacy_ms:>12.2f}{current_ms:>12.2f}"
+                f"{legacy_ms / current_ms:>9.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
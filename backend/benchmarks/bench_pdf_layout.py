@@ -0,0 +1,90 @@
+"""
+Microbenchmark del corte de líneas del exportador PDF.
+
+Compara el wrap anterior (`textwrap` con un ancho estimado de `font_size * 0.5`
+por carácter) contra el layout con métricas reales y caches, sobre todos los
+textos de CVs largos. Además del tiempo informa cuántas líneas del wrap
+anterior se salen del margen.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_pdf_layout [--repeat 20]
+"""
+
+import argparse
+import statistics
+import textwrap
+import time
+from typing import Callable, List, Tuple
+
+from app.services.export_service import PDF_TEXT_WIDTH
+from app.services.pdf_layout import clear_layout_caches, text_width, wrap_lines
+from benchmarks.cv_factory import build_cv
+
+SIZES = (10, 100, 500)
+# Cuerpo de las plantillas (sans, serif, mono): el ancho real por carácter varía mucho.
+BODY_FONTS = ("Helvetica", "Times-Roman", "Courier")
+
+Block = Tuple[str, str, int]
+
+
+def _legacy_wrap(text: str, font_name: str, font_size: int, max_width: float) -> List[str]:
+    max_chars = max(int(max_width / (font_size * 0.5)), 10)
+    return textwrap.wrap(text, width=max_chars)
+
+
+def _current_wrap(text: str, font_name: str, font_size: int, max_width: float) -> List[str]:
+    return list(wrap_lines(text, font_name, font_size, max_width))
+
+
+def _blocks(size: int) -> List[Block]:
+    cv = build_cv(experience_items=size)
+    blocks: List[Block] = []
+    for font_name in BODY_FONTS:
+        blocks.append((cv["personalInfo"]["summary"], font_name, 9))
+        for exp in cv["experience"]:
+            blocks.append((f"{exp['position']} · {exp['company']}", font_name, 10))
+            blocks.append((f"{exp['location']} | {exp['startDate']} - {exp['endDate']}", font_name, 9))
+            blocks.append((exp["description"], font_name, 9))
+    return blocks
+
+
+def _measure(wrap: Callable, blocks: List[Block], repeat: int, cold: bool) -> float:
+    samples = []
+    for _ in range(repeat):
+        if cold:
+            clear_layout_caches()
+        start = time.perf_counter()
+        for text, font_name, font_size in blocks:
+            wrap(text, font_name, font_size, PDF_TEXT_WIDTH)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _overflowing(wrap: Callable, blocks: List[Block]) -> int:
+    return sum(
+        1
+        for text, font_name, font_size in blocks
+        for line in wrap(text, font_name, font_size, PDF_TEXT_WIDTH)
+        if text_width(line, font_name, font_size) > PDF_TEXT_WIDTH
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'items':>7}{'legacy ms':>12}{'cold ms':>10}{'warm ms':>10}{'legacy overflow':>17}{'overflow':>10}")
+    for size in SIZES:
+        blocks = _blocks(size)
+        legacy_ms = _measure(_legacy_wrap, blocks, args.repeat, cold=False)
+        cold_ms = _measure(_current_wrap, blocks, args.repeat, cold=True)
+        warm_ms = _measure(_current_wrap, blocks, args.repeat, cold=False)
+        print(
+            f"{size:>7}{legacy_ms:>12.2f}{cold_ms:>10.2f}{warm_ms:>10.2f}"
+            f"{_overflowing(_legacy_wrap, blocks):>17}{_overflowing(_current_wrap, blocks):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
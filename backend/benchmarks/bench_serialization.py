@@ -0,0 +1,85 @@
+"""
+Microbenchmark de CPU por turno de chat: serialización con `json` vs orjson.
+
+Un turno carga la sesión guardada, emite un evento SSE por cada fragmento de
+la respuesta en streaming y vuelve a guardar la sesión. Se mide tiempo de CPU
+(`process_time`), así la latencia de la IA y del store no entra en la cuenta.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serialization [--turns 200] [--deltas 300]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from app.api.schemas import ChatMessage, ChatSession
+from app.core.serialization import dump_model, load_model, sse_event
+from benchmarks.cv_factory import build_cv
+
+MESSAGE_COUNTS = (10, 40, 100)
+EXPERIENCE_ITEMS = 8
+
+# (cargar sesión, evento SSE, guardar sesión)
+Codec = Tuple[
+    Callable[[str], ChatSession],
+    Callable[[Dict[str, Any]], str],
+    Callable[[ChatSession], str],
+]
+
+LEGACY: Codec = (
+    lambda raw: ChatSession.model_validate(json.loads(raw)),
+    lambda data: f"data: {json.dumps(data)}\n\n",
+    lambda session: json.dumps(session.model_dump(mode="json")),
+)
+ORJSON: Codec = (
+    lambda raw: load_model(ChatSession, raw),
+    sse_event,
+    dump_model,
+)
+
+
+def _session(messages: int) -> ChatSession:
+    return ChatSession(
+        session_id="bench",
+        cv_data=build_cv(experience_items=EXPERIENCE_ITEMS),
+        messages=[
+            ChatMessage(
+                id=f"m{index}",
+                role="user" if index % 2 else "assistant",
+                content="Trabajé como desarrolladora backend en Acme durante tres años. " * 4,
+            )
+            for index in range(messages)
+        ],
+    )
+
+
+def _run(codec: Codec, raw: str, turns: int, deltas: int) -> float:
+    load, event, save = codec
+    start = time.process_time()
+    for turn in range(turns):
+        session = load(raw)
+        for index in range(deltas):
+            event({"type": "delta", "content": f"fragmento {index} ñ", "turn": turn})
+        event({"type": "complete", "cvData": session.cv_data, "phase": session.current_phase.value})
+        save(session)
+    return (time.process_time() - start) * 1000 / turns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--deltas", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'messages':>9}{'json ms':>10}{'orjson ms':>11}{'speedup':>10}")
+    for messages in MESSAGE_COUNTS:
+        raw = _session(messages).model_dump_json()
+        legacy_ms = _run(LEGACY, raw, args.turns, args.deltas)
+        orjson_ms = _run(ORJSON, raw, args.turns, args.deltas)
+        print(f"{messages:>9}{legacy_ms:>10.3f}{orjson_ms:>11.3f}{legacy_ms / orjson_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Generador de CVs sintéticos para los benchmarks.
+
+Los datos son determinísticos (semilla fija) para que las corridas sean
+comparables entre sí.
+"""
+
+import random
+from typing import Any, Dict
+
+_COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Corp"]
+_POSITIONS = ["Backend Developer", "Data Engineer", "Product Manager", "QA Analyst", "Tech Lead"]
+_SKILLS = ["Python", "FastAPI", "React", "Docker", "AWS", "SQL", "Kubernetes", "Git", "Scrum"]
+_SENTENCES = [
+    "Lideré la migración de servicios monolíticos a microservicios",
+    "Reduje el tiempo de respuesta de la API en un 40%",
+    "Diseñé pipelines de datos para reportes diarios",
+    "Coordiné un equipo de 6 personas con metodologías ágiles",
+    "Implementé monitoreo y alertas para producción",
+]
+
+
+def build_cv(experience_items: int = 10, seed: int = 7, extra_sentences: int = 0) -> Dict[str, Any]:
+    """
+    CV con el formato del frontend (claves camelCase), con N experiencias.
+
+    `extra_sentences` alarga cada descripción (para medir textos largos).
+    """
+    rng = random.Random(seed)
+    return {
+        "personalInfo": {
+            "fullName": "Juana Pérez",
+            "email": "juana@example.com",
+            "phone": "+54 11 5555 5555",
+            "location": "Buenos Aires, Argentina",
+            "summary": " ".join(rng.sample(_SENTENCES, 3)),
+            "linkedin": "https://linkedin.com/in/juanaperez",
+        },
+        "experience": [
+            {
+                "id": f"exp-{index}",
+                "company": rng.choice(_COMPANIES),
+                "position": rng.choice(_POSITIONS),
+                "startDate": f"{2000 + index % 20}-01",
+                "endDate": f"{2001 + index % 20}-12",
+                "current": False,
+                "location": "Remoto",
+                "description": ". ".join(rng.sample(_SENTENCES, 3) + rng.choices(_SENTENCES, k=extra_sentences)),
+                "highlights": rng.sample(_SENTENCES, 2),
+            }
+            for index in range(experience_items)
+        ],
+        "education": [
+            {
+                "id": f"edu-{index}",
+                "institution": "Universidad de Buenos Aires",
+                "degree": "Licenciatura en Sistemas",
+                "startDate": f"{1995 + index}-03",
+                "endDate": f"{2000 + index}-12",
+            }
+            for index in range(max(1, experience_items // 10))
+        ],
+        "skills": [
+            {"id": f"skill-{index}", "name": f"{rng.choice(_SKILLS)} {index}", "level": "Advanced"}
+            for index in range(experience_items * 2)
+        ],
+        "projects": [],
+        "languages": [{"id": "lang-1", "language": "Inglés", "fluency": "Advanced"}],
+        "certifications": [],
+        "interests": [],
+    }
@@ -0,0 +1,102 @@
+from app.services.ats_scoring import (
+    build_term_index,
+    detect_cv_sections,
+    match_industry_keywords,
+    score_ats_locally,
+    sweep_industries,
+    INDUSTRY_KEYWORDS,
+)
+
+
+SAMPLE_CV = """Juan Pérez
+juan@example.com | +54 11 5555 5555 | linkedin.com/in/juanperez
+
+Perfil
+Desarrollador backend con foco en APIs y cloud.
+
+Experiencia
+Backend Developer - Acme (2019 - 2024)
+Desarrollo de microservicios en Python con FastAPI, PostgreSQL y Docker sobre AWS.
+Pipelines de CI/CD con GitHub Actions y metodologías ágiles (Scrum).
+
+Educación
+Ingeniería en Sistemas - UBA (2014 - 2019)
+
+Habilidades
+Python, FastAPI, Docker, Kubernetes, Git, SQL
+"""
+
+
+class TestTermIndex:
+    def test_matches_multiword_and_accentless_keywords(self):
+        index = build_term_index("Experiencia con Spring Boot y Análisis de datos")
+        assert "spring boot" in index
+        assert "analisis" in index
+
+    def test_keyword_matching_is_token_based(self):
+        # "Git" no debe matchear dentro de "GitHub".
+        found, missing = match_industry_keywords(build_term_index("GitHub"), "tech")
+        assert "GitHub" in found
+        assert "Git" not in found
+        assert "Git" in missing
+
+
+class TestSectionDetection:
+    def test_detects_spanish_and_english_headings(self):
+        sections = detect_cv_sections("Perfil\n...\nWork History\n...\nSkills\n...")
+        assert sections["summary"]
+        assert sections["experience"]
+        assert sections["skills"]
+        assert not sections["education"]
+
+
+class TestScoreAtsLocally:
+    def test_complete_cv_scores_high(self):
+        result = score_ats_locally(SAMPLE_CV, "tech", "es")
+        assert result["completeness_score"] == 100
+        assert result["grade"] in {"A", "B", "C"}
+        assert "Python" in result["found_keywords"]
+        assert "Python" not in result["missing_keywords"]
+        assert not result["mismatch_detected"]
+
+    def test_scores_are_deterministic(self):
+        assert score_ats_locally(SAMPLE_CV, "tech") == score_ats_locally(SAMPLE_CV, "tech")
+
+    def test_reuses_prebuilt_term_index(self):
+        index = build_term_index(SAMPLE_CV)
+        assert score_ats_locally(SAMPLE_CV, "tech", term_index=index) == score_ats_locally(SAMPLE_CV, "tech")
+
+    def test_missing_contact_and_sections_are_reported(self):
+        result = score_ats_locally("Python developer", "tech", "en")
+        messages = [issue["message"] for issue in result["issues"]]
+        assert "Missing visible email" in messages
+        assert "Missing experience section" in messages
+        assert result["completeness_score"] == 0
+
+    def test_unknown_industry_falls_back_to_general(self):
+        result = score_ats_locally(SAMPLE_CV, "space-mining")
+        assert result["industry_recommendation"] == "tech"
+        assert 0 <= result["keyword_score"] <= 100
+
+    def test_recommends_best_fitting_industry(self):
+        # El CV es de backend: aunque se pida finanzas, la recomendación es tech.
+        result = score_ats_locally(SAMPLE_CV, "finance")
+        assert result["industry_recommendation"] == sweep_industries(SAMPLE_CV)[0]["industry"] == "tech"
+        assert score_ats_locally(SAMPLE_CV, "finance", industry_recommendation="education")[
+            "industry_recommendation"
+        ] == "education"
+
+
+class TestSweepIndustries:
+    def test_ranks_every_industry(self):
+        ranking = sweep_industries(SAMPLE_CV)
+        assert {item["industry"] for item in ranking} == set(INDUSTRY_KEYWORDS)
+        assert ranking[0]["industry"] == "tech"
+        fit_scores = [item["fit_score"] for item in ranking]
+        assert fit_scores == sorted(fit_scores, reverse=True)
+
+    def test_matches_single_industry_scoring(self):
+        tech = next(item for item in sweep_industries(SAMPLE_CV) if item["industry"] == "tech")
+        single = score_ats_locally(SAMPLE_CV, "tech")
+        assert tech["ats_score"] == single["ats_score"]
+        assert tech["found_keywords"] == single["found_keywords"]
@@ -478,17 +478,38 @@ class TestJobAnalysis:
         }
 
         result = await analyze_job_description(
-            job_description="Buscamos desarrollador React con experiencia en Node.js",
+            job_description="Buscamos desarrollador React con experiencia en Node.js y TypeScript",
             cv_data=sample_cv_data,
         )
 
         assert result is not None
-        assert result.match_score == 75
-        assert len(result.matched_skills) == 2
-        assert len(result.missing_skills) == 2
+        # El match se calcula localmente (React, Node.js y "desarrollador" sí;
+        # TypeScript no); la IA solo aporta las sugerencias.
+        assert result.match_score == 70
+        assert result.matched_skills == ["Node.js", "React", "desarrollador"]
+        assert result.missing_skills == ["TypeScript"]
         assert len(result.suggestions) == 1
         assert result.suggestions[0].priority == "high"
 
+    @patch("app.services.ai_service.get_ai_completion")
+    @patch("app.services.ai_service.settings")
+    async def test_analyze_job_description_fast_mode(
+        self, mock_settings, mock_get_ai_completion, sample_cv_data
+    ):
+        """Test modo rápido: sin IA y sin API key."""
+        mock_settings.GROQ_API_KEY = "placeholder_key"
+
+        result = await analyze_job_description(
+            job_description="Buscamos desarrollador React con experiencia en Node.js y TypeScript",
+            cv_data=sample_cv_data,
+            mode="fast",
+        )
+
+        assert result is not None
+        assert "TypeScript" in result.missing_skills
+        assert result.suggestions[0].section == "skills"
+        mock_get_ai_completion.assert_not_called()
+
     @patch("app.services.ai_service.settings")
     async def test_analyze_job_description_no_api_key(
         self, mock_settings, sample_cv_data
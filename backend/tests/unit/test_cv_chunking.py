@@ -0,0 +1,32 @@
+from app.services.cv_chunking import build_extraction_chunks, split_cv_text, split_sections
+
+CV_TEXT = (
+    "Ana Pérez\nana@example.com\n\n"
+    "EXPERIENCIA\nAcme - Backend Developer\n" + "Desarrollé APIs en Python.\n" * 40 + "\n"
+    "EDUCACIÓN\nUBA - Licenciatura en Informática\n\n"
+    "HABILIDADES\nPython, Docker, AWS\n"
+)
+
+
+def test_split_sections_starts_each_block_at_a_heading():
+    blocks = split_sections(CV_TEXT)
+    assert blocks[0].startswith("Ana Pérez")
+    assert [block.split("\n", 1)[0] for block in blocks[1:]] == ["EXPERIENCIA", "EDUCACIÓN", "HABILIDADES"]
+    assert "".join(blocks) == CV_TEXT
+
+
+def test_split_cv_text_respects_limit_without_dropping_content():
+    chunks = split_cv_text(CV_TEXT, max_chars=400)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    # Ninguna línea con contenido se pierde al cortar.
+    original_lines = [line for line in CV_TEXT.splitlines() if line.strip()]
+    chunk_lines = [line for chunk in chunks for line in chunk.splitlines() if line.strip()]
+    assert chunk_lines == original_lines
+    assert split_cv_text(CV_TEXT, max_chars=10_000) == [CV_TEXT]
+
+
+def test_build_extraction_chunks_keeps_files_apart():
+    chunks = build_extraction_chunks([("cv.pdf", CV_TEXT), ("extra.txt", "Certificaciones\nAWS")], 400)
+    assert chunks[0].startswith("\n--- FILE: cv.pdf (parte 1/")
+    assert chunks[-1] == "\n--- FILE: extra.txt ---\nCertificaciones\nAWS\n"
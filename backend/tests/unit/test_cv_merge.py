@@ -0,0 +1,81 @@
+from app.api.schemas import ChatSession, CVMergeIndex
+from app.services.ai_service import _merge_cv_data_for_context, _merge_descriptions
+from app.services.cv_merge import fingerprint_item, merge_cv_data
+
+
+def _experience(index, **extra):
+    return {"id": f"exp-{index}", "company": "Acme", "position": "Dev", **extra}
+
+
+def test_merge_cv_data_appends_only_new_items():
+    base = {
+        "personalInfo": {"fullName": "Juan", "email": "old@email.com"},
+        "experience": [_experience(1)],
+        "interests": ["Ajedrez"],
+    }
+    update = {
+        "personalInfo": {"email": "new@email.com"},
+        # Mismos campos de identidad: solo cambia la ubicación.
+        "experience": [_experience(1, location="Remoto"), _experience(2), _experience(2)],
+        "interests": ["Ajedrez", "Running"],
+    }
+
+    result = merge_cv_data(base, update)
+
+    assert result["personalInfo"] == {"fullName": "Juan", "email": "new@email.com"}
+    assert [item["id"] for item in result["experience"]] == ["exp-1", "exp-2"]
+    assert result["interests"] == ["Ajedrez", "Running"]
+    # Sin `in_place` la base no se toca.
+    assert len(base["experience"]) == 1
+    assert base["personalInfo"]["email"] == "old@email.com"
+
+
+def test_index_only_fingerprints_new_items(mocker):
+    base = {"experience": [_experience(index) for index in range(50)]}
+    index = CVMergeIndex()
+    merge_cv_data(base, {"experience": [_experience(0)]}, index=index, in_place=True)
+    assert index.sizes["experience"] == 50
+
+    spy = mocker.patch("app.services.cv_merge.fingerprint_item", side_effect=fingerprint_item)
+    merge_cv_data(base, {"experience": [_experience(50), _experience(3)]}, index=index, in_place=True)
+
+    assert spy.call_count == 2
+    assert len(base["experience"]) == 51
+    assert index.sizes["experience"] == 51
+
+
+def test_index_rebuilds_section_edited_outside_the_engine():
+    base = {"skills": [{"name": "Python"}]}
+    index = CVMergeIndex()
+    merge_cv_data(base, {"skills": [{"name": "SQL"}]}, index=index, in_place=True)
+
+    base["skills"].pop()
+    merge_cv_data(base, {"skills": [{"name": "SQL"}]}, index=index, in_place=True)
+
+    assert [skill["name"] for skill in base["skills"]] == ["Python", "SQL"]
+
+
+def test_index_survives_session_serialization():
+    session = ChatSession(session_id="s1", cv_data={"skills": [{"name": "Python"}]})
+    merge_cv_data(session.cv_data, {"skills": [{"name": "SQL"}]}, index=session.cv_index, in_place=True)
+
+    restored = ChatSession.model_validate(session.model_dump(mode="json"))
+
+    assert restored.cv_index.fingerprints == session.cv_index.fingerprints
+    merge_cv_data(restored.cv_data, {"skills": [{"name": "SQL"}]}, index=restored.cv_index, in_place=True)
+    assert len(restored.cv_data["skills"]) == 2
+
+
+def test_merge_for_context_leaves_session_untouched():
+    cv_data = {"skills": [{"name": "Python"}]}
+    index = CVMergeIndex()
+
+    merged = _merge_cv_data_for_context(cv_data, {"skills": [{"name": "SQL"}]}, cv_index=index)
+
+    assert len(merged["skills"]) == 2
+    assert cv_data == {"skills": [{"name": "Python"}]}
+    assert index.sizes["skills"] == 1
+
+
+def test_merge_descriptions_keeps_first_occurrence_order():
+    assert _merge_descriptions("A. B", "B. C. A") == "A. B. C"
@@ -0,0 +1,86 @@
+import io
+import pickle
+import zipfile
+
+from docx import Document
+
+from app.services import docx_skeleton
+from app.services.docx_skeleton import BODY_STYLE, ENTRY_TITLE_STYLE, HEADING_STYLE, ROLE_STYLE
+from app.services.export_service import build_export_payload, clear_render_tree_cache, get_render_tree
+from app.services.template_assets import clear_template_assets
+
+CV_DATA = {
+    "personalInfo": {"fullName": "Jane Doe", "role": "Backend Developer", "email": "jane@example.com"},
+    "experience": [
+        {"position": "Dev", "company": "Acme", "startDate": "2020", "current": True, "description": "APIs"}
+    ],
+}
+
+
+def setup_function():
+    clear_render_tree_cache()
+    clear_template_assets()
+
+
+def test_skeleton_is_built_once_per_template(mocker):
+    build = mocker.spy(docx_skeleton, "build_docx_skeleton")
+
+    build_export_payload(CV_DATA, "professional", "docx")
+    build_export_payload({**CV_DATA, "skills": [{"name": "Python"}]}, "professional", "docx")
+    assert build.call_count == 1
+
+    build_export_payload(CV_DATA, "harvard", "docx")
+    assert build.call_count == 2
+
+
+def test_docx_export_uses_named_styles_instead_of_run_fonts():
+    content, _, _ = build_export_payload(CV_DATA, "professional", "docx")
+    document = Document(io.BytesIO(content))
+    fonts = get_render_tree(CV_DATA, "professional").styles
+
+    assert document.styles[BODY_STYLE].font.name == fonts["body_font"]
+    assert document.styles["Title"].font.name == fonts["heading_font"]
+
+    paragraphs = {paragraph.text: paragraph for paragraph in document.paragraphs}
+    assert paragraphs["Jane Doe"].style.name == "Title"
+    assert paragraphs["Backend Developer"].style.name == ROLE_STYLE
+    assert paragraphs["APIs"].style.name == BODY_STYLE
+    assert paragraphs["Experiencia"].style.name == HEADING_STYLE
+    # Ningún run lleva fuente propia: todo sale del estilo.
+    assert all(run.font.name is None for paragraph in document.paragraphs for run in paragraph.runs)
+
+    entry_runs = [run for paragraph in document.paragraphs for run in paragraph.runs if run.text == "Dev · Acme"]
+    assert entry_runs and all(run.style.name == ENTRY_TITLE_STYLE for run in entry_runs)
+
+
+def test_docx_export_drops_unused_parts_and_styles():
+    content, _, _ = build_export_payload(CV_DATA, "professional", "docx")
+    names = zipfile.ZipFile(io.BytesIO(content)).namelist()
+    assert "word/stylesWithEffects.xml" not in names
+    assert "docProps/thumbnail.jpeg" not in names
+
+    styles = {style.name for style in Document(io.BytesIO(content)).styles}
+    assert {BODY_STYLE, "Title", HEADING_STYLE, ROLE_STYLE, ENTRY_TITLE_STYLE} <= styles
+    assert "Heading 9" not in styles
+
+
+def test_cloned_documents_do_not_share_paragraphs():
+    skeleton = docx_skeleton.build_docx_skeleton({"body_font": "Arial", "heading_font": "Georgia"})
+    first = skeleton.new_document()
+    first.add_paragraph("body", "solo en el primero")
+    first.save()
+
+    second = skeleton.new_document()
+    second.add_paragraph("body", "línea 1\nlínea 2")
+    document = Document(io.BytesIO(second.save()))
+    assert [paragraph.text for paragraph in document.paragraphs] == ["línea 1\nlínea 2"]
+
+
+def test_skeleton_survives_pickling_for_the_process_pool():
+    skeleton = docx_skeleton.build_docx_skeleton({"body_font": "Arial", "heading_font": "Georgia"})
+    skeleton.new_document()
+    restored = pickle.loads(pickle.dumps(skeleton))
+
+    document = restored.new_document()
+    document.add_paragraph("name", "Jane Doe")
+    assert Document(io.BytesIO(document.save())).paragraphs[0].style.name == "Title"
@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import AsyncMock
 from fastapi.testclient import TestClient
@@ -35,7 +36,7 @@ def test_generate_cv_endpoint_validation(mocker):
     mock_extract.return_value = "Test CV content"
 
     # Mock the AI service
-    mock_ai = mocker.patch("app.api.endpoints.extract_cv_data", new_callable=AsyncMock)
+    mock_ai = mocker.patch("app.services.ai_service.extract_cv_data", new_callable=AsyncMock)
     mock_ai.return_value = {
         "personalInfo": {"fullName": "John Doe"},
         "experience": [],
@@ -121,6 +122,81 @@ def test_ats_check_endpoint_validation(mocker):
     assert response.json()["code"] == "file_processing_error"
 
 
+
+def test_ats_check_sweep_endpoint_ranks_industries(mocker):
+    mock_extract = mocker.patch(
+        "app.api.endpoints.extract_text_from_file", new_callable=AsyncMock
+    )
+    mock_extract.return_value = (
+        "Experiencia\nDesarrollador Python con React, Docker, AWS, SQL y Git en equipos Scrum."
+    )
+
+    response = client.post(
+        "/api/ats-check/sweep",
+        files={"files": ("cv.txt", b"Text content", "text/plain")},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    industries = [item["industry"] for item in body["industries"]]
+    assert industries[0] == "tech"
+    assert body["top_match"]["industry_recommendation"] == "tech"
+
+
+
+def test_job_analysis_batch_endpoint_ranks_locally(mocker):
+    mock_analysis = mocker.patch(
+        "app.services.ai_service.analyze_job_description", new_callable=AsyncMock
+    )
+    payload = {
+        "jobDescription": "Buscamos Backend Developer con Python, FastAPI, PostgreSQL, Docker y AWS.",
+        "candidates": [
+            {"id": "a", "cvData": {"skills": [{"name": "Excel"}]}},
+            {"id": "b", "cvData": {"skills": [{"name": "Python"}, {"name": "FastAPI"}]}},
+        ],
+    }
+
+    response = client.post("/api/chat/job-analysis/batch", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 2
+    assert [item["id"] for item in body["ranked"]] == ["b", "a"]
+    mock_analysis.assert_not_called()
+
+    payload["candidates"][1]["id"] = "a"
+    response = client.post("/api/chat/job-analysis/batch", json=payload)
+    assert response.status_code == 422
+
+
+def test_job_analysis_batch_files_rejects_before_parsing(mocker):
+    mock_extract = mocker.patch(
+        "app.api.endpoints.extract_text_from_file", new_callable=AsyncMock
+    )
+    mocker.patch("app.api.endpoints.settings.BATCH_RANKING_MAX_CANDIDATES", 2)
+    mocker.patch("app.api.endpoints.MAX_FILE_SIZE_BYTES", 10)
+    data = {"job_description": "Buscamos Backend Developer con Python, FastAPI, PostgreSQL y Docker."}
+
+    too_many = [("files", (f"cv{i}.txt", b"Python", "text/plain")) for i in range(3)]
+    response = client.post("/api/chat/job-analysis/batch/files", data=data, files=too_many)
+    assert response.status_code == 400
+
+    oversize = [
+        ("files", ("a.txt", b"Python", "text/plain")),
+        ("files", ("b.txt", b"x" * 11, "text/plain")),
+    ]
+    response = client.post("/api/chat/job-analysis/batch/files", data=data, files=oversize)
+    assert response.status_code == 400
+    assert response.json()["code"] == "file_processing_error"
+    mock_extract.assert_not_called()
+
+
+def test_batch_candidate_ids_skip_names_already_taken():
+    from app.api.endpoints import _unique_candidate_id
+
+    used = set()
+    ids = [_unique_candidate_id(name, used) for name in ("a.pdf#3", "a.pdf", "a.pdf", "a.pdf")]
+    assert ids == ["a.pdf#3", "a.pdf", "a.pdf#2", "a.pdf#4"]
+
+
 @pytest.mark.asyncio
 async def test_ping_endpoint():
     response = client.get("/ping")
@@ -155,3 +231,163 @@ async def test_custom_exceptions():
         raise AIServiceError("Test error")
     assert exc_info.value.status_code == 503
     assert exc_info.value.detail["code"] == "ai_service_unavailable"
+
+
+def test_json_repair_metrics_endpoint():
+    response = client.get("/api/metrics/json-repair")
+    assert response.status_code == 200
+    body = response.json()
+    assert {"attempts", "parseRepaired", "validationRepaired", "retriesAvoided"} <= set(body)
+
+
+def test_templates_endpoint_serves_public_payload_with_etag():
+    response = client.get("/api/templates")
+    assert response.status_code == 200
+    assert "max-age" in response.headers["cache-control"]
+    templates = response.json()
+    ids = [template["id"] for template in templates]
+    assert "professional" in ids
+    assert len(ids) == len(set(ids))  # sin aliases
+    assert all("prompt" not in template and "sectionOrder" in template for template in templates)
+
+    cached = client.get("/api/templates", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_export_cv_endpoint_returns_304_for_matching_etag(mocker):
+    from app.services import export_workers
+    from app.services.export_cache import export_cache
+
+    export_cache.clear()
+    render = mocker.spy(export_workers, "build_export_payload")
+    payload = {
+        "cv_data": {"personalInfo": {"fullName": "Jane Doe"}},
+        "template_id": "professional",
+        "format": "txt",
+    }
+
+    first = client.post("/api/export-cv", json=payload)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = client.post("/api/export-cv", json=payload)
+    assert second.content == first.content
+    assert render.call_count == 1
+
+    cached = client.post("/api/export-cv", json=payload, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+
+def test_export_cv_bundle_streams_zip_with_every_item():
+    import io
+    import zipfile
+
+    response = client.post(
+        "/api/export-cv/bundle",
+        json={
+            "cv_data": {"personalInfo": {"fullName": "Jane Doe"}, "skills": [{"name": "Python"}]},
+            "items": [
+                {"template_id": "professional", "format": "pdf"},
+                {"template_id": "professional", "format": "TXT"},
+                {"template_id": "professional", "format": "txt"},
+                {"template_id": "harvard", "format": "docx"},
+            ],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    names = archive.namelist()
+    # El par repetido (TXT/txt) se exporta una sola vez.
+    assert sorted(name.rsplit(".", 1)[1] for name in names) == ["docx", "pdf", "txt"]
+    txt = next(name for name in names if name.endswith(".txt"))
+    assert archive.read(txt).startswith(b"Jane Doe")
+
+
+def test_export_cv_bundle_dedupes_aliases_and_keeps_entry_names_unique():
+    import io
+    import zipfile
+
+    from app.services.export_bundle import _unique_entry_name, normalize_bundle_items
+
+    assert normalize_bundle_items([("minimal", "pdf"), ("pure", "PDF"), ("tech", "pdf"), ("terminal", "txt")]) == [
+        ("pure", "pdf"),
+        ("terminal", "pdf"),
+        ("terminal", "txt"),
+    ]
+    used = set()
+    assert [_unique_entry_name("cv_Ana.pdf", used) for _ in range(3)] == ["cv_Ana.pdf", "cv_Ana_2.pdf", "cv_Ana_3.pdf"]
+
+    response = client.post(
+        "/api/export-cv/bundle",
+        json={
+            "cv_data": {"personalInfo": {"fullName": "Ana"}},
+            "items": [{"template_id": "minimal", "format": "pdf"}, {"template_id": "pure", "format": "pdf"}],
+        },
+    )
+    assert response.status_code == 200
+    assert len(zipfile.ZipFile(io.BytesIO(response.content)).namelist()) == 1
+
+
+def test_export_cv_bundle_rejects_unknown_template():
+    response = client.post(
+        "/api/export-cv/bundle",
+        json={"cv_data": {}, "items": [{"template_id": "nope", "format": "pdf"}]},
+    )
+    assert response.status_code == 400
+
+
+def test_generate_complete_cv_batch_endpoint(mocker):
+    from app.services.enhancement_cache import enhancement_cache
+
+    enhancement_cache.clear()
+    mocker.patch(
+        "app.services.cv_generator.get_ai_completion",
+        new_callable=AsyncMock,
+        return_value={"summary": "Backend developer"},
+    )
+    cv_data = {"personalInfo": {"fullName": "Jane Doe", "summary": "Dev"}}
+
+    response = client.post(
+        "/api/generate-complete-cv/batch",
+        json={"cv_data": cv_data, "template_types": ["professional", "minimal"]},
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert list(results) == ["professional", "minimal"]
+    assert results["minimal"]["data"]["personalInfo"]["summary"] == "Backend developer"
+    assert results["minimal"]["generated_at"]
+
+    invalid = client.post(
+        "/api/generate-complete-cv/batch",
+        json={"cv_data": cv_data, "template_types": ["professional", "nope"]},
+    )
+    assert invalid.status_code == 400
+
+
+def test_generate_linkedin_post_stream_endpoint_emits_sse(mocker):
+    async def fake_stream(prompt, system_msg):
+        yield {"type": "delta", "text": '{"post_content": "Hola"}'}
+        yield {"type": "section", "section": "post_content", "data": "Hola"}
+        yield {"type": "result", "data": {"post_content": "Hola"}, "provider": "groq"}
+
+    mocker.patch("app.services.ai_service.stream_ai_completion", side_effect=fake_stream)
+
+    response = client.post("/api/generate-linkedin-post/stream", json={"personalInfo": {"fullName": "Jane"}})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert [event["type"] for event in events] == ["delta", "section", "complete"]
+    assert events[-1]["data"] == {"post_content": "Hola"}
+
+
+def test_generate_complete_cv_stream_endpoint_rejects_unknown_template():
+    response = client.post(
+        "/api/generate-complete-cv/stream",
+        json={"cv_data": {"personalInfo": {}}, "template_type": "nope"},
+    )
+    assert response.status_code == 400
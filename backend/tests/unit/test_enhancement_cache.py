@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from app.services import cv_generator
+from app.services.enhancement_cache import EnhancementCache, enhancement_cache, enhancement_key
+
+CV_DATA = {
+    "personalInfo": {"fullName": "Jane Doe", "summary": "Backend dev con experiencia en APIs y equipos"},
+    "experience": [
+        {"company": "Acme", "position": "Dev", "description": "Hice APIs", "highlights": ["a", "b", "c"]},
+    ],
+    "skills": [{"name": f"Skill {index}"} for index in range(20)],
+}
+
+
+def test_enhancement_key_ignores_key_order():
+    assert enhancement_key({"a": 1, "b": [1, 2]}) == enhancement_key({"b": [1, 2], "a": 1})
+    assert enhancement_key({"a": 1}) != enhancement_key({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_enhancement():
+    cache = EnhancementCache(max_entries=4, ttl_seconds=60)
+    calls = 0
+
+    async def enhance(cv_data):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"personalInfo": {"summary": "mejorado"}}
+
+    results = await asyncio.gather(*(cache.get_or_enhance(CV_DATA, enhance) for _ in range(4)))
+    again, cached = await cache.get_or_enhance(CV_DATA, enhance)
+
+    assert calls == 1
+    assert cached is True
+    assert [shared for _, shared in results].count(False) == 1
+    # Cada llamador recibe su copia.
+    results[0][0]["personalInfo"]["summary"] = "editado"
+    assert again["personalInfo"]["summary"] == "mejorado"
+
+
+@pytest.mark.asyncio
+async def test_enhancement_is_cached_when_owner_is_cancelled():
+    cache = EnhancementCache(max_entries=4, ttl_seconds=60)
+    release = asyncio.Event()
+
+    async def enhance(cv_data):
+        await release.wait()
+        return {"personalInfo": {"summary": "mejorado"}}
+
+    owner = asyncio.create_task(cache.get_or_enhance(CV_DATA, enhance))
+    await asyncio.sleep(0)
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+    release.set()
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert cache.get(enhancement_key(CV_DATA)) == {"personalInfo": {"summary": "mejorado"}}
+
+
+def test_cache_evicts_oldest_and_expires(monkeypatch):
+    cache = EnhancementCache(max_entries=2, ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr("app.services.enhancement_cache.time.monotonic", lambda: now[0])
+
+    for key in ("a", "b", "c"):
+        cache.put(key, {"key": key})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"key": "c"}
+
+    now[0] += 11
+    assert cache.get("c") is None
+
+
+@pytest.mark.asyncio
+async def test_batch_enhances_once_and_formats_per_template(mocker):
+    enhancement_cache.clear()
+    prompts = []
+
+    async def complete(prompt, **kwargs):
+        prompts.append(prompt)
+        if "Adjust the wording" in prompt:
+            return {"summary": "Resumen con foco académico", "experience": [{"description": "Investigué APIs"}]}
+        if "Professional Summary" in prompt:
+            return {"summary": "Backend developer con foco en APIs robustas y equipos ágiles de producto"}
+        return {}
+
+    mocker.patch.object(cv_generator, "get_ai_completion", side_effect=complete)
+
+    results = await cv_generator.generate_complete_cv_batch(CV_DATA, ["professional", "pure", "harvard", "pure"])
+
+    assert list(results) == ["professional", "pure", "harvard"]
+    # 3 secciones de la mejora (resumen, experiencia, skills) + 1 delta para harvard.
+    assert len(prompts) == 4
+    assert sum("Adjust the wording" in prompt for prompt in prompts) == 1
+
+    professional = results["professional"]["data"]
+    assert len(professional["skills"]) == 20
+    pure = results["pure"]["data"]
+    assert len(pure["skills"]) == 12
+    assert len(pure["experience"][0]["highlights"]) == 2
+    harvard = results["harvard"]["data"]
+    assert harvard["personalInfo"]["summary"] == "Resumen con foco académico"
+    assert harvard["experience"][0]["description"] == "Investigué APIs"
+    assert professional["experience"][0]["description"] == "Hice APIs"
+
+    single = await cv_generator.generate_complete_cv(CV_DATA, "terminal")
+    assert single["metadata"]["enhancement_cached"] is True
+    assert len(prompts) == 4
@@ -0,0 +1,51 @@
+from app.services.export_cache import ExportCache, etag_matches, export_cache_key
+
+
+CV = {"personalInfo": {"fullName": "Jane Doe"}, "skills": [{"name": "Python"}]}
+
+
+def test_export_cache_key_is_stable_and_sensitive():
+    key = export_cache_key(CV, "professional", "pdf")
+
+    # El orden de las claves no cambia el hash.
+    reordered = {"skills": [{"name": "Python"}], "personalInfo": {"fullName": "Jane Doe"}}
+    assert export_cache_key(reordered, "professional", "pdf") == key
+    assert export_cache_key(CV, "professional", "docx") != key
+    assert export_cache_key(CV, "harvard", "pdf") != key
+
+
+def test_export_cache_evicts_least_recently_used_by_bytes():
+    cache = ExportCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"  # "a" pasa a ser el más reciente
+
+    cache.put("c", b"1234")
+    # Un archivo más grande que el presupuesto no se guarda en memoria.
+    cache.put("huge", b"x" * 11)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get("huge") is None
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+
+def test_export_cache_disk_tier_survives_memory_eviction(tmp_path):
+    cache = ExportCache(max_bytes=4, disk_dir=str(tmp_path), disk_max_bytes=8)
+    cache.put("a", b"1234")
+    cache.put("b", b"5678")
+
+    assert cache.get("a") == b"1234"
+    assert cache.stats()["disk_hits"] == 1
+
+    cache.put("c", b"9999")
+    # El disco también respeta su presupuesto (se borra el menos usado).
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_etag_matches_lists_and_weak_validators():
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"x"', '"abc"')
+    assert not etag_matches(None, '"abc"')
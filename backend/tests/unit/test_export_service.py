@@ -30,3 +30,25 @@ def test_resolve_pdf_fonts_mapping():
     fonts = export_service._resolve_pdf_fonts(cv_data, "professional")
     assert fonts["heading"] == "Courier-Bold"
     assert fonts["body"] == "Times-Roman"
+
+
+def test_render_tree_is_shared_across_formats(mocker):
+    cv_data = {
+        "personalInfo": {"fullName": "Jane Doe", "summary": "Backend developer"},
+        "experience": [{"position": "Dev", "company": "Acme", "startDate": "2020", "current": True}],
+        "projects": [],
+        "config": {"sections": {"skills": {"visible": False}}},
+        "skills": [{"name": "Python"}],
+    }
+    compile_tree = mocker.spy(export_service, "compile_render_tree")
+
+    txt, _, _ = export_service.build_export_payload(cv_data, "professional", "txt")
+    export_service.build_export_payload(cv_data, "professional", "docx")
+    export_service.build_export_payload(cv_data, "professional", "pdf")
+
+    assert compile_tree.call_count == 1
+    tree = export_service.get_render_tree(cv_data, "professional")
+    # Secciones vacías u ocultas no llegan al tree.
+    assert [section.key for section in tree.sections] == ["summary", "experience"]
+    assert tree.sections[1].entries[0].meta == "2020 - Presente"
+    assert b"Dev \xc2\xb7 Acme\n  2020 - Presente" in txt
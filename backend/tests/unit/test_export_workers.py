@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services import export_workers
+from app.services.export_workers import render_export, stream_export_chunks
+
+
+@pytest.mark.asyncio
+async def test_render_export_runs_off_the_event_loop(mocker):
+    loop_thread = threading.get_ident()
+    render_threads = []
+
+    def fake_build(cv_data, template_id, export_format, tree=None):
+        render_threads.append(threading.get_ident())
+        return b"%PDF", "cv.pdf", "application/pdf"
+
+    mocker.patch.object(export_workers, "build_export_payload", fake_build)
+    assert await render_export({}, "professional", "pdf") == (b"%PDF", "cv.pdf", "application/pdf")
+
+    assert render_threads and render_threads[0] != loop_thread
+
+
+@pytest.mark.asyncio
+async def test_render_export_respects_per_format_limit(mocker):
+    mocker.patch.dict(export_workers.settings.EXPORT_FORMAT_CONCURRENCY, {"docx": 1})
+    mocker.patch.object(export_workers.settings, "EXPORT_WORKERS", 4)
+    export_workers.shutdown_export_workers()
+    active = []
+    peak = []
+
+    def slow_build(cv_data, template_id, export_format, tree=None):
+        active.append(export_format)
+        peak.append(len(active))
+        time.sleep(0.02)
+        active.remove(export_format)
+        return b"doc", "cv.docx", "application/octet-stream"
+
+    mocker.patch.object(export_workers, "build_export_payload", slow_build)
+    await asyncio.gather(*(render_export({}, "professional", "docx") for _ in range(3)))
+
+    assert max(peak) == 1
+    export_workers.shutdown_export_workers()
+
+
+@pytest.mark.asyncio
+async def test_stream_export_chunks_splits_without_losing_bytes():
+    content = bytes(range(256)) * 5
+    chunks = [chunk async for chunk in stream_export_chunks(content, chunk_size=300)]
+
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 300, 80]
+    assert b"".join(chunks) == content
@@ -0,0 +1,75 @@
+from app.services.job_matcher import (
+    extract_job_requirements,
+    match_job_description,
+)
+
+
+JOB_DESCRIPTION = (
+    "Buscamos Backend Developer con experiencia en Python, FastAPI y PostgreSQL. "
+    "Se valora Spring Boot, Docker y Kubernetes sobre AWS. Microservicios y CI/CD."
+)
+
+CV_DATA = {
+    "personalInfo": {"summary": "Desarrolladora backend con foco en APIs"},
+    "experience": [{"description": "APIs con FastAPI y PostgreSQL desplegadas en AWS"}],
+    "skills": [{"name": "Python"}, {"name": "Docker"}],
+}
+
+
+class TestExtractJobRequirements:
+    def test_known_skills_come_first_with_canonical_labels(self):
+        requirements = extract_job_requirements(JOB_DESCRIPTION)
+        labels = [item["label"] for item in requirements]
+        assert "Spring Boot" in labels
+        assert "CI/CD" in labels
+        first_free = next(i for i, item in enumerate(requirements) if not item["is_skill"])
+        assert all(item["is_skill"] for item in requirements[:first_free])
+
+    def test_multiword_skill_does_not_duplicate_its_tokens(self):
+        labels = {item["label"].lower() for item in extract_job_requirements(JOB_DESCRIPTION)}
+        assert "spring" not in labels
+        assert "boot" not in labels
+
+    def test_stopwords_are_ignored(self):
+        labels = {item["label"].lower() for item in extract_job_requirements(JOB_DESCRIPTION)}
+        assert not labels & {"buscamos", "experiencia", "con"}
+
+    def test_empty_description(self):
+        assert extract_job_requirements("") == []
+
+
+class TestMatchJobDescription:
+    def test_splits_matched_and_missing(self):
+        result = match_job_description(JOB_DESCRIPTION, CV_DATA)
+        assert {"Python", "FastAPI", "PostgreSQL", "Docker", "AWS"} <= set(result["matched_skills"])
+        assert {"Spring Boot", "Kubernetes"} <= set(result["missing_skills"])
+        assert result["match_score"] == 56
+
+    def test_full_match_scores_100(self):
+        cv = {"summary": JOB_DESCRIPTION}
+        assert match_job_description(JOB_DESCRIPTION, cv)["match_score"] == 100
+
+    def test_accents_do_not_break_matching(self):
+        result = match_job_description("Requisitos: inglés avanzado y liderazgo", {"languages": ["Ingles"]})
+        assert "Inglés" in result["matched_skills"]
+
+
+class TestRankCandidates:
+    def test_ranks_by_match_score_and_extracts_requirements_once(self, mocker):
+        from app.services import job_matcher
+
+        spy = mocker.spy(job_matcher, "extract_job_requirements")
+        requirements, ranking = job_matcher.rank_candidates(
+            JOB_DESCRIPTION,
+            [
+                ("weak", {"skills": [{"name": "Excel"}]}),
+                ("strong", CV_DATA),
+                ("text", "Python FastAPI PostgreSQL Spring Boot Docker Kubernetes AWS"),
+            ],
+        )
+
+        assert spy.call_count == 1
+        assert "Spring Boot" in requirements
+        assert [item["id"] for item in ranking] == ["text", "strong", "weak"]
+        assert [item["rank"] for item in ranking] == [1, 2, 3]
+        assert ranking[-1]["match_score"] == 0
@@ -0,0 +1,91 @@
+import pytest
+
+from app.api.schemas import CVData
+from app.services.json_repair import (
+    coerce_to_model,
+    get_repair_metrics,
+    parse_json_with_repair,
+    record_retry_avoided,
+    repair_json_text,
+    reset_repair_metrics,
+    track_repairs,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    reset_repair_metrics()
+    yield
+    reset_repair_metrics()
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ('```json\n{"a": 1,}\n```', {"a": 1}),
+        ("Aquí está tu CV: {'a': True, 'b': None} ¡listo!", {"a": True, "b": None}),
+        ('{"a": “hola”, "b": "línea\nnueva"}', {"a": "hola", "b": "línea\nnueva"}),
+        ('{"skills": [{"name": "Python"}, {"name": "SQL"},]}', {"skills": [{"name": "Python"}, {"name": "SQL"}]}),
+    ],
+)
+def test_repair_json_text_fixes_common_mistakes(raw, expected):
+    assert repair_json_text(raw) == expected
+
+
+def test_repair_json_text_completes_truncated_objects():
+    assert repair_json_text('{"a": [1, 2, {"b": "cortad') == {"a": [1, 2, {"b": "cortad"}]}
+    assert repair_json_text('{"a": 1, "b":') == {"a": 1, "b": None}
+    # Una clave a medio escribir se descarta volviendo al último corte seguro.
+    assert repair_json_text('{"a": 1, "ke') == {"a": 1}
+    assert repair_json_text("sin json") is None
+
+
+def test_parse_json_with_repair_records_avoided_retries():
+    assert parse_json_with_repair('{"ok": true}', "test") == {"ok": True}
+    assert get_repair_metrics()["attempts"] == 0
+
+    with track_repairs() as repairs:
+        assert parse_json_with_repair('{"ok": true}', "test") == {"ok": True}
+    assert not repairs.repaired
+
+    with track_repairs() as repairs:
+        assert parse_json_with_repair('{"ok": true,', "test") == {"ok": True}
+        assert parse_json_with_repair('{"ok": true,', "test") == {"ok": True}
+    assert repairs.repaired
+    record_retry_avoided("test")
+
+    with track_repairs() as repairs:
+        assert parse_json_with_repair("nada", "test") is None
+    assert not repairs.repaired
+
+    metrics = get_repair_metrics()
+    assert metrics["parse_repaired"] == 2
+    assert metrics["failed"] == 1
+    # Reparar no cuenta por sí solo: lo registra el llamador que se salteó el re-prompt.
+    assert metrics["retries_avoided"] == 1
+    assert metrics["by_context"]["test"]["retries_avoided"] == 1
+
+
+def test_coerce_to_model_fixes_types_and_drops_invalid_items():
+    payload = {
+        "personalInfo": {"fullName": "Jane Doe", "email": "no-es-un-mail", "phone": 5551234567},
+        "skills": [{"name": "Python"}, {"level": "Advanced"}],
+        "tools": "Git, Docker; Jira",
+    }
+
+    validated = coerce_to_model(CVData, payload, "extract_cv_data")
+
+    assert validated is not None
+    assert validated.personalInfo.email is None
+    assert validated.personalInfo.phone == "5551234567"
+    assert [skill.name for skill in validated.skills] == ["Python"]
+    assert validated.tools == ["Git", "Docker", "Jira"]
+    # El payload original no se toca.
+    assert payload["personalInfo"]["email"] == "no-es-un-mail"
+    assert len(payload["skills"]) == 2
+    assert get_repair_metrics()["validation_repaired"] == 1
+
+
+def test_coerce_to_model_gives_up_on_missing_required_root_fields():
+    assert coerce_to_model(CVData, {"skills": []}, "extract_cv_data") is None
+    assert get_repair_metrics()["failed"] == 1
@@ -0,0 +1,69 @@
+from app.api.schemas import ChatMessage, ChatSession
+from app.services import language_detection
+from app.services.language_detection import (
+    detect_cv_language,
+    detect_language,
+    detect_language_preference,
+    scan_language_signals,
+    update_session_language,
+)
+
+
+def _message(role: str, content: str) -> ChatMessage:
+    return ChatMessage(id=f"{role}-{content[:8]}", role=role, content=content)
+
+
+class TestDetectLanguage:
+    def test_english_text_is_not_misdetected_by_substrings(self):
+        # "en" dentro de "engineer" o "environment" no cuenta como español.
+        assert detect_language("Senior engineer working in cloud environments with the team") == "en"
+
+    def test_spanish_text(self):
+        assert detect_language("Lideré un equipo de desarrollo con cinco personas") == "es"
+
+    def test_empty_text_defaults_to_spanish(self):
+        assert detect_language("") == "es"
+
+    def test_results_are_memoized_by_text(self, mocker):
+        text = "Desarrollo de aplicaciones con React para clientes"
+        first = scan_language_signals(text)
+        scanner = mocker.patch.object(language_detection, "_LANGUAGE_SIGNAL_RE")
+        assert scan_language_signals(text) == first
+        scanner.finditer.assert_not_called()
+
+    def test_detect_cv_language(self):
+        cv = {"personalInfo": {"summary": "Software engineer with 5 years of experience"}}
+        assert detect_cv_language(cv) == "en"
+        cv["experience"] = [{"description": "Desarrollé microservicios para el área de pagos"}]
+        assert detect_cv_language(cv) == "es"
+
+
+class TestLanguagePreference:
+    def test_explicit_request_wins(self):
+        history = [_message("user", "Hola, me llamo Ana y trabajo en una consultora")]
+        assert detect_language_preference("Please write it in English", history) == "en"
+
+    def test_mentioning_a_language_skill_is_not_a_request(self):
+        assert detect_language_preference("Tengo nivel de inglés avanzado", []) == "es"
+
+
+class TestSessionLanguage:
+    def test_session_language_is_updated_incrementally(self, mocker):
+        session = ChatSession(session_id="s1", messages=[_message("user", "Hola, soy desarrolladora")])
+        assert update_session_language(session) == "es"
+        assert session.language.scanned_messages == 1
+
+        spy = mocker.spy(language_detection, "scan_language_signals")
+        session.messages.append(_message("assistant", "Contame de tu experiencia"))
+        session.messages.append(_message("user", "Can we continue in English please?"))
+        assert update_session_language(session) == "en"
+        # Solo se escaneó el mensaje nuevo del usuario.
+        assert spy.call_count == 1
+        assert session.language.scanned_messages == 3
+
+    def test_language_state_survives_serialization(self):
+        session = ChatSession(session_id="s2", messages=[_message("user", "I worked as a data analyst")])
+        update_session_language(session)
+        restored = ChatSession.model_validate(session.model_dump(mode="json"))
+        assert restored.language.code == "en"
+        assert restored.language.scanned_messages == 1
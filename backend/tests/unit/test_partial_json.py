@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from app.services.partial_json import IncrementalJSONParser
+
+DOCUMENT = {
+    "personalInfo": {"fullName": 'Ana "La Dev" {Pérez}', "email": "ana@example.com"},
+    "experience": [
+        {"company": "Acme", "highlights": ["a", "b"]},
+        {"company": "Globex"},
+    ],
+    "skills": ["Python", 3, True],
+    "score": 12,
+    "certifications": [],
+}
+
+
+def _feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return parser, events
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 17, 10_000])
+def test_parser_emits_sections_and_items_regardless_of_chunking(chunk_size):
+    text = "Claro, acá está:\n```json\n" + json.dumps(DOCUMENT, ensure_ascii=False) + "\n```"
+    parser, events = _feed_in_chunks(text, chunk_size)
+
+    assert parser.done
+    assert [(e["type"], e["section"], e.get("index")) for e in events] == [
+        ("section", "personalInfo", None),
+        ("item", "experience", 0),
+        ("item", "experience", 1),
+        ("section", "experience", None),
+        ("item", "skills", 0),
+        ("item", "skills", 1),
+        ("item", "skills", 2),
+        ("section", "skills", None),
+        ("section", "score", None),
+        ("section", "certifications", None),
+    ]
+    assert events[0]["data"] == DOCUMENT["personalInfo"]
+    assert events[1]["data"] == DOCUMENT["experience"][0]
+
+
+def test_parser_emits_items_before_the_section_closes():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"personalInfo": {"fullName": "Ana"}, "experience": [{"company": "A') == [
+        {"type": "section", "section": "personalInfo", "data": {"fullName": "Ana"}},
+    ]
+    events = parser.feed('cme"}, {"company": ')
+    assert events == [{"type": "item", "section": "experience", "index": 0, "data": {"company": "Acme"}}]
+    assert not parser.done
@@ -0,0 +1,62 @@
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from app.services import pdf_layout
+from app.services.export_service import build_export_payload
+from app.services.pdf_layout import clear_layout_caches, text_width, wrap_lines
+
+
+def setup_function():
+    clear_layout_caches()
+
+
+def test_text_width_matches_reportlab():
+    text = "Lideré la migración — 40% más rápido"
+    for font_name in ("Helvetica", "Times-Bold", "Courier"):
+        assert abs(text_width(text, font_name, 9) - stringWidth(text, font_name, 9)) < 1e-6
+
+
+def test_wrap_lines_fills_lines_without_overflowing():
+    text = "Reduje el tiempo de respuesta de la API en un 40% " * 12
+    max_width = 300
+
+    lines = wrap_lines(text, "Courier", 9, max_width)
+
+    assert " ".join(lines) == " ".join(text.split())
+    assert all(stringWidth(line, "Courier", 9) <= max_width for line in lines)
+    # Cada línea está llena: la siguiente palabra ya no entraba.
+    for line, following in zip(lines, lines[1:]):
+        next_word = following.split()[0]
+        assert stringWidth(f"{line} {next_word}", "Courier", 9) > max_width
+
+
+def test_wrap_lines_breaks_words_longer_than_a_line():
+    url = "https://example.com/" + "a" * 200
+    lines = wrap_lines(f"Ver {url}", "Helvetica", 9, 100)
+
+    assert lines[0] == "Ver"
+    assert "".join(lines[1:]) == url
+    assert all(stringWidth(line, "Helvetica", 9) <= 100 for line in lines)
+
+
+def test_wrap_lines_is_memoized(mocker):
+    measure = mocker.spy(pdf_layout, "stringWidth")
+    wrap_lines("Tech Lead · Acme", "Helvetica-Bold", 10, 468)
+    calls = measure.call_count
+
+    wrap_lines("Tech Lead · Acme", "Helvetica-Bold", 10, 468)
+    wrap_lines("Lead Tech · Acme", "Helvetica-Bold", 10, 468)  # mismos glifos
+
+    assert measure.call_count == calls
+    assert wrap_lines.cache_info().hits == 1
+
+
+def test_pdf_export_uses_configured_font_family():
+    cv_data = {
+        "personalInfo": {"fullName": "Jane Doe", "summary": "Backend developer"},
+        "config": {"fonts": {"heading": '"Fira Code"', "body": '"Fira Code"'}},
+    }
+    content, _, _ = build_export_payload(cv_data, "professional", "pdf")
+    assert b"/BaseFont /Courier-Bold" in content
+    assert b"/BaseFont /Courier " in content
+    # La plantilla usa Helvetica-Bold para títulos.
+    assert b"/BaseFont /Helvetica-Bold" not in content
@@ -0,0 +1,202 @@
+import asyncio
+
+import pytest
+
+from app.core.exceptions import AIServiceError
+from app.services.section_planner import assemble_sections, plan_sections, run_section_plan
+
+CV_DATA = {
+    "personalInfo": {"fullName": "Jane Doe", "summary": "Backend dev"},
+    "experience": [
+        {"id": "e1", "company": "Acme", "position": "Dev", "description": "Hice APIs"},
+        {"id": "e2", "company": "Globex", "position": "Lead", "description": "Lideré"},
+    ],
+    "education": [{"institution": "UBA"}],
+    "skills": [{"name": "Python"}],
+    "projects": [{"name": "CV Convos", "url": "https://example.com", "description": "App"}],
+}
+
+
+def _fake_response(prompt: str):
+    if "Professional Summary" in prompt:
+        return {"summary": "Backend developer con 5 años"}
+    if "experience entry" in prompt:
+        # La IA intenta cambiar la empresa: no debería pasar.
+        return {"company": "Inventada", "description": "Diseñé APIs REST", "highlights": ["-40% latencia"]}
+    if "skills list" in prompt:
+        return {"skills": ["Python", {"name": "FastAPI", "level": "Advanced"}]}
+    return {"projects": [{"name": "Otro", "description": "App de CVs con IA"}]}
+
+
+def test_plan_has_one_task_per_section_and_experience_entry():
+    tasks = plan_sections(CV_DATA, "generate", "Spanish")
+    assert [(task.section, task.index) for task in tasks] == [
+        ("summary", None),
+        ("experience", 0),
+        ("experience", 1),
+        ("skills", None),
+        ("projects", None),
+    ]
+    assert "Hice APIs" in tasks[1].prompt and "Lideré" not in tasks[1].prompt
+
+
+@pytest.mark.asyncio
+async def test_run_section_plan_is_concurrent_and_bounded():
+    in_flight = 0
+    peak = 0
+
+    async def complete(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return _fake_response(prompt)
+
+    tasks = plan_sections(CV_DATA, "generate", "Spanish")
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await run_section_plan(tasks, complete, concurrency=5)
+    assert loop.time() - start < 0.05 * len(tasks)  # secuencial serían 5 x 50 ms
+    assert peak == 5
+
+    peak = 0
+    await run_section_plan(tasks, complete, concurrency=2)
+    assert peak == 2
+    assert all(results)
+
+
+def test_assemble_keeps_facts_and_untouched_sections():
+    tasks = plan_sections(CV_DATA, "generate", "Spanish")
+    assembled = assemble_sections(CV_DATA, tasks, [_fake_response(task.prompt) for task in tasks])
+
+    assert assembled["personalInfo"]["summary"] == "Backend developer con 5 años"
+    assert assembled["experience"][0]["company"] == "Acme"
+    assert assembled["experience"][0]["description"] == "Diseñé APIs REST"
+    assert assembled["skills"][0] == {"name": "Python"}
+    assert assembled["projects"][0]["name"] == "CV Convos"
+    assert assembled["projects"][0]["description"] == "App de CVs con IA"
+    assert assembled["education"] == CV_DATA["education"]
+    assert CV_DATA["experience"][0]["description"] == "Hice APIs"
+
+
+@pytest.mark.asyncio
+async def test_failed_section_keeps_original_and_total_failure_raises():
+    async def flaky(prompt):
+        if "experience entry" in prompt:
+            raise AIServiceError("timeout")
+        return _fake_response(prompt)
+
+    tasks = plan_sections(CV_DATA, "improve", "Spanish")
+    results = await run_section_plan(tasks, flaky, concurrency=4)
+    assembled = assemble_sections(CV_DATA, tasks, results)
+    assert assembled["experience"] == CV_DATA["experience"]
+    assert assembled["personalInfo"]["summary"] == "Backend developer con 5 años"
+
+    async def down(prompt):
+        raise AIServiceError("sin proveedor")
+
+    with pytest.raises(AIServiceError):
+        await run_section_plan(tasks, down, concurrency=4)
+
+
+@pytest.mark.asyncio
+async def test_generate_complete_cv_reassembles_sections(mocker):
+    from app.services.cv_generator import generate_complete_cv
+    from app.services.enhancement_cache import enhancement_cache
+
+    enhancement_cache.clear()
+    completion = mocker.patch(
+        "app.services.cv_generator.get_ai_completion",
+        side_effect=lambda prompt, **kwargs: _fake_response(prompt),
+    )
+
+    result = await generate_complete_cv(CV_DATA, "professional")
+
+    assert completion.call_count == 5
+    assert result["data"]["experience"][1]["company"] == "Globex"
+    assert result["data"]["experience"][1]["highlights"] == ["-40% latencia"]
+    assert result["data"]["education"][0]["institution"] == "UBA"
+    assert result["metadata"]["section_counts"]["skills"] == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_complete_cv_stream_tags_sections_and_matches_final_payload(mocker):
+    import json
+
+    from app.services.cv_generator import generate_complete_cv, generate_complete_cv_stream
+    from app.services.enhancement_cache import enhancement_cache
+
+    async def fake_stream(prompt, system_msg):
+        document = json.dumps(_fake_response(prompt))
+        for start in range(0, len(document), 16):
+            yield {"type": "delta", "text": document[start:start + 16]}
+        yield {"type": "result", "data": json.loads(document), "provider": "groq"}
+
+    enhancement_cache.clear()
+    mocker.patch("app.services.cv_generator.stream_ai_completion", side_effect=fake_stream)
+    completion = mocker.patch(
+        "app.services.cv_generator.get_ai_completion",
+        side_effect=lambda prompt, **kwargs: _fake_response(prompt),
+    )
+
+    events = [json.loads(event[len("data: "):]) async for event in generate_complete_cv_stream(CV_DATA, "professional")]
+
+    sections = sorted(
+        (event["section"], event["index"] if event["index"] is not None else -1)
+        for event in events
+        if event["type"] == "section"
+    )
+    assert sections == [("experience", 0), ("experience", 1), ("projects", -1), ("skills", -1), ("summary", -1)]
+    assert any(event["type"] == "delta" and event["section"] == "experience" for event in events)
+    assert completion.call_count == 0
+
+    final = events[-1]
+    assert final["type"] == "complete"
+    assert final["data"]["metadata"]["enhancement_cached"] is False
+    assert final["data"]["data"]["experience"][1]["highlights"] == ["-40% latencia"]
+
+    # Misma respuesta que sin streaming (la mejora ya está cacheada).
+    direct = await generate_complete_cv(CV_DATA, "professional")
+    assert direct["data"] == final["data"]["data"]
+    assert set(direct) == set(final["data"])
+
+
+@pytest.mark.asyncio
+async def test_generate_complete_cv_stream_falls_back_only_without_a_provider(mocker):
+    import json
+
+    from app.services.cv_generator import generate_complete_cv_stream
+    from app.services.enhancement_cache import enhancement_cache
+
+    async def fake_stream(prompt, system_msg):
+        if "Professional Summary" in prompt:
+            # Ningún proveedor pudo abrir el stream.
+            yield {"type": "result", "data": None, "provider": None}
+        elif "skills list" in prompt:
+            # El proveedor respondió, pero no con JSON.
+            yield {"type": "delta", "text": "no es json"}
+            yield {"type": "result", "data": None, "provider": "groq"}
+        else:
+            yield {"type": "result", "data": _fake_response(prompt), "provider": "groq"}
+
+    enhancement_cache.clear()
+    mocker.patch("app.services.cv_generator.stream_ai_completion", side_effect=fake_stream)
+    completion = mocker.patch(
+        "app.services.cv_generator.get_ai_completion",
+        side_effect=lambda prompt, **kwargs: _fake_response(prompt),
+    )
+
+    events = [json.loads(event[len("data: "):]) async for event in generate_complete_cv_stream(CV_DATA, "professional")]
+    sections = {event["section"]: event for event in events if event["type"] == "section"}
+
+    assert completion.call_count == 1
+    assert "Professional Summary" in completion.call_args.kwargs["prompt"]
+    assert sections["summary"]["data"] == {"summary": "Backend developer con 5 años"}
+    assert sections["skills"]["data"] is None
+    assert "skills" in sections["skills"]["error"]
+
+    final = events[-1]
+    assert final["type"] == "complete"
+    # La sección fallida conserva el contenido original.
+    assert [skill["name"] for skill in final["data"]["data"]["skills"]] == ["Python"]
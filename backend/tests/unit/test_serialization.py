@@ -0,0 +1,33 @@
+import json
+
+from app.api.schemas import ChatMessage, ChatSession
+from app.core.serialization import ORJSONResponse, dump_model, load_model, sse_event
+
+
+def test_sse_event_matches_json_content():
+    data = {"type": "delta", "content": "Diseñé APIs 🚀", "index": 3, "items": [1.5, None, True]}
+
+    event = sse_event(data)
+
+    assert event.startswith("data: ") and event.endswith("\n\n")
+    assert json.loads(event[len("data: "):]) == data
+    assert "Diseñé" in event  # sin escapes \u
+
+
+def test_session_roundtrip_matches_legacy_payload():
+    session = ChatSession(
+        session_id="abc",
+        cv_data={"personalInfo": {"fullName": "Ana Pérez"}, "skills": [{"name": "Python"}]},
+        messages=[ChatMessage(id="m1", role="user", content="Hola")],
+    )
+
+    raw = dump_model(session)
+
+    assert json.loads(raw) == json.loads(json.dumps(session.model_dump(mode="json")))
+    assert load_model(ChatSession, raw) == session
+
+
+def test_orjson_response_renders_dicts():
+    response = ORJSONResponse({"status": "ok", 1: "uno"})
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"status": "ok", "1": "uno"}
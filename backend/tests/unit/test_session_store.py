@@ -0,0 +1,177 @@
+import asyncio
+from typing import Dict, Optional
+
+import pytest
+
+from app.api.schemas import ChatMessage, ChatSession
+from app.services.session_store import BaseSessionStore, CachedSessionStore
+
+
+class MemoryStore(BaseSessionStore):
+    """Backend en memoria que cuenta lecturas y escrituras."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.ttl_seconds = 3600
+        self.data: Dict[str, str] = {}
+        self.reads = 0
+        self.writes = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def get_session(self, session_id: str) -> Optional[ChatSession]:
+        self.reads += 1
+        raw = self.data.get(session_id)
+        return ChatSession.model_validate_json(raw) if raw else None
+
+    async def save_session(self, session: ChatSession) -> None:
+        self.writes += 1
+        self.data[session.session_id] = session.model_dump_json()
+
+
+class LocalBus:
+    """Invalidador en memoria con la interfaz de `RedisSessionInvalidator`."""
+
+    def __init__(self) -> None:
+        self.subscribers = []
+
+    def connect(self):
+        bus = self
+
+        class Invalidator:
+            async def start(self, on_invalidate):
+                self.on_invalidate = on_invalidate
+                bus.subscribers.append(self)
+
+            async def publish(self, session_id):
+                for subscriber in bus.subscribers:
+                    if subscriber is not self:
+                        subscriber.on_invalidate(session_id)
+
+            async def close(self):
+                bus.subscribers.remove(self)
+
+        return Invalidator()
+
+
+def _cached(backend, **kwargs) -> CachedSessionStore:
+    options = {"max_entries": 8, "flush_delay": 60, "ttl_seconds": 3600, **kwargs}
+    return CachedSessionStore(backend, **options)
+
+
+def _message(content: str) -> ChatMessage:
+    return ChatMessage(id=content, role="user", content=content)
+
+
+@pytest.mark.asyncio
+async def test_hot_session_costs_one_write_per_turn_and_no_reads():
+    backend = MemoryStore()
+    store = _cached(backend)
+    await store.initialize()
+    await store.save_session(ChatSession(session_id="s1"))
+    await store.flush("s1")
+
+    for turn in range(3):
+        async with store.lock("s1"):
+            session = await store.get_session("s1")
+            session.messages.append(_message(f"turno {turn}"))
+            await store.save_session(session)
+            session.cv_data = {"personalInfo": {"fullName": "Ana"}}
+            await store.save_session(session)
+            await store.flush("s1")
+
+    assert backend.reads == 0
+    assert backend.writes == 4
+    assert len(ChatSession.model_validate_json(backend.data["s1"]).messages) == 3
+
+
+@pytest.mark.asyncio
+async def test_pending_write_is_flushed_after_delay_and_on_close():
+    backend = MemoryStore()
+    store = _cached(backend, flush_delay=0.01)
+
+    await store.save_session(ChatSession(session_id="s1"))
+    await store.save_session(ChatSession(session_id="s1"))
+    assert backend.writes == 0
+    await asyncio.sleep(0.05)
+    assert backend.writes == 1
+
+    slow = _cached(backend)
+    await slow.save_session(ChatSession(session_id="s2"))
+    await slow.close()
+    assert "s2" in backend.data
+
+
+@pytest.mark.asyncio
+async def test_eviction_keeps_dirty_sessions_and_expired_ones_are_reloaded():
+    backend = MemoryStore()
+    store = _cached(backend, max_entries=1, ttl_seconds=0)
+
+    await store.save_session(ChatSession(session_id="a"))
+    await store.save_session(ChatSession(session_id="b"))
+    assert await store.get_session("a") is not None
+    assert backend.reads == 0
+
+    await store.flush("a")
+    await store.flush("b")
+    await store.get_session("a")
+    assert backend.reads == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_other_workers():
+    backend = MemoryStore()
+    bus = LocalBus()
+    worker_a = _cached(backend, invalidator=bus.connect())
+    worker_b = _cached(backend, invalidator=bus.connect())
+    await worker_a.initialize()
+    await worker_b.initialize()
+
+    await worker_a.save_session(ChatSession(session_id="s1"))
+    await worker_a.flush("s1")
+    stale = await worker_b.get_session("s1")
+    assert stale.messages == []
+
+    session = await worker_a.get_session("s1")
+    session.messages.append(_message("hola"))
+    await worker_a.save_session(session)
+    await worker_a.flush("s1")
+
+    fresh = await worker_b.get_session("s1")
+    assert [message.content for message in fresh.messages] == ["hola"]
+    assert backend.reads == 2
+
+
+def test_shared_stores_get_invalidation_or_a_warning(monkeypatch, caplog):
+    from app.services import session_store
+
+    monkeypatch.setattr(session_store.settings, "SESSION_CACHE_SIZE", 16)
+    monkeypatch.setattr(session_store.settings, "SESSION_CACHE_REDIS_URL", "")
+    monkeypatch.setenv("SESSION_STORE_TYPE", "redis")
+    monkeypatch.setenv("REDIS_URL", "redis://sessions:6379/1")
+
+    cached = session_store._load_store()
+    assert cached.invalidator.redis_url == "redis://sessions:6379/1"
+
+    for store_type in ("postgres", "sqlite"):
+        monkeypatch.setenv("SESSION_STORE_TYPE", store_type)
+        caplog.clear()
+        with caplog.at_level("WARNING", logger="app.services.session_store"):
+            cached = session_store._load_store()
+        assert cached.invalidator is None
+        assert "SESSION_CACHE_REDIS_URL" in caplog.text
+
+
+def test_cache_is_disabled_for_several_workers_without_invalidation(monkeypatch, tmp_path):
+    from app.services import session_store
+
+    monkeypatch.setattr(session_store.settings, "SESSION_CACHE_SIZE", 16)
+    monkeypatch.setattr(session_store.settings, "SESSION_CACHE_REDIS_URL", "")
+    monkeypatch.setattr(session_store.settings, "WEB_CONCURRENCY", 4)
+    monkeypatch.setenv("SESSION_STORE_TYPE", "sqlite")
+    monkeypatch.setenv("CHAT_SESSION_DB_PATH", str(tmp_path / "sessions.db"))
+    assert isinstance(session_store._load_store(), session_store.SQLiteSessionStore)
+
+    monkeypatch.setattr(session_store.settings, "SESSION_CACHE_REDIS_URL", "redis://bus:6379/0")
+    assert isinstance(session_store._load_store(), session_store.CachedSessionStore)
@@ -0,0 +1,115 @@
+import json
+
+import httpx
+import pytest
+from unittest.mock import MagicMock
+from groq import BadRequestError
+
+from app.services.ai_service import (
+    CV_DATA_OUTPUT,
+    JOB_TAILORING_OUTPUT,
+    MODEL_ID,
+    _call_groq_api,
+    extract_cv_data,
+)
+from app.services.structured_output import (
+    reset_structured_output_support,
+    supports_structured_output,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_support():
+    reset_structured_output_support()
+    yield
+    reset_structured_output_support()
+
+
+def _groq_response(content):
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+
+def test_generated_schemas_are_self_contained():
+    cv_schema = json.dumps(CV_DATA_OUTPUT.json_schema)
+    assert "$ref" not in cv_schema and "$defs" not in cv_schema
+    assert CV_DATA_OUTPUT.json_schema["required"] == ["personalInfo"]
+    assert "fieldOfStudy" in cv_schema
+
+    # Solo los campos que completa la IA; el match se calcula localmente.
+    tailoring = JOB_TAILORING_OUTPUT.json_schema
+    assert set(tailoring["properties"]) == {"suggestions", "optimized_cv"}
+    assert "match_score" not in tailoring.get("required", [])
+
+
+@pytest.mark.asyncio
+async def test_extract_cv_data_sends_schema_instead_of_prose(mocker):
+    mocker.patch("app.services.ai_service.settings.GROQ_API_KEY", "test_key")
+    mock_client = mocker.patch("app.services.ai_service.Groq").return_value
+    mock_client.chat.completions.create.return_value = _groq_response(
+        '{"personalInfo": {"fullName": "John Doe"}}'
+    )
+
+    await extract_cv_data("CV Text")
+
+    kwargs = mock_client.chat.completions.create.call_args.kwargs
+    assert kwargs["response_format"]["type"] == "json_schema"
+    assert kwargs["response_format"]["json_schema"]["name"] == "cv_data"
+    assert "Strictly follow this schema" not in kwargs["messages"][1]["content"]
+
+
+def test_groq_falls_back_to_prose_schema_when_unsupported(mocker):
+    mocker.patch("app.services.ai_service.settings.GROQ_API_KEY", "test_key")
+    mock_client = mocker.patch("app.services.ai_service.Groq").return_value
+    rejection = BadRequestError(
+        "json_schema not supported",
+        response=httpx.Response(400, request=httpx.Request("POST", "https://api.groq.com")),
+        body=None,
+    )
+    mock_client.chat.completions.create.side_effect = [
+        rejection,
+        _groq_response('{"personalInfo": {"fullName": "John Doe"}}'),
+        _groq_response('{"personalInfo": {"fullName": "Jane Doe"}}'),
+    ]
+
+    result = _call_groq_api.retry_with(stop=lambda _: True)("CV", "system", True, CV_DATA_OUTPUT)
+
+    assert result["personalInfo"]["fullName"] == "John Doe"
+    fallback_kwargs = mock_client.chat.completions.create.call_args.kwargs
+    assert fallback_kwargs["response_format"] == {"type": "json_object"}
+    assert "Strictly follow this schema" in fallback_kwargs["messages"][1]["content"]
+    assert not supports_structured_output("groq", MODEL_ID)
+
+    # Las llamadas siguientes ya no pagan el rechazo.
+    _call_groq_api.retry_with(stop=lambda _: True)("CV", "system", True, CV_DATA_OUTPUT)
+    assert mock_client.chat.completions.create.call_count == 3
+
+
+def test_other_client_errors_keep_structured_output_enabled(mocker):
+    from google.genai import errors as genai_errors
+
+    from app.services.ai_service import GEMINI_MODEL_ID, _call_gemini_api
+
+    mocker.patch("app.services.ai_service.settings.GROQ_API_KEY", "test_key")
+    mock_client = mocker.patch("app.services.ai_service.Groq").return_value
+    context_length = BadRequestError(
+        "Please reduce the length of the messages or completion.",
+        response=httpx.Response(400, request=httpx.Request("POST", "https://api.groq.com")),
+        body={"error": {"type": "invalid_request_error", "code": "context_length_exceeded"}},
+    )
+    mock_client.chat.completions.create.side_effect = context_length
+
+    with pytest.raises(BadRequestError):
+        _call_groq_api.retry_with(stop=lambda _: True)("CV", "system", True, CV_DATA_OUTPUT)
+    # No se reintenta con el schema en prosa: el error sigue su camino normal.
+    assert mock_client.chat.completions.create.call_count == 1
+    assert supports_structured_output("groq", MODEL_ID)
+
+    mocker.patch("app.services.ai_service.settings.GOOGLE_API_KEY", "test_key")
+    gemini = mocker.patch("app.services.ai_service.genai.Client").return_value
+    gemini.models.generate_content.side_effect = genai_errors.ClientError(
+        429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).", "status": "RESOURCE_EXHAUSTED"}}
+    )
+
+    assert _call_gemini_api("CV", "system", True, CV_DATA_OUTPUT) is None
+    assert gemini.models.generate_content.call_count == 1
+    assert supports_structured_output("gemini", GEMINI_MODEL_ID)
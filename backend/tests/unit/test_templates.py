@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from app.core.templates import DEFAULT_TEMPLATES_DIR, TemplateRegistry, load_templates
+from app.services.template_assets import get_template_assets
+
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    directory = tmp_path / "templates"
+    shutil.copytree(DEFAULT_TEMPLATES_DIR, directory)
+    return directory
+
+
+def _edit(path, **changes):
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data.update(changes)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    # Fuerza un mtime distinto aunque el filesystem tenga poca resolución.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_bundled_templates_load_in_file_order_with_aliases():
+    snapshot = load_templates(DEFAULT_TEMPLATES_DIR)
+    assert snapshot.unique[0].id == "professional"
+    assert snapshot.templates["minimal"] is snapshot.templates["pure"]
+    assert b"prompt" not in snapshot.public_payload
+    assert b"aliases" not in snapshot.public_payload
+
+
+def test_reload_swaps_snapshot_only_when_files_change(templates_dir):
+    registry = TemplateRegistry(str(templates_dir))
+    payload, etag = registry.get_public_payload()
+    seen = []
+    registry.add_listener(seen.append)
+
+    assert registry.reload() is False
+
+    _edit(templates_dir / "01-professional.json", name="Ejecutivo")
+    assert registry.reload() is True
+    assert registry.version == 2
+    assert registry.get_template("professional").name == "Ejecutivo"
+    assert registry.get_public_payload()[1] != etag
+    assert [snapshot.version for snapshot in seen] == [2]
+
+
+def test_invalid_template_keeps_previous_version(templates_dir):
+    registry = TemplateRegistry(str(templates_dir))
+    (templates_dir / "10-broken.json").write_text('{"id": "broken"}', encoding="utf-8")
+
+    assert registry.reload() is False
+    assert registry.version == 1
+    assert registry.get_template("broken") is None
+    assert registry.get_template("professional") is not None
+
+
+def test_duplicate_alias_is_rejected(templates_dir):
+    _edit(templates_dir / "02-harvard.json", aliases=["minimal"])
+    with pytest.raises(ValueError):
+        load_templates(str(templates_dir))
+
+
+def test_template_assets_are_compiled_once_per_version(templates_dir, monkeypatch):
+    from app.services import template_assets
+
+    registry = TemplateRegistry(str(templates_dir))
+    monkeypatch.setattr(template_assets, "registry", registry)
+    monkeypatch.setattr(template_assets, "_assets", {})
+    registry.add_listener(template_assets.warm_template_assets)
+
+    config = registry.get_template("professional")
+    assets = get_template_assets(config)
+    assert get_template_assets(config) is assets
+    assert assets.formatting_prompt == config.prompt.strip()
+
+    _edit(templates_dir / "01-professional.json", styles={**config.styles, "accent": "#ff0000"})
+    registry.reload()
+    reloaded = get_template_assets(registry.get_template("professional"))
+    assert reloaded is not assets
+    assert reloaded.accent.hexval() == "0xff0000"